@@ -1,7 +1,11 @@
+import logging
+
 from flask import Flask
 from flask_cors import CORS
 from config import Config
 from extensions import db
+from models.migrations import prepare_file_tables
+from utils.process_pool import in_pool_worker
 
 from routes.mapping_routes import mapping_bp
 from routes.bulk_assign_customers import bulk_bp
@@ -32,6 +36,20 @@ from routes.auditor.upload_routes import upload_bp
 
 from routes.dashboard.main_routes import main_bp
 from routes.routes import api1_bp
+from routes.job_routes import job_bp
+from routes.artifact_routes import artifact_bp
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_database(app):
+    """Add the blob store columns the saved-file models select, if an older database lacks them"""
+    try:
+        with app.app_context():
+            prepare_file_tables()
+    except Exception as e:
+        logger.error(f"Could not prepare the saved-file tables ({e}); saving and listing files will fail "
+                     f"until the database is reachable and 'python -m models.migrations' has run")
 
 def create_app():
     app = Flask(__name__)
@@ -72,8 +90,13 @@ def create_app():
 
     app.register_blueprint(main_bp)
     app.register_blueprint(api1_bp, url_prefix='/api')
-    
-    
+    app.register_blueprint(job_bp, url_prefix='/api')
+    app.register_blueprint(artifact_bp, url_prefix='/api')
+
+    # Job workers build their own app; the serving process has prepared the tables
+    if not in_pool_worker():
+        prepare_database(app)
+
     return app
 
 # db = SQLAlchemy()
@@ -0,0 +1,159 @@
+# benchmarks/mapping_indexes.py
+
+import os
+import random
+import argparse
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import insert, inspect
+
+from models.schema import *
+from models.migrations import MAPPING_MODELS, migrate_mapping_indexes
+from extensions import db
+from services.mapping_snapshot import invalidate_mapping_snapshot
+import services.mapping_service as svc
+
+# Seeds an empty database with realistic mapping volumes, then times the
+# mapping lookups on the legacy schema (no secondary indexes) and again after
+# models.migrations has run. Point --db at a scratch database only: the
+# benchmark refuses to seed one that already holds customers.
+#
+#   python -m benchmarks.mapping_indexes
+#   python -m benchmarks.mapping_indexes --db mysql+pymysql://user:pw@host/bench
+
+
+def _make_app(db_uri):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = db_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def _create_legacy_schema():
+    """Mapping tables as they were before the migration: no secondary indexes"""
+    db.create_all()
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for model in MAPPING_MODELS:
+            present = {ix["name"] for ix in inspector.get_indexes(model.__tablename__)}
+            for index in model.__table__.indexes:
+                if index.name in present:
+                    index.drop(conn)
+
+
+def _seed(rng, customers, executives, branches=40, regions=8, companies=100, products=2000):
+    exec_rows = [{"id": i, "name": f"EXECUTIVE {i:04d}", "code": f"E{i:04d}"} for i in range(1, executives + 1)]
+    customer_rows = [{"id": i, "code": f"C{i:06d}", "name": f"Customer {i}",
+                      "executive_id": rng.randint(1, executives)} for i in range(1, customers + 1)]
+    branch_rows = [{"id": i, "name": f"BRANCH {i:02d}"} for i in range(1, branches + 1)]
+    region_rows = [{"id": i, "name": f"REGION {i}"} for i in range(1, regions + 1)]
+    company_rows = [{"id": i, "name": f"Company {i:03d}"} for i in range(1, companies + 1)]
+    product_rows = [{"id": i, "name": f"Product {i:05d}"} for i in range(1, products + 1)]
+
+    # Executives usually cover one branch, some two; every branch sits in one region
+    branch_exec = [{"executive_id": e, "branch_id": rng.randint(1, branches)} for e in range(1, executives + 1)]
+    branch_exec += [{"executive_id": e, "branch_id": rng.randint(1, branches)}
+                    for e in rng.sample(range(1, executives + 1), executives // 4)]
+    region_branch = [{"region_id": rng.randint(1, regions), "branch_id": b} for b in range(1, branches + 1)]
+    company_product = [{"company_id": rng.randint(1, companies), "product_id": p} for p in range(1, products + 1)]
+    company_product += [{"company_id": rng.randint(1, companies), "product_id": rng.randint(1, products)}
+                        for _ in range(products // 2)]
+
+    for model, rows in (
+        (Executive, exec_rows), (Customer, customer_rows), (Branch, branch_rows), (Region, region_rows),
+        (Company, company_rows), (Product, product_rows), (BranchExecutiveMap, branch_exec),
+        (RegionBranchMap, region_branch), (CompanyProductMap, company_product),
+    ):
+        db.session.execute(insert(model), rows)
+    db.session.commit()
+    return [row["code"] for row in customer_rows], [row["name"] for row in exec_rows]
+
+
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _measure(app, codes, exec_names, repeat):
+    sample_codes = codes[::max(1, len(codes) // 1000)]
+
+    def cold(func):
+        def run():
+            invalidate_mapping_snapshot()
+            with app.app_context():
+                func()
+        return run
+
+    def in_context(func):
+        def run():
+            with app.app_context():
+                func()
+                db.session.remove()
+        return run
+
+    return {
+        "get_exec_by_customer_code (1000 codes, snapshot rebuild)":
+            _best_of(repeat, cold(lambda: [svc.get_exec_by_customer_code(c) for c in sample_codes])),
+        "get_branches_for_executive (all executives, snapshot rebuild)":
+            _best_of(repeat, cold(lambda: [svc.get_branches_for_executive(n) for n in exec_names])),
+        "export_all_mappings":
+            _best_of(repeat, in_context(svc.export_all_mappings)),
+        "Customer by code, one query per code (1000 codes)":
+            _best_of(repeat, in_context(lambda: [Customer.query.filter_by(code=c).first() for c in sample_codes])),
+        "get_exec_customers (all executives)":
+            _best_of(repeat, in_context(lambda: [svc.get_exec_customers(n) for n in exec_names])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time mapping lookups before and after the index migration")
+    parser.add_argument("--db", help="SQLAlchemy URI of an empty scratch database (default: temporary SQLite file)")
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--executives", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scratch = None
+    if not args.db:
+        fd, scratch = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        args.db = f"sqlite:///{scratch}"
+
+    app = _make_app(args.db)
+    try:
+        with app.app_context():
+            inspector = inspect(db.engine)
+            if inspector.has_table(Customer.__tablename__) and db.session.query(Customer.id).first() is not None:
+                parser.error("the target database already has customers; use an empty scratch database")
+            _create_legacy_schema()
+            codes, exec_names = _seed(random.Random(args.seed), args.customers, args.executives)
+
+        before = _measure(app, codes, exec_names, args.repeat)
+        with app.app_context():
+            created = migrate_mapping_indexes()
+        after = _measure(app, codes, exec_names, args.repeat)
+    finally:
+        if scratch:
+            with app.app_context():
+                db.engine.dispose()
+            os.remove(scratch)
+
+    print(f"{args.customers} customers, {args.executives} executives; best of {args.repeat} runs")
+    print(f"Migration created {len(created)} index(es): {', '.join(created)}")
+    width = max(len(name) for name in before)
+    print(f"{'':{width}}  {'before':>10}  {'after':>10}  {'speedup':>8}")
+    for name, seconds in before.items():
+        print(f"{name:{width}}  {seconds * 1000:8.1f}ms  {after[name] * 1000:8.1f}ms  {seconds / after[name]:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/ppt_tables.py
+
+import io
+import time
+import types
+import logging
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from utils import executive_ppt_generator, ppt_generator, consolidated_ppt
+from utils.ppt_pipeline import new_presentation
+
+# Times the table slide builders before and after they moved to the templated
+# renderer in utils/ppt_table.py. The old builders are loaded from git and both
+# versions fill the same decks of generated tables; the figures are table
+# slides per second. The baseline is the parent of the commit that introduced
+# the renderer:
+#
+#   rev=$(git log --reverse --format=%h -S "from utils.ppt_table import" -- utils/ppt_generator.py | head -1)
+#   python -m benchmarks.ppt_tables --baseline "$rev^"
+#   python -m benchmarks.ppt_tables --baseline "$rev^" --slides 60 --rows 40 --columns 12
+
+# name -> (module, builder name, call with (prs, df, title, percent_col))
+BUILDERS = {
+    "executive deck": (executive_ppt_generator, "add_table_slide",
+                       lambda f, prs, df, title, pct: f(prs, df, title, [pct])),
+    "branch deck": (ppt_generator, "add_table_slide",
+                    lambda f, prs, df, title, pct: f(prs, df, title, [pct])),
+    "branch deck, single %": (ppt_generator, "_add_table_slide",
+                              lambda f, prs, df, title, pct: f(prs, title, df, pct)),
+    "consolidated deck": (consolidated_ppt, "_add_table_slide",
+                          lambda f, prs, df, title, pct: f(prs, title, df, [pct])),
+}
+
+
+def load_baseline(module, rev):
+    """The module as it was at a git revision"""
+    path = module.__name__.replace(".", "/") + ".py"
+    source = subprocess.run(["git", "show", f"{rev}:./{path}"], capture_output=True, text=True, check=True).stdout
+    baseline = types.ModuleType(f"baseline_{module.__name__.rsplit('.', 1)[-1]}")
+    exec(compile(source, f"{rev}:{path}", "exec"), baseline.__dict__)
+    return baseline
+
+
+def make_tables(rng, slides, rows, columns):
+    """Executive tables with a % column and a TOTAL row"""
+    tables = []
+    for i in range(slides):
+        df = pd.DataFrame({"Executive": [f"Executive {j}" for j in range(rows - 1)] + ["TOTAL"]})
+        for c in range(columns - 2):
+            df[f"Month {c + 1}"] = rng.random(rows) * 1e5
+        df["%"] = rng.random(rows) * 120
+        df.iloc[rng.integers(0, rows - 1), 1] = np.nan
+        tables.append((df, f"Budget vs Billed {i + 1}"))
+    return tables
+
+
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _deck_runner(builder, call, tables, percent_col):
+    def run():
+        prs = new_presentation()
+        with redirect_stdout(io.StringIO()):  # the old builders print their columns
+            for df, title in tables:
+                call(builder, prs, df.copy(), title, percent_col)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time PPT table slides before and after the templated renderer")
+    parser.add_argument("--baseline", required=True, help="git revision of the old builders (see the header of this script)")
+    parser.add_argument("--slides", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=25)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # column-order warnings for the generated tables
+    tables = make_tables(np.random.default_rng(args.seed), args.slides, args.rows, args.columns)
+    percent_col = args.columns - 1
+
+    baselines, results = {}, {}
+    for name, (module, builder_name, call) in BUILDERS.items():
+        if module not in baselines:
+            baselines[module] = load_baseline(module, args.baseline)
+        before = _best_of(args.repeat, _deck_runner(getattr(baselines[module], builder_name), call, tables, percent_col))
+        after = _best_of(args.repeat, _deck_runner(getattr(module, builder_name), call, tables, percent_col))
+        results[name] = (args.slides / before, args.slides / after)
+
+    print(f"{args.slides} slides of {args.rows}x{args.columns} tables; best of {args.repeat} runs")
+    width = max(len(name) for name in results)
+    print(f"{'':{width}}  {'before':>12}  {'after':>12}  {'speedup':>8}")
+    for name, (before, after) in results.items():
+        print(f"{name:{width}}  {before:8.1f} sl/s  {after:8.1f} sl/s  {after / before:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
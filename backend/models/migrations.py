@@ -0,0 +1,191 @@
+# models/migrations.py
+
+import io
+import logging
+
+from sqlalchemy import inspect, select, text, update
+
+from models.schema import *
+from extensions import db
+from utils.blob_store import put_blob
+from services.file_store import workbook_sheets
+
+logger = logging.getLogger(__name__)
+
+# The mapping tables predate their indexes, and db.create_all() never touches a
+# table that already exists. This migration brings an existing database up to
+# the indexes declared in models/schema.py: every declared index that is
+# missing is created, unless an index over the same columns is already there
+# (MySQL adds one for each foreign key, for instance). Before a unique index
+# is created, duplicate rows are deleted, keeping the oldest (lowest id) row
+# of each group, which is the row the mapping snapshot already used.
+#
+# The saved-file tables get their blob store columns (sha256, size, sheets)
+# and the bytes still held in file_data are moved to the blob store one row
+# at a time, each in its own transaction, so an interrupted run resumes where
+# it stopped. Running the migrations again is a no-op. The column step alone
+# (prepare_file_tables) also runs when the app starts, since the file models
+# select the new columns.
+#
+#   python -m models.migrations
+
+MAPPING_MODELS = (
+    Executive, Customer, Branch, Region, BranchExecutiveMap, RegionBranchMap,
+    Company, Product, CompanyProductMap,
+)
+FILE_MODELS = (BudgetFile, SalesFile, OsFile, LastYearSalesFile)
+
+
+def _existing_indexes(inspector, table_name):
+    """(name, columns, unique) of the indexes and unique constraints on a table"""
+    found = [(ix['name'], tuple(ix['column_names']), bool(ix.get('unique')))
+             for ix in inspector.get_indexes(table_name)]
+    found += [(uc['name'], tuple(uc['column_names']), True)
+              for uc in inspector.get_unique_constraints(table_name)]
+    pk = inspector.get_pk_constraint(table_name)
+    if pk.get('constrained_columns'):
+        found.append((pk.get('name'), tuple(pk['constrained_columns']), True))
+    return found
+
+
+def _is_covered(index, existing):
+    columns = tuple(col.name for col in index.columns)
+    for name, existing_columns, unique in existing:
+        if name == index.name:
+            return True
+        if existing_columns == columns and (unique or not index.unique):
+            return True
+    return False
+
+
+def _delete_duplicates(conn, table, columns):
+    """Delete all but the lowest-id row of each group of rows equal on columns"""
+    quote = conn.dialect.identifier_preparer.quote
+    table_name = quote(table.name)
+    group_by = ", ".join(quote(col) for col in columns)
+    # The derived table lets MySQL read the table it deletes from
+    result = conn.execute(text(
+        f"DELETE FROM {table_name} WHERE id NOT IN "
+        f"(SELECT id FROM (SELECT MIN(id) AS id FROM {table_name} GROUP BY {group_by}) AS keep)"
+    ))
+    return result.rowcount
+
+
+def _create_missing_indexes(conn, inspector, table):
+    created = []
+    existing = _existing_indexes(inspector, table.name)
+    for index in sorted(table.indexes, key=lambda ix: ix.name):
+        if _is_covered(index, existing):
+            continue
+        columns = [col.name for col in index.columns]
+        if index.unique:
+            removed = _delete_duplicates(conn, table, columns)
+            if removed:
+                logger.warning(f"Removed {removed} duplicate rows from {table.name} ({', '.join(columns)})")
+        index.create(conn)
+        existing.append((index.name, tuple(columns), bool(index.unique)))
+        created.append(index.name)
+        logger.info(f"Created index {index.name} on {table.name} ({', '.join(columns)})")
+    return created
+
+
+def migrate_mapping_indexes(engine=None):
+    """Create the missing mapping-table indexes; returns the names of those created"""
+    engine = engine or db.engine
+    created = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for model in MAPPING_MODELS:
+            table = model.__table__
+            if not inspector.has_table(table.name):
+                table.create(conn)
+                logger.info(f"Created table {table.name}")
+                continue
+            created += _create_missing_indexes(conn, inspector, table)
+    return created
+
+
+### --------- Saved files ----------
+
+def _prepare_file_table(conn, table):
+    """Add the blob store columns and indexes; True if file_data can be cleared"""
+    inspector = inspect(conn)
+    if not inspector.has_table(table.name):
+        table.create(conn)
+        logger.info(f"Created table {table.name}")
+        return True
+
+    quote = conn.dialect.identifier_preparer.quote
+    columns = {col['name']: col for col in inspector.get_columns(table.name)}
+    for name in ('sha256', 'size', 'sheets'):
+        if name not in columns:
+            column_type = table.c[name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(name)} {column_type} NULL"))
+            logger.info(f"Added column {table.name}.{name}")
+
+    _create_missing_indexes(conn, inspect(conn), table)
+
+    file_data = columns['file_data']
+    if not file_data['nullable']:
+        if conn.dialect.name != 'mysql':
+            # Only MySQL can relax the column in place; rebuild the table to save new files
+            logger.warning(f"{table.name}.file_data is still NOT NULL on {conn.dialect.name}; "
+                           f"moved rows keep their bytes and new files cannot be saved until the table is rebuilt")
+            return False
+        column_type = file_data['type'].compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {quote(table.name)} MODIFY {quote('file_data')} {column_type} NULL"))
+        logger.info(f"Made {table.name}.file_data nullable")
+    return True
+
+
+def prepare_file_tables(engine=None):
+    """Give the saved-file tables their blob store columns; returns the names of those whose file_data can be cleared"""
+    engine = engine or db.engine
+    clearable = set()
+    for model in FILE_MODELS:
+        with engine.begin() as conn:
+            if _prepare_file_table(conn, model.__table__):
+                clearable.add(model.__tablename__)
+    return clearable
+
+
+def migrate_file_blobs(engine=None):
+    """Move saved-file bytes from file_data into the blob store; returns the number of rows moved"""
+    engine = engine or db.engine
+    clearable = prepare_file_tables(engine)
+    moved = 0
+    for model in FILE_MODELS:
+        table = model.__table__
+        clear_bytes = table.name in clearable
+        with engine.begin() as conn:
+            pending = conn.execute(
+                select(table.c.id)
+                .where(table.c.file_data.isnot(None), table.c.sha256.is_(None))
+                .order_by(table.c.id)
+            ).scalars().all()
+
+        for row_id in pending:
+            with engine.begin() as conn:
+                data = conn.execute(select(table.c.file_data).where(table.c.id == row_id)).scalar()
+                if data is None:
+                    continue
+                digest, size = put_blob(data)
+                changes = {'sha256': digest, 'size': size, 'sheets': workbook_sheets(io.BytesIO(data))}
+                if clear_bytes:
+                    changes['file_data'] = None
+                conn.execute(update(table).where(table.c.id == row_id).values(**changes))
+            moved += 1
+            logger.info(f"Moved {table.name} row {row_id} to the blob store ({size} bytes)")
+    return moved
+
+
+if __name__ == "__main__":
+    from app import create_app
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app()
+    with app.app_context():
+        created = migrate_mapping_indexes()
+        moved = migrate_file_blobs()
+    print(f"Created {len(created)} index(es): {', '.join(created) or 'none'}")
+    print(f"Moved {moved} saved file(s) to the blob store")
@@ -1,6 +1,5 @@
 from extensions import db
 from datetime import datetime
-from sqlalchemy import LargeBinary
 
 # ========================
 # Executive-related Models
@@ -10,7 +9,7 @@ class Executive(db.Model):
     __tablename__ = 'executives'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
-    code = db.Column(db.String(50), nullable=True)
+    code = db.Column(db.String(50), nullable=True, index=True)
 
     customers = db.relationship("Customer", backref="executive", lazy=True)
     branches = db.relationship("BranchExecutiveMap", backref="executive", lazy=True)
@@ -21,8 +20,11 @@ class Executive(db.Model):
 
 class Customer(db.Model):
     __tablename__ = 'customers'
+    __table_args__ = (
+        db.Index('ix_customers_executive_id_code', 'executive_id', 'code'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    code = db.Column(db.String(50), nullable=False)
+    code = db.Column(db.String(50), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=True)
 
     executive_id = db.Column(db.Integer, db.ForeignKey('executives.id'))
@@ -48,12 +50,20 @@ class Region(db.Model):
 
 class BranchExecutiveMap(db.Model):
     __tablename__ = 'branch_exec_map'
+    __table_args__ = (
+        db.Index('uq_branch_exec_map_branch_executive', 'branch_id', 'executive_id', unique=True),
+        db.Index('ix_branch_exec_map_executive_id', 'executive_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     branch_id = db.Column(db.Integer, db.ForeignKey('branches.id'), nullable=False)
     executive_id = db.Column(db.Integer, db.ForeignKey('executives.id'), nullable=False)
 
 class RegionBranchMap(db.Model):
     __tablename__ = 'region_branch_map'
+    __table_args__ = (
+        db.Index('uq_region_branch_map_region_branch', 'region_id', 'branch_id', unique=True),
+        db.Index('ix_region_branch_map_branch_id', 'branch_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     region_id = db.Column(db.Integer, db.ForeignKey('regions.id'), nullable=False)
     branch_id = db.Column(db.Integer, db.ForeignKey('branches.id'), nullable=False)
@@ -72,12 +82,16 @@ class Company(db.Model):
 class Product(db.Model):
     __tablename__ = 'products'
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
 
     company_mappings = db.relationship("CompanyProductMap", backref="product", lazy=True)
 
 class CompanyProductMap(db.Model):
     __tablename__ = 'company_product_map'
+    __table_args__ = (
+        db.Index('uq_company_product_map_company_product', 'company_id', 'product_id', unique=True),
+        db.Index('ix_company_product_map_product_id', 'product_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
@@ -86,30 +100,55 @@ class CompanyProductMap(db.Model):
 # File Processing
 # ========================
 
+# File contents live in the blob store (utils/blob_store.py) under sha256;
+# file_data only still holds the bytes of rows saved before the move and is
+# deferred, so listing files never loads it.
+
 class BudgetFile(db.Model):
     __tablename__ = "budget_files"
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    file_data = db.Column(LargeBinary, nullable=False)
+    file_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    sheets = db.Column(db.JSON, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class SalesFile(db.Model):
     __tablename__ = "sales_files"
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    file_data = db.Column(db.LargeBinary, nullable=False)
+    file_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    sheets = db.Column(db.JSON, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class OsFile(db.Model):
     __tablename__ = "os_files"
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    file_data = db.Column(db.LargeBinary, nullable=False)
+    file_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    sheets = db.Column(db.JSON, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class LastYearSalesFile(db.Model):
     __tablename__ = 'last_year_sales_files'
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    file_data = db.Column(db.LargeBinary, nullable=False)
-    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    file_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    sheets = db.Column(db.JSON, nullable=True)
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# ========================
+# Mapping snapshot versioning
+# ========================
+
+class MappingVersion(db.Model):
+    __tablename__ = 'mapping_versions'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -5,8 +5,9 @@ import warnings
 from datetime import datetime
 from io import BytesIO
 import traceback
-from fuzzywuzzy import process
-import Levenshtein
+
+from utils.auditor.table_locator import find_header_rows
+from utils.column_resolver import find_field
 
 # Configuration
 warnings.filterwarnings('ignore')
@@ -191,81 +192,58 @@ def clean_header_row(header_row):
 
 def extract_tables(df, possible_headers, is_product_analysis=False):
     """Extract tables from dataframe based on possible headers"""
-    for i in range(len(df)):
-        row_text = ' '.join(df.iloc[i].astype(str).str.lower().tolist())
-        for header in possible_headers:
-            if header.lower() in row_text:
-                # First check for budget/actual style headers
-                potential_header = df.iloc[i]
-                if any(str(col).strip().lower().startswith(('budget-', 'act-', 'ly-', 'gr.', 'ach.')) for col in potential_header[1:]):
-                    data_start = i + 2 if i + 2 < len(df) else i + 1
-                    if data_start < len(df):
-                        first_col = str(df.iloc[data_start, 0]).strip().upper()
-                        identifier_cols = ['REGIONS', 'REGION', 'BRANCH', 'ORGANIZATION', 'ORGANIZATION NAME'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
-                        if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
-                            return i, data_start
+    header_rows = find_header_rows(df, {'table': possible_headers}, skip_blank=False)['table']
+    if not header_rows:
+        return None, None
+    i = header_rows[0]
+
+    # First check for budget/actual style headers
+    potential_header = df.iloc[i]
+    if any(str(col).strip().lower().startswith(('budget-', 'act-', 'ly-', 'gr.', 'ach.')) for col in potential_header[1:]):
+        data_start = i + 2 if i + 2 < len(df) else i + 1
+        if data_start < len(df):
+            first_col = str(df.iloc[data_start, 0]).strip().upper()
+            identifier_cols = ['REGIONS', 'REGION', 'BRANCH', 'ORGANIZATION', 'ORGANIZATION NAME'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
+            if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
+                return i, data_start
                     
-                    data_start = i + 1
-                    if data_start < len(df):
-                        first_col = str(df.iloc[data_start, 0]).strip().upper()
-                        if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
-                            return i, data_start
+        data_start = i + 1
+        if data_start < len(df):
+            first_col = str(df.iloc[data_start, 0]).strip().upper()
+            if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
+                return i, data_start
                 
-                # Check next row for budget/actual style headers
-                if i + 1 < len(df):
-                    potential_header = df.iloc[i + 1]
-                    if any(str(col).strip().lower().startswith(('budget-', 'act-', 'ly-', 'gr.', 'ach.')) for col in potential_header[1:]):
-                        data_start = i + 2 if i + 2 < len(df) else i + 1
-                        if data_start < len(df):
-                            first_col = str(df.iloc[data_start, 0]).strip().upper()
-                            identifier_cols = ['REGIONS', 'REGION', 'BRANCH', 'ORGANIZATION', 'ORGANIZATION NAME'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
-                            if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
-                                return i + 1, data_start
+    # Check next row for budget/actual style headers
+    if i + 1 < len(df):
+        potential_header = df.iloc[i + 1]
+        if any(str(col).strip().lower().startswith(('budget-', 'act-', 'ly-', 'gr.', 'ach.')) for col in potential_header[1:]):
+            data_start = i + 2 if i + 2 < len(df) else i + 1
+            if data_start < len(df):
+                first_col = str(df.iloc[data_start, 0]).strip().upper()
+                identifier_cols = ['REGIONS', 'REGION', 'BRANCH', 'ORGANIZATION', 'ORGANIZATION NAME'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
+                if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
+                    return i + 1, data_start
                 
-                # If budget/actual style not found, try the first approach
-                for j in range(i + 1, min(i + 5, len(df))):
-                    row = df.iloc[j]
-                    first_col = str(row.iloc[0]).strip().upper()
-                    identifier_cols = ['REGIONS', 'REGION', 'BRANCH'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
-                    if any(r in first_col for r in identifier_cols):
-                        header_row = j - 1 if j > 0 else j
-                        potential_header = df.iloc[header_row]
-                        if not all(str(col).strip().upper() in ['MT', 'RS', ''] for col in potential_header[1:]):
-                            return header_row, j
-                        else:
-                            header_row = j - 2 if j > 1 else j
-                            potential_header = df.iloc[header_row]
-                            if not all(str(col).strip().upper() in ['MT', 'RS', ''] for col in potential_header[1:]):
-                                return header_row, j
-                            else:
-                                return None, None
-                
-                return None, None
+    # If budget/actual style not found, try the first approach
+    for j in range(i + 1, min(i + 5, len(df))):
+        row = df.iloc[j]
+        first_col = str(row.iloc[0]).strip().upper()
+        identifier_cols = ['REGIONS', 'REGION', 'BRANCH'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
+        if any(r in first_col for r in identifier_cols):
+            header_row = j - 1 if j > 0 else j
+            potential_header = df.iloc[header_row]
+            if not all(str(col).strip().upper() in ['MT', 'RS', ''] for col in potential_header[1:]):
+                return header_row, j
+            else:
+                header_row = j - 2 if j > 1 else j
+                potential_header = df.iloc[header_row]
+                if not all(str(col).strip().upper() in ['MT', 'RS', ''] for col in potential_header[1:]):
+                    return header_row, j
+                else:
+                    return None, None
     
     return None, None
 
-def find_column(df, possible_names, case_sensitive=False, threshold=80):
-    """Enhanced fuzzy matching for column names"""
-    if isinstance(possible_names, str):
-        possible_names = [possible_names]
-    
-    for name in possible_names:
-        if case_sensitive:
-            if name in df.columns:
-                return name
-        else:
-            for col in df.columns:
-                if col.lower() == name.lower():
-                    return col
-    
-    # If exact match not found, try fuzzy matching
-    for name in possible_names:
-        matches = process.extractOne(name, df.columns, score_cutoff=threshold)
-        if matches:
-            return matches[0]
-    
-    return None
-
 def standardize_column_names(df, is_auditor=False):
     """Standardize column names for consistency"""
     df = df.copy()
@@ -410,17 +388,10 @@ def process_budget_data(budget_df, group_type='region'):
         budget_df = handle_duplicate_columns(budget_df.copy())
         budget_df.columns = budget_df.columns.str.strip()
         
-        identifier_col = None
-        identifier_names = ['Branch', 'Region', 'REGIONS'] if group_type == 'region' else ['Product', 'Product Group', 'PRODUCT NAME']
-        for col in identifier_names:
-            if col in budget_df.columns:
-                identifier_col = col
-                break
-        
+        identifier_field = 'branch_or_region' if group_type == 'region' else 'product_name'
+        identifier_col = find_field(budget_df, identifier_field, threshold=80)
         if not identifier_col:
-            identifier_col = find_column(budget_df, identifier_names[0], threshold=80)
-            if not identifier_col:
-                return None, f"Could not find {group_type.capitalize()} column in budget dataset."
+            return None, f"Could not find {group_type.capitalize()} column in budget dataset."
         
         budget_cols = {'Qty': [], 'Value': []}
         detailed_pattern = r'(Qty|Value)\s*[-]\s*(\w{3,})\'?(\d{2,4})'
@@ -482,17 +453,10 @@ def process_last_year_data(last_year_df, group_type='region'):
         last_year_df = handle_duplicate_columns(last_year_df.copy())
         last_year_df.columns = last_year_df.columns.str.strip()
         
-        identifier_col = None
-        identifier_names = ['Branch', 'Region', 'REGIONS'] if group_type == 'region' else ['Product', 'Product Group', 'PRODUCT NAME']
-        for col in identifier_names:
-            if col in last_year_df.columns:
-                identifier_col = col
-                break
-        
+        identifier_field = 'branch_or_region' if group_type == 'region' else 'product_name'
+        identifier_col = find_field(last_year_df, identifier_field, threshold=80)
         if not identifier_col:
-            identifier_col = find_column(last_year_df, identifier_names[0], threshold=80)
-            if not identifier_col:
-                return None, f"Could not find {group_type.capitalize()} column in last year dataset."
+            return None, f"Could not find {group_type.capitalize()} column in last year dataset."
         
         ly_cols = {'Qty': [], 'Value': []}
         detailed_pattern = r'(Qty|Value)\s*[-]\s*(\w{3,})\'?(\d{2,4})'
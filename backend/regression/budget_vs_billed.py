@@ -0,0 +1,146 @@
+# regression/budget_vs_billed.py
+
+import io
+import sys
+import json
+import time
+import types
+import logging
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from utils import budget_vs_billed
+from utils.excel_cache import read_excel_cached
+
+# Runs calculate_budget_vs_billed as it was before the per-row sales scan was
+# replaced by a grouped join (loaded from git, or from a file) next to the
+# current one on the sample uploads, and checks that every table comes out
+# identical: same columns, same rows in the same order, same values. Each
+# month of the sales file is tried with the matching monthly budget columns
+# and with the yearly totals, for all executives and branches and for a
+# narrower selection.
+#
+# The baseline is the parent of the commit that removed the per-row scan:
+#
+#   rev=$(git log -1 --format=%h -S "for _, row in valid_budget.iterrows():" -- utils/budget_vs_billed.py)
+#   python -m regression.budget_vs_billed --baseline "$rev^"
+#   python -m regression.budget_vs_billed --baseline-file old_budget_vs_billed.py
+
+SOURCE_PATH = "utils/budget_vs_billed.py"
+
+SALES_FILE = "20250808_121400_Combined_Sales_Report_1.xlsx"
+BUDGET_FILE = "20250808_121631_processed_budget_1.xlsx"
+
+BASE_REQUEST = {
+    'sales_sheet': 'Combined Sales', 'sales_header': 1,
+    'budget_sheet': 'Sheet1', 'budget_header': 1,
+    'sales_date_col': 'Date', 'sales_value_col': 'Value', 'sales_qty_col': 'Actual Quantity',
+    'sales_area_col': 'Branch', 'sales_sl_code_col': 'Customer Code',
+    'sales_product_group_col': 'Type (Make)', 'sales_exec_col': 'Executive Name',
+    'budget_area_col': 'Branch', 'budget_sl_code_col': 'SL Code',
+    'budget_product_group_col': 'Product Group', 'budget_exec_col': 'Executive Name',
+}
+
+
+def load_baseline(rev=None, path=None):
+    """The baseline module, from a file or from SOURCE_PATH at a git revision"""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            source, origin = f.read(), path
+    else:
+        origin = f"{rev}:{SOURCE_PATH}"
+        source = subprocess.run(["git", "show", f"{rev}:./{SOURCE_PATH}"],
+                                capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType("baseline_budget_vs_billed")
+    exec(compile(source, origin, "exec"), module.__dict__)
+    return module
+
+
+def build_requests(baseline, sales_file, budget_file):
+    """(label, request) pairs covering every sales month"""
+    sales = read_excel_cached(f"uploads/{sales_file}", sheet_name=BASE_REQUEST['sales_sheet'],
+                              header=BASE_REQUEST['sales_header'] - 1, dtype=str)
+    budget = read_excel_cached(f"uploads/{budget_file}", sheet_name=BASE_REQUEST['budget_sheet'],
+                               header=BASE_REQUEST['budget_header'] - 1, dtype=str)
+    dates = pd.to_datetime(sales[BASE_REQUEST['sales_date_col']], dayfirst=True, errors='coerce').dropna()
+    months = [period.strftime('%b %y') for period in sorted(dates.dt.to_period('M').unique())]
+
+    sales_execs = sales[BASE_REQUEST['sales_exec_col']].dropna().unique().tolist()
+    budget_execs = budget[BASE_REQUEST['budget_exec_col']].dropna().unique().tolist()
+    branches = sorted(
+        set(sales[BASE_REQUEST['sales_area_col']].dropna().map(baseline.map_branch))
+        | set(budget[BASE_REQUEST['budget_area_col']].dropna().map(baseline.map_branch))
+    )
+    selections = {
+        "all": (sales_execs, budget_execs, branches),
+        "narrow": (sales_execs[::2], budget_execs[::2], branches[:max(1, len(branches) // 2)]),
+    }
+
+    requests = []
+    for month in months:
+        budget_month = pd.Timestamp(f"01 {month}").strftime("%b'%y")
+        column_sets = {"yearly totals": ("Qty", "Value")}
+        if f"Qty - {budget_month}" in budget.columns:
+            column_sets["monthly"] = (f"Qty - {budget_month}", f"Value - {budget_month}")
+        for columns_name, (qty_col, value_col) in column_sets.items():
+            for selection_name, (s_execs, b_execs, s_branches) in selections.items():
+                requests.append((f"{month}, {columns_name}, {selection_name}", dict(
+                    BASE_REQUEST,
+                    sales_filename=sales_file, budget_filename=budget_file,
+                    budget_qty_col=qty_col, budget_value_col=value_col,
+                    selected_month=month,
+                    selected_sales_execs=s_execs, selected_budget_execs=b_execs,
+                    selected_branches=s_branches,
+                )))
+    return requests
+
+
+def result_mismatch(expected, actual):
+    """Name of the first table that differs between two results, or None"""
+    for name in sorted(set(expected) | set(actual)):
+        left = json.dumps(expected.get(name), default=str, sort_keys=True)
+        right = json.dumps(actual.get(name), default=str, sort_keys=True)
+        if left != right:
+            return name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare calculate_budget_vs_billed with its pre-grouped-join version")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--baseline", help="git revision of the old version (see the header of this script)")
+    source.add_argument("--baseline-file", help="path of the old budget_vs_billed.py, instead of reading it from git")
+    parser.add_argument("--sales", default=SALES_FILE, help="sales workbook in uploads/")
+    parser.add_argument("--budget", default=BUDGET_FILE, help="budget workbook in uploads/")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline, args.baseline_file)
+    logging.disable(logging.INFO)
+
+    failures, old_total, new_total = 0, 0.0, 0.0
+    requests = build_requests(baseline, args.sales, args.budget)
+    for label, request in requests:
+        with redirect_stdout(io.StringIO()):  # both versions print debug lines
+            start = time.perf_counter()
+            expected = baseline.calculate_budget_vs_billed(dict(request))
+            old_total += time.perf_counter() - start
+            start = time.perf_counter()
+            actual = budget_vs_billed.calculate_budget_vs_billed(dict(request))
+            new_total += time.perf_counter() - start
+
+        mismatch = result_mismatch(expected, actual)
+        if mismatch:
+            failures += 1
+        rows = len(expected['budget_vs_billed_qty']['data'])
+        print(f"{'FAIL' if mismatch else 'ok'}: {label} ({rows} rows)" + (f": {mismatch} differs" if mismatch else ""))
+
+    print(f"{len(requests) - failures}/{len(requests)} requests match; "
+          f"baseline {old_total:.2f}s, current {new_total:.2f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# regression/excel_sidecars.py
+
+import os
+import sys
+import glob
+import argparse
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import utils.excel_cache as excel_cache
+
+# Checks that a Feather sidecar reads back exactly what pd.read_excel returns
+# for every sheet of the sample workbooks: same columns, dtypes and values,
+# and the same Python type in every object cell (NaN stays NaN, not None).
+#
+#   python -m regression.excel_sidecars
+#   python -m regression.excel_sidecars path/to/book.xlsx ...
+
+SAMPLE_GLOB = os.path.join("uploads", "*.xlsx")
+
+
+def frame_mismatch(expected, actual):
+    """Description of the first difference between two frames, or None"""
+    try:
+        pd.testing.assert_frame_equal(expected, actual, check_exact=True)
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    for i in range(expected.shape[1]):
+        if expected.dtypes.iloc[i] != object:
+            continue
+        left, right = expected.iloc[:, i].tolist(), actual.iloc[:, i].tolist()
+        for row, (a, b) in enumerate(zip(left, right)):
+            if type(a) is not type(b):
+                return f"column {expected.columns[i]!r} row {row}: {a!r} ({type(a).__name__}) != {b!r} ({type(b).__name__})"
+    return None
+
+
+def check_frame(df, label):
+    key = ("regression", label, 0, ())
+    if not excel_cache._write_sidecar(label, key, df):
+        return "skipped"
+    actual = excel_cache._read_sidecar(label, key)
+    if actual is None:
+        return "unreadable sidecar"
+    return frame_mismatch(df, actual)
+
+
+def synthetic_frames():
+    """Cases the sample files may not cover"""
+    return {
+        "object column with NaN": pd.DataFrame({"a": ["x", np.nan, "y"]}),
+        "object column with None": pd.DataFrame({"a": ["x", None, "y"]}),
+        "mixed types": pd.DataFrame({"a": ["x", 1, 2.5, np.nan, True, datetime(2025, 4, 1), None]}),
+        "all NaN object": pd.DataFrame({"a": pd.Series([np.nan, np.nan], dtype=object)}),
+        "numbers and dates": pd.DataFrame({"n": [1, 2], "f": [1.5, np.nan],
+                                           "d": pd.to_datetime(["2025-04-01", None])}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sidecar reads with pd.read_excel")
+    parser.add_argument("paths", nargs="*", help=f"workbooks to check (default: {SAMPLE_GLOB})")
+    args = parser.parse_args()
+    paths = args.paths or sorted(glob.glob(SAMPLE_GLOB))
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as sidecar_dir:
+        excel_cache.EXCEL_SIDECAR_DIR = sidecar_dir
+        cases = [(f"synthetic: {name}", df) for name, df in synthetic_frames().items()]
+        for path in paths:
+            for sheet, df in pd.read_excel(path, sheet_name=None).items():
+                cases.append((f"{os.path.basename(path)} [{sheet}]", df))
+
+        for label, df in cases:
+            result = check_frame(df, label)
+            if result not in (None, "skipped"):
+                failures += 1
+            print(f"{'ok' if result is None else result if result == 'skipped' else 'FAIL'}: {label}"
+                  + (f" ({result})" if result not in (None, "skipped") else ""))
+
+    print(f"{len(cases) - failures}/{len(cases)} sheets match")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# routes/artifact_routes.py
+
+from flask import Blueprint, jsonify
+
+from utils.artifact_store import (
+    ARTIFACT_STORE_MAX_BYTES, list_artifacts, send_cached_artifact, delete_artifact
+)
+
+artifact_bp = Blueprint("artifacts", __name__)
+
+
+@artifact_bp.route("/artifacts", methods=["GET"])
+def get_artifacts():
+    artifacts = list_artifacts()
+    return jsonify({
+        "artifacts": artifacts,
+        "count": len(artifacts),
+        "total_bytes": sum(meta.get("size") or 0 for meta in artifacts),
+        "max_bytes": ARTIFACT_STORE_MAX_BYTES
+    })
+
+
+@artifact_bp.route("/artifacts/<key>", methods=["GET"])
+def download_artifact(key):
+    response = send_cached_artifact(key)
+    if response is None:
+        return jsonify({"error": "Artifact not found"}), 404
+    return response
+
+
+@artifact_bp.route("/artifacts/<key>", methods=["DELETE"])
+def remove_artifact(key):
+    if not delete_artifact(key):
+        return jsonify({"error": "Artifact not found"}), 404
+    return jsonify({"success": True, "key": key})
@@ -1,9 +1,14 @@
 from flask import Blueprint, request, jsonify, session
 import pandas as pd
+from utils.excel_cache import read_excel_cached
 import re
 import traceback
 import logging
 from utils.auditor.data_processor import DataProcessor
+from utils.auditor.table_locator import MT_TABLE_HEADERS, VALUE_TABLE_HEADERS, find_header_rows
+from services.result_store import (
+    store_in_session, load_from_session, drop_from_session, session_keys, result_store_stats
+)
 
 # Create the blueprint
 auditor_bp = Blueprint('auditor', __name__)
@@ -78,19 +83,20 @@ def process_auditor_auto():
         table2_key = get_session_key(filepath, sheet_name, 'Table2')
         
         logger.debug(f"Session keys: table1={table1_key}, table2={table2_key}")
-        logger.debug(f"Session contains table1: {'table1_key' in session}, table2: {'table2_key' in session}")
         
-        if not force_refresh and table1_key in session and table2_key in session:
-            logger.info("Both tables found in session, returning cached data")
-            # Return the requested table from session
-            if table_choice == "Table 1: SALES in MT/Tonage" and table1_key in session:
-                stored_data = session[table1_key]
+        cached_table1 = None if force_refresh else load_from_session(table1_key)
+        cached_table2 = None if force_refresh else load_from_session(table2_key)
+        logger.debug(f"Store contains table1: {cached_table1 is not None}, table2: {cached_table2 is not None}")
+        
+        if cached_table1 is not None and cached_table2 is not None:
+            logger.info("Both tables found in result store, returning cached data")
+            # Return the requested table from the store
+            if table_choice == "Table 1: SALES in MT/Tonage":
                 logger.info("Returning cached Table 1 data")
-                return jsonify(stored_data)
-            elif table_choice == "Table 2: SALES in Value" and table2_key in session:
-                stored_data = session[table2_key]
+                return jsonify(cached_table1)
+            elif table_choice == "Table 2: SALES in Value":
                 logger.info("Returning cached Table 2 data")
-                return jsonify(stored_data)
+                return jsonify(cached_table2)
         
         # Initialize DataProcessor
         try:
@@ -106,7 +112,7 @@ def process_auditor_auto():
         # Read the Excel sheet
         try:
             logger.info(f"Reading Excel file: {filepath}, sheet: {sheet_name}")
-            df_sheet = pd.read_excel(filepath, sheet_name=sheet_name, header=None)
+            df_sheet = read_excel_cached(filepath, sheet_name=sheet_name, header=None)
             logger.info(f"Excel sheet loaded successfully. Shape: {df_sheet.shape}")
             logger.debug(f"First few rows:\n{df_sheet.head()}")
         except FileNotFoundError:
@@ -136,15 +142,13 @@ def process_auditor_auto():
             }
         
         # Define possible headers for both tables
-        table1_possible_headers = [
-            "SALES in MT", "SALES IN MT", "Sales in MT", "SALES IN TONNAGE", "SALES IN TON",
-            "Tonnage", "TONNAGE", "Tonnage Sales", "Sales Tonnage", "Metric Tons", "MT Sales"
-        ]
+        table1_possible_headers = MT_TABLE_HEADERS
+        table2_possible_headers = VALUE_TABLE_HEADERS
         
-        table2_possible_headers = [
-            "SALES in Value", "SALES IN VALUE", "Sales in Value", "SALES IN RS", "VALUE SALES",
-            "Value", "VALUE", "Sales Value"
-        ]
+        # Locate candidate header rows for both tables in one pass over the sheet
+        header_rows = find_header_rows(
+            df_sheet, {'table1': table1_possible_headers, 'table2': table2_possible_headers}, skip_blank=False
+        )
         
         logger.debug(f"Searching for table1 headers: {table1_possible_headers}")
         logger.debug(f"Searching for table2 headers: {table2_possible_headers}")
@@ -156,7 +160,8 @@ def process_auditor_auto():
                 idx1, data_start1 = processor.extract_tables(
                     df_sheet, 
                     table1_possible_headers, 
-                    is_product_analysis=analysis_info['is_product_analysis']
+                    is_product_analysis=analysis_info['is_product_analysis'],
+                    header_rows=header_rows['table1']
                 )
                 logger.info(f"Table 1 extraction result: idx={idx1}, data_start={data_start1}")
             except Exception as e:
@@ -168,7 +173,8 @@ def process_auditor_auto():
                 idx2, data_start2 = processor.extract_tables(
                     df_sheet, 
                     table2_possible_headers, 
-                    is_product_analysis=analysis_info['is_product_analysis']
+                    is_product_analysis=analysis_info['is_product_analysis'],
+                    header_rows=header_rows['table2']
                 )
                 logger.info(f"Table 2 extraction result: idx={idx2}, data_start={data_start2}")
             except Exception as e:
@@ -210,7 +216,7 @@ def process_auditor_auto():
                         
                         logger.info(f"Table 1 column analysis: Act={len(act_columns1)}, Gr={len(gr_columns1)}, Ach={len(ach_columns1)}, Budget={len(budget_columns1)}, LY={len(ly_columns1)}")
                         
-                        # Prepare Table 1 data for session storage
+                        # Prepare Table 1 data for the result store
                         table1_data = {
                             'success': True,
                             'table_name': 'Table 1: SALES in MT/Tonage',
@@ -234,9 +240,9 @@ def process_auditor_auto():
                             }
                         }
                         
-                        # Store in session
-                        session[table1_key] = table1_data
-                        logger.info(f"Table 1 stored in session with key: {table1_key}")
+                        # Store server-side; the session only keeps the handle
+                        store_in_session(table1_key, table1_data)
+                        logger.info(f"Table 1 stored in result store with key: {table1_key}")
                     else:
                         logger.warning("Table 1 dataframe is empty after processing")
                         
@@ -278,7 +284,7 @@ def process_auditor_auto():
                         
                         logger.info(f"Table 2 column analysis: Act={len(act_columns2)}, Gr={len(gr_columns2)}, Ach={len(ach_columns2)}, Budget={len(budget_columns2)}, LY={len(ly_columns2)}")
                         
-                        # Prepare Table 2 data for session storage
+                        # Prepare Table 2 data for the result store
                         table2_data = {
                             'success': True,
                             'table_name': 'Table 2: SALES in Value',
@@ -302,9 +308,9 @@ def process_auditor_auto():
                             }
                         }
                         
-                        # Store in session
-                        session[table2_key] = table2_data
-                        logger.info(f"Table 2 stored in session with key: {table2_key}")
+                        # Store server-side; the session only keeps the handle
+                        store_in_session(table2_key, table2_data)
+                        logger.info(f"Table 2 stored in result store with key: {table2_key}")
                     else:
                         logger.warning("Table 2 dataframe is empty after processing")
                         
@@ -409,31 +415,34 @@ def get_available_tables():
         available_tables = []
         table_info = {}
         
-        # Check if tables are in session
-        if table1_key in session:
+        # Check if tables are in the result store
+        cached_table1 = load_from_session(table1_key)
+        cached_table2 = load_from_session(table2_key)
+        
+        if cached_table1 is not None:
             available_tables.append("Table 1: SALES in MT/Tonage")
             table_info["Table 1: SALES in MT/Tonage"] = {
                 'source': 'session_cache',
-                'estimated_rows': session[table1_key]['shape'][0]
+                'estimated_rows': cached_table1['shape'][0]
             }
             logger.info("Found Table 1 in session cache")
         
-        if table2_key in session:
+        if cached_table2 is not None:
             available_tables.append("Table 2: SALES in Value")
             table_info["Table 2: SALES in Value"] = {
                 'source': 'session_cache',
-                'estimated_rows': session[table2_key]['shape'][0]
+                'estimated_rows': cached_table2['shape'][0]
             }
             logger.info("Found Table 2 in session cache")
         
-        # If both tables are in session, return cached info
+        # If both tables are cached, return cached info
         if len(available_tables) == 2:
             logger.info("Both tables found in cache, returning cached information")
             return jsonify({
                 'success': True,
                 'available_tables': available_tables,
                 'table_info': table_info,
-                'analysis_type': session[table2_key]['analysis_type'] if table2_key in session else session[table1_key]['analysis_type'],
+                'analysis_type': cached_table2['analysis_type'],
                 'default_table': "Table 2: SALES in Value" if "Table 2: SALES in Value" in available_tables else available_tables[0],
                 'from_cache': True
             })
@@ -450,7 +459,7 @@ def get_available_tables():
         
         # Read the Excel sheet
         try:
-            df_sheet = pd.read_excel(filepath, sheet_name=sheet_name, header=None)
+            df_sheet = read_excel_cached(filepath, sheet_name=sheet_name, header=None)
             logger.info(f"Sheet loaded for detection. Shape: {df_sheet.shape}")
         except Exception as e:
             logger.error(f"Error reading Excel file: {str(e)}")
@@ -460,15 +469,13 @@ def get_available_tables():
         analysis_info = detect_analysis_type(sheet_name)
         
         # Define possible headers
-        table1_possible_headers = [
-            "SALES in MT", "SALES IN MT", "Sales in MT", "SALES IN TONNAGE", "SALES IN TON",
-            "Tonnage", "TONNAGE", "Tonnage Sales", "Sales Tonnage", "Metric Tons", "MT Sales"
-        ]
+        table1_possible_headers = MT_TABLE_HEADERS
+        table2_possible_headers = VALUE_TABLE_HEADERS
         
-        table2_possible_headers = [
-            "SALES in Value", "SALES IN VALUE", "Sales in Value", "SALES IN RS", "VALUE SALES",
-            "Value", "VALUE", "Sales Value"
-        ]
+        # Locate candidate header rows for both tables in one pass over the sheet
+        header_rows = find_header_rows(
+            df_sheet, {'table1': table1_possible_headers, 'table2': table2_possible_headers}, skip_blank=False
+        )
         
         available_tables = []
         table_info = {}
@@ -478,7 +485,8 @@ def get_available_tables():
             idx1, data_start1 = processor.extract_tables(
                 df_sheet, 
                 table1_possible_headers, 
-                is_product_analysis=analysis_info['is_product_analysis']
+                is_product_analysis=analysis_info['is_product_analysis'],
+                header_rows=header_rows['table1']
             )
             if idx1 is not None:
                 available_tables.append("Table 1: SALES in MT/Tonage")
@@ -497,7 +505,8 @@ def get_available_tables():
             idx2, data_start2 = processor.extract_tables(
                 df_sheet, 
                 table2_possible_headers, 
-                is_product_analysis=analysis_info['is_product_analysis']
+                is_product_analysis=analysis_info['is_product_analysis'],
+                header_rows=header_rows['table2']
             )
             if idx2 is not None:
                 available_tables.append("Table 2: SALES in Value")
@@ -561,10 +570,11 @@ def get_cached_table():
         else:
             return jsonify({'error': 'Invalid table choice'}), 400
         
-        # Check if table exists in session
-        if table_key in session:
+        # Check if table exists in the result store
+        cached_table = load_from_session(table_key)
+        if cached_table is not None:
             logger.info(f"Returning cached table: {table_choice}")
-            return jsonify(session[table_key])
+            return jsonify(cached_table)
         else:
             logger.warning(f"Table not found in cache: {table_key}")
             return jsonify({'error': 'Table not found in cache. Please refresh.'}), 404
@@ -591,13 +601,7 @@ def clear_session_cache():
             table1_key = get_session_key(filepath, sheet_name, 'Table1')
             table2_key = get_session_key(filepath, sheet_name, 'Table2')
             
-            removed_count = 0
-            if table1_key in session:
-                session.pop(table1_key, None)
-                removed_count += 1
-            if table2_key in session:
-                session.pop(table2_key, None)
-                removed_count += 1
+            removed_count = sum(drop_from_session(key) for key in (table1_key, table2_key))
             
             logger.info(f"Cleared {removed_count} tables for sheet '{sheet_name}'")
             
@@ -607,9 +611,9 @@ def clear_session_cache():
             })
         else:
             # Clear all auditor cache
-            keys_to_remove = [key for key in session.keys() if key.startswith('auditor_')]
+            keys_to_remove = session_keys('auditor_')
             for key in keys_to_remove:
-                session.pop(key, None)
+                drop_from_session(key)
             
             logger.info(f"Cleared {len(keys_to_remove)} cached tables")
             
@@ -651,11 +655,11 @@ def export_auditor_data():
             table_key = get_session_key(filepath, sheet_name, 'Table2')
         
         df = None
+        cached_data = load_from_session(table_key)
         
-        if table_key in session:
-            # Get data from session
+        if cached_data is not None:
+            # Get data from the result store
             logger.info("Getting data from session cache")
-            cached_data = session[table_key]
             df = pd.DataFrame(cached_data['data'])
         else:
             # If not in cache, process fresh (fallback)
@@ -744,12 +748,15 @@ def debug_session():
     logger.info("Debug session endpoint called")
     
     try:
-        auditor_keys = [key for key in session.keys() if key.startswith('auditor_')]
+        auditor_keys = session_keys('auditor_')
         session_info = {}
         
         for key in auditor_keys:
             try:
-                data = session[key]
+                data = load_from_session(key)
+                if data is None:
+                    session_info[key] = {'error': 'Expired or evicted from result store'}
+                    continue
                 session_info[key] = {
                     'table_name': data.get('table_name', 'Unknown'),
                     'shape': data.get('shape', [0, 0]),
@@ -764,7 +771,8 @@ def debug_session():
             'success': True,
             'total_auditor_keys': len(auditor_keys),
             'session_info': session_info,
-            'all_session_keys': list(session.keys())
+            'all_session_keys': list(session.keys()),
+            'result_store': result_store_stats()
         })
         
     except Exception as e:
@@ -786,7 +794,7 @@ def health_check():
             'message': 'Auditor blueprint is healthy',
             'data_processor_available': True,
             'session_keys_count': len(session.keys()),
-            'auditor_session_keys': len([k for k in session.keys() if k.startswith('auditor_')])
+            'auditor_session_keys': len(session_keys('auditor_'))
         })
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -6,10 +6,11 @@ from io import BytesIO
 import traceback
 from datetime import datetime
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side,GradientFill
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import ColorScaleRule, IconSetRule, DataBarRule
+from openpyxl.worksheet.worksheet import Worksheet
 import logging
 import os
 import re
@@ -17,7 +18,13 @@ import json
 import hashlib
 import uuid
 import base64
-
+from utils.excel_stream import (
+    StyleRegistry, new_streaming_workbook, set_column_widths, merge_row, save_to_spool, file_digest
+)
+from utils.auditor.style_cache import (
+    interned_font, interned_pattern_fill, interned_alignment, interned_border
+)
+from utils.jobs import DONE, register_completion_hook, report_progress, result_path
 
 
 # Create Blueprint
@@ -29,116 +36,6 @@ logger = logging.getLogger(__name__)
 
 
 
-def copy_cell_comprehensive_formatting(source_cell, target_cell, excel_formatting=None):
-    """
-    Copy comprehensive formatting from source cell to target cell
-    """
-    try:
-        # Copy basic value
-        target_cell.value = source_cell.value
-        
-        # Font formatting with all properties
-        if source_cell.font:
-            target_cell.font = Font(
-                name=source_cell.font.name or 'Calibri',
-                size=source_cell.font.size or 11,
-                bold=source_cell.font.bold or False,
-                italic=source_cell.font.italic or False,
-                vertAlign=source_cell.font.vertAlign,
-                underline=source_cell.font.underline or 'none',
-                strike=source_cell.font.strike or False,
-                color=source_cell.font.color,
-                charset=source_cell.font.charset,
-                family=source_cell.font.family,
-                scheme=source_cell.font.scheme
-            )
-        
-        # Fill/Background formatting with gradient support
-        if source_cell.fill and source_cell.fill.fill_type:
-            if source_cell.fill.fill_type == 'solid':
-                target_cell.fill = PatternFill(
-                    fill_type=source_cell.fill.fill_type,
-                    start_color=source_cell.fill.start_color,
-                    end_color=source_cell.fill.end_color
-                )
-            elif source_cell.fill.fill_type in ['linear', 'path']:
-                # Handle gradient fills
-                try:
-                    target_cell.fill = GradientFill(
-                        type=source_cell.fill.type,
-                        degree=getattr(source_cell.fill, 'degree', 0),
-                        left=getattr(source_cell.fill, 'left', 0),
-                        right=getattr(source_cell.fill, 'right', 0),
-                        top=getattr(source_cell.fill, 'top', 0),
-                        bottom=getattr(source_cell.fill, 'bottom', 0),
-                        stop=getattr(source_cell.fill, 'stop', [])
-                    )
-                except:
-                    # Fallback to pattern fill if gradient fails
-                    target_cell.fill = PatternFill(
-                        fill_type='solid',
-                        start_color=source_cell.fill.start_color,
-                        end_color=source_cell.fill.end_color
-                    )
-        
-        # Enhanced alignment formatting
-        if source_cell.alignment:
-            target_cell.alignment = Alignment(
-                horizontal=source_cell.alignment.horizontal,
-                vertical=source_cell.alignment.vertical,
-                text_rotation=source_cell.alignment.text_rotation or 0,
-                wrap_text=source_cell.alignment.wrap_text or False,
-                shrink_to_fit=source_cell.alignment.shrink_to_fit or False,
-                indent=source_cell.alignment.indent or 0,
-                relativeIndent=getattr(source_cell.alignment, 'relativeIndent', 0),
-                justifyLastLine=getattr(source_cell.alignment, 'justifyLastLine', False),
-                readingOrder=getattr(source_cell.alignment, 'readingOrder', 0)
-            )
-        
-        # Comprehensive border formatting
-        if source_cell.border:
-            target_cell.border = Border(
-                left=source_cell.border.left,
-                right=source_cell.border.right,
-                top=source_cell.border.top,
-                bottom=source_cell.border.bottom,
-                diagonal=source_cell.border.diagonal,
-                diagonal_direction=source_cell.border.diagonal_direction,
-                outline=getattr(source_cell.border, 'outline', True),
-                vertical=getattr(source_cell.border, 'vertical', None),
-                horizontal=getattr(source_cell.border, 'horizontal', None)
-            )
-        
-        # Enhanced number formatting with custom format preservation
-        if source_cell.number_format and source_cell.number_format != 'General':
-            target_cell.number_format = source_cell.number_format
-        elif isinstance(source_cell.value, (int, float)) and not pd.isna(source_cell.value):
-            # Apply formatting based on excel_formatting configuration
-            if excel_formatting and excel_formatting.get('number_format', {}).get('force_format', False):
-                format_pattern = excel_formatting.get('number_format', {}).get('format_pattern', '0.00')
-                target_cell.number_format = format_pattern
-            elif source_cell.number_format:
-                target_cell.number_format = source_cell.number_format
-            else:
-                # Default number formatting
-                target_cell.number_format = '0.00'
-        
-        # Copy hyperlinks
-        if hasattr(source_cell, 'hyperlink') and source_cell.hyperlink:
-            target_cell.hyperlink = source_cell.hyperlink
-        
-        # Copy comments with formatting
-        if hasattr(source_cell, 'comment') and source_cell.comment:
-            target_cell.comment = source_cell.comment
-        
-        return True
-        
-    except Exception as e:
-        logger.warning(f"Error copying comprehensive formatting for cell {source_cell.coordinate}: {str(e)}")
-        # Fallback to basic value copy
-        target_cell.value = source_cell.value
-        return False
-
 def copy_sheet_structural_formatting(source_sheet, target_sheet):
     """
     Copy structural formatting elements from source sheet to target sheet
@@ -294,17 +191,18 @@ def enhance_overview_sheet_formatting(overview_sheet):
         }
         
         # Apply alternating row colors to data sections
+        light_fill = PatternFill(
+            start_color=colors['light'], 
+            end_color=colors['light'], 
+            fill_type="solid"
+        )
         current_row = 1
         for row in overview_sheet.iter_rows():
             if current_row > 3:  # Skip header rows
                 for cell in row:
                     if cell.value and current_row % 2 == 0:
                         # Apply light background to even rows
-                        cell.fill = PatternFill(
-                            start_color=colors['light'], 
-                            end_color=colors['light'], 
-                            fill_type="solid"
-                        )
+                        cell.fill = light_fill
             current_row += 1
         
         # Add borders to all data cells
@@ -325,6 +223,90 @@ def enhance_overview_sheet_formatting(overview_sheet):
     except Exception as e:
         logger.warning(f"Could not enhance overview sheet formatting: {str(e)}")
 
+### --------- Streaming dual-table sheets ----------
+
+DUAL_TABLE_ROW_HEIGHT = 25
+
+def dual_table_styles(title_font, title_fills, header_font, header_fills, total_font, total_fill, border,
+                      sheet_title=None):
+    """
+    StyleRegistry for the MT / Value table exports. title_fills and header_fills map
+    'mt' / 'value' to fills; sheet_title is (font, fill, alignment) of an optional sheet banner.
+    """
+    title_alignment = Alignment(horizontal="center", vertical="center")
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    total = dict(font=total_font, fill=total_fill)
+    body = {
+        'first': dict(border=border, alignment=Alignment(horizontal="left", vertical="center")),
+        'number': dict(border=border, number_format='#,##0.00', alignment=Alignment(horizontal="right", vertical="center")),
+        'text': dict(border=border, alignment=Alignment(horizontal="center", vertical="center")),
+    }
+    styles = {}
+    for table in ('mt', 'value'):
+        styles[f'{table}_title'] = dict(font=title_font, fill=title_fills[table], alignment=title_alignment)
+        styles[f'{table}_header'] = dict(font=header_font, fill=header_fills[table], alignment=header_alignment, border=border)
+    for name, spec in body.items():
+        styles[name] = spec
+        styles[f'{name}_total'] = dict(spec, **total)
+    if sheet_title is not None:
+        font, fill, alignment = sheet_title
+        styles['sheet_title'] = dict(font=font, fill=fill, alignment=alignment)
+    return StyleRegistry(styles)
+
+def is_total_row_label(value):
+    return isinstance(value, str) and ('TOTAL' in str(value).upper() or 'ACCLLP' in str(value).upper())
+
+def stream_dual_table(ws, styles, df, table, title, current_row):
+    """
+    Append the title, header and data rows of one table ('mt' or 'value') to a
+    write-only sheet starting at current_row; returns the next free row.
+    """
+    ws.row_dimensions[current_row].height = DUAL_TABLE_ROW_HEIGHT
+    ws.append([styles.cell(ws, title, f'{table}_title')])
+    merge_row(ws, current_row, len(df.columns))
+    current_row += 1
+
+    ws.row_dimensions[current_row].height = DUAL_TABLE_ROW_HEIGHT
+    ws.append([styles.cell(ws, column, f'{table}_header') for column in df.columns])
+    current_row += 1
+
+    for row_data in df.itertuples(index=False):
+        # Highlight total rows
+        suffix = '_total' if len(row_data) > 0 and is_total_row_label(row_data[0]) else ''
+        cells = []
+        for col_idx, value in enumerate(row_data, 1):
+            if col_idx == 1:  # First column
+                style = 'first'
+            elif isinstance(value, (int, float)) and not pd.isna(value):
+                style = 'number'
+            else:
+                style = 'text'
+            cells.append(styles.cell(ws, value, style + suffix))
+        ws.append(cells)
+        current_row += 1
+    return current_row
+
+def skip_rows(ws, count, current_row):
+    """Leave count empty rows on a write-only sheet; returns the next free row"""
+    for _ in range(count):
+        ws.append([])
+    return current_row + count
+
+def set_export_page_setup(ws):
+    ws.page_setup.orientation = Worksheet.ORIENTATION_LANDSCAPE
+    ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 0
+
+def send_spooled_excel(spool, download_name):
+    """Send a spooled workbook in chunks; the spool is closed with the response"""
+    return send_file(
+        spool,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=download_name
+    )
+
 # Global callback registry for file storage
 FILE_STORAGE_CALLBACKS = {}
 
@@ -347,9 +329,30 @@ def trigger_file_storage_callback(callback_id, file_data):
         return True
     return False
 
+def store_job_result(job_status):
+    """Job completion hook: report finished background exports to their storage callback"""
+    callback_id = job_status.get('callback_id')
+    if not callback_id or job_status.get('state') != DONE:
+        return
+    trigger_file_storage_callback(callback_id, {
+        'name': job_status.get('download_name') or job_status['job_id'],
+        'job_id': job_status['job_id'],
+        'path': result_path(job_status['job_id']),
+        'size': job_status.get('size'),
+        'mimetype': job_status.get('mimetype'),
+        'endpoint': job_status.get('endpoint')
+    })
+
+register_completion_hook(store_job_result)
+
 def generate_file_metadata(file_data, analysis_type, source_info=None):
-    """Generate comprehensive metadata for stored files"""
-    file_size = len(file_data) if isinstance(file_data, bytes) else 0
+    """Generate comprehensive metadata for stored files (file_data: bytes or a file object)"""
+    if isinstance(file_data, bytes):
+        file_size, file_hash = len(file_data), hashlib.md5(file_data).hexdigest()
+    elif hasattr(file_data, 'read'):
+        file_size, file_hash = file_digest(file_data)
+    else:
+        file_size, file_hash = 0, None
     
     metadata = {
         'id': str(uuid.uuid4()),
@@ -360,7 +363,7 @@ def generate_file_metadata(file_data, analysis_type, source_info=None):
         'analysis_type': analysis_type,
         'auto_stored': True,
         'source_info': source_info or {},
-        'hash': hashlib.md5(file_data).hexdigest() if isinstance(file_data, bytes) else None
+        'hash': file_hash
     }
     
     return metadata
@@ -516,12 +519,8 @@ def generate_master_excel_with_callback():
         
         logger.info(f"Generating category-based Excel (no overview): {file_name}")
         
-        # Create Excel workbook
-        wb = openpyxl.Workbook()
-        
-        # Remove default sheet
-        if 'Sheet' in wb.sheetnames:
-            wb.remove(wb['Sheet'])
+        # Create a write-only Excel workbook: rows are streamed, not kept as cell objects
+        wb = new_streaming_workbook()
         
         # Define styles for dual tables
         # MT Table styles (Green theme)
@@ -530,16 +529,10 @@ def generate_master_excel_with_callback():
         mt_header_fill = PatternFill(start_color="5CB85C", end_color="5CB85C", fill_type="solid")
         
         # Value Table styles (Blue theme)
-        value_title_font = Font(bold=True, size=14, color="FFFFFF")
         value_title_fill = PatternFill(start_color="17A2B8", end_color="17A2B8", fill_type="solid")
         value_header_fill = PatternFill(start_color="5BC0DE", end_color="5BC0DE", fill_type="solid")
         
         header_font = Font(bold=True, color="FFFFFF", size=11)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        data_alignment_left = Alignment(horizontal="left", vertical="center")
-        data_alignment_right = Alignment(horizontal="right", vertical="center")
-        data_alignment_center = Alignment(horizontal="center", vertical="center")
         
         total_font = Font(bold=True, color="155724")
         total_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
@@ -551,130 +544,44 @@ def generate_master_excel_with_callback():
             bottom=Side(style='thin')
         )
         
+        styles = dual_table_styles(
+            mt_title_font, {'mt': mt_title_fill, 'value': value_title_fill},
+            header_font, {'mt': mt_header_fill, 'value': value_header_fill},
+            total_font, total_fill, border
+        )
+        
         def create_dual_table_sheet(sheet_name, mt_df, value_df, sheet_index):
             """Create a sheet with exactly 2 tables - MT and Value"""
             ws = wb.create_sheet(sheet_name, sheet_index - 1)
             
+            # Column widths and freeze panes go first on a write-only sheet
+            max_cols = max(
+                len(mt_df.columns) if not mt_df.empty else 5,
+                len(value_df.columns) if not value_df.empty else 5
+            )
+            set_column_widths(ws, [35] + [15] * (max_cols - 1))  # First column wider
+            
+            # Freeze panes at A3 (below titles and headers)
+            ws.freeze_panes = 'A3'
+            
             current_row = 1
             
             # MT DATA TABLE
             if not mt_df.empty:
-                # MT Title
-                mt_title = ws.cell(row=current_row, column=1, value="MT DATA")
-                mt_title.font = mt_title_font
-                mt_title.fill = mt_title_fill
-                mt_title.alignment = Alignment(horizontal="center", vertical="center")
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(mt_df.columns))
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # MT Headers
-                for col_idx, column in enumerate(mt_df.columns, 1):
-                    cell = ws.cell(row=current_row, column=col_idx, value=column)
-                    cell.font = header_font
-                    cell.fill = mt_header_fill
-                    cell.alignment = header_alignment
-                    cell.border = border
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # MT Data rows
-                for row_data in mt_df.itertuples(index=False):
-                    for col_idx, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=current_row, column=col_idx, value=value)
-                        cell.border = border
-                        
-                        if col_idx == 1:  # First column
-                            cell.alignment = data_alignment_left
-                            # Check for total rows
-                            if isinstance(value, str) and ('TOTAL' in str(value).upper() or 'ACCLLP' in str(value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                        else:
-                            if isinstance(value, (int, float)) and not pd.isna(value):
-                                cell.number_format = '#,##0.00'
-                                cell.alignment = data_alignment_right
-                            else:
-                                cell.alignment = data_alignment_center
-                            
-                            # Highlight total rows
-                            first_col_value = row_data[0] if len(row_data) > 0 else ""
-                            if isinstance(first_col_value, str) and ('TOTAL' in str(first_col_value).upper() or 'ACCLLP' in str(first_col_value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                    
-                    current_row += 1
-                
-                current_row += 2  # Space between tables
+                current_row = stream_dual_table(ws, styles, mt_df, 'mt', "MT DATA", current_row)
+                current_row = skip_rows(ws, 2, current_row)  # Space between tables
             
             # VALUE DATA TABLE
             if not value_df.empty:
-                # Value Title
-                value_title = ws.cell(row=current_row, column=1, value="VALUE DATA")
-                value_title.font = value_title_font
-                value_title.fill = value_title_fill
-                value_title.alignment = Alignment(horizontal="center", vertical="center")
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(value_df.columns))
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # Value Headers
-                for col_idx, column in enumerate(value_df.columns, 1):
-                    cell = ws.cell(row=current_row, column=col_idx, value=column)
-                    cell.font = header_font
-                    cell.fill = value_header_fill
-                    cell.alignment = header_alignment
-                    cell.border = border
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # Value Data rows
-                for row_data in value_df.itertuples(index=False):
-                    for col_idx, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=current_row, column=col_idx, value=value)
-                        cell.border = border
-                        
-                        if col_idx == 1:  # First column
-                            cell.alignment = data_alignment_left
-                            # Check for total rows
-                            if isinstance(value, str) and ('TOTAL' in str(value).upper() or 'ACCLLP' in str(value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                        else:
-                            if isinstance(value, (int, float)) and not pd.isna(value):
-                                cell.number_format = '#,##0.00'
-                                cell.alignment = data_alignment_right
-                            else:
-                                cell.alignment = data_alignment_center
-                            
-                            # Highlight total rows
-                            first_col_value = row_data[0] if len(row_data) > 0 else ""
-                            if isinstance(first_col_value, str) and ('TOTAL' in str(first_col_value).upper() or 'ACCLLP' in str(first_col_value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                    
-                    current_row += 1
+                current_row = stream_dual_table(ws, styles, value_df, 'value', "VALUE DATA", current_row)
             
             # If both tables are empty, add a message
             if mt_df.empty and value_df.empty:
-                ws.cell(row=1, column=1, value="No data available for this category")
-                ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=5)
-            
-            # Auto-adjust column widths
-            max_cols = max(
-                len(mt_df.columns) if not mt_df.empty else 5,
-                len(value_df.columns) if not value_df.empty else 5
-            )
-            
-            for col_idx in range(1, max_cols + 1):
-                if col_idx == 1:  # First column - wider
-                    ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = 35
-                else:  # Data columns
-                    ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = 15
-            
-            # Freeze panes at A3 (below titles and headers)
-            ws.freeze_panes = 'A3'
+                ws.append(["No data available for this category"])
+                merge_row(ws, 1, 5)
             
+            set_export_page_setup(ws)
+            report_progress(sheet_index * 18, f"Created {sheet_name} sheet")
             return ws
         
         # Create sheets in the specific order requested
@@ -727,18 +634,9 @@ def generate_master_excel_with_callback():
         
         # Note: We always create all 5 sheets, so sheet_count will always be 5
         
-        # Set print settings for all sheets
-        for sheet in wb.worksheets:
-            sheet.page_setup.orientation = sheet.ORIENTATION_LANDSCAPE
-            sheet.page_setup.paperSize = sheet.PAPERSIZE_A4
-            sheet.page_setup.fitToWidth = 1
-            sheet.page_setup.fitToHeight = 0
-        
-        # Save to BytesIO
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        file_data = output.getvalue()
+        # Save to a spooled temporary file
+        report_progress(95, "Saving workbook")
+        output = save_to_spool(wb)
         
         # Generate file metadata
         source_info = {
@@ -748,7 +646,7 @@ def generate_master_excel_with_callback():
             'created_sheets': created_sheets
         }
         
-        file_metadata = generate_file_metadata(file_data, 'category_based_merged', source_info)
+        file_metadata = generate_file_metadata(output, 'category_based_merged', source_info)
         file_metadata['name'] = f"{file_name}.xlsx"
         
         # Trigger callback for automatic storage if configured
@@ -758,15 +656,7 @@ def generate_master_excel_with_callback():
         
         logger.info(f"Successfully generated category-based merged Excel: {file_name}.xlsx - {len(created_sheets)} sheets")
         
-        # Reset BytesIO for download
-        output = BytesIO(file_data)
-        
-        response = send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=f"{file_name}.xlsx"
-        )
+        response = send_spooled_excel(output, f"{file_name}.xlsx")
         
         # Add custom headers
         response.headers['X-Storage-Callback-Triggered'] = str(storage_triggered)
@@ -814,12 +704,8 @@ def generate_selected_excel():
         
         logger.info(f"Generating selected combined Excel with dual tables: {file_name}")
         
-        # Create Excel workbook
-        wb = openpyxl.Workbook()
-        
-        # Remove default sheet
-        if 'Sheet' in wb.sheetnames:
-            wb.remove(wb['Sheet'])
+        # Create a write-only Excel workbook: rows are streamed, not kept as cell objects
+        wb = new_streaming_workbook()
         
         # Define styles (same as master Excel)
         title_font = Font(bold=True, size=16, color="FFFFFF")
@@ -831,12 +717,10 @@ def generate_selected_excel():
         mt_title_fill = PatternFill(start_color="28A745", end_color="28A745", fill_type="solid")
         
         # Value Table styles (Blue)
-        value_title_font = Font(bold=True, size=14, color="FFFFFF")
         value_title_fill = PatternFill(start_color="17A2B8", end_color="17A2B8", fill_type="solid")
         
         header_font = Font(bold=True, color="FFFFFF", size=11)
         header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
         
         total_font = Font(bold=True, color="155724")
         total_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
@@ -848,141 +732,49 @@ def generate_selected_excel():
             bottom=Side(style='thin')
         )
         
+        styles = dual_table_styles(
+            mt_title_font, {'mt': mt_title_fill, 'value': value_title_fill},
+            header_font, {'mt': header_fill, 'value': header_fill},
+            total_font, total_fill, border,
+            sheet_title=(title_font, title_fill, title_alignment)
+        )
+        
         def format_selected_dual_table_worksheet(ws, mt_df, value_df, sheet_title, analysis_type=""):
-            """Apply formatting to selected worksheet with two tables (MT and Value) stacked vertically"""
+            """Write a selected worksheet with two tables (MT and Value) stacked vertically"""
+            
+            # Column widths and freeze panes go first on a write-only sheet
+            max_cols = max(
+                len(mt_df.columns) if not mt_df.empty else 0, 
+                len(value_df.columns) if not value_df.empty else 0
+            )
+            if max_cols:
+                set_column_widths(ws, [35] + [14] * (max_cols - 1))  # First column wider
+            
+            # Add freeze panes at the first data row
+            if not mt_df.empty:
+                ws.freeze_panes = 'B6'
+            elif not value_df.empty:
+                ws.freeze_panes = 'B4'
             
             current_row = 1
             
             # Add main sheet title
             if not mt_df.empty or not value_df.empty:
-                max_cols = max(
-                    len(mt_df.columns) if not mt_df.empty else 0, 
-                    len(value_df.columns) if not value_df.empty else 0,
-                    5  # Minimum columns for title
-                )
-                
-                title_cell = ws.cell(row=current_row, column=1, value=sheet_title)
-                title_cell.font = title_font
-                title_cell.fill = title_fill
-                title_cell.alignment = title_alignment
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=max_cols)
                 ws.row_dimensions[current_row].height = 30
-                current_row += 2
+                ws.append([styles.cell(ws, sheet_title, 'sheet_title')])
+                merge_row(ws, current_row, max(max_cols, 5))  # Minimum columns for title
+                current_row = skip_rows(ws, 1, current_row + 1)
             
             # MT Table Section
             if not mt_df.empty:
-                # MT Table Title
-                mt_title_cell = ws.cell(row=current_row, column=1, value=f"{analysis_type} - MT DATA (SELECTED)")
-                mt_title_cell.font = mt_title_font
-                mt_title_cell.fill = mt_title_fill
-                mt_title_cell.alignment = Alignment(horizontal="center", vertical="center")
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(mt_df.columns))
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # MT Headers
-                for col_idx, column in enumerate(mt_df.columns, 1):
-                    cell = ws.cell(row=current_row, column=col_idx, value=column)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = border
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # MT Data
-                for row_data in mt_df.itertuples(index=False):
-                    for col_idx, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=current_row, column=col_idx, value=value)
-                        cell.border = border
-                        
-                        # Format based on column type
-                        if col_idx == 1:  # First column
-                            cell.alignment = Alignment(horizontal="left", vertical="center")
-                            # Check for total rows
-                            if isinstance(value, str) and ('TOTAL' in str(value).upper() or 'ACCLLP' in str(value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                        else:  # Data columns
-                            if isinstance(value, (int, float)) and not pd.isna(value):
-                                cell.number_format = '#,##0.00'
-                                cell.alignment = Alignment(horizontal="right", vertical="center")
-                            else:
-                                cell.alignment = Alignment(horizontal="center", vertical="center")
-                            
-                            # Highlight total rows
-                            first_col_value = row_data[0] if len(row_data) > 0 else ""
-                            if isinstance(first_col_value, str) and ('TOTAL' in str(first_col_value).upper() or 'ACCLLP' in str(first_col_value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                    current_row += 1
-                
-                current_row += 2  # Space between tables
+                current_row = stream_dual_table(ws, styles, mt_df, 'mt', f"{analysis_type} - MT DATA (SELECTED)", current_row)
+                current_row = skip_rows(ws, 2, current_row)  # Space between tables
             
             # Value Table Section
             if not value_df.empty:
-                # Value Table Title
-                value_title_cell = ws.cell(row=current_row, column=1, value=f"{analysis_type} - VALUE DATA (SELECTED)")
-                value_title_cell.font = value_title_font
-                value_title_cell.fill = value_title_fill
-                value_title_cell.alignment = Alignment(horizontal="center", vertical="center")
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(value_df.columns))
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # Value Headers
-                for col_idx, column in enumerate(value_df.columns, 1):
-                    cell = ws.cell(row=current_row, column=col_idx, value=column)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = border
-                ws.row_dimensions[current_row].height = 25
-                current_row += 1
-                
-                # Value Data
-                for row_data in value_df.itertuples(index=False):
-                    for col_idx, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=current_row, column=col_idx, value=value)
-                        cell.border = border
-                        
-                        # Format based on column type
-                        if col_idx == 1:  # First column
-                            cell.alignment = Alignment(horizontal="left", vertical="center")
-                            # Check for total rows
-                            if isinstance(value, str) and ('TOTAL' in str(value).upper() or 'ACCLLP' in str(value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                        else:  # Data columns
-                            if isinstance(value, (int, float)) and not pd.isna(value):
-                                cell.number_format = '#,##0.00'
-                                cell.alignment = Alignment(horizontal="right", vertical="center")
-                            else:
-                                cell.alignment = Alignment(horizontal="center", vertical="center")
-                            
-                            # Highlight total rows
-                            first_col_value = row_data[0] if len(row_data) > 0 else ""
-                            if isinstance(first_col_value, str) and ('TOTAL' in str(first_col_value).upper() or 'ACCLLP' in str(first_col_value).upper()):
-                                cell.font = total_font
-                                cell.fill = total_fill
-                    current_row += 1
+                current_row = stream_dual_table(ws, styles, value_df, 'value', f"{analysis_type} - VALUE DATA (SELECTED)", current_row)
             
-            # Auto-adjust column widths
-            max_cols = max(
-                len(mt_df.columns) if not mt_df.empty else 0, 
-                len(value_df.columns) if not value_df.empty else 0
-            )
-            for col_idx in range(1, max_cols + 1):
-                if col_idx == 1:  # First column - wider
-                    ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = 35
-                else:  # Data columns
-                    ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = 14
-            
-            # Add freeze panes at the first data row
-            if not mt_df.empty:
-                ws.freeze_panes = ws['B6']
-            elif not value_df.empty:
-                ws.freeze_panes = ws['B4']
+            set_export_page_setup(ws)
         
         sheet_count = 0
         
@@ -1030,23 +822,14 @@ def generate_selected_excel():
         # If no sheets were created, create a default message sheet
         if sheet_count == 0:
             default_sheet = wb.create_sheet("No_Selected_Data", 0)
-            default_sheet.cell(row=1, column=1, value="No selected data available for Excel generation")
-            default_sheet.cell(row=2, column=1, value="Please select files and ensure data is available")
-            default_sheet.cell(row=3, column=1, value=f"Selected files: {len(selected_files_info)}")
+            default_sheet.append(["No selected data available for Excel generation"])
+            default_sheet.append(["Please select files and ensure data is available"])
+            default_sheet.append([f"Selected files: {len(selected_files_info)}"])
+            set_export_page_setup(default_sheet)
             logger.warning("No selected data available - created default message sheet")
         
-        # Set print settings for all sheets
-        for sheet in wb.worksheets:
-            sheet.page_setup.orientation = sheet.ORIENTATION_LANDSCAPE
-            sheet.page_setup.paperSize = sheet.PAPERSIZE_A4
-            sheet.page_setup.fitToWidth = 1
-            sheet.page_setup.fitToHeight = 0
-        
-        # Save to BytesIO
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        file_data = output.getvalue()
+        # Save to a spooled temporary file
+        output = save_to_spool(wb)
         
         # Generate file metadata for storage
         source_info = {
@@ -1061,7 +844,7 @@ def generate_selected_excel():
             }
         }
         
-        file_metadata = generate_file_metadata(file_data, 'selected_dual_table_combined', source_info)
+        file_metadata = generate_file_metadata(output, 'selected_dual_table_combined', source_info)
         file_metadata['name'] = f"{file_name}.xlsx"
         
         # Trigger callback for automatic storage if configured
@@ -1071,15 +854,7 @@ def generate_selected_excel():
         
         logger.info(f"Successfully generated selected combined Excel file with dual tables: {file_name}.xlsx - {sheet_count} sheets (Storage callback: {'triggered' if storage_triggered else 'not configured'})")
         
-        # Reset BytesIO for download
-        output = BytesIO(file_data)
-        
-        response = send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=f"{file_name}.xlsx"
-        )
+        response = send_spooled_excel(output, f"{file_name}.xlsx")
         
         # Add custom headers for callback information
         response.headers['X-File-Metadata'] = json.dumps(file_metadata)
@@ -1194,7 +969,7 @@ def combine_category_excel_files():
                                 # Copy formatting
                                 try:
                                     if cell.font:
-                                        new_cell.font = Font(
+                                        new_cell.font = interned_font(
                                             name=cell.font.name or 'Calibri',
                                             size=cell.font.size or 11,
                                             bold=cell.font.bold,
@@ -1203,21 +978,21 @@ def combine_category_excel_files():
                                         )
                                     
                                     if cell.fill and cell.fill.fill_type:
-                                        new_cell.fill = PatternFill(
+                                        new_cell.fill = interned_pattern_fill(
                                             fill_type=cell.fill.fill_type,
                                             start_color=cell.fill.start_color,
                                             end_color=cell.fill.end_color
                                         )
                                     
                                     if cell.alignment:
-                                        new_cell.alignment = Alignment(
+                                        new_cell.alignment = interned_alignment(
                                             horizontal=cell.alignment.horizontal,
                                             vertical=cell.alignment.vertical,
                                             wrap_text=cell.alignment.wrap_text
                                         )
                                         
                                     if cell.border:
-                                        new_cell.border = Border(
+                                        new_cell.border = interned_border(
                                             left=cell.border.left,
                                             right=cell.border.right,
                                             top=cell.border.top,
@@ -1734,7 +1509,7 @@ def combine_excel_files():
                                 # Copy formatting
                                 try:
                                     if cell.font:
-                                        new_cell.font = Font(
+                                        new_cell.font = interned_font(
                                             name=cell.font.name or 'Calibri',
                                             size=cell.font.size or 11,
                                             bold=cell.font.bold,
@@ -1743,7 +1518,7 @@ def combine_excel_files():
                                         )
                                     
                                     if cell.fill and cell.fill.fill_type:
-                                        new_cell.fill = PatternFill(
+                                        new_cell.fill = interned_pattern_fill(
                                             fill_type=cell.fill.fill_type,
                                             start_color=cell.fill.start_color,
                                             end_color=cell.fill.end_color
@@ -1753,7 +1528,7 @@ def combine_excel_files():
                                     if is_header_row:
                                         new_cell.alignment = table_header_alignment
                                         # Make headers bold and with header styling
-                                        new_cell.font = Font(
+                                        new_cell.font = interned_font(
                                             name=new_cell.font.name or 'Calibri',
                                             size=new_cell.font.size or 11,
                                             bold=True,
@@ -1762,7 +1537,7 @@ def combine_excel_files():
                                     else:
                                         # Apply appropriate alignment for data cells
                                         if cell.alignment:
-                                            new_cell.alignment = Alignment(
+                                            new_cell.alignment = interned_alignment(
                                                 horizontal=cell.alignment.horizontal or "center",
                                                 vertical="center",
                                                 wrap_text=cell.alignment.wrap_text
@@ -1777,7 +1552,7 @@ def combine_excel_files():
                                                 new_cell.alignment = data_alignment_center
                                     
                                     if cell.border:
-                                        new_cell.border = Border(
+                                        new_cell.border = interned_border(
                                             left=cell.border.left,
                                             right=cell.border.right,
                                             top=cell.border.top,
@@ -1863,7 +1638,7 @@ def combine_excel_files():
                                     cell.alignment = table_header_alignment
                                     # Make header bold if not already
                                     if not cell.font.bold:
-                                        cell.font = Font(
+                                        cell.font = interned_font(
                                             name=cell.font.name or 'Calibri',
                                             size=cell.font.size or 11,
                                             bold=True,
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, send_file
 import pandas as pd
+from utils.excel_cache import read_excel_cached
 from io import BytesIO
 import traceback
 from process import safe_merge_dataframes, clean_and_convert_numeric
@@ -28,7 +29,7 @@ def merge_data():
         
         for dataset in datasets:
             try:
-                df = pd.read_excel(dataset['filepath'], sheet_name=dataset['sheet_name'])
+                df = read_excel_cached(dataset['filepath'], sheet_name=dataset['sheet_name'])
                 dfs.append(df)
                 dataset_info.append({
                     'name': f"{dataset.get('name', 'Unknown')} - {dataset['sheet_name']}",
@@ -87,7 +88,7 @@ def export_csv():
         if not filepath or not sheet_name:
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
-        df = pd.read_excel(filepath, sheet_name=sheet_name)
+        df = read_excel_cached(filepath, sheet_name=sheet_name)
         
         # Clean the data for export
         df = clean_and_convert_numeric(df)
@@ -130,7 +131,7 @@ def export_excel():
         with pd.ExcelWriter(output, engine='openpyxl') as writer:
             for dataset in datasets:
                 try:
-                    df = pd.read_excel(dataset['filepath'], sheet_name=dataset['sheet_name'])
+                    df = read_excel_cached(dataset['filepath'], sheet_name=dataset['sheet_name'])
                     df = clean_and_convert_numeric(df)
                     
                     # Use provided sheet name or generate one
@@ -172,8 +173,8 @@ def get_sheet_info():
         if not filepath or not sheet_name:
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
-        df = pd.read_excel(filepath, sheet_name=sheet_name, nrows=0)  # Just get columns
-        full_df = pd.read_excel(filepath, sheet_name=sheet_name)
+        df = read_excel_cached(filepath, sheet_name=sheet_name, nrows=0)  # Just get columns
+        full_df = read_excel_cached(filepath, sheet_name=sheet_name)
         
         # Get basic statistics
         numeric_columns = full_df.select_dtypes(include=['number']).columns.tolist()
@@ -210,7 +211,7 @@ def preview_data():
         if not filepath or not sheet_name:
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
-        df = pd.read_excel(filepath, sheet_name=sheet_name)
+        df = read_excel_cached(filepath, sheet_name=sheet_name)
         
         # Get preview data
         preview_df = df.head(num_rows)
@@ -240,7 +241,7 @@ def search_data():
         if not filepath or not sheet_name or not search_term:
             return jsonify({'error': 'Missing required parameters'}), 400
         
-        df = pd.read_excel(filepath, sheet_name=sheet_name)
+        df = read_excel_cached(filepath, sheet_name=sheet_name)
         
         if search_column and search_column in df.columns:
             # Search in specific column
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
 import pandas as pd
+from utils.excel_cache import read_excel_cached, get_sheet_names_cached
+from utils.column_resolver import find_field
 import numpy as np
 import re
 from datetime import datetime
@@ -388,43 +390,13 @@ def handle_duplicate_columns(df):
     df.columns = cols
     return df
 
-def find_column(df, search_terms, threshold=80, case_sensitive=False):
-    """Find column by fuzzy matching"""
-    from difflib import SequenceMatcher
-    
-    def similarity(a, b):
-        return SequenceMatcher(None, a.lower() if not case_sensitive else a, 
-                             b.lower() if not case_sensitive else b).ratio() * 100
-    
-    for term in search_terms:
-        for col in df.columns:
-            if similarity(str(col), term) >= threshold:
-                return col
-    return None
-
 def process_budget_data_product_region(budget_df, group_type='product_region'):
     """Process budget data for ERO-PW analysis"""
     budget_df = handle_duplicate_columns(budget_df.copy())
     budget_df.columns = budget_df.columns.str.strip()
 
-    product_col = None
-    region_col = None
-    product_names = ['Product', 'Product Group', 'PRODUCT NAME']
-    region_names = ['Region', 'Branch', 'REGIONS']
-
-    for col in product_names:
-        if col in budget_df.columns:
-            product_col = col
-            break
-    if not product_col:
-        product_col = find_column(budget_df, product_names, threshold=80)
-
-    for col in region_names:
-        if col in budget_df.columns:
-            region_col = col
-            break
-    if not region_col:
-        region_col = find_column(budget_df, region_names, threshold=80)
+    product_col = find_field(budget_df, 'product_name', threshold=80)
+    region_col = find_field(budget_df, 'region_or_branch', threshold=80)
 
     if not product_col or not region_col:
         return {'error': 'Could not find Product Group or Region column in budget dataset.'}
@@ -496,11 +468,11 @@ def process_sales_data(df_sales, fiscal_year_start, months):
         df_sales = handle_duplicate_columns(df_sales)
         
         # Find required columns with flexible matching
-        region_col = find_column(df_sales, ['Region', 'Area', 'Zone'], case_sensitive=False)
-        product_col = find_column(df_sales, ['Type (Make)', 'Type(Make)', 'Product', 'Product Group'], case_sensitive=False)
-        date_col = find_column(df_sales, ['Date', 'Month Format', 'Month'], case_sensitive=False)
-        qty_col = find_column(df_sales, ['Actual Quantity', 'Acutal Qty', 'Qty'], case_sensitive=False)
-        value_col = find_column(df_sales, ['Value', 'Amount', 'Sales Value'], case_sensitive=False)
+        region_col = find_field(df_sales, 'region')
+        product_col = find_field(df_sales, 'sales_product_group')
+        date_col = find_field(df_sales, 'sales_date')
+        qty_col = find_field(df_sales, 'sales_qty')
+        value_col = find_field(df_sales, 'sales_value')
         
         # Rename columns to standard names for consistency
         rename_dict = {}
@@ -914,8 +886,7 @@ def process_ero_pw_analysis():
         months = ero_pw_merge_processor.months
         
         # Process budget data (using original function - no changes to budget processing)
-        xls_budget = pd.ExcelFile(budget_filepath)
-        df_budget = pd.read_excel(xls_budget, sheet_name=budget_sheet)
+        df_budget = read_excel_cached(budget_filepath, sheet_name=budget_sheet)
         df_budget.columns = df_budget.columns.str.strip()
         df_budget = df_budget.dropna(how='all').reset_index(drop=True)
         
@@ -944,21 +915,19 @@ def process_ero_pw_analysis():
         actual_value_current = {}
         
         if sales_filepath and sales_sheets:
-            xls_sales = pd.ExcelFile(sales_filepath)
-            
             for sheet_name in sales_sheets:
                 try:
-                    df_sales = pd.read_excel(xls_sales, sheet_name=sheet_name, header=0)
+                    df_sales = read_excel_cached(sales_filepath, sheet_name=sheet_name, header=0)
                     
                     if isinstance(df_sales.columns, pd.MultiIndex):
                         df_sales.columns = ['_'.join(col).strip() for col in df_sales.columns.values]
                     df_sales = handle_duplicate_columns(df_sales)
                     
-                    region_col = find_column(df_sales, ['Region', 'Area', 'Zone'], case_sensitive=False)
-                    product_col = find_column(df_sales, ['Type (Make)', 'Type(Make)', 'Product'], case_sensitive=False)
-                    date_col = find_column(df_sales, ['Date', 'Month Format', 'Month'], case_sensitive=False)
-                    qty_col = find_column(df_sales, ['Actual Quantity', 'Quantity', 'Qty'], case_sensitive=False)
-                    value_col = find_column(df_sales, ['Value', 'Amount', 'Sales Value'], case_sensitive=False)
+                    region_col = find_field(df_sales, 'region')
+                    product_col = find_field(df_sales, 'sales_product_group')
+                    date_col = find_field(df_sales, 'sales_date')
+                    qty_col = find_field(df_sales, 'sales_qty')
+                    value_col = find_field(df_sales, 'sales_value')
                     
                     if product_col:
                         # Filter for WEST region
@@ -1044,18 +1013,17 @@ def process_ero_pw_analysis():
         if last_year_filepath and last_year_sheet:
             try:
                 current_app.logger.info("Attempting FIRST method: Original last year file logic")
-                xls_last_year = pd.ExcelFile(last_year_filepath)
-                df_last_year = pd.read_excel(xls_last_year, sheet_name=last_year_sheet)
+                df_last_year = read_excel_cached(last_year_filepath, sheet_name=last_year_sheet)
                 
                 if isinstance(df_last_year.columns, pd.MultiIndex):
                     df_last_year.columns = ['_'.join(col).strip() for col in df_last_year.columns.values]
                 df_last_year = handle_duplicate_columns(df_last_year)
                 
-                region_col = find_column(df_last_year, ['Region'], case_sensitive=False)
-                product_col = find_column(df_last_year, ['Type (Make)', 'Type(Make)', 'Product Group'], case_sensitive=False)
-                date_col = find_column(df_last_year, ['Date', 'Month Format', 'Month'], case_sensitive=False)
-                qty_col = find_column(df_last_year, ['Actual Quantity', 'Acutal Quantity', 'Qty'], case_sensitive=False)
-                amount_col = find_column(df_last_year, ['Amount', 'Value', 'Sales Value'], case_sensitive=False)
+                region_col = find_field(df_last_year, 'region')
+                product_col = find_field(df_last_year, 'sales_product_group')
+                date_col = find_field(df_last_year, 'sales_date')
+                qty_col = find_field(df_last_year, 'sales_qty')
+                amount_col = find_field(df_last_year, 'sales_amount')
                 
                 if product_col and date_col:
                     # Filter for WEST region
@@ -1147,26 +1115,24 @@ def process_ero_pw_analysis():
         if ly_processing_method == "none" and last_year_filepath and last_year_sheet:
             try:
                 current_app.logger.info("Attempting SECOND method: Sales processing logic on last year file")
-                xls_last_year = pd.ExcelFile(last_year_filepath)
-                
                 # Check if last year file has multiple sheets, try to process them like sales sheets
-                available_sheets = xls_last_year.sheet_names
+                available_sheets = get_sheet_names_cached(last_year_filepath)
                 sheets_to_process = [last_year_sheet] if last_year_sheet in available_sheets else available_sheets
                 
                 for sheet_name in sheets_to_process:
                     try:
-                        df_last_year_sales = pd.read_excel(xls_last_year, sheet_name=sheet_name, header=0)
+                        df_last_year_sales = read_excel_cached(last_year_filepath, sheet_name=sheet_name, header=0)
                         
                         if isinstance(df_last_year_sales.columns, pd.MultiIndex):
                             df_last_year_sales.columns = ['_'.join(col).strip() for col in df_last_year_sales.columns.values]
                         df_last_year_sales = handle_duplicate_columns(df_last_year_sales)
                         
                         # USE SAME COLUMN DETECTION AS CURRENT YEAR SALES
-                        region_col = find_column(df_last_year_sales, ['Region', 'Area', 'Zone'], case_sensitive=False)
-                        product_col = find_column(df_last_year_sales, ['Type (Make)', 'Type(Make)', 'Product'], case_sensitive=False)
-                        date_col = find_column(df_last_year_sales, ['Date', 'Month Format', 'Month'], case_sensitive=False)
-                        qty_col = find_column(df_last_year_sales, ['Actual Quantity', 'Quantity', 'Qty'], case_sensitive=False)
-                        value_col = find_column(df_last_year_sales, ['Value', 'Amount', 'Sales Value'], case_sensitive=False)
+                        region_col = find_field(df_last_year_sales, 'region')
+                        product_col = find_field(df_last_year_sales, 'sales_product_group')
+                        date_col = find_field(df_last_year_sales, 'sales_date')
+                        qty_col = find_field(df_last_year_sales, 'sales_qty')
+                        value_col = find_field(df_last_year_sales, 'sales_value')
                         
                         if product_col:
                             # Filter for WEST region
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-import pandas as pd
+from utils.excel_cache import read_excel_cached
 import traceback
 from process import (
     handle_duplicate_columns,
@@ -28,7 +28,7 @@ def process_sheet():
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
         # Read the specific sheet
-        df = pd.read_excel(filepath, sheet_name=sheet_name, header=None)
+        df = read_excel_cached(filepath, sheet_name=sheet_name, header=None)
         
         # Process based on type
         if processing_type == 'budget':
@@ -260,7 +260,7 @@ def validate_data():
         if not filepath or not sheet_name:
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
-        df = pd.read_excel(filepath, sheet_name=sheet_name)
+        df = read_excel_cached(filepath, sheet_name=sheet_name)
         is_valid, message = validate_dataframe(df, f"{sheet_name}", required_columns)
         
         return jsonify({
@@ -284,7 +284,7 @@ def optimize_memory():
         if not filepath or not sheet_name:
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
-        df = pd.read_excel(filepath, sheet_name=sheet_name)
+        df = read_excel_cached(filepath, sheet_name=sheet_name)
         optimized_df, memory_info = optimize_dataframe_memory(df)
         
         return jsonify({
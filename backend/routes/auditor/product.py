@@ -1,5 +1,9 @@
-from flask import Blueprint, request, jsonify, current_app, session, send_file
+from flask import Blueprint, request, jsonify, current_app, send_file
 import pandas as pd
+from utils.excel_cache import read_excel_cached, get_sheet_names_cached
+from services.result_store import store_in_session, load_from_session
+from utils.auditor.table_locator import first_header_row
+from utils.column_resolver import find_field
 import numpy as np
 import re
 from datetime import datetime
@@ -366,8 +370,7 @@ class MergePreviewProcessor:
     def detect_product_sheet(self, auditor_filepath):
         """Detect product analysis sheet in auditor file"""
         try:
-            xls_auditor = pd.ExcelFile(auditor_filepath)
-            sheet_names = xls_auditor.sheet_names
+            sheet_names = get_sheet_names_cached(auditor_filepath)
             
             # Look for product-related sheet
             for sheet in sheet_names:
@@ -383,27 +386,7 @@ class MergePreviewProcessor:
     
     def extract_tables(self, df_auditor, table_headers, is_product_analysis=True):
         """Extract table location from auditor data"""
-        table_idx = None
-        data_start_idx = None
-        
-        for idx, row in df_auditor.iterrows():
-            # Convert row to string for searching
-            row_values = []
-            for val in row:
-                if pd.notna(val):
-                    row_values.append(str(val).upper())
-            row_str = ' '.join(row_values)
-            
-            # Check if any header matches
-            for header in table_headers:
-                if header.upper() in row_str:
-                    table_idx = idx
-                    data_start_idx = idx + 1
-                    break
-            if table_idx is not None:
-                break
-        
-        return table_idx, data_start_idx
+        return extract_auditor_tables(df_auditor, table_headers, is_product_analysis)
     
     def smart_product_sorting(self, all_products):
         """Smart product sorting - regular products first, then totals"""
@@ -753,21 +736,18 @@ def store_totals_in_session(data_dict, data_type='mt'):
             current_app.logger.warning(f"No TOTAL SALES row found in {data_type} data")
             return False
         
-        # Initialize session storage if it doesn't exist
-        if 'total_sales_data' not in session:
-            session['total_sales_data'] = {}
+        # Totals live in the result store; the session only carries the handle
+        totals = dict(load_from_session('total_sales_data') or {})
         
         # Store the total sales row data
         session_key = 'tonnage' if data_type.lower() == 'mt' else 'value'
-        session['total_sales_data'][session_key] = {
+        totals[session_key] = {
             'data': total_sales_row,
             'columns': data_dict['columns'],
             'timestamp': datetime.now().isoformat(),
             'source': 'product_analysis'
         }
-        
-        # Mark session as modified
-        session.modified = True
+        store_in_session('total_sales_data', totals)
         
         current_app.logger.info(f"Stored {data_type} totals in session with {len(total_sales_row)} columns")
         return True
@@ -790,29 +770,6 @@ def handle_duplicate_columns(df):
     df.columns = cols
     return df
 
-def find_column(df, possible_names, threshold=80, case_sensitive=False):
-    """Find column by fuzzy matching"""
-    from difflib import SequenceMatcher
-    
-    def similarity(a, b):
-        return SequenceMatcher(None, a, b).ratio() * 100
-    
-    best_match = None
-    best_score = 0
-    
-    for col in df.columns:
-        for name in possible_names:
-            if not case_sensitive:
-                score = similarity(str(col).lower(), str(name).lower())
-            else:
-                score = similarity(str(col), str(name))
-            
-            if score >= threshold and score > best_score:
-                best_score = score
-                best_match = col
-    
-    return best_match
-
 def rename_columns(columns):
     """Rename columns to standard format"""
     renamed = []
@@ -847,25 +804,10 @@ def detect_analysis_type(sheet_name):
 
 def extract_auditor_tables(df_auditor, table_headers, is_product_analysis=True):
     """Extract tables from auditor data"""
-    table_idx = None
-    data_start_idx = None
-    
-    for idx, row in df_auditor.iterrows():
-        row_values = []
-        for val in row:
-            if pd.notna(val):
-                row_values.append(str(val).upper())
-        row_str = ' '.join(row_values)
-        
-        for header in table_headers:
-            if header.upper() in row_str:
-                table_idx = idx
-                data_start_idx = idx + 1
-                break
-        if table_idx is not None:
-            break
-    
-    return table_idx, data_start_idx
+    table_idx = first_header_row(df_auditor, table_headers)
+    if table_idx is None:
+        return None, None
+    return table_idx, table_idx + 1
 
 def process_auditor_table(df_auditor, table_headers, end_row=None):
     """Process auditor table and return cleaned DataFrame"""
@@ -935,15 +877,7 @@ def process_budget_data_product(budget_df, group_type='product'):
     budget_df = handle_duplicate_columns(budget_df.copy())
     budget_df.columns = budget_df.columns.str.strip()
 
-    product_col = None
-    product_names = ['Product', 'Product Group', 'PRODUCT NAME']
-    
-    for col in product_names:
-        if col in budget_df.columns:
-            product_col = col
-            break
-    if not product_col:
-        product_col = find_column(budget_df, product_names[0], threshold=80)
+    product_col = find_field(budget_df, 'product_name', threshold=80)
 
     if not product_col:
         return None, "Could not find Product Group column in budget dataset."
@@ -1054,7 +988,7 @@ def process_last_year_data_enhanced(last_year_file_info, fiscal_info, months):
         current_app.logger.info(f"Processing last year file: {last_year_file_info}")
         
         # Read the last year file
-        df_last_year = pd.read_excel(
+        df_last_year = read_excel_cached(
             last_year_file_info['filepath'], 
             sheet_name=last_year_file_info['sheet_name'], 
             header=0
@@ -1070,27 +1004,10 @@ def process_last_year_data_enhanced(last_year_file_info, fiscal_info, months):
         current_app.logger.info(f"Last year columns: {list(df_last_year.columns)}")
         
         # Find required columns with multiple possible names
-        product_possible_names = [
-            'Type (Make)', 'Type(Make)', 'Product Group' 
-            
-        ]
-        date_possible_names = [
-            'Month Format', 'Date', 'Month'
-            
-        ]
-        qty_possible_names = [
-            'Actual Quantity', 'Acutal Quantity', 'Qty', 
-            'Actual Qty', 'Sales Qty',
-        ]
-        value_possible_names = [
-            'Amount', 'Value', 'Sales Value',
-            
-        ]
-        
-        product_col = find_column(df_last_year, product_possible_names, threshold=70, case_sensitive=False)
-        date_col = find_column(df_last_year, date_possible_names, threshold=70, case_sensitive=False)
-        qty_col = find_column(df_last_year, qty_possible_names, threshold=70, case_sensitive=False)
-        value_col = find_column(df_last_year, value_possible_names, threshold=70, case_sensitive=False)
+        product_col = find_field(df_last_year, 'sales_product_group', threshold=70)
+        date_col = find_field(df_last_year, 'sales_month', threshold=70)
+        qty_col = find_field(df_last_year, 'sales_qty', threshold=70)
+        value_col = find_field(df_last_year, 'sales_amount', threshold=70)
         
         current_app.logger.info(f"Found columns - Product: {product_col}, Date: {date_col}, Qty: {qty_col}, Value: {value_col}")
         
@@ -1506,7 +1423,7 @@ def process_product_analysis():
             return jsonify({'success': False, 'error': 'Budget file and sheet are required'})
 
         # Process budget data
-        budget_df = pd.read_excel(budget_filepath, sheet_name=budget_sheet)
+        budget_df = read_excel_cached(budget_filepath, sheet_name=budget_sheet)
         budget_df.columns = budget_df.columns.str.strip()
         budget_df = budget_df.dropna(how='all').reset_index(drop=True)
 
@@ -1526,15 +1443,15 @@ def process_product_analysis():
         # Process current year sales files
         for sales_file_info in sales_files:
             try:
-                df_sales = pd.read_excel(sales_file_info['filepath'], sheet_name=sales_file_info['sheet_name'], header=0)
+                df_sales = read_excel_cached(sales_file_info['filepath'], sheet_name=sales_file_info['sheet_name'], header=0)
                 if isinstance(df_sales.columns, pd.MultiIndex):
                     df_sales.columns = ['_'.join(col).strip() for col in df_sales.columns.values]
                 df_sales = handle_duplicate_columns(df_sales)
                 
-                product_col = find_column(df_sales, ['Type (Make)', 'Type(Make)'], case_sensitive=False)
-                date_col = find_column(df_sales, ['Month Format', 'Date', 'Month'], case_sensitive=False)
-                qty_col = find_column(df_sales, ['Actual Quantity', 'Acutal Quantity'], case_sensitive=False)
-                value_col = find_column(df_sales, ['Amount', 'Value', 'Sales Value'], case_sensitive=False)
+                product_col = find_field(df_sales, 'sales_product_group')
+                date_col = find_field(df_sales, 'sales_month')
+                qty_col = find_field(df_sales, 'sales_qty')
+                value_col = find_field(df_sales, 'sales_amount')
                 
                 if product_col and date_col:
                     unique_products = df_sales[product_col].dropna().astype(str).str.strip().str.upper()
@@ -1677,7 +1594,7 @@ def process_product_analysis_with_session():
                 response_data['session_info'] = {
                     'totals_stored': True,
                     'available_for_sales_monthwise': True,
-                    'session_keys': list(session.get('total_sales_data', {}).keys()),
+                    'session_keys': list((load_from_session('total_sales_data') or {}).keys()),
                     'timestamp': datetime.now().isoformat()
                 }
                 
@@ -1700,8 +1617,7 @@ def get_sheet_info():
         if not file_path or not os.path.exists(file_path):
             return jsonify({'success': False, 'error': 'File not found'})
         
-        excel_file = pd.ExcelFile(file_path)
-        sheet_names = excel_file.sheet_names
+        sheet_names = get_sheet_names_cached(file_path)
         
         return jsonify({
             'success': True,
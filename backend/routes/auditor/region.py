@@ -1,37 +1,18 @@
 from flask import Blueprint, request, jsonify, send_file
 import pandas as pd
+from utils.excel_cache import read_excel_cached
+from utils.auditor.table_locator import first_header_row
+from utils.column_resolver import find_field
 import numpy as np
 import re
 from datetime import datetime
 from io import BytesIO
-from fuzzywuzzy import process
 from werkzeug.utils import secure_filename
 import os
 import xlsxwriter
 
 region_bp = Blueprint('region', __name__)
 
-def find_column(df, possible_names, case_sensitive=False, threshold=80):
-    """Enhanced fuzzy matching for column names"""
-    if isinstance(possible_names, str):
-        possible_names = [possible_names]
-    
-    for name in possible_names:
-        if case_sensitive:
-            if name in df.columns:
-                return name
-        else:
-            for col in df.columns:
-                if col.lower() == name.lower():
-                    return col
-    
-    for name in possible_names:
-        matches = process.extractOne(name, df.columns, score_cutoff=threshold)
-        if matches:
-            return matches[0]
-    
-    return None
-
 def handle_duplicate_columns(df):
     """Handle duplicate column names by renaming them"""
     cols = pd.Series(df.columns)
@@ -42,20 +23,10 @@ def handle_duplicate_columns(df):
 
 def extract_tables_from_auditor(df, headers):
     """Extract table data from auditor format"""
-    table_idx = None
-    data_start = None
-    
-    for idx, row in df.iterrows():
-        row_str = ' '.join([str(cell).strip().upper() for cell in row if pd.notna(cell)])
-        for header in headers:
-            if header.upper() in row_str:
-                table_idx = idx
-                data_start = idx + 1
-                break
-        if table_idx is not None:
-            break
-    
-    return table_idx, data_start
+    table_idx = first_header_row(df, headers, strip_cells=True)
+    if table_idx is None:
+        return None, None
+    return table_idx, table_idx + 1
 
 def rename_columns(columns):
     """Rename columns to standard format"""
@@ -72,17 +43,10 @@ def process_budget_data(budget_df, group_type='region'):
     budget_df = handle_duplicate_columns(budget_df.copy())
     budget_df.columns = budget_df.columns.str.strip()
     
-    identifier_col = None
-    identifier_names = ['Branch', 'Region', 'REGIONS'] if group_type == 'region' else ['Product', 'Product Group', 'PRODUCT NAME']
-    for col in identifier_names:
-        if col in budget_df.columns:
-            identifier_col = col
-            break
-    
+    identifier_field = 'branch_or_region' if group_type == 'region' else 'product_name'
+    identifier_col = find_field(budget_df, identifier_field, threshold=80)
     if not identifier_col:
-        identifier_col = find_column(budget_df, identifier_names[0], threshold=80)
-        if not identifier_col:
-            return None
+        return None
     
     budget_cols = {'Qty': [], 'Value': []}
     detailed_pattern = r'(Qty|Value)\s*[-]\s*(\w{3,})\'?(\d{2,4})'
@@ -345,23 +309,13 @@ def add_ytd_calculations_auditor_format(df, data_type='MT', fiscal_year_start=No
     
     return df_reordered
 
-# Column aliases for dynamic renaming
-column_aliases = {
-    'Date': ['Month Format', 'Month', 'Date'],
-    'Product Name': ['Type(Make)', 'Product Group'],
-    'Value': ['Value',  'Amount'],
-    'Amount': ['Amount', 'Total Amount', 'Sales Amount', 'Value', 'Sales Value'],
-    'Branch': ['Branch.1', 'Branch'],
-    'Actual Quantity': ['Actual Quantity', 'Acutal Quantity', 'Quantity', 'Sales Quantity', 'Qty', 'Volume']
-}
-
 def process_sales_data_for_year(filepath, sheet_name, is_last_year=False, data_type='MT', 
                               fiscal_year_start=None, fiscal_year_end=None,
                               last_fiscal_year_start=None, last_fiscal_year_end=None):
     """Process sales data for a specific year and data type with proper fiscal year handling"""
     try:
         # Read and prepare the data
-        df_sales = pd.read_excel(filepath, sheet_name=sheet_name, header=0)
+        df_sales = read_excel_cached(filepath, sheet_name=sheet_name, header=0)
         
         if isinstance(df_sales.columns, pd.MultiIndex):
             df_sales.columns = ['_'.join(col).strip() for col in df_sales.columns.values]
@@ -369,14 +323,14 @@ def process_sales_data_for_year(filepath, sheet_name, is_last_year=False, data_t
         df_sales = handle_duplicate_columns(df_sales)
         
         # Find required columns
-        branch_col = find_column(df_sales, column_aliases['Branch'], case_sensitive=False)
-        date_col = find_column(df_sales, ['Month Format', 'Date', 'Month'] + column_aliases['Date'], case_sensitive=False)
+        branch_col = find_field(df_sales, 'auditor_branch')
+        date_col = find_field(df_sales, 'sales_month')
         
         if data_type == 'MT':
-            value_col = find_column(df_sales, ['Actual Quantity', 'Acutal Quantity'] + column_aliases['Actual Quantity'], case_sensitive=False)
+            value_col = find_field(df_sales, 'sales_qty')
             value_column_name = 'Actual Quantity'
         else:  # Value
-            value_col = find_column(df_sales, ['Amount', 'Value', 'Sales Value'] + column_aliases['Value'], case_sensitive=False)
+            value_col = find_field(df_sales, 'sales_amount')
             value_column_name = 'Value' if data_type == 'Value' else 'Amount'
         
         if not all([branch_col, date_col, value_col]):
@@ -527,8 +481,7 @@ def process_region_analysis():
     
         
         # Process budget data
-        xls_budget = pd.ExcelFile(budget_filepath)
-        df_budget = pd.read_excel(xls_budget, sheet_name=selected_budget_sheet)
+        df_budget = read_excel_cached(budget_filepath, sheet_name=selected_budget_sheet)
         df_budget.columns = df_budget.columns.str.strip()
         df_budget = df_budget.dropna(how='all').reset_index(drop=True)
         
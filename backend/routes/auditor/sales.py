@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 import pandas as pd
+from utils.excel_cache import read_excel_cached
 import traceback
 import numpy as np
 from datetime import datetime
@@ -84,7 +85,7 @@ def process_sales_sheet():
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
         # Read Excel with header in first row (row index 0)
-        df_sales = pd.read_excel(filepath, sheet_name=sheet_name, header=0)
+        df_sales = read_excel_cached(filepath, sheet_name=sheet_name, header=0)
         df_sales = handle_duplicate_columns(df_sales)
         
         # Clean the data
@@ -123,7 +124,7 @@ def process_budget_sheet():
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
         # Read Excel with header in first row (row index 0)
-        df_budget = pd.read_excel(filepath, sheet_name=sheet_name, header=0)
+        df_budget = read_excel_cached(filepath, sheet_name=sheet_name, header=0)
         df_budget.columns = df_budget.columns.str.strip()
         df_budget = df_budget.dropna(how='all').reset_index(drop=True)
         df_budget = handle_duplicate_columns(df_budget)
@@ -217,7 +218,7 @@ def process_last_year_sheet():
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
         # Read Excel with header in first row (row index 0)
-        df_last_year = pd.read_excel(filepath, sheet_name=sheet_name, header=0)
+        df_last_year = read_excel_cached(filepath, sheet_name=sheet_name, header=0)
         df_last_year.columns = df_last_year.columns.str.strip()
         df_last_year = df_last_year.dropna(how='all').reset_index(drop=True)
         df_last_year = handle_duplicate_columns(df_last_year)
@@ -311,7 +312,7 @@ def get_sheet_preview():
             return jsonify({'error': 'Missing filepath or sheet_name'}), 400
         
         # Read Excel sheet
-        df = pd.read_excel(filepath, sheet_name=sheet_name, header=0)
+        df = read_excel_cached(filepath, sheet_name=sheet_name, header=0)
         df = handle_duplicate_columns(df)
         
         # Clean basic formatting
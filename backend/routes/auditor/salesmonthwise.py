@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify, send_file, current_app, session
 import pandas as pd
+from utils.excel_cache import read_excel_cached, get_sheet_names_cached
+from utils.auditor.table_locator import MT_TABLE_HEADERS, VALUE_TABLE_HEADERS, find_header_rows
 import numpy as np
 import re
 from io import BytesIO
@@ -102,15 +104,14 @@ def build_custom_headers(table_type):
     
     return headers
 
-def extract_tables(df_sheet, possible_headers):
+def extract_tables(df_sheet, possible_headers, header_rows=None):
     """Extract table positions based on possible headers"""
-    for idx, row in df_sheet.iterrows():
-        row_str = ' '.join(str(cell) for cell in row if pd.notna(cell)).strip()
-        for header in possible_headers:
-            if re.search(re.escape(header), row_str, re.IGNORECASE):
-                data_start = idx + 1
-                return idx, data_start
-    return None, None
+    if header_rows is None:
+        header_rows = find_header_rows(df_sheet, {'table': possible_headers})['table']
+    if not header_rows:
+        return None, None
+    idx = df_sheet.index[header_rows[0]]
+    return idx, idx + 1
 
 def rename_columns(columns):
     """Rename columns to handle duplicates and nan values"""
@@ -145,33 +146,24 @@ def process_sales_analysis_core(filepath, sheet_name):
     custom_headers_mt = build_custom_headers('MT')
     custom_headers_value = build_custom_headers('Value')
     
-    xls = pd.ExcelFile(filepath)
+    sheet_names = get_sheet_names_cached(filepath)
     
     # Find sales analysis sheet
     sales_analysis_sheet = None
-    for sheet in xls.sheet_names:
+    for sheet in sheet_names:
         if re.search(r'sales\s*analysis\s*month\s*wise', sheet.lower(), re.IGNORECASE):
             sales_analysis_sheet = sheet
             break
     
     if not sales_analysis_sheet:
-        raise ValueError(f'No Sales Analysis Month Wise sheet found. Available sheets: {xls.sheet_names}')
+        raise ValueError(f'No Sales Analysis Month Wise sheet found. Available sheets: {sheet_names}')
     
-    df_sheet = pd.read_excel(xls, sheet_name=sales_analysis_sheet, header=None, dtype=str)
+    df_sheet = read_excel_cached(filepath, sheet_name=sales_analysis_sheet, header=None, dtype=str)
     
-    # Define possible headers
-    table1_possible_headers = [
-        "SALES in MT", "SALES IN MT", "Sales in MT", "SALES IN TONNAGE", "SALES IN TON",
-        "Tonnage", "TONNAGE", "Tonnage Sales", "Sales Tonnage", "Metric Tons", "MT Sales"
-    ]
-    table2_possible_headers = [
-        "SALES in Value", "SALES IN VALUE", "Sales in Value", "SALES IN RS", "VALUE SALES",
-        "Value", "VALUE", "Sales Value"
-    ]
-    
-    # Extract table positions
-    idx1, data_start1 = extract_tables(df_sheet, table1_possible_headers)
-    idx2, data_start2 = extract_tables(df_sheet, table2_possible_headers)
+    # Locate both tables in one pass over the sheet
+    header_rows = find_header_rows(df_sheet, {'mt': MT_TABLE_HEADERS, 'value': VALUE_TABLE_HEADERS})
+    idx1, data_start1 = extract_tables(df_sheet, MT_TABLE_HEADERS, header_rows['mt'])
+    idx2, data_start2 = extract_tables(df_sheet, VALUE_TABLE_HEADERS, header_rows['value'])
     
     if idx1 is None:
         raise ValueError('Could not locate SALES in MT table header')
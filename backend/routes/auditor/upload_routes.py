@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
-import pandas as pd
 import os
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from utils.excel_cache import get_sheet_names_cached, invalidate_file, write_sidecars
 
 # Create the blueprint - this line is CRITICAL
 upload_bp = Blueprint('upload', __name__)
@@ -41,9 +41,12 @@ def upload_file():
             
             # Read Excel file and get sheet names
             try:
-                xl_file = pd.ExcelFile(filepath)
-                sheet_names = xl_file.sheet_names
-                xl_file.close()
+                sheet_names = get_sheet_names_cached(filepath)
+                try:
+                    # Convert every sheet once so later calculations skip the openpyxl parse
+                    write_sidecars(filepath)
+                except Exception as e:
+                    print(f"⚠️ Could not write columnar sidecars for {filename}: {e}")
                 
                 return jsonify({
                     'success': True,
@@ -56,6 +59,7 @@ def upload_file():
             except Exception as e:
                 # Clean up the uploaded file if Excel reading fails
                 if os.path.exists(filepath):
+                    invalidate_file(filepath)
                     os.remove(filepath)
                 return jsonify({'error': f'Error reading Excel file: {str(e)}'}), 400
         
@@ -75,6 +79,7 @@ def delete_file():
             return jsonify({'error': 'No filepath provided'}), 400
         
         if os.path.exists(filepath):
+            invalidate_file(filepath)
             os.remove(filepath)
             return jsonify({'success': True, 'message': 'File deleted successfully'})
         else:
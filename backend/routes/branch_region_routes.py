@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models.schema import db, Branch, Region, Executive, BranchExecutiveMap, RegionBranchMap
+from services.mapping_snapshot import bump_mapping_version
 
 branch_region_bp = Blueprint("branch_region_bp", __name__)
 
@@ -18,6 +19,7 @@ def create_branch():
     if Branch.query.filter_by(name=name).first():
         return jsonify({"error": "Branch already exists"}), 400
     db.session.add(Branch(name=name))
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "Branch created"}), 201
 
@@ -29,6 +31,7 @@ def delete_branch(name):
     BranchExecutiveMap.query.filter_by(branch_id=branch.id).delete()
     RegionBranchMap.query.filter_by(branch_id=branch.id).delete()
     db.session.delete(branch)
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "Branch deleted"}), 200
 
@@ -57,6 +60,7 @@ def create_region():
     if Region.query.filter_by(name=name).first():
         return jsonify({"error": "Region already exists"}), 400
     db.session.add(Region(name=name))
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "Region created"}), 201
 
@@ -67,6 +71,7 @@ def delete_region(name):
         return jsonify({"error": "Region not found"}), 404
     RegionBranchMap.query.filter_by(region_id=region.id).delete()
     db.session.delete(region)
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "Region deleted"}), 200
 
@@ -94,11 +99,14 @@ def map_branch_executives():
 
     BranchExecutiveMap.query.filter_by(branch_id=branch.id).delete()
 
+    mapped_ids = set()  # a branch/executive pair may only be mapped once
     for name in exec_names:
         exec_obj = Executive.query.filter_by(name=name).first()
-        if exec_obj:
+        if exec_obj and exec_obj.id not in mapped_ids:
             db.session.add(BranchExecutiveMap(branch_id=branch.id, executive_id=exec_obj.id))
+            mapped_ids.add(exec_obj.id)
 
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "Mapping updated"}), 200
 
@@ -114,11 +122,14 @@ def map_region_branches():
 
     RegionBranchMap.query.filter_by(region_id=region.id).delete()
 
+    mapped_ids = set()  # a region/branch pair may only be mapped once
     for bname in branch_names:
         branch = Branch.query.filter_by(name=bname).first()
-        if branch:
+        if branch and branch.id not in mapped_ids:
             db.session.add(RegionBranchMap(region_id=region.id, branch_id=branch.id))
+            mapped_ids.add(branch.id)
 
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "Mapping updated"}), 200
 
@@ -207,6 +218,7 @@ def upload_branch_region_file():
         if region_obj and not RegionBranchMap.query.filter_by(branch_id=branch_obj.id, region_id=region_obj.id).first():
             db.session.add(RegionBranchMap(branch_id=branch_obj.id, region_id=region_obj.id))
 
+    bump_mapping_version()
     db.session.commit()
     return jsonify({"message": "File processed successfully."})
 
@@ -7,9 +7,14 @@ import json
 from werkzeug.utils import secure_filename
 from utils.budget_vs_billed import calculate_budget_vs_billed, auto_map_budget_columns
 from utils.ppt_generator import generate_budget_ppt, create_od_ppt_updated,create_product_growth_ppt,create_nbc_individual_ppt,create_od_individual_ppt,create_consolidated_ppt
-from utils.od_target import auto_map_od_columns,calculate_od_values_updated,create_region_branch_mapping,create_dynamic_regional_summary,get_cumulative_branches,get_cumulative_regions
-from utils.product_growth import calculate_product_growth,auto_map_product_growth_columns,standardize_name
+from utils.od_target import auto_map_od_columns,calculate_od_values_updated,calculate_od_values_batch,create_region_branch_mapping,create_dynamic_regional_summary,get_cumulative_branches,get_cumulative_regions
+from utils.product_growth import calculate_product_growth,auto_map_product_growth_columns
+from utils.group_names import standardize_names
 from utils.nbc_od_utils import auto_map_nbc_columns,auto_map_od_target_columns,create_customer_table,filter_os_qty,nbc_branch_mapping
+from utils.excel_cache import read_excel_cached, get_sheet_names_cached, invalidate_file, write_sidecars
+from utils.month_keys import parse_dates, month_keys, unique_month_labels
+from utils.artifact_store import deck_artifact_key, send_cached_artifact, store_artifact
+from utils.branch_names import area_names, branch_alias_names, executive_names
 
 branch_bp = Blueprint('branch', __name__)
 logger = logging.getLogger(__name__)
@@ -17,6 +22,9 @@ UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs("static", exist_ok=True)
 
+# Bump when the layout of the branch decks changes, so stored decks are rebuilt
+PPT_ARTIFACT_VERSION = 1
+
 
 @branch_bp.route('/upload', methods=['POST'])
 def upload_file():
@@ -25,7 +33,12 @@ def upload_file():
         return jsonify({'error': 'No file uploaded'}), 400
     filename = secure_filename(file.filename)
     path = os.path.join(UPLOAD_FOLDER, filename)
+    invalidate_file(path)
     file.save(path)
+    try:
+        write_sidecars(path)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not write columnar sidecars for {filename}: {e}")
     return jsonify({'message': 'File uploaded successfully', 'filename': filename})
 
 @branch_bp.route('/sheets', methods=['POST'])
@@ -33,8 +46,7 @@ def get_sheet_names():
     file = request.json.get('filename')
     path = os.path.join(UPLOAD_FOLDER, file)
     try:
-        xl = pd.ExcelFile(path)
-        return jsonify({'sheets': xl.sheet_names})
+        return jsonify({'sheets': get_sheet_names_cached(path)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
@@ -46,7 +58,7 @@ def get_columns_and_auto_map():
     sheet_name = data['sheet_name']
 
     try:
-        df = pd.read_excel(path, sheet_name=sheet_name, header=header_row)
+        df = read_excel_cached(path, sheet_name=sheet_name, header=header_row)
         columns = df.columns.tolist()
         return jsonify({'columns': columns})
     except Exception as e:
@@ -75,21 +87,19 @@ def get_exec_branch_options():
         sales_path = os.path.join('uploads', data['sales_filename'])
         budget_path = os.path.join('uploads', data['budget_filename'])
 
-        sales_df = pd.read_excel(sales_path, sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
-        budget_df = pd.read_excel(budget_path, sheet_name=data['budget_sheet'], header=data['budget_header'] - 1)
+        sales_df = read_excel_cached(sales_path, sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
+        budget_df = read_excel_cached(budget_path, sheet_name=data['budget_sheet'], header=data['budget_header'] - 1)
 
         exec_sales_col = data['sales_exec_col']
         exec_budget_col = data['budget_exec_col']
         area_sales_col = data['sales_area_col']
         area_budget_col = data['budget_area_col']
 
-        from utils.budget_vs_billed import map_branch
-
         sales_execs = sorted(sales_df[exec_sales_col].dropna().unique().tolist())
         budget_execs = sorted(budget_df[exec_budget_col].dropna().unique().tolist())
 
         combined = pd.concat([sales_df[area_sales_col], budget_df[area_budget_col]], ignore_index=True).dropna()
-        branches = sorted(set(map(map_branch, combined)))
+        branches = sorted(set(branch_alias_names(combined)))
 
         
 
@@ -107,10 +117,10 @@ def extract_months():
     try:
         data = request.json
         sales_path = os.path.join('uploads', data['sales_filename'])
-        df = pd.read_excel(sales_path, sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
+        df = read_excel_cached(sales_path, sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
         date_col = data['sales_date_col']
 
-        months = pd.to_datetime(df[date_col], dayfirst=True, errors='coerce').dt.strftime('%b %y').dropna().unique().tolist()
+        months = unique_month_labels(month_keys(parse_dates(df[date_col])))
         return jsonify({'months': months})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -130,6 +140,11 @@ def budget_vs_billed():
 def generate_consolidated_branch_ppt():
     try:
         data = request.get_json()
+        artifact = deck_artifact_key('consolidated_branch_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         report_title = data.get('reportTitle', 'ACCLLP Consolidated Report')
         all_dfs_info = data.get('allDfsInfo', [])
         
@@ -149,11 +164,13 @@ def generate_consolidated_branch_ppt():
 
         # Optional logo - for now, ignore unless you want to add a file upload
         ppt_stream = create_consolidated_ppt(parsed_sections, logo_file=None, title=report_title)
+        filename = f"{report_title.replace(' ', '_')}.pptx"
+        store_artifact(artifact, ppt_stream, filename)
 
         return send_file(
             ppt_stream,
             as_attachment=True,
-            download_name=f"{report_title.replace(' ', '_')}.pptx",
+            download_name=filename,
             mimetype='application/vnd.openxmlformats-officedocument.presentationml.presentation'
         )
 
@@ -165,8 +182,16 @@ def download_ppt():
     try:
         payload = request.get_json()
         print("📦 PPT Payload Keys:", list(payload.keys()))
+        artifact = deck_artifact_key('budget_ppt', payload, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         ppt_path = generate_budget_ppt(payload)
-        return send_file(ppt_path, as_attachment=True)
+        # The deck moves into the artifact store instead of piling up in static/
+        filename = os.path.basename(ppt_path)
+        stored_path = store_artifact(artifact, ppt_path, filename, move=True)
+        return send_file(os.path.abspath(stored_path or ppt_path), as_attachment=True, download_name=filename)
     except Exception as e:
         print("❌ PPT generation failed:", str(e))
         return jsonify({'error': str(e)}), 500
@@ -192,9 +217,9 @@ def get_od_columns():
 def get_od_filter_options():
     data = request.get_json()
     try:
-        os_prev = pd.read_excel(f"uploads/{data['os_prev_filename']}", sheet_name=data['os_prev_sheet'], header=data['os_prev_header'] - 1)
-        os_curr = pd.read_excel(f"uploads/{data['os_curr_filename']}", sheet_name=data['os_curr_sheet'], header=data['os_curr_header'] - 1)
-        sales = pd.read_excel(f"uploads/{data['sales_filename']}", sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
+        os_prev = read_excel_cached(f"uploads/{data['os_prev_filename']}", sheet_name=data['os_prev_sheet'], header=data['os_prev_header'] - 1)
+        os_curr = read_excel_cached(f"uploads/{data['os_curr_filename']}", sheet_name=data['os_curr_sheet'], header=data['os_curr_header'] - 1)
+        sales = read_excel_cached(f"uploads/{data['sales_filename']}", sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
 
         # Pull mapped column names
         os_prev_exec = data['os_prev_mapping'].get('executive')
@@ -254,9 +279,40 @@ def calculate_od_target():
         print("📄 Filenames:", data['os_prev_filename'], data['sales_filename'])
 
         # Load the 3 Excel files
-        os_prev = pd.read_excel(f"uploads/{data['os_prev_filename']}", sheet_name=data['os_prev_sheet'], header=data['os_prev_header'] - 1)
-        os_curr = pd.read_excel(f"uploads/{data['os_curr_filename']}", sheet_name=data['os_curr_sheet'], header=data['os_curr_header'] - 1)
-        sales = pd.read_excel(f"uploads/{data['sales_filename']}", sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
+        os_prev = read_excel_cached(f"uploads/{data['os_prev_filename']}", sheet_name=data['os_prev_sheet'], header=data['os_prev_header'] - 1)
+        os_curr = read_excel_cached(f"uploads/{data['os_curr_filename']}", sheet_name=data['os_curr_sheet'], header=data['os_curr_header'] - 1)
+        sales = read_excel_cached(f"uploads/{data['sales_filename']}", sheet_name=data['sales_sheet'], header=data['sales_header'] - 1)
+
+        # === Several month/executive/branch/region selections (e.g. a PPT run) in one pass ===
+        if data.get('selections'):
+            results = calculate_od_values_batch(
+                os_prev, os_curr, sales,
+                data['os_prev_mapping']['due_date'],
+                data['os_prev_mapping']['ref_date'],
+                data['os_prev_mapping']['branch'],
+                data['os_prev_mapping']['net_value'],
+                data['os_prev_mapping']['executive'],
+                data['os_prev_mapping'].get('region'),
+                data['os_curr_mapping']['due_date'],
+                data['os_curr_mapping']['ref_date'],
+                data['os_curr_mapping']['branch'],
+                data['os_curr_mapping']['net_value'],
+                data['os_curr_mapping']['executive'],
+                data['os_curr_mapping'].get('region'),
+                data['sales_mapping']['bill_date'],
+                data['sales_mapping']['due_date'],
+                data['sales_mapping']['branch'],
+                data['sales_mapping']['value'],
+                data['sales_mapping']['executive'],
+                data['sales_mapping'].get('region'),
+                data['selections']
+            )
+            return jsonify({"results": [{
+                "branch_summary": final.to_dict(orient='records') if final is not None else [],
+                "regional_summary": regional.to_dict(orient='records') if regional is not None else [],
+                "region_mapping": region_map,
+                "error": error
+            } for final, regional, region_map, error in results]})
 
         # === Apply filters and calculate final output ===
         final, regional, region_map = calculate_od_values_updated(
@@ -377,13 +433,13 @@ def get_product_growth_filters():
         budget_group_col = data["budget_group_col"]
 
         # Load DataFrames
-        ly_df = pd.read_excel(f"uploads/{ly_filename}", sheet_name=ly_sheet, header=ly_header)
-        cy_df = pd.read_excel(f"uploads/{cy_filename}", sheet_name=cy_sheet, header=cy_header)
-        budget_df = pd.read_excel(f"uploads/{budget_filename}", sheet_name=budget_sheet, header=budget_header)
+        ly_df = read_excel_cached(f"uploads/{ly_filename}", sheet_name=ly_sheet, header=ly_header)
+        cy_df = read_excel_cached(f"uploads/{cy_filename}", sheet_name=cy_sheet, header=cy_header)
+        budget_df = read_excel_cached(f"uploads/{budget_filename}", sheet_name=budget_sheet, header=budget_header)
 
         # ✅ Extract unique months from LY and CY
-        ly_months = pd.to_datetime(ly_df[ly_date_col], dayfirst=True, errors="coerce").dt.strftime("%b %y").dropna().unique().tolist()
-        cy_months = pd.to_datetime(cy_df[cy_date_col], dayfirst=True, errors="coerce").dt.strftime("%b %y").dropna().unique().tolist()
+        ly_months = unique_month_labels(month_keys(parse_dates(ly_df[ly_date_col])))
+        cy_months = unique_month_labels(month_keys(parse_dates(cy_df[cy_date_col])))
 
         # ✅ Get unique executives
         executives = pd.concat([
@@ -397,7 +453,7 @@ def get_product_growth_filters():
             ly_df[ly_group_col].dropna(),
             cy_df[cy_group_col].dropna(),
             budget_df[budget_group_col].dropna()
-        ]).dropna().astype(str).map(standardize_name)
+        ]).dropna().astype(str).pipe(standardize_names)
 
         company_groups = sorted(set(all_groups))
 
@@ -417,9 +473,9 @@ def calculate_product_growth_api():
         data = request.get_json()
 
         # === Load Excel files directly from 'uploads/' ===
-        ly_df = pd.read_excel(f"uploads/{data['ly_filename']}", sheet_name=data['ly_sheet'], header=data['ly_header'] - 1)
-        cy_df = pd.read_excel(f"uploads/{data['cy_filename']}", sheet_name=data['cy_sheet'], header=data['cy_header'] - 1)
-        budget_df = pd.read_excel(f"uploads/{data['budget_filename']}", sheet_name=data['budget_sheet'], header=data['budget_header'] - 1)
+        ly_df = read_excel_cached(f"uploads/{data['ly_filename']}", sheet_name=data['ly_sheet'], header=data['ly_header'] - 1)
+        cy_df = read_excel_cached(f"uploads/{data['cy_filename']}", sheet_name=data['cy_sheet'], header=data['cy_header'] - 1)
+        budget_df = read_excel_cached(f"uploads/{data['budget_filename']}", sheet_name=data['budget_sheet'], header=data['budget_header'] - 1)
 
         result = calculate_product_growth(
             ly_df, cy_df, budget_df,
@@ -513,7 +569,7 @@ def get_nbc_columns():
         sheet_name = data['sheet_name']
         header = data['header'] - 1
 
-        df = pd.read_excel(f"uploads/{filename}", sheet_name=sheet_name, header=header)
+        df = read_excel_cached(f"uploads/{filename}", sheet_name=sheet_name, header=header)
         columns = df.columns.tolist()
         mapped = auto_map_nbc_columns(columns)
 
@@ -535,7 +591,7 @@ def get_nbc_filters():
         branch_col = data["branch_col"]
         executive_col = data["executive_col"]
 
-        df = pd.read_excel(f"uploads/{filename}", sheet_name=sheet_name, header=header_row)
+        df = read_excel_cached(f"uploads/{filename}", sheet_name=sheet_name, header=header_row)
 
         # Clean column names
         df.columns = [str(col).strip() for col in df.columns]
@@ -582,7 +638,7 @@ def calculate_nbc_table():
         selected_branches = data.get("selected_branches", [])
         selected_executives = data.get("selected_executives", [])
 
-        df = pd.read_excel(f"uploads/{filename}", sheet_name=sheet_name, header=header)
+        df = read_excel_cached(f"uploads/{filename}", sheet_name=sheet_name, header=header)
 
         results = create_customer_table(
             df, date_col, branch_col, customer_id_col, executive_col,
@@ -652,7 +708,7 @@ def get_column_unique_values():
         header = data["header"] - 1
         column_names = data.get("column_names", [])
 
-        df = pd.read_excel(f"uploads/{filename}", sheet_name=sheet_name, header=header)
+        df = read_excel_cached(f"uploads/{filename}", sheet_name=sheet_name, header=header)
 
         response = {}
 
@@ -669,12 +725,10 @@ def get_column_unique_values():
                 valid_years = sorted(col_data.dt.year.dropna().astype(int).unique())
                 response[col] = {"years": [str(y) for y in valid_years]}
             elif "area" in lower_col or "branch" in lower_col:
-                from utils.nbc_od_utils import extract_area_name
-                cleaned = sorted(set(filter(None, col_data.map(extract_area_name))))
+                cleaned = sorted(set(filter(None, area_names(col_data))))
                 response[col] = {"values": cleaned}
             elif "executive" in lower_col:
-                from utils.nbc_od_utils import extract_executive_name
-                cleaned = sorted(set(filter(None, col_data.map(extract_executive_name))))
+                cleaned = sorted(set(filter(None, executive_names(col_data))))
                 response[col] = {"values": cleaned}
             else:
                 cleaned = sorted(set(col_data.astype(str).str.strip().unique()))
@@ -704,7 +758,7 @@ def calculate_od_target_table():
         selected_years = data.get("selected_years", [])
         till_month = data.get("till_month")
 
-        df = pd.read_excel(f"uploads/{filename}", sheet_name=sheet_name, header=header)
+        df = read_excel_cached(f"uploads/{filename}", sheet_name=sheet_name, header=header)
 
         result_df, start_date, end_date = filter_os_qty(
             df,
@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 import pandas as pd
 from io import BytesIO
 from services.mapping_service import process_budget_file
+from services.file_store import store_file, list_stored_files, send_stored_file, delete_stored_file, file_source
 import base64
 
 budget_bp = Blueprint("budget", __name__)
@@ -63,8 +64,7 @@ def save_budget_file():
     from extensions import db
 
     binary_data = b64decode(base64_excel)
-    budget_file = BudgetFile(filename=filename, file_data=binary_data)
-    db.session.add(budget_file)
+    budget_file = store_file(BudgetFile, filename, binary_data)
     db.session.commit()
 
     return jsonify({"message": "File saved", "id": budget_file.id})
@@ -72,24 +72,17 @@ def save_budget_file():
 @budget_bp.route("/budget-files", methods=["GET"])
 def list_budget_files():
     from models.schema import BudgetFile
-    files = BudgetFile.query.order_by(BudgetFile.uploaded_at.desc()).all()
-    return jsonify([
-        {"id": f.id, "filename": f.filename, "uploaded_at": f.uploaded_at.isoformat()}
-        for f in files
-    ])
+    return jsonify(list_stored_files(BudgetFile))
     
 @budget_bp.route("/budget-files/<int:file_id>/download", methods=["GET"])
 def download_budget_file(file_id):
     from models.schema import BudgetFile
-    import io
     file = BudgetFile.query.get_or_404(file_id)
 
-    return send_file(
-        io.BytesIO(file.file_data),
-        download_name=file.filename,
-        as_attachment=True,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    try:
+        return send_stored_file(file)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
 
 @budget_bp.route("/budget-files/<int:file_id>", methods=["DELETE"])
 def delete_budget_file(file_id):
@@ -98,22 +91,22 @@ def delete_budget_file(file_id):
     if not os_file:
         return jsonify({"error": "File not found"}), 404
 
-    from extensions import db
-    db.session.delete(os_file)
-    db.session.commit()
+    delete_stored_file(os_file)
 
     return jsonify({"message": "File deleted"})
 
 @budget_bp.route("/budget-files/<int:file_id>/data", methods=["GET"])
 def get_budget_file_data(file_id):
     from models.schema import BudgetFile
-    from utils.file_utils import read_excel_from_binary  # Make sure this utility exists
+    from utils.excel_cache import read_excel_cached
     file = BudgetFile.query.get(file_id)
     if not file:
         return jsonify({"error": "Budget file not found"}), 404
 
     try:
-        df = read_excel_from_binary(file.file_data)
+        df = read_excel_cached(file_source(file))
         return jsonify(df.head(100).to_dict(orient="records"))
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": f"Failed to read Excel: {str(e)}"}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from models.schema import *
 from extensions import db
+from services.mapping_snapshot import bump_mapping_version
+from services.mapping_service import upsert_customer_assignments
 
 bulk_bp = Blueprint("bulk", __name__)
 
@@ -17,7 +18,7 @@ def bulk_assign_customers():
         if not exec_name_col or not cust_code_col:
             return jsonify({"error": "Missing required column mappings"}), 400
 
-        exec_map = {}
+        assignments = []
         for row in data:
             exec_name = str(row.get(exec_name_col, "")).strip()
             exec_code = str(row.get(exec_code_col, "")).strip() if exec_code_col else None
@@ -26,30 +27,19 @@ def bulk_assign_customers():
 
             if not exec_name or not cust_code:
                 continue
+            assignments.append((exec_name, exec_code, cust_code, cust_name))
 
-            # Find or create executive
-            if exec_name not in exec_map:
-                exec_obj = Executive.query.filter_by(name=exec_name).first()
-                if not exec_obj:
-                    exec_obj = Executive(name=exec_name, code=exec_code)
-                    db.session.add(exec_obj)
-                    db.session.flush()
-                exec_map[exec_name] = exec_obj
-            else:
-                exec_obj = exec_map[exec_name]
-
-            # Create or update customer
-            cust = Customer.query.filter_by(code=cust_code).first()
-            if not cust:
-                cust = Customer(code=cust_code, name=cust_name or "", executive_id=exec_obj.id)
-                db.session.add(cust)
-            else:
-                cust.executive_id = exec_obj.id
-                if cust_name:
-                    cust.name = cust_name
+        # Executives and customers are looked up per chunk, not per row
+        created, updated = upsert_customer_assignments(assignments)
 
+        bump_mapping_version()
         db.session.commit()
-        return jsonify({"message": "Bulk customer assignment completed."})
+        return jsonify({
+            "message": "Bulk customer assignment completed.",
+            "created": created,
+            "updated": updated
+        })
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
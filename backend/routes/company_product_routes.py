@@ -67,6 +67,7 @@ def delete_product(name):
     # Remove all mappings first
     db.session.query(svc.CompanyProductMap).filter_by(product_id=product.id).delete()
     db.session.delete(product)
+    svc.bump_mapping_version()
     db.session.commit()
     return jsonify({"success": True})
 
@@ -78,6 +79,7 @@ def delete_company(name):
 
     db.session.query(svc.CompanyProductMap).filter_by(company_id=company.id).delete()
     db.session.delete(company)
+    svc.bump_mapping_version()
     db.session.commit()
     return jsonify({"success": True})
 
@@ -8,6 +8,9 @@ from werkzeug.utils import secure_filename
 import mysql.connector
 from datetime import datetime
 import uuid
+import json
+from utils.blob_store import put_blob, blob_path, has_blob
+from services.file_store import workbook_sheets
 
 cumulative_bp = Blueprint('cumulative', __name__)
 
@@ -34,6 +37,15 @@ UPLOAD_FOLDER = "uploads"
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+# Monthly workbooks live in the blob store; monthly_files rows keep the sha256,
+# size and sheet list. file_data is only set on rows stored before the move.
+MONTHLY_BLOB_NAMESPACE = "monthly_files"
+BLOB_COLUMNS = {
+    "sha256": "VARCHAR(64) NULL",
+    "size": "BIGINT NULL",
+    "sheets": "JSON NULL",
+}
+
 def get_db_connection():
     print("🔌 Attempting DB connection")
     try:
@@ -73,8 +85,11 @@ def init_db():
             month VARCHAR(20) NOT NULL,
             filename VARCHAR(255) NOT NULL,
             upload_date DATETIME NOT NULL,
-            file_data LONGBLOB NOT NULL,
-            skip_first_row BOOLEAN NOT NULL
+            file_data LONGBLOB NULL,
+            skip_first_row BOOLEAN NOT NULL,
+            sha256 VARCHAR(64) NULL,
+            size BIGINT NULL,
+            sheets JSON NULL
         )
         """)
         cursor.execute("CREATE INDEX idx_month ON monthly_files(month)")
@@ -94,6 +109,19 @@ def init_db():
             conn.close()
 print("2")
 
+def ensure_blob_columns(conn, cursor):
+    """Upgrade a monthly_files table from before the blob store"""
+    cursor.execute("SHOW COLUMNS FROM monthly_files")
+    columns = {row[0]: row for row in cursor.fetchall()}
+    for name, definition in BLOB_COLUMNS.items():
+        if name not in columns:
+            cursor.execute(f"ALTER TABLE monthly_files ADD COLUMN {name} {definition}")
+            logger.info(f"Added monthly_files.{name}")
+    if columns["file_data"][2] == "NO":
+        cursor.execute("ALTER TABLE monthly_files MODIFY file_data LONGBLOB NULL")
+        logger.info("Made monthly_files.file_data nullable")
+    conn.commit()
+
 def check_db_tables():
     print("🔍 check_db_tables() called")
     conn = get_db_connection()
@@ -110,6 +138,7 @@ def check_db_tables():
             print("📁 Table doesn't exist, calling init_db()")
             return init_db()
         print("✅ Table exists")
+        ensure_blob_columns(conn, cursor)
         return True
     except mysql.connector.Error as err:
         logger.error(f"Table check error: {err}")
@@ -147,6 +176,7 @@ def read_excel_file(file_path, month, filename, skip_first_row=False):
         return None
 print("5")
 def store_file_in_db(month, filename, file_data, skip_first_row):
+    """Store a monthly workbook (bytes or a path) in the blob store and record it"""
     conn = get_db_connection()
     if not conn:
         return None
@@ -156,24 +186,50 @@ def store_file_in_db(month, filename, file_data, skip_first_row):
         file_id = str(uuid.uuid4())
         upload_date = datetime.now()
         
-        if isinstance(file_data, str):
+        if isinstance(file_data, str) and not os.path.exists(file_data):
             file_data = file_data.encode('utf-8')
+
+        digest, size = put_blob(file_data, namespace=MONTHLY_BLOB_NAMESPACE)
+        sheets = workbook_sheets(blob_path(digest, MONTHLY_BLOB_NAMESPACE))
             
         cursor.execute(
-            "INSERT INTO monthly_files (id, month, filename, upload_date, file_data, skip_first_row) "
-            "VALUES (%s, %s, %s, %s, %s, %s)",
-            (file_id, month, filename, upload_date, file_data, skip_first_row)
+            "INSERT INTO monthly_files (id, month, filename, upload_date, file_data, skip_first_row, sha256, size, sheets) "
+            "VALUES (%s, %s, %s, %s, NULL, %s, %s, %s, %s)",
+            (file_id, month, filename, upload_date, skip_first_row, digest, size,
+             json.dumps(sheets) if sheets is not None else None)
         )
         
         conn.commit()
         return file_id
-    except mysql.connector.Error as err:
+    except (mysql.connector.Error, OSError) as err:
         logger.error(f"Error storing file in DB: {err}")
         return None
     finally:
         if conn.is_connected():
             cursor.close()
             conn.close()
+
+def monthly_file_path(conn, file):
+    """
+    (path, is_temporary) of a stored monthly file. Blob store files are read
+    in place; bytes of rows from before the blob store are fetched on their
+    own and written to UPLOAD_FOLDER.
+    """
+    if has_blob(file.get('sha256'), MONTHLY_BLOB_NAMESPACE):
+        return blob_path(file['sha256'], MONTHLY_BLOB_NAMESPACE), False
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT file_data FROM monthly_files WHERE id = %s", (file['id'],))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row or row[0] is None:
+        raise FileNotFoundError(f"No stored content for {file['filename']}")
+    file_path = os.path.join(UPLOAD_FOLDER, file['filename'])
+    with open(file_path, 'wb') as f:
+        f.write(row[0])
+    return file_path, True
 print(6)
 @cumulative_bp.route("/api/files", methods=["GET"])
 def get_available_files():
@@ -244,10 +300,7 @@ def process_files():
                         file_path = os.path.join(UPLOAD_FOLDER, filename)
                         file.save(file_path)
                         
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                        
-                        file_id = store_file_in_db(month, filename, file_data, skip_first_row)
+                        file_id = store_file_in_db(month, filename, file_path, skip_first_row)
                         if not file_id:
                             errors.append(f"Failed to store {month} file in database")
                             continue
@@ -277,7 +330,7 @@ def process_files():
                 cursor = conn.cursor(dictionary=True)
                 placeholders = ', '.join(['%s'] * len(selected_months))
                 query = f"""
-                    SELECT m1.id, m1.month, m1.filename, m1.upload_date, m1.file_data, m1.skip_first_row
+                    SELECT m1.id, m1.month, m1.filename, m1.upload_date, m1.skip_first_row, m1.sha256
                     FROM monthly_files m1
                     JOIN (
                         SELECT month, MAX(upload_date) as latest_date 
@@ -291,9 +344,7 @@ def process_files():
                 
                 for file in db_files:
                     try:
-                        file_path = os.path.join(UPLOAD_FOLDER, file['filename'])
-                        with open(file_path, 'wb') as f:
-                            f.write(file['file_data'])
+                        file_path, is_temporary = monthly_file_path(conn, file)
                         
                         df = read_excel_file(file_path, file['month'], file['filename'], file['skip_first_row'])
                         if df is not None and not df.empty:
@@ -301,7 +352,7 @@ def process_files():
                         else:
                             errors.append(f"Failed to read {file['month']} file")
 
-                        if os.path.exists(file_path):
+                        if is_temporary and os.path.exists(file_path):
                             os.remove(file_path)
                     except Exception as e:
                         errors.append(f"Error processing {file['month']}: {str(e)}")
@@ -374,7 +425,7 @@ def download_file():
                 cursor = conn.cursor(dictionary=True)
                 placeholders = ', '.join(['%s'] * len(selected_months))
                 query = f"""
-                    SELECT m1.id, m1.month, m1.filename, m1.upload_date, m1.file_data, m1.skip_first_row
+                    SELECT m1.id, m1.month, m1.filename, m1.upload_date, m1.skip_first_row, m1.sha256
                     FROM monthly_files m1
                     JOIN (
                         SELECT month, MAX(upload_date) as latest_date 
@@ -388,9 +439,7 @@ def download_file():
                 
                 for file in db_files:
                     try:
-                        file_path = os.path.join(UPLOAD_FOLDER, file['filename'])
-                        with open(file_path, 'wb') as f:
-                            f.write(file['file_data'])
+                        file_path, is_temporary = monthly_file_path(conn, file)
                         
                         df = read_excel_file(file_path, file['month'], file['filename'], file['skip_first_row'])
                         if df is not None and not df.empty:
@@ -398,7 +447,7 @@ def download_file():
                         else:
                             errors.append(f"Failed to read {file['month']} file")
 
-                        if os.path.exists(file_path):
+                        if is_temporary and os.path.exists(file_path):
                             os.remove(file_path)
                     except Exception as e:
                         errors.append(f"Error processing {file['month']}: {str(e)}")
@@ -7,7 +7,6 @@ from pptx.enum.text import PP_ALIGN
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.utils
@@ -25,6 +24,8 @@ import numpy as np
 import pandas as pd
 from werkzeug.utils import secure_filename
 from services.dashboard.data_processing import process_ytd_comparison, create_plotly_chart
+from utils.excel_cache import read_excel_cached, get_sheet_names_cached
+from utils.chart_render import render_charts
 from flask import current_app  # <-- ADD THIS
 # Add these imports at the top with other imports
 from utils.dashboard.helpers import (
@@ -79,18 +80,12 @@ def upload_file():
         if not file.filename.endswith('.xlsx'):
             return jsonify({'error': 'Invalid file format. Please upload an Excel file (.xlsx)'}), 400
 
-        file_buffer = BytesIO(file.read())
+        file_content = file.read()
         
-        try:
-            xls = pd.ExcelFile(file_buffer, engine='openpyxl')
-        except:
-            file_buffer.seek(0)
-            xls = pd.ExcelFile(file_buffer)
-        
-        sheet_names = xls.sheet_names
+        sheet_names = get_sheet_names_cached(file_content)
         
-        file_buffer.seek(0)
-        df_sheet = pd.read_excel(file_buffer, sheet_name=sheet_names[0], header=None, nrows=1000)
+        # Parsed through the shared cache so a follow-up /process-sheet on this sheet is free
+        df_sheet = read_excel_cached(file_content, sheet_name=sheet_names[0], header=None, nrows=1000)
         
         # Determine sheet type for table ending logic
         sheet_name = sheet_names[0].lower()
@@ -101,8 +96,7 @@ def upload_file():
         # Alternative reading method for narrow sheets with long text
         if df_sheet.shape[1] < 10 and df_sheet.iloc[:, 0].astype(str).str.len().max() > 200:
             try:
-                file_buffer.seek(0)
-                df_sheet_alt = pd.read_excel(file_buffer, sheet_name=sheet_names[0], header=None, engine='openpyxl', nrows=1000)
+                df_sheet_alt = read_excel_cached(file_content, sheet_name=sheet_names[0], header=None, engine='openpyxl', nrows=1000)
                 if df_sheet_alt.shape[1] > df_sheet.shape[1]:
                     df_sheet = df_sheet_alt
             except:
@@ -219,20 +213,13 @@ def process_sheet():
 
         # Decode and read Excel file
         file_content = base64.b64decode(file_data)
-        file_buffer = BytesIO(file_content)
+        sheet_names = get_sheet_names_cached(file_content)
         
-        try:
-            xls = pd.ExcelFile(file_buffer, engine='openpyxl')
-        except Exception as e:
-            logging.warning(f"Openpyxl failed, trying default engine: {str(e)}")
-            file_buffer.seek(0)
-            xls = pd.ExcelFile(file_buffer)
-        
-        if sheet_name not in xls.sheet_names:
+        if sheet_name not in sheet_names:
             return jsonify({'error': f'Sheet "{sheet_name}" not found in file'}), 404
 
         # Read sheet data with initial processing
-        df_sheet = pd.read_excel(xls, sheet_name=sheet_name, header=None, nrows=1000)
+        df_sheet = read_excel_cached(file_content, sheet_name=sheet_name, header=None, nrows=1000)
         original_shape = df_sheet.shape
         logging.info(f"Processing sheet: {sheet_name}, initial shape: {original_shape}")
 
@@ -291,7 +278,7 @@ def process_sheet():
                 df_sheet = pd.DataFrame(new_data)
 
         # Determine sheet type
-        sheet_index = xls.sheet_names.index(sheet_name)
+        sheet_index = sheet_names.index(sheet_name)
         is_first_sheet = sheet_index == 0
         is_branch_analysis = 'region wise analysis' in sheet_name.lower()
         is_product_analysis = ('product' in sheet_name.lower() or 
@@ -1656,7 +1643,8 @@ def download_master_ppt():
             subtitle = title_slide.placeholders[1]
             subtitle.text = f"Sheet: {selected_sheet}\nGenerated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
 
-        # Loop through all data items
+        # Loop through all data items; chart images are rendered together after the loop
+        charts = []
         for item in all_data:
             try:
                 label = item['label']
@@ -1699,51 +1687,8 @@ def download_master_ppt():
                         slide_title += f" ({selected_filter})"
                     slide.shapes.title.text = slide_title
 
-                    budget_data = chart_df[chart_df['Metric'] == 'Budget']
-                    actual_data = chart_df[chart_df['Metric'] == 'Actual']
-
-                    plt.figure(figsize=(10, 6))
-
-                    if visual_type == 'line':
-                        months = budget_data[x_col].tolist()
-                        plt.plot(months, budget_data[y_col], marker='o',
-                                 label='Budget', color='#2E86AB')
-                        plt.plot(months, actual_data[y_col], marker='o',
-                                 label='Actual', color='#FF8C00')
-                        plt.legend()
-                        plt.grid(True, linestyle='--', alpha=0.3)
-
-                    elif visual_type == 'pie':
-                        budget_value = budget_data[y_col].sum()
-                        actual_value = actual_data[y_col].sum()
-                        if budget_value > 0 and actual_value > 0:
-                            plt.pie([budget_value, actual_value],
-                                    labels=['Budget', 'Actual'],
-                                    autopct='%1.1f%%',
-                                    startangle=90,
-                                    colors=['#2E86AB', '#FF8C00'])
-                            plt.axis('equal')
-
-                    else:  # Default bar
-                        bar_width = 0.35
-                        months = budget_data[x_col].tolist()
-                        x_pos = np.arange(len(months))
-                        plt.bar(x_pos - bar_width/2, budget_data[y_col], bar_width,
-                                label='Budget', color='#2E86AB')
-                        plt.bar(x_pos + bar_width/2, actual_data[y_col], bar_width,
-                                label='Actual', color='#FF8C00')
-                        plt.xticks(x_pos, months, rotation=45, ha='right')
-                        plt.legend()
-                        plt.grid(True, linestyle='--', alpha=0.3)
-
-                    plt.title(slide_title)
-                    plt.tight_layout()
-                    img_buffer = BytesIO()
-                    plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-                    img_buffer.seek(0)
-                    plt.close()
-
-                    slide.shapes.add_picture(img_buffer, Inches(1), Inches(1.5), width=Inches(8))
+                    charts.append((slide, label, data_processing.budget_vs_actual_job(
+                        chart_df, x_col, y_col, visual_type, slide_title)))
                     continue  # done with this slide
 
                 # Ensure numeric data for other charts
@@ -1774,44 +1719,21 @@ def download_master_ppt():
                     slide_title += f" ({selected_filter})"
                 slide.shapes.title.text = slide_title
 
-                plt.figure(figsize=(10, 6))
-
-                if visual_type == 'pie':
-                    plt.pie(chart_df[y_col], labels=chart_df[x_col],
-                            autopct='%1.1f%%', startangle=90,
-                            colors=sns.color_palette('Set2'))
-                    plt.axis('equal')
-
-                elif visual_type == 'bar':
-                    if 'Metric' in chart_df.columns:
-                        pivot_df = chart_df.pivot(index=x_col, columns='Metric', values=y_col)
-                        pivot_df.plot(kind='bar', ax=plt.gca(), color=['#2E86AB', '#FF8C00'])
-                    else:
-                        plt.bar(chart_df[x_col], chart_df[y_col], color='#2E86AB')
-                    plt.xticks(rotation=45, ha='right')
-
-                elif visual_type == 'line':
-                    if 'Metric' in chart_df.columns:
-                        for name, group in chart_df.groupby('Metric'):
-                            plt.plot(group[x_col], group[y_col], marker='o', label=name,
-                                     color='#FF8C00' if 'Actual' in str(name) else '#2E86AB')
-                        plt.legend()
-                    else:
-                        plt.plot(chart_df[x_col], chart_df[y_col], marker='o', color='#2E86AB')
-                    plt.xticks(rotation=45, ha='right')
-
-                plt.title(slide_title)
-                plt.tight_layout()
-                img_buffer = BytesIO()
-                plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-                img_buffer.seek(0)
-                plt.close()
-                slide.shapes.add_picture(img_buffer, Inches(1), Inches(1.5), width=Inches(8))
+                charts.append((slide, label, data_processing.master_chart_job(
+                    chart_df, x_col, y_col, visual_type, slide_title)))
 
             except Exception as e:
                 current_app.logger.error(f"Error creating chart for {label}: {str(e)}", exc_info=True)
                 continue
 
+        # Render all charts at once (cached / in parallel) and place them on their slides
+        pngs = render_charts([job for _, _, job in charts])
+        for (slide, label, _), png in zip(charts, pngs):
+            if png is None:
+                current_app.logger.error(f"Error creating chart for {label}")
+                continue
+            slide.shapes.add_picture(BytesIO(png), Inches(1), Inches(1.5), width=Inches(8))
+
         # Save final PPT
         ppt_buffer = BytesIO()
         ppt.save(ppt_buffer)
@@ -9,6 +9,7 @@ from io import BytesIO
 
 from utils.executive_budget_vs_billed import (
     calculate_executive_budget_vs_billed, 
+    calculate_executive_budget_vs_billed_batch,
     auto_map_executive_columns, 
     load_data,
     get_executives_and_branches,
@@ -50,10 +51,14 @@ from utils.executive_ppt_generator import (
     create_nbc_individual_ppt,
     create_od_individual_ppt
 )
+from utils.artifact_store import deck_artifact_key, send_cached_artifact, store_artifact
 
 executive_bp = Blueprint('executive', __name__, url_prefix='/api/executive')
 logger = logging.getLogger(__name__)
 
+# Bump when the layout of the executive decks changes, so stored decks are rebuilt
+PPT_ARTIFACT_VERSION = 1
+
 @executive_bp.route('/customer_auto_map_columns', methods=['POST'])
 def customer_auto_map_columns():
     """Auto-map columns for customer analysis"""
@@ -179,6 +184,11 @@ def generate_customer_ppt():
         data = request.get_json()
         logger.info(f"Received Customer PPT generation request with keys: {list(data.keys())}")
 
+        artifact = deck_artifact_key('customer_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         # Get results data
         results_data = data.get('results_data')
         if not results_data:
@@ -237,6 +247,8 @@ def generate_customer_ppt():
 
         logger.info(f"✅ Successfully generated Customer PPT: {filename}")
 
+        store_artifact(artifact, final_buffer, filename)
+
         return send_file(
             final_buffer,
             as_attachment=True,
@@ -377,6 +389,11 @@ def generate_od_target_ppt():
         data = request.get_json()
         logger.info(f"Received OD Target PPT generation request with keys: {list(data.keys())}")
 
+        artifact = deck_artifact_key('od_target_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         # Get results data
         results_data = data.get('results_data')
         if not results_data:
@@ -428,6 +445,8 @@ def generate_od_target_ppt():
 
         logger.info(f"✅ Successfully generated OD Target PPT: {filename}")
 
+        store_artifact(artifact, ppt_buffer, filename)
+
         return send_file(
             ppt_buffer,
             as_attachment=True,
@@ -648,6 +667,11 @@ def generate_product_growth_ppt():
         logger.info(f"Received Product Growth PPT generation request with keys: {list(data.keys())}")
         logger.info(f"🔍 Full request data: {data}")
 
+        artifact = deck_artifact_key('product_growth_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         # Handle different data formats
         streamlit_result = data.get('streamlit_result')
         results_data = data.get('results_data')
@@ -747,6 +771,8 @@ def generate_product_growth_ppt():
 
         logger.info(f"Successfully generated PPT: {filename}")
 
+        store_artifact(artifact, ppt_buffer, filename)
+
         return send_file(
             ppt_buffer,
             as_attachment=True,
@@ -1023,6 +1049,17 @@ def calculate_budget_vs_billed():
            missing = [name for name, val in zip(['value', 'quantity', 'executive'], required_budget_cols) if not val]
            return jsonify({'error': f'Missing required budget column mappings: {missing}'}), 400
        
+       # Several month selections (e.g. every month of a review deck) in one pass
+       month_selections = data.get('month_selections')
+       if month_selections:
+           results = calculate_executive_budget_vs_billed_batch(
+               sales_file_path, budget_file_path,
+               sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
+               budget_value, budget_quantity, budget_product_group, budget_sl_code, budget_executive, budget_area,
+               selected_executives, month_selections, selected_branches
+           )
+           return jsonify({'success': True, 'results': results})
+       
        # Call calculation function
        result = calculate_executive_budget_vs_billed(
            sales_file_path=sales_file_path,
@@ -1380,6 +1417,11 @@ def generate_ppt():
         data = request.get_json()
         logger.info(f"Received PPT generation request with keys: {list(data.keys())}")
 
+        artifact = deck_artifact_key('executive_budget_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         # Get results data
         results_data = data.get('results_data')
         if not results_data:
@@ -1423,6 +1465,8 @@ def generate_ppt():
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"Executive_Budget_vs_Billed_{month_title.replace(' ', '_')}_{timestamp}.pptx"
 
+        store_artifact(artifact, ppt_buffer, filename)
+
         return send_file(
             ppt_buffer,
             as_attachment=True,
@@ -1442,6 +1486,11 @@ def generate_od_ppt():
         data = request.get_json()
         logger.info(f"Received OD PPT generation request with keys: {list(data.keys())}")
 
+        artifact = deck_artifact_key('executive_od_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         # Get results data
         results_data = data.get('results_data')
         if not results_data:
@@ -1485,6 +1534,8 @@ def generate_od_ppt():
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"Executive_OD_Target_vs_Collection_{month_title.replace(' ', '_')}_{timestamp}.pptx"
 
+        store_artifact(artifact, ppt_buffer, filename)
+
         return send_file(
             ppt_buffer,
             as_attachment=True,
@@ -1504,6 +1555,11 @@ def generate_consolidated_ppt():
         data = request.get_json()
         logger.info(f"Received consolidated PPT generation request")
 
+        artifact = deck_artifact_key('consolidated_ppt', data, version=PPT_ARTIFACT_VERSION)
+        cached = send_cached_artifact(artifact)
+        if cached:
+            return cached
+
         # 1. Validate reports
         reports_data = data.get('reports_data', [])
         if not reports_data:
@@ -1548,6 +1604,8 @@ def generate_consolidated_ppt():
 
         filename = f"Consolidated_Executive_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
 
+        store_artifact(artifact, ppt_buffer, filename)
+
         return send_file(
             ppt_buffer,
             as_attachment=True,
@@ -4,8 +4,8 @@ from flask import Blueprint, request, jsonify, send_file
 from werkzeug.utils import secure_filename
 from config import Config
 import os
-import pandas as pd
 from services import mapping_service as svc
+from utils.excel_cache import read_excel_cached, invalidate_file
 
 file_bp = Blueprint("file", __name__)
 
@@ -22,13 +22,14 @@ def upload_budget():
 
     filename = secure_filename(file.filename)
     path = os.path.join(Config.UPLOAD_FOLDER, filename)
+    invalidate_file(path)
     file.save(path)
 
     sheet = request.form.get("sheet") or 0
     header = int(request.form.get("header", 0))
 
     try:
-        df = pd.read_excel(path, sheet_name=sheet, header=header)
+        df = read_excel_cached(path, sheet_name=sheet, header=header)
         processed_df = svc.process_budget_file(df)
 
         output_path = os.path.join(Config.PROCESSED_FOLDER, f"processed_{filename}")
@@ -46,13 +47,14 @@ def upload_sales():
 
     filename = secure_filename(file.filename)
     path = os.path.join(Config.UPLOAD_FOLDER, filename)
+    invalidate_file(path)
     file.save(path)
 
     sheet = request.form.get("sheet") or 0
     header = int(request.form.get("header", 0))
 
     try:
-        df = pd.read_excel(path, sheet_name=sheet, header=header)
+        df = read_excel_cached(path, sheet_name=sheet, header=header)
         processed_df = svc.process_sales_file(df)
 
         output_path = os.path.join(Config.PROCESSED_FOLDER, f"processed_{filename}")
@@ -70,13 +72,14 @@ def upload_os():
 
     filename = secure_filename(file.filename)
     path = os.path.join(Config.UPLOAD_FOLDER, filename)
+    invalidate_file(path)
     file.save(path)
 
     sheet = request.form.get("sheet") or 0
     header = int(request.form.get("header", 0))
 
     try:
-        df = pd.read_excel(path, sheet_name=sheet, header=header)
+        df = read_excel_cached(path, sheet_name=sheet, header=header)
         processed_df = svc.process_os_file(df)
 
         output_path = os.path.join(Config.PROCESSED_FOLDER, f"processed_{filename}")
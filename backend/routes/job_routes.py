@@ -0,0 +1,88 @@
+# routes/job_routes.py
+
+from flask import Blueprint, request, jsonify, send_file, url_for
+import os
+
+from utils.jobs import (
+    DONE, FAILED, FINISHED_STATES, capture_request, submit_job, read_status, result_path,
+    cancel_job, delete_job
+)
+
+job_bp = Blueprint("jobs", __name__)
+
+# Long-running report builds that can run as background jobs: call them with
+# ?async=1 and they answer 202 with a job id instead of the report.
+ASYNC_JOB_ENDPOINTS = {
+    "/api/product/process",
+    "/api/ts-pw/process-ts-pw",
+    "/api/ero-pw/process-ero-pw",
+    "/api/region/process-region-analysis",
+    "/api/combined/generate-master-excel-with-callback",
+    "/api/executive/generate_consolidated_ppt",
+    "/api/bulk-assign-customers",
+}
+
+ASYNC_ARG = "async"
+
+
+def wants_async(req):
+    return req.path in ASYNC_JOB_ENDPOINTS and req.args.get(ASYNC_ARG, "").lower() in ("1", "true", "yes")
+
+
+@job_bp.before_app_request
+def queue_async_request():
+    if request.method != "POST" or not wants_async(request):
+        return None
+
+    payload = request.get_json(silent=True)
+    callback_id = payload.get("callback_id") if isinstance(payload, dict) else None
+    status = submit_job(capture_request(request, drop_args=(ASYNC_ARG,)), callback_id=callback_id)
+    job_id = status["job_id"]
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "state": status["state"],
+        "status_url": url_for("jobs.job_status", job_id=job_id),
+        "result_url": url_for("jobs.job_result", job_id=job_id)
+    }), 202
+
+
+@job_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    status = read_status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
+
+
+@job_bp.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    status = read_status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    if status["state"] not in (DONE, FAILED) or not os.path.exists(result_path(job_id)):
+        return jsonify({"error": f"Job is {status['state']}", "state": status["state"],
+                        "message": status.get("message")}), 409
+
+    download_name = status.get("download_name")
+    response = send_file(
+        os.path.abspath(result_path(job_id)),
+        mimetype=status.get("mimetype") or "application/octet-stream",
+        as_attachment=bool(download_name),
+        download_name=download_name
+    )
+    response.status_code = status.get("http_status") or 200
+    return response
+
+
+@job_bp.route("/jobs/<job_id>", methods=["DELETE"])
+def remove_job(job_id):
+    status = read_status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    if status["state"] not in FINISHED_STATES:
+        if cancel_job(job_id):
+            return jsonify({"success": True, "job_id": job_id, "state": "cancelled"})
+        return jsonify({"error": f"Job is {status['state']} and cannot be cancelled"}), 409
+    delete_job(job_id)
+    return jsonify({"success": True, "job_id": job_id, "deleted": True})
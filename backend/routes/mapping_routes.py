@@ -93,6 +93,7 @@ def remove_customers():
             cust.executive_id = None
             count += 1
 
+    svc.bump_mapping_version()
     db.session.commit()
     return jsonify({"removed": count})
 
@@ -118,6 +119,7 @@ def assign_customers_manually():
             db.session.add(cust)
             count += 1
 
+    svc.bump_mapping_version()
     db.session.commit()
     return jsonify({"assigned": count})
 
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, send_file
 from services.mapping_service import process_os_file
+from services.file_store import store_file, list_stored_files, send_stored_file, delete_stored_file
 import pandas as pd
 import io
 
@@ -47,7 +48,6 @@ def save_os_file():
 
     file = request.files["file"]
     filename = request.form.get("filename") or file.filename
-    binary_data = file.read()
 
     from models.schema import OsFile
     from extensions import db
@@ -55,11 +55,10 @@ def save_os_file():
     # Check if already exists
     existing = OsFile.query.filter_by(filename=filename).first()
     if existing:
-        db.session.delete(existing)
-        db.session.commit()
+        delete_stored_file(existing)
 
-    new_file = OsFile(filename=filename, file_data=binary_data)
-    db.session.add(new_file)
+    # Streamed into the blob store rather than read into memory
+    store_file(OsFile, filename, file.stream)
     db.session.commit()
 
     return jsonify({"message": "OS file saved to database."})
@@ -67,24 +66,20 @@ def save_os_file():
 @os_bp.route("/os-files", methods=["GET"])
 def list_os_files():
     from models.schema import OsFile
-    files = OsFile.query.order_by(OsFile.uploaded_at.desc()).all()
-    return jsonify([
-        {"id": f.id, "filename": f.filename, "uploaded_at": f.uploaded_at.isoformat()}
-        for f in files
-    ])
+    return jsonify(list_stored_files(OsFile))
 
 @os_bp.route("/os-files/<int:file_id>/download", methods=["GET"])
 def download_os_file(file_id):
     from models.schema import OsFile
-    import io
     file = OsFile.query.get_or_404(file_id)
 
-    return send_file(
-        io.BytesIO(file.file_data),
-        download_name=file.filename if file.filename.endswith(".xlsx") else f"{file.filename}.xlsx",
-        as_attachment=True,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    try:
+        return send_stored_file(
+            file,
+            download_name=file.filename if file.filename.endswith(".xlsx") else f"{file.filename}.xlsx"
+        )
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
 
 @os_bp.route("/os-files/<int:file_id>", methods=["DELETE"])
 def delete_os_file(file_id):
@@ -93,8 +88,6 @@ def delete_os_file(file_id):
     if not os_file:
         return jsonify({"error": "File not found"}), 404
 
-    from extensions import db
-    db.session.delete(os_file)
-    db.session.commit()
+    delete_stored_file(os_file)
 
     return jsonify({"message": "File deleted"})
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, send_file, jsonify
 from models.schema import BudgetFile, SalesFile, OsFile
-import io
 import pandas as pd
 from services.ppt_generator import generate_branch_ppt
+from services.file_store import file_source
 
 ppt_bp = Blueprint("ppt", __name__)
 
@@ -27,10 +27,13 @@ def generate_ppt():
         return jsonify({"error": "Invalid file IDs"}), 404
 
     # Convert to DataFrames
-    df_budget = pd.read_excel(io.BytesIO(budget_file.file_data))
-    df_sales = pd.read_excel(io.BytesIO(sales_file.file_data))
-    df_os_prev = pd.read_excel(io.BytesIO(os_prev_file.file_data))
-    df_os_curr = pd.read_excel(io.BytesIO(os_curr_file.file_data))
+    try:
+        df_budget = pd.read_excel(file_source(budget_file))
+        df_sales = pd.read_excel(file_source(sales_file))
+        df_os_prev = pd.read_excel(file_source(os_prev_file))
+        df_os_curr = pd.read_excel(file_source(os_curr_file))
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
 
     # Generate PPT (you'll define this function)
     pptx_buffer = generate_branch_ppt(df_budget, df_sales, df_os_prev, df_os_curr)
@@ -1,10 +1,10 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 import pandas as pd
 from io import BytesIO
 import base64
 from services.mapping_service import process_sales_file
+from services.file_store import store_file, list_stored_files, send_stored_file, delete_stored_file, file_source
 from models.schema import *
-import io
 
 sales_bp = Blueprint("sales", __name__)
 
@@ -58,29 +58,22 @@ def save_sales_file():
     from extensions import db
 
     binary_data = b64decode(base64_excel)
-    sales_file = SalesFile(filename=filename, file_data=binary_data)
-    db.session.add(sales_file)
+    sales_file = store_file(SalesFile, filename, binary_data)
     db.session.commit()
 
     return jsonify({"message": "File saved", "id": sales_file.id})
 
 @sales_bp.route("/sales-files", methods=["GET"])
 def list_sales_files():
-    files = SalesFile.query.order_by(SalesFile.uploaded_at.desc()).all()
-    return jsonify([
-        {"id": f.id, "filename": f.filename, "uploaded_at": f.uploaded_at.isoformat()}
-        for f in files
-    ])
+    return jsonify(list_stored_files(SalesFile))
 
 @sales_bp.route("/sales-files/<int:file_id>/download", methods=["GET"])
 def download_sales_file(file_id):
     file = SalesFile.query.get_or_404(file_id)
-    return send_file(
-        io.BytesIO(file.file_data),
-        download_name=file.filename,
-        as_attachment=True,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    try:
+        return send_stored_file(file)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
 
 @sales_bp.route("/sales-files/<int:file_id>", methods=["DELETE"])
 def delete_sales_file(file_id):
@@ -89,21 +82,21 @@ def delete_sales_file(file_id):
     if not os_file:
         return jsonify({"error": "File not found"}), 404
 
-    from extensions import db
-    db.session.delete(os_file)
-    db.session.commit()
+    delete_stored_file(os_file)
 
     return jsonify({"message": "File deleted"})
 
 @sales_bp.route("/sales-files/<int:file_id>/data", methods=["GET"])
 def get_sales_file_data(file_id):
-    from utils.file_utils import read_excel_from_binary
+    from utils.excel_cache import read_excel_cached
     file = SalesFile.query.get(file_id)
     if not file:
         return jsonify({"error": "Sales file not found"}), 404
 
     try:
-        df = read_excel_from_binary(file.file_data)
+        df = read_excel_cached(file_source(file))
         return jsonify(df.head(100).to_dict(orient="records"))
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": f"Failed to parse file: {str(e)}"}), 500
@@ -35,6 +35,7 @@ from utils.dashboard.helpers import (
     extract_performance_column,
     extract_month_year
 )       
+from utils.chart_render import ChartJob, render_chart, render_charts
 
 # Add this near the top of data_processing.py
 BRANCH_EXCLUDE_TERMS = [
@@ -382,79 +383,193 @@ def create_plotly_chart(data, x_col, y_col, chart_type, title, color_override=No
     
     return fig, config
 
-def create_matplotlib_chart(chart_data, x_col, y_col, chart_type, title, color_override=None, is_product_chart=False):
-    try:
-        plt.style.use('seaborn')
-        plt.figure(figsize=(10, 6))
-        plt.rcParams['xtick.major.pad'] = 10
-        plt.rcParams['axes.labelpad'] = 10
-
-        if chart_type == 'bar':
-            if 'Metric' in chart_data.columns:
-                pivot_df = chart_data.pivot(index=x_col, columns='Metric', values=y_col)
-                pivot_df.plot(kind='bar', ax=plt.gca(), color=['#2E86AB', '#FF8C00'], width=0.8)
-            else:
-                plt.bar(chart_data[x_col], chart_data[y_col], color=color_override or '#2E86AB', width=0.6)
-            
-            # Conditional label rotation
-            if is_product_chart:
-                plt.xticks(rotation=45, ha='right', fontsize=12)  # Slanted for products
-            else:
-                plt.xticks(rotation=0, ha='center', fontsize=12)  # Straight for others
-
-        elif chart_type == 'line':
-            if 'Metric' in chart_data.columns:
-                for name, group in chart_data.groupby('Metric'):
-                    plt.plot(
-                        group[x_col],
-                        group[y_col],
-                        marker='o',
-                        markersize=8,
-                        linewidth=2,
-                        label=name,
-                        color='#FF8C00' if 'Actual' in str(name) else '#2E86AB'
-                    )
-                plt.legend(fontsize=12)
-            else:
-                plt.plot(
-                    chart_data[x_col],
-                    chart_data[y_col],
+### --------- Chart images (drawn through utils.chart_render) ----------
+
+PRODUCT_CHART_RC = {'xtick.major.pad': 10, 'axes.labelpad': 10}
+
+def _draw_matplotlib_chart(fig, spec):
+    chart_data = pd.DataFrame(spec['data'])
+    x_col, y_col = spec['x_col'], spec['y_col']
+    chart_type, color_override = spec['chart_type'], spec['color_override']
+    ax = fig.add_subplot()
+
+    if chart_type == 'bar':
+        if 'Metric' in chart_data.columns:
+            pivot_df = chart_data.pivot(index=x_col, columns='Metric', values=y_col)
+            pivot_df.plot(kind='bar', ax=ax, color=['#2E86AB', '#FF8C00'], width=0.8)
+        else:
+            ax.bar(chart_data[x_col], chart_data[y_col], color=color_override or '#2E86AB', width=0.6)
+
+    elif chart_type == 'line':
+        if 'Metric' in chart_data.columns:
+            for name, group in chart_data.groupby('Metric'):
+                ax.plot(
+                    group[x_col],
+                    group[y_col],
                     marker='o',
                     markersize=8,
                     linewidth=2,
-                    color=color_override or '#2E86AB'
+                    label=name,
+                    color='#FF8C00' if 'Actual' in str(name) else '#2E86AB'
                 )
-            
-            # Conditional label rotation
-            if is_product_chart:
-                plt.xticks(rotation=45, ha='right', fontsize=12)
-            else:
-                plt.xticks(rotation=0, ha='center', fontsize=12)
-
-        elif chart_type == 'pie':
-            plt.pie(
+            ax.legend(fontsize=12)
+        else:
+            ax.plot(
+                chart_data[x_col],
                 chart_data[y_col],
-                labels=chart_data[x_col],
-                autopct='%1.1f%%',
-                startangle=90,
-                textprops={'fontsize': 12},
-                colors=['#2E86AB', '#FF8C00', '#A23B72', '#F18F01', '#C73E1D']
+                marker='o',
+                markersize=8,
+                linewidth=2,
+                color=color_override or '#2E86AB'
             )
-            plt.axis('equal')
 
-        plt.title(title, fontsize=16, pad=20)
-        plt.tight_layout()
+    elif chart_type == 'pie':
+        ax.pie(
+            chart_data[y_col],
+            labels=chart_data[x_col],
+            autopct='%1.1f%%',
+            startangle=90,
+            textprops={'fontsize': 12},
+            colors=['#2E86AB', '#FF8C00', '#A23B72', '#F18F01', '#C73E1D']
+        )
+        ax.axis('equal')
 
-        img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-        img_buffer.seek(0)
-        plt.close()
-        return img_buffer
+    if chart_type in ('bar', 'line'):
+        # Conditional label rotation: slanted for products, straight for others
+        if spec['is_product_chart']:
+            plt.setp(ax.get_xticklabels(), rotation=45, ha='right', fontsize=12)
+        else:
+            plt.setp(ax.get_xticklabels(), rotation=0, ha='center', fontsize=12)
+
+    ax.set_title(spec['title'], fontsize=16, pad=20)
+    fig.tight_layout()
+
+def matplotlib_chart_job(chart_data, x_col, y_col, chart_type, title, color_override=None, is_product_chart=False):
+    """Chart job for create_matplotlib_chart's seaborn-styled charts"""
+    spec = {
+        'data': chart_data.to_dict('list'),
+        'x_col': x_col,
+        'y_col': y_col,
+        'chart_type': chart_type,
+        'title': title,
+        'color_override': color_override,
+        'is_product_chart': is_product_chart,
+    }
+    return ChartJob(_draw_matplotlib_chart, spec, 'seaborn', PRODUCT_CHART_RC)
+
+def create_matplotlib_chart(chart_data, x_col, y_col, chart_type, title, color_override=None, is_product_chart=False):
+    try:
+        png = render_chart(matplotlib_chart_job(chart_data, x_col, y_col, chart_type, title, color_override, is_product_chart))
+        return BytesIO(png) if png is not None else None
 
     except Exception as e:
-        current_app.logging.error(f"Error creating matplotlib chart: {str(e)}", exc_info=True)
+        current_app.logger.error(f"Error creating matplotlib chart: {str(e)}", exc_info=True)
         return None
 
+def _draw_share_pie(fig, spec):
+    ax = fig.add_subplot()
+    ax.pie(
+        spec['values'],
+        labels=spec['labels'],
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=['#2E86AB', '#FF8C00'],
+        textprops={'fontsize': 12}
+    )
+    ax.axis('equal')
+    ax.set_title(spec['title'], pad=20)
+
+def _draw_budget_vs_actual(fig, spec):
+    chart_df = pd.DataFrame(spec['data'])
+    x_col, y_col, visual_type = spec['x_col'], spec['y_col'], spec['visual_type']
+    budget_data = chart_df[chart_df['Metric'] == 'Budget']
+    actual_data = chart_df[chart_df['Metric'] == 'Actual']
+    ax = fig.add_subplot()
+
+    if visual_type == 'line':
+        months = budget_data[x_col].tolist()
+        ax.plot(months, budget_data[y_col], marker='o',
+                label='Budget', color='#2E86AB')
+        ax.plot(months, actual_data[y_col], marker='o',
+                label='Actual', color='#FF8C00')
+        ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.3)
+
+    elif visual_type == 'pie':
+        budget_value = budget_data[y_col].sum()
+        actual_value = actual_data[y_col].sum()
+        if budget_value > 0 and actual_value > 0:
+            ax.pie([budget_value, actual_value],
+                   labels=['Budget', 'Actual'],
+                   autopct='%1.1f%%',
+                   startangle=90,
+                   colors=['#2E86AB', '#FF8C00'])
+            ax.axis('equal')
+
+    else:  # Default bar
+        bar_width = 0.35
+        months = budget_data[x_col].tolist()
+        x_pos = np.arange(len(months))
+        ax.bar(x_pos - bar_width/2, budget_data[y_col], bar_width,
+               label='Budget', color='#2E86AB')
+        ax.bar(x_pos + bar_width/2, actual_data[y_col], bar_width,
+               label='Actual', color='#FF8C00')
+        ax.set_xticks(x_pos)
+        ax.set_xticklabels(months, rotation=45, ha='right')
+        ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.3)
+
+    ax.set_title(spec['title'])
+    fig.tight_layout()
+
+def _draw_master_chart(fig, spec):
+    chart_df = pd.DataFrame(spec['data'])
+    x_col, y_col, visual_type = spec['x_col'], spec['y_col'], spec['visual_type']
+    ax = fig.add_subplot()
+
+    if visual_type == 'pie':
+        ax.pie(chart_df[y_col], labels=chart_df[x_col],
+               autopct='%1.1f%%', startangle=90,
+               colors=sns.color_palette('Set2'))
+        ax.axis('equal')
+
+    elif visual_type == 'bar':
+        if 'Metric' in chart_df.columns:
+            pivot_df = chart_df.pivot(index=x_col, columns='Metric', values=y_col)
+            pivot_df.plot(kind='bar', ax=ax, color=['#2E86AB', '#FF8C00'])
+        else:
+            ax.bar(chart_df[x_col], chart_df[y_col], color='#2E86AB')
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+    elif visual_type == 'line':
+        if 'Metric' in chart_df.columns:
+            for name, group in chart_df.groupby('Metric'):
+                ax.plot(group[x_col], group[y_col], marker='o', label=name,
+                        color='#FF8C00' if 'Actual' in str(name) else '#2E86AB')
+            ax.legend()
+        else:
+            ax.plot(chart_df[x_col], chart_df[y_col], marker='o', color='#2E86AB')
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+    ax.set_title(spec['title'])
+    fig.tight_layout()
+
+def master_chart_job(chart_df, x_col, y_col, visual_type, title):
+    """Chart job for a generic /download-master-ppt slide"""
+    spec = {
+        'data': chart_df.to_dict('list'),
+        'x_col': x_col,
+        'y_col': y_col,
+        'visual_type': visual_type,
+        'title': title,
+    }
+    return ChartJob(_draw_master_chart, spec)
+
+def budget_vs_actual_job(chart_df, x_col, y_col, visual_type, title):
+    """Chart job for the paired Budget/Actual slide of /download-master-ppt"""
+    job = master_chart_job(chart_df, x_col, y_col, visual_type, title)
+    return job._replace(draw=_draw_budget_vs_actual)
+
 def create_ppt_with_chart(title, chart_data, x_col, y_col, chart_type='bar', color_override=None, selected_filter=None, is_product_chart=False):
     try:
         current_app.logging.debug(f"Creating PPT: title={title}, chart_type={chart_type}, x_col={x_col}, y_col={y_col}")
@@ -542,7 +657,8 @@ def create_master_ppt_with_matplotlib(all_data, table_name, selected_sheet, visu
         if len(title_slide.placeholders) > 1:
             title_slide.placeholders[1].text = f"Sheet: {selected_sheet}\nGenerated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         
-        # Process each visualization in order
+        # Process each visualization in order; chart images are rendered after the loop
+        charts = []
         for item in all_data:
             label = item['label']
             data = item['data']
@@ -580,27 +696,13 @@ def create_master_ppt_with_matplotlib(all_data, table_name, selected_sheet, visu
                         slide_title += f" - {selected_filter}"
                     slide.shapes.title.text = slide_title
                     
-                    # Create pie chart
-                    plt.figure(figsize=(10, 6))
-                    plt.pie(
-                        data['Value'],
-                        labels=data['Metric'],
-                        autopct='%1.1f%%',
-                        startangle=90,
-                        colors=['#2E86AB', '#FF8C00'],
-                        textprops={'fontsize': 12}
-                    )
-                    plt.axis('equal')
-                    plt.title(slide_title, pad=20)
-                    
-                    # Save plot to buffer
-                    img_buffer = BytesIO()
-                    plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-                    img_buffer.seek(0)
-                    plt.close()
-                    
-                    # Add image to slide
-                    slide.shapes.add_picture(img_buffer, Inches(1), Inches(1.5), width=Inches(8))
+                    # Pie chart image is rendered with the rest of the deck below
+                    job = ChartJob(_draw_share_pie, {
+                        'values': data['Value'].tolist(),
+                        'labels': data['Metric'].tolist(),
+                        'title': slide_title,
+                    })
+                    charts.append((slide, label, job, (Inches(1), Inches(1.5), Inches(8), None)))
                     continue
                 
                 # Performance charts - needs Name, Performance
@@ -672,39 +774,34 @@ def create_master_ppt_with_matplotlib(all_data, table_name, selected_sheet, visu
                 title_frame.paragraphs[0].font.bold = True
                 title_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
                 
-                # Generate chart image
-                try:
-                    img_buffer = create_matplotlib_chart(
-                        data, 
-                        x_col, 
-                        y_col, 
-                        chart_type, 
-                        slide_title,
-                        '#FF8C00' if 'Act' in label else '#2E86AB'
-                    )
-                    
-                    if img_buffer:
-                        slide.shapes.add_picture(
-                            img_buffer, 
-                            Inches(0.5), 
-                            Inches(1.2), 
-                            width=Inches(9), 
-                            height=Inches(6.5)
-                        )
-                    else:
-                        text_box = slide.shapes.add_textbox(Inches(1), Inches(3), Inches(8), Inches(2))
-                        text_frame = text_box.text_frame
-                        text_frame.text = f"Chart: {label}\n(Image generation failed)"
-                        text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-                
-                except Exception as chart_error:
-                    current_app.logging.error(f"Chart generation error for {label}: {str(chart_error)}")
-                    continue
+                # Chart image is rendered with the rest of the deck below
+                job = matplotlib_chart_job(
+                    data, 
+                    x_col, 
+                    y_col, 
+                    chart_type, 
+                    slide_title,
+                    '#FF8C00' if 'Act' in label else '#2E86AB'
+                )
+                charts.append((slide, label, job, (Inches(0.5), Inches(1.2), Inches(9), Inches(6.5))))
                 
             except Exception as e:
                 current_app.logging.error(f"Error creating chart for {label}: {str(e)}", exc_info=True)
                 continue
         
+        # Render every chart of the deck at once (cached / in parallel) and place the images
+        pngs = render_charts([job for _, _, job, _ in charts])
+        for (slide, label, job, (left, top, width, height)), png in zip(charts, pngs):
+            if png is not None:
+                slide.shapes.add_picture(BytesIO(png), left, top, width=width, height=height)
+            elif job.draw is _draw_share_pie:
+                current_app.logger.error(f"Error creating chart for {label}")
+            else:
+                text_box = slide.shapes.add_textbox(Inches(1), Inches(3), Inches(8), Inches(2))
+                text_frame = text_box.text_frame
+                text_frame.text = f"Chart: {label}\n(Image generation failed)"
+                text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+        
         # Save to buffer
         master_ppt_buffer = BytesIO()
         master_ppt.save(master_ppt_buffer)
@@ -0,0 +1,125 @@
+# services/file_store.py
+
+import io
+import os
+import logging
+
+from flask import send_file
+from openpyxl import load_workbook
+
+from models.schema import *
+from extensions import db
+from utils.blob_store import put_blob, blob_path, has_blob, delete_blob
+
+logger = logging.getLogger(__name__)
+
+# Saved budget, sales, OS and last-year workbooks. Content goes to the blob
+# store and the row keeps the digest, size and sheet list, so listing reads a
+# handful of columns and downloads stream from disk (with Range support)
+# instead of pulling a BLOB through the ORM. Rows saved before the move keep
+# their bytes in file_data until models.migrations moves them.
+#
+# Rows with the same content share a blob, so a delete and a save of that
+# content must not interleave. Each runs in its own database transaction: the
+# delete checks for other rows with the digest under FOR UPDATE (a SQLite
+# writer holds the database lock anyway) and removes the blob before its
+# commit, and a save flushes its row before relying on the blob. Whichever
+# comes second sees the other's outcome: the delete finds the new row and
+# keeps the blob, or the save finds the blob gone and writes it again.
+
+FILE_MODELS = (BudgetFile, SalesFile, OsFile, LastYearSalesFile)
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+### --------- Metadata ----------
+
+def workbook_sheets(source):
+    """[{"name", "rows"}] of a workbook, from its sheet dimensions; None if it cannot be read"""
+    if isinstance(source, str):
+        # openpyxl judges paths by extension, and blobs are stored as .bin
+        with open(source, "rb") as f:
+            return workbook_sheets(f)
+    try:
+        wb = load_workbook(source, read_only=True)
+    except Exception as e:
+        logger.info(f"No sheet metadata for {source}: {e}")
+        return None
+    try:
+        return [{"name": ws.title, "rows": ws.max_row} for ws in wb.worksheets]
+    finally:
+        wb.close()
+
+
+### --------- Saving and reading ----------
+
+def store_file(model, filename, source):
+    """New (uncommitted, flushed) model row for bytes, a file object or a path"""
+    digest, size = put_blob(source)
+    record = model(filename=filename, sha256=digest, size=size)
+    db.session.add(record)
+    db.session.flush()
+    if not has_blob(digest):
+        # A concurrent delete of the last row sharing this content removed it
+        put_blob(source)
+    record.sheets = workbook_sheets(blob_path(digest))
+    return record
+
+
+def file_source(record):
+    """
+    Path of the stored content, or a BytesIO for rows not moved to the blob
+    store yet. Raises FileNotFoundError when the content is gone.
+    """
+    if has_blob(record.sha256):
+        return blob_path(record.sha256)
+    if record.file_data is None:
+        raise FileNotFoundError(f"No stored content for {record.filename}")
+    return io.BytesIO(record.file_data)
+
+
+def send_stored_file(record, download_name=None):
+    source = file_source(record)
+    if isinstance(source, str):
+        source = os.path.abspath(source)
+    return send_file(
+        source,
+        download_name=download_name or record.filename,
+        as_attachment=True,
+        mimetype=XLSX_MIMETYPE,
+        etag=record.sha256 or True,
+        conditional=True
+    )
+
+
+def list_stored_files(model):
+    """Listing rows of a file table, newest first; never loads file contents"""
+    rows = (db.session.query(model.id, model.filename, model.uploaded_at, model.size, model.sheets)
+            .order_by(model.uploaded_at.desc()).all())
+    return [
+        {"id": file_id, "filename": filename, "uploaded_at": uploaded_at.isoformat(), "size": size, "sheets": sheets}
+        for file_id, filename, uploaded_at, size, sheets in rows
+    ]
+
+
+### --------- Deleting ----------
+
+def is_blob_referenced(digest, lock=False):
+    """True if a saved file row uses the digest; lock holds off concurrent saves of it until commit"""
+    for model in FILE_MODELS:
+        query = db.session.query(model.id).filter(model.sha256 == digest)
+        if lock:
+            query = query.with_for_update()
+        if query.first() is not None:
+            return True
+    return False
+
+
+def delete_stored_file(record):
+    """Delete a row and commit; its blob goes too once no other saved file shares it"""
+    digest = record.sha256
+    db.session.delete(record)
+    db.session.flush()
+    if digest and not is_blob_referenced(digest, lock=True):
+        # Before the commit, while the reference check still holds its locks
+        delete_blob(digest)
+    db.session.commit()
@@ -2,9 +2,23 @@
 
 from models.schema import *
 from extensions import db
+from sqlalchemy import insert, update
 from sqlalchemy.orm import joinedload
+from services.mapping_snapshot import (
+    get_mapping_snapshot,
+    bump_mapping_version,
+    normalize_customer_code,
+    normalize_product_name,
+    lookup_key,
+)
+from utils.jobs import report_progress
 import pandas as pd
+import numpy as np
 import io
+import os
+
+# Rows per IN query and per batched INSERT/UPDATE of the bulk customer upsert
+BULK_ASSIGN_CHUNK_SIZE = int(os.getenv("BULK_ASSIGN_CHUNK_SIZE", 1000))
 
 ### --------- Executive & Customer Logic ----------
 
@@ -13,6 +27,7 @@ def add_executive(name, code=None):
         return False, "Executive already exists"
     exec = Executive(name=name, code=code)
     db.session.add(exec)
+    bump_mapping_version()
     db.session.commit()
     return True, "Executive added"
 
@@ -28,6 +43,7 @@ def remove_executive(name):
     BranchExecutiveMap.query.filter_by(executive_id=exec.id).delete()
 
     db.session.delete(exec)
+    bump_mapping_version()
     db.session.commit()
     return True, count
 
@@ -35,16 +51,99 @@ def assign_customers_to_exec(exec_name, customer_codes):
     exec = Executive.query.filter_by(name=exec_name).first()
     if not exec:
         return 0
-    count = 0
-    for code in customer_codes:
-        cust = Customer.query.filter_by(code=code).first()
-        if cust:
-            cust.executive_id = exec.id
-        else:
-            db.session.add(Customer(code=code, executive_id=exec.id))
-        count += 1
+    upsert_customer_assignments([(exec.name, None, code, None) for code in customer_codes])
+    bump_mapping_version()
     db.session.commit()
-    return count
+    return len(customer_codes)
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _first_by_key(rows):
+    """(exact, lookup_key) indexes of (id, value) rows, keeping the lowest id"""
+    exact, folded = {}, {}
+    for row_id, value in rows:
+        exact.setdefault(value, row_id)
+        folded.setdefault(lookup_key(value), row_id)
+    return exact, folded
+
+def _resolve_executive_ids(exec_codes, chunk_size):
+    """Executive id for each name in exec_codes (name -> code), creating missing executives"""
+    names = list(exec_codes)
+    found = []
+    for chunk in _chunks(names, chunk_size):
+        found += (db.session.query(Executive.id, Executive.name)
+                  .filter(Executive.name.in_(chunk)).order_by(Executive.id).all())
+    exact, folded = _first_by_key(found)
+
+    created = {}
+    for name in names:
+        key = lookup_key(name)
+        if name not in exact and key not in folded and key not in created:
+            created[key] = Executive(name=name, code=exec_codes[name])
+    if created:
+        db.session.add_all(created.values())
+        db.session.flush()
+
+    ids = {}
+    for name in names:
+        key = lookup_key(name)
+        ids[name] = exact.get(name) or folded.get(key) or created[key].id
+    return ids
+
+def upsert_customer_assignments(assignments, chunk_size=None):
+    """
+    Assign customers to executives in bulk. assignments are (exec_name,
+    exec_code, cust_code, cust_name) tuples; later rows win. Existing customers
+    are fetched with one IN query per chunk and written back with batched
+    INSERTs and UPDATEs, instead of a query per row. Missing executives are
+    created with their first exec_code. Does not commit; returns
+    (created, updated).
+    """
+    chunk_size = chunk_size or BULK_ASSIGN_CHUNK_SIZE
+
+    exec_codes = {}
+    for exec_name, exec_code, _, _ in assignments:
+        exec_codes.setdefault(exec_name, exec_code)
+    exec_ids = _resolve_executive_ids(exec_codes, chunk_size)
+
+    # lookup_key(code) -> [code, executive_id, name]; codes compare like MySQL does
+    pending = {}
+    for exec_name, _, cust_code, cust_name in assignments:
+        entry = pending.setdefault(lookup_key(cust_code), [cust_code, None, None])
+        entry[1] = exec_ids[exec_name]
+        if cust_name:
+            entry[2] = cust_name
+
+    entries = list(pending.values())
+    created = updated = 0
+    for chunk in _chunks(entries, chunk_size):
+        exact, folded = _first_by_key(
+            db.session.query(Customer.id, Customer.code)
+            .filter(Customer.code.in_([code for code, _, _ in chunk])).order_by(Customer.id).all()
+        )
+        inserts, renames, reassigns = [], [], []
+        for code, exec_id, name in chunk:
+            cust_id = exact.get(code) or folded.get(lookup_key(code))
+            if cust_id is None:
+                inserts.append({"code": code, "name": name or "", "executive_id": exec_id})
+            elif name:
+                renames.append({"id": cust_id, "executive_id": exec_id, "name": name})
+            else:
+                reassigns.append({"id": cust_id, "executive_id": exec_id})
+
+        if inserts:
+            db.session.execute(insert(Customer), inserts)
+        for rows in (renames, reassigns):
+            if rows:
+                db.session.execute(update(Customer), rows)
+        created += len(inserts)
+        updated += len(renames) + len(reassigns)
+        report_progress(100 * (created + updated) / len(entries),
+                        f"Assigned {created + updated} of {len(entries)} customers")
+
+    return created, updated
 
 def get_executives():
     return Executive.query.all()
@@ -59,11 +158,13 @@ def get_exec_customers(exec_name):
 def add_branch(name):
     if not Branch.query.filter_by(name=name).first():
         db.session.add(Branch(name=name))
+        bump_mapping_version()
         db.session.commit()
 
 def add_region(name):
     if not Region.query.filter_by(name=name).first():
         db.session.add(Region(name=name))
+        bump_mapping_version()
         db.session.commit()
 
 def map_exec_to_branch(exec_name, branch_name):
@@ -72,6 +173,7 @@ def map_exec_to_branch(exec_name, branch_name):
     if exec and branch:
         if not BranchExecutiveMap.query.filter_by(executive_id=exec.id, branch_id=branch.id).first():
             db.session.add(BranchExecutiveMap(executive_id=exec.id, branch_id=branch.id))
+            bump_mapping_version()
             db.session.commit()
 
 def map_branch_to_region(branch_name, region_name):
@@ -80,6 +182,7 @@ def map_branch_to_region(branch_name, region_name):
     if branch and region:
         if not RegionBranchMap.query.filter_by(branch_id=branch.id, region_id=region.id).first():
             db.session.add(RegionBranchMap(branch_id=branch.id, region_id=region.id))
+            bump_mapping_version()
             db.session.commit()
 
 ### --------- Company & Product Logic ----------
@@ -87,11 +190,13 @@ def map_branch_to_region(branch_name, region_name):
 def add_company(name):
     if not Company.query.filter_by(name=name).first():
         db.session.add(Company(name=name))
+        bump_mapping_version()
         db.session.commit()
 
 def add_product(name):
     if not Product.query.filter_by(name=name).first():
         db.session.add(Product(name=name))
+        bump_mapping_version()
         db.session.commit()
 
 def get_all_products():
@@ -118,12 +223,15 @@ def map_company_products(company_name, product_names):
     CompanyProductMap.query.filter_by(company_id=company.id).delete()
 
     count = 0
+    mapped_ids = set()  # a company/product pair may only be mapped once
     for product_name in product_names:
         product = Product.query.filter_by(name=product_name).first()
-        if product:
+        if product and product.id not in mapped_ids:
             db.session.add(CompanyProductMap(company_id=company.id, product_id=product.id))
+            mapped_ids.add(product.id)
             count += 1
 
+    bump_mapping_version()
     db.session.commit()
     return count
 
@@ -170,6 +278,7 @@ def upload_company_product_from_df(df, company_col, product_col):
             db.session.add(CompanyProductMap(company_id=company.id, product_id=product.id))
             count += 1
 
+    bump_mapping_version()
     db.session.commit()
     return count
 
@@ -206,58 +315,26 @@ def export_all_mappings():
 
 ### --------- Excel Processing ----------
 
-def normalize_customer_code(code):
-    import pandas as pd  # ensure pandas is imported
-
-    if pd.isna(code):
-        return ""
-    
-    code_str = str(code).strip()
-    try:
-        if '.' in code_str and code_str.replace('.', '').replace('-', '').isdigit():
-            float_val = float(code_str)
-            if float_val == int(float_val):
-                return str(int(float_val))
-    except (ValueError, OverflowError):
-        pass
-    
-    return code_str
+# Per-row helpers below read the cached mapping snapshot instead of querying
 
 def get_exec_by_customer_code(customer_code):
-    cust = Customer.query.filter_by(code=customer_code).first()
-    if cust and cust.executive:
-        return cust.executive.name
-    return None
+    return get_mapping_snapshot()["customer_by_code"].get(lookup_key(customer_code))
 
 def get_exec_code(exec_name):
-    exec_obj = Executive.query.filter_by(name=exec_name).first()
-    return exec_obj.code if exec_obj else ""
+    lookups = get_mapping_snapshot()
+    name = lookups["exec_by_name"].get(lookup_key(exec_name))
+    if name is None:
+        return ""
+    return lookups["exec_code_by_name"].get(name)
 
 def get_branches_for_executive(exec_name):
-    exec_obj = Executive.query.filter_by(name=exec_name).first()
-    if not exec_obj:
-        return ""
-    
-    branch_maps = BranchExecutiveMap.query.filter_by(executive_id=exec_obj.id).all()
-    branches = [b.branch.name for b in branch_maps if b.branch]
-    return ", ".join(sorted(set(branches)))
+    return get_mapping_snapshot()["exec_branches"].get(lookup_key(exec_name), "")
 
 def get_region_for_branch(branch_name):
-    branch_obj = Branch.query.filter_by(name=branch_name).first()
-    if not branch_obj:
-        return ""
-    
-    region_map = RegionBranchMap.query.filter_by(branch_id=branch_obj.id).first()
-    if region_map and region_map.region:
-        return region_map.region.name
-    
-    return ""
+    return get_mapping_snapshot()["branch_region"].get(lookup_key(branch_name), "")
 
 
 def process_budget_file(df, customer_col, exec_code_col, exec_name_col, branch_col, region_col, cust_name_col=None):
-    from models.schema import Customer, Executive
-    import pandas as pd
-
     processed_df = df.copy()
 
     if "Branch" not in processed_df.columns:
@@ -267,41 +344,31 @@ def process_budget_file(df, customer_col, exec_code_col, exec_name_col, branch_c
     if "Company Group" not in processed_df.columns:
         processed_df["Company Group"] = ""
 
-    # Load customer code → executive name mapping from DB
-    customers = Customer.query.all()
-    customer_code_map = {normalize_customer_code(c.code): c.executive.name for c in customers if c.executive}
-
-    # Load executive name → code mapping
-    executives = Executive.query.all()
-    exec_code_map = {e.name: e.code for e in executives}
+    # Customer code → executive → branch → region, all from one snapshot of the mapping tables
+    lookups = get_mapping_snapshot()
 
-    for idx, row in processed_df.iterrows():
-        if pd.notna(row[customer_col]):
-            customer_code = normalize_customer_code(str(row[customer_col]).strip())
+    customers = processed_df[customer_col]
+    codes = _map_distinct(customers[customers.notna()], lambda c: normalize_customer_code(str(c).strip()))
+    exec_names = codes.map(lookups["customer_exec"]).dropna().astype(object)
+    matched = exec_names.index
 
-            if customer_code in customer_code_map:
-                exec_name = customer_code_map[customer_code]
+    if exec_code_col in processed_df.columns:
+        exec_codes = exec_names[exec_names.isin(lookups["exec_code_by_name"].keys())].map(lookups["exec_code_by_name"])
+        processed_df.loc[exec_codes.index, exec_code_col] = exec_codes
 
-                # Assign executive code
-                if exec_code_col in processed_df.columns and exec_name in exec_code_map:
-                    processed_df.at[idx, exec_code_col] = exec_code_map[exec_name]
+    if exec_name_col in processed_df.columns:
+        processed_df.loc[matched, exec_name_col] = exec_names
 
-                # Assign executive name
-                if exec_name_col in processed_df.columns:
-                    processed_df.at[idx, exec_name_col] = exec_name
+    branches = lookup_branches(exec_names, lookups)
+    if branch_col in processed_df.columns:
+        processed_df.loc[matched, branch_col] = branches
+    processed_df.loc[matched, "Branch"] = branches
 
-                # Assign branch
-                branch = get_branches_for_executive(exec_name)
-                if branch_col in processed_df.columns:
-                    processed_df.at[idx, branch_col] = branch
-                processed_df.at[idx, "Branch"] = branch
-
-                # Assign region
-                if branch and "," not in branch:
-                    region = get_region_for_branch(branch)
-                    if region_col in processed_df.columns:
-                        processed_df.at[idx, region_col] = region
-                    processed_df.at[idx, "Region"] = region
+    single = branches[(branches != "") & ~branches.str.contains(",", regex=False)]
+    regions = lookup_regions(single, lookups)
+    if region_col in processed_df.columns:
+        processed_df.loc[single.index, region_col] = regions
+    processed_df.loc[single.index, "Region"] = regions
 
     return processed_df
 
@@ -311,36 +378,50 @@ def process_budget_file(df, customer_col, exec_code_col, exec_name_col, branch_c
 #####################      
 
 def get_exec_name_by_code(exec_code):
-    exec_obj = Executive.query.filter_by(code=exec_code).first()
-    return exec_obj.name if exec_obj else None
+    return get_mapping_snapshot()["exec_by_code"].get(lookup_key(exec_code))
 
 def get_branches_for_exec(exec_name):
-    exec_obj = Executive.query.filter_by(name=exec_name).first()
-    if not exec_obj:
-        return ""
-    branches = BranchExecutiveMap.query.filter_by(executive_id=exec_obj.id).all()
-    return ", ".join(sorted(set(b.branch.name for b in branches))) if branches else ""
-
-def get_region_for_branch(branch_name):
-    branch = Branch.query.filter_by(name=branch_name).first()
-    if not branch:
-        return ""
-    region_map = RegionBranchMap.query.filter_by(branch_id=branch.id).first()
-    return region_map.region.name if region_map else ""
+    return get_branches_for_executive(exec_name)
 
 def get_company_for_product(product_name):
-    normalized = ' '.join(product_name.lower().strip().split())
-    for mapping in CompanyProductMap.query.all():
-        mapped_product = mapping.product.name.lower().strip()
-        mapped_norm = ' '.join(mapped_product.split())
-        if normalized == mapped_norm:
-            return mapping.company.name
-    for mapping in CompanyProductMap.query.all():
-        mapped_product = mapping.product.name.lower().strip()
-        mapped_norm = ' '.join(mapped_product.split())
-        if normalized in mapped_norm or mapped_norm in normalized:
-            return mapping.company.name
-    return ""
+    resolved = match_company_for_products([product_name], get_mapping_snapshot())
+    return next(iter(resolved.values()))
+
+def match_company_for_products(product_names, lookups):
+    """Resolve each distinct product name once against the normalized product index"""
+    resolved = {}
+    for name in pd.unique(product_names):
+        norm = normalize_product_name(name)
+        company = lookups["product_exact"].get(norm)
+        if company is None:
+            company = next(
+                (c for mapped, c in lookups["product_index"] if norm in mapped or mapped in norm),
+                ""
+            )
+        resolved[name] = company
+    return resolved
+
+def _map_distinct(series, func):
+    """Apply a scalar function once per distinct value and broadcast the result"""
+    uniques = pd.unique(series)
+    return series.map(dict(zip(uniques, (func(v) for v in uniques))))
+
+def _distinct_str(series):
+    return _map_distinct(series, str).astype(object)
+
+def lookup_branches(exec_names, lookups):
+    """Executive names → comma-joined branch names ("" when unmapped)"""
+    return exec_names.astype(object).str.lower().map(lookups["exec_branches"]).fillna("").astype(object)
+
+def lookup_regions(branches, lookups):
+    """Single branch names → region name ("" when unmapped)"""
+    return branches.astype(object).str.strip().str.lower().map(lookups["branch_region"]).fillna("").astype(object)
+
+def _to_float_or_nan(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
 
 def process_sales_file(df, exec_code_col, product_col=None, exec_name_col=None, unit_col=None, quantity_col=None, value_col=None):
     df = df.copy()
@@ -354,72 +435,63 @@ def process_sales_file(df, exec_code_col, product_col=None, exec_name_col=None,
     if value_col:
         df["Value"] = ""
 
-    exec_found, branch_found, region_found, product_mapped = 0, 0, 0, 0
-
-    for idx, row in df.iterrows():
-        exec_name = None
-
-        # Try by code
-        exec_code = str(row[exec_code_col]).strip() if pd.notna(row[exec_code_col]) else None
-        if exec_code:
-            exec_name = get_exec_name_by_code(exec_code)
-            if exec_name:
-                exec_found += 1
-
-        # Fallback by name
-        if not exec_name and exec_name_col and pd.notna(row[exec_name_col]):
-            potential_name = str(row[exec_name_col]).strip()
-            if Executive.query.filter_by(name=potential_name).first():
-                exec_name = potential_name
-                exec_found += 1
-
-        # Update executive name
-        if exec_name and exec_name_col and exec_name_col in df.columns:
-            df.at[idx, exec_name_col] = exec_name
-
-        # Get branch
-        if exec_name:
-            branch = get_branches_for_exec(exec_name)
-            if branch:
-                df.at[idx, "Branch"] = branch
-                branch_found += 1
-
-                if "," not in branch:
-                    region = get_region_for_branch(branch)
-                    if region:
-                        df.at[idx, "Region"] = region
-                        region_found += 1
-
-        # Product → Company
-        if product_col and pd.notna(row[product_col]):
-            product_name = str(row[product_col]).strip()
-            company = get_company_for_product(product_name)
-            if company:
-                df.at[idx, "Company Group"] = company
-                product_mapped += 1
-
-        # Quantity normalization
-        if unit_col and quantity_col and pd.notna(row[unit_col]) and pd.notna(row[quantity_col]):
-            try:
-                unit = str(row[unit_col]).strip().upper()
-                quantity = float(row[quantity_col])
-                if unit == "MT":
-                    actual = quantity
-                elif unit in ["KGS", "NOS"]:
-                    actual = quantity / 1000
-                else:
-                    actual = quantity
-                df.at[idx, "Actual Quantity"] = actual
-            except:
-                df.at[idx, "Actual Quantity"] = ""
-
-        # Value in lakhs
-        if value_col and pd.notna(row[value_col]):
-            try:
-                value = float(row[value_col])
-                df.at[idx, "Value"] = round(value / 100000, 2)
-            except:
-                df.at[idx, "Value"] = 0
+    lookups = get_mapping_snapshot()
+
+    # Executive: by code first, then fall back to the name column
+    codes = df[exec_code_col]
+    code_keys = _distinct_str(codes[codes.notna()]).str.strip()
+    code_keys = code_keys[code_keys != ""]
+    exec_names = code_keys.str.lower().map(lookups["exec_by_code"]).reindex(df.index).astype(object)
+
+    if exec_name_col:
+        names = df[exec_name_col]
+        name_keys = _distinct_str(names[names.notna()]).str.strip()
+        known = name_keys.str.lower().isin(lookups["exec_by_name"].keys())
+        fallback = name_keys[known].reindex(df.index)
+        exec_names = exec_names.fillna(fallback).astype(object)
+
+    has_exec = exec_names.notna()
+    exec_found = int(has_exec.sum())
+
+    if exec_name_col and exec_name_col in df.columns:
+        df.loc[has_exec, exec_name_col] = exec_names[has_exec]
+
+    # Branch and region through the preloaded indexes
+    branches = lookup_branches(exec_names[has_exec], lookups)
+    branches = branches[branches != ""]
+    df.loc[branches.index, "Branch"] = branches
+    branch_found = len(branches)
+
+    single = branches[~branches.str.contains(",", regex=False)]
+    regions = lookup_regions(single, lookups)
+    regions = regions[regions != ""]
+    df.loc[regions.index, "Region"] = regions
+    region_found = len(regions)
+
+    # Product → Company
+    product_mapped = 0
+    if product_col:
+        products = df.loc[df[product_col].notna(), product_col]
+        product_names = _distinct_str(products).str.strip()
+        companies = product_names.map(match_company_for_products(product_names, lookups)).astype(object)
+        companies = companies[companies != ""]
+        df.loc[companies.index, "Company Group"] = companies
+        product_mapped = len(companies)
+
+    # Quantity normalization
+    if unit_col and quantity_col:
+        present = df[unit_col].notna() & df[quantity_col].notna()
+        quantity = _map_distinct(df.loc[present, quantity_col], _to_float_or_nan)
+        unit = _distinct_str(df.loc[present, unit_col]).str.strip().str.upper()
+        actual = quantity.where(~unit.isin(["KGS", "NOS"]), quantity / 1000)
+        df.loc[present, "Actual Quantity"] = actual.astype(object).where(actual.notna(), "")
+
+    # Value in lakhs
+    if value_col:
+        present = df[value_col].notna()
+        value = _map_distinct(df.loc[present, value_col], _to_float_or_nan)
+        lakhs = (value / 100000).round(2)
+        df.loc[present, "Value"] = lakhs.astype(object).where(lakhs.notna(), 0)
 
     print(f"[Sales File] Total: {len(df)}, Execs: {exec_found}, Branches: {branch_found}, Regions: {region_found}, Products: {product_mapped}")
     return df
@@ -429,30 +501,28 @@ def process_sales_file(df, exec_code_col, product_col=None, exec_name_col=None,
 #################
 
 def get_branch_for_exec(exec_name):
-    exec_obj = Executive.query.filter_by(name=exec_name).first()
-    if not exec_obj:
-        return ""
-    branches = BranchExecutiveMap.query.filter_by(executive_id=exec_obj.id).all()
-    return ", ".join(sorted(set(b.branch.name for b in branches))) if branches else ""
-
-def get_region_for_branch(branch_name):
-    branch = Branch.query.filter_by(name=branch_name).first()
-    if not branch:
-        return ""
-    region_map = RegionBranchMap.query.filter_by(branch_id=branch.id).first()
-    return region_map.region.name if region_map else ""
+    return get_branches_for_executive(exec_name)
 
 def match_exec_name(exec_code_from_file):
-    exec_code_from_file = str(exec_code_from_file).strip().lower()
-    for exec in Executive.query.all():
-        db_code = exec.code.strip().lower() if exec.code else ""
-        if exec_code_from_file == db_code:
-            return exec.name
-    for exec in Executive.query.all():
-        db_code = exec.code.strip().lower() if exec.code else ""
-        if exec_code_from_file in db_code or db_code in exec_code_from_file:
-            return exec.name
-    return None
+    resolved = match_exec_names([exec_code_from_file], get_mapping_snapshot())
+    return next(iter(resolved.values()))
+
+def match_exec_names(exec_codes, lookups):
+    """
+    Resolve each distinct OS executive code once, with the same exact-then-substring
+    rules as match_exec_name but against the preloaded code index.
+    """
+    resolved = {}
+    for raw in pd.unique(exec_codes):
+        code = str(raw).strip().lower()
+        exec_name = next((name for db_code, name in lookups["exec_code_index"] if code == db_code), None)
+        if exec_name is None:
+            exec_name = next(
+                (name for db_code, name in lookups["exec_code_index"] if code in db_code or db_code in code),
+                None
+            )
+        resolved[raw] = exec_name
+    return resolved
 
 def process_os_file(df, exec_code_col):
     df = df.copy()
@@ -462,40 +532,35 @@ def process_os_file(df, exec_code_col):
         df["Region"] = ""
 
     total_rows = len(df)
-    exec_found_count = 0
-    branch_mapped_count = 0
-    region_mapped_count = 0
-    exec_not_found = []
-    branch_not_found = []
-
-    for idx, row in df.iterrows():
-        exec_name = None
-        if pd.notna(row[exec_code_col]):
-            exec_code = str(row[exec_code_col]).strip()
-            exec_name = match_exec_name(exec_code)
-
-            if exec_name:
-                exec_found_count += 1
-            else:
-                exec_not_found.append(exec_code)
-
-        if exec_name:
-            branch = get_branch_for_exec(exec_name)
-            if branch:
-                df.at[idx, "Branch"] = branch
-                branch_mapped_count += 1
-
-                if "," not in branch:
-                    region = get_region_for_branch(branch)
-                    if region:
-                        df.at[idx, "Region"] = region
-                        region_mapped_count += 1
-                    else:
-                        branch_not_found.append(branch)
-                else:
-                    df.at[idx, "Region"] = "Multiple Branches"
-            else:
-                branch_not_found.append(f"Executive: {exec_name}")
+    lookups = get_mapping_snapshot()
+
+    raw_codes = df[exec_code_col]
+    exec_codes = _distinct_str(raw_codes[raw_codes.notna()]).str.strip()
+    exec_names = exec_codes.map(match_exec_names(exec_codes, lookups)).astype(object)
+    found = exec_names.notna()
+    exec_found_count = int(found.sum())
+    exec_not_found = exec_codes[~found].tolist()
+
+    exec_names = exec_names[found]
+    branches = lookup_branches(exec_names, lookups)
+    mapped = branches[branches != ""]
+    df.loc[mapped.index, "Branch"] = mapped
+    branch_mapped_count = len(mapped)
+
+    multiple = mapped.str.contains(",", regex=False)
+    df.loc[mapped.index[multiple], "Region"] = "Multiple Branches"
+    single = mapped[~multiple]
+    regions = lookup_regions(single, lookups)
+    has_region = regions != ""
+    df.loc[regions.index[has_region], "Region"] = regions[has_region]
+    region_mapped_count = int(has_region.sum())
+
+    # Same row-ordered diagnostics as the per-row version
+    issues = pd.concat([
+        single[~has_region],
+        "Executive: " + exec_names[branches == ""],
+    ]).sort_index()
+    branch_not_found = issues.tolist()
 
     # Optional: add debug logging
     print(f"[OS FILE] Total Rows: {total_rows}")
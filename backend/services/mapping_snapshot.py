@@ -0,0 +1,163 @@
+# services/mapping_snapshot.py
+
+import threading
+
+import pandas as pd
+from flask import g, has_app_context
+from sqlalchemy.exc import IntegrityError
+
+from models.schema import *
+from extensions import db
+
+# The snapshot is rebuilt whenever mapping_versions.version moves. Writers bump
+# the version inside their own transaction (bump_mapping_version), so every
+# worker process sees the change on its next request.
+
+_lock = threading.Lock()
+_snapshot = None
+_version_row_ready = False
+
+
+### --------- Normalization ----------
+
+def normalize_customer_code(code):
+    if pd.isna(code):
+        return ""
+
+    code_str = str(code).strip()
+    try:
+        if '.' in code_str and code_str.replace('.', '').replace('-', '').isdigit():
+            float_val = float(code_str)
+            if float_val == int(float_val):
+                return str(int(float_val))
+    except (ValueError, OverflowError):
+        pass
+
+    return code_str
+
+def normalize_product_name(name):
+    return ' '.join(str(name).lower().strip().split())
+
+def lookup_key(value):
+    # MySQL's default collations compare case-insensitively, so the in-memory
+    # indexes do too; otherwise results would differ from the per-row queries.
+    return str(value).strip().lower()
+
+
+### --------- Version counter ----------
+
+def _ensure_version_row():
+    global _version_row_ready
+    if _version_row_ready:
+        return
+    # Own connection, so a caller's pending transaction is never committed early
+    with db.engine.begin() as conn:
+        MappingVersion.__table__.create(conn, checkfirst=True)
+        if conn.execute(MappingVersion.__table__.select().where(MappingVersion.id == 1)).first() is None:
+            try:
+                conn.execute(MappingVersion.__table__.insert().values(id=1, version=0))
+            except IntegrityError:
+                pass  # another worker inserted it first
+    _version_row_ready = True
+
+def current_mapping_version():
+    """Committed mapping version; read at most once per request"""
+    if has_app_context() and "mapping_version" in g:
+        return g.mapping_version
+    _ensure_version_row()
+    version = db.session.query(MappingVersion.version).filter_by(id=1).scalar() or 0
+    if has_app_context():
+        g.mapping_version = version
+    return version
+
+def bump_mapping_version():
+    """Mark the mapping tables as changed; call before committing a mutation"""
+    _ensure_version_row()
+    db.session.query(MappingVersion).filter_by(id=1).update(
+        {MappingVersion.version: MappingVersion.version + 1}, synchronize_session=False
+    )
+    if has_app_context():
+        g.pop("mapping_version", None)
+
+
+### --------- Snapshot ----------
+
+def _build_snapshot(version):
+    exec_rows = db.session.query(Executive.id, Executive.name, Executive.code).order_by(Executive.id).all()
+    branch_names = dict(db.session.query(Branch.id, Branch.name).all())
+    region_names = dict(db.session.query(Region.id, Region.name).all())
+
+    exec_by_code, exec_by_name = {}, {}
+    for _, name, code in exec_rows:
+        if code is not None:
+            exec_by_code.setdefault(lookup_key(code), name)
+        exec_by_name.setdefault(lookup_key(name), name)
+    exec_code_by_name = {name: code for _, name, code in exec_rows}
+    exec_code_index = [(code.strip().lower() if code else "", name) for _, name, code in exec_rows]
+    exec_names_by_id = {exec_id: name for exec_id, name, _ in exec_rows}
+
+    customer_exec, customer_by_code = {}, {}
+    for code, exec_id in db.session.query(Customer.code, Customer.executive_id).order_by(Customer.id).all():
+        exec_name = exec_names_by_id.get(exec_id)
+        customer_by_code.setdefault(lookup_key(code), exec_name)
+        if exec_name is not None:
+            customer_exec[normalize_customer_code(code)] = exec_name
+
+    exec_branch_sets = {}
+    for exec_id, branch_id in db.session.query(BranchExecutiveMap.executive_id, BranchExecutiveMap.branch_id).all():
+        if branch_id in branch_names:
+            exec_branch_sets.setdefault(exec_id, set()).add(branch_names[branch_id])
+    exec_branches = {}
+    for exec_id, name, _ in exec_rows:
+        if exec_id in exec_branch_sets:
+            exec_branches.setdefault(lookup_key(name), ", ".join(sorted(exec_branch_sets[exec_id])))
+
+    branch_region = {}
+    for branch_id, region_id in (db.session.query(RegionBranchMap.branch_id, RegionBranchMap.region_id)
+                                 .order_by(RegionBranchMap.id).all()):
+        if branch_id in branch_names and region_id in region_names:
+            branch_region.setdefault(lookup_key(branch_names[branch_id]), region_names[region_id])
+
+    product_company = (db.session.query(Product.name, Company.name)
+                       .select_from(CompanyProductMap)
+                       .join(Product, CompanyProductMap.product_id == Product.id)
+                       .join(Company, CompanyProductMap.company_id == Company.id)
+                       .order_by(CompanyProductMap.id).all())
+    product_index = [(normalize_product_name(product), company) for product, company in product_company]
+    product_exact = {}
+    for norm, company in product_index:
+        product_exact.setdefault(norm, company)
+
+    return {
+        "version": version,
+        "exec_by_code": exec_by_code,
+        "exec_by_name": exec_by_name,
+        "exec_code_by_name": exec_code_by_name,
+        "exec_code_index": exec_code_index,
+        "customer_exec": customer_exec,
+        "customer_by_code": customer_by_code,
+        "exec_branches": exec_branches,
+        "branch_region": branch_region,
+        "product_index": product_index,
+        "product_exact": product_exact,
+    }
+
+def get_mapping_snapshot():
+    """
+    Indexed, read-only view of the executive, customer, branch/region and
+    company/product mapping tables. Rebuilt only when the version moves.
+    """
+    global _snapshot
+    version = current_mapping_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot["version"] != version:
+        with _lock:
+            if _snapshot is None or _snapshot["version"] != version:
+                _snapshot = _build_snapshot(version)
+            snapshot = _snapshot
+    return snapshot
+
+def invalidate_mapping_snapshot():
+    global _snapshot
+    with _lock:
+        _snapshot = None
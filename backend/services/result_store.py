@@ -0,0 +1,138 @@
+# services/result_store.py
+
+import os
+import pickle
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from flask import session
+
+# Server-side home for processed tables and totals. Flask's default session is a
+# signed cookie, so anything put in it is re-serialized and sent back on every
+# request; routes keep their payloads here and put only the opaque handle in the
+# session. The store is per process: a handle that expired, was evicted or was
+# issued by another worker simply reads as missing and the caller reprocesses.
+# Readers get their own copy of the payload, so a route that edits what it read
+# cannot change what the next request sees.
+
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", 256 * 1024 * 1024))
+RESULT_STORE_TTL_SECONDS = int(os.getenv("RESULT_STORE_TTL_SECONDS", 2 * 60 * 60))
+
+_lock = threading.Lock()
+_entries = OrderedDict()     # handle -> (payload, nbytes, expires_at)
+_total_bytes = 0
+
+
+def _payload_nbytes(payload):
+    try:
+        return len(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return len(repr(payload))
+
+
+def _copy_payload(payload):
+    if isinstance(payload, dict):
+        return {key: _copy_payload(value) for key, value in payload.items()}
+    if isinstance(payload, list):
+        return [_copy_payload(value) for value in payload]
+    if hasattr(payload, 'copy'):
+        return payload.copy()  # DataFrames, Series, arrays, sets
+    return payload
+
+
+def _drop(handle):
+    global _total_bytes
+    entry = _entries.pop(handle, None)
+    if entry is not None:
+        _total_bytes -= entry[1]
+
+
+def _evict(now):
+    for handle in [h for h, entry in _entries.items() if entry[2] <= now]:
+        _drop(handle)
+    while _total_bytes > RESULT_STORE_MAX_BYTES and _entries:
+        _drop(next(iter(_entries)))
+
+
+### --------- Handles ----------
+
+def put_result(payload, ttl=None):
+    """Keep payload server-side and return its handle"""
+    global _total_bytes
+    nbytes = _payload_nbytes(payload)
+    handle = secrets.token_urlsafe(16)
+    if nbytes > RESULT_STORE_MAX_BYTES:
+        return handle  # larger than the whole budget; reads as missing
+
+    now = time.monotonic()
+    expires_at = now + (ttl if ttl is not None else RESULT_STORE_TTL_SECONDS)
+    with _lock:
+        _entries[handle] = (payload, nbytes, expires_at)
+        _total_bytes += nbytes
+        _evict(now)
+    return handle
+
+def get_result(handle):
+    """Copy of the payload stored under handle, or None when unknown or expired"""
+    if not handle:
+        return None
+    with _lock:
+        entry = _entries.get(handle)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            _drop(handle)
+            return None
+        _entries.move_to_end(handle)
+        payload = entry[0]
+    return _copy_payload(payload)
+
+def drop_result(handle):
+    with _lock:
+        _drop(handle)
+
+def result_store_stats():
+    with _lock:
+        return {
+            'entries': len(_entries),
+            'total_bytes': _total_bytes,
+            'max_bytes': RESULT_STORE_MAX_BYTES,
+            'ttl_seconds': RESULT_STORE_TTL_SECONDS,
+        }
+
+
+### --------- Session helpers ----------
+
+def store_in_session(key, payload):
+    """Store payload server-side and remember its handle under session[key]"""
+    previous = session.get(key)
+    if isinstance(previous, str):
+        drop_result(previous)
+    session[key] = put_result(payload)
+    return session[key]
+
+def load_from_session(key):
+    """Payload behind session[key]; stale handles are removed from the session"""
+    handle = session.get(key)
+    if handle is None:
+        return None
+    if not isinstance(handle, str):
+        session.pop(key, None)  # payload left in the cookie by older versions
+        return None
+    payload = get_result(handle)
+    if payload is None:
+        session.pop(key, None)
+    return payload
+
+def drop_from_session(key):
+    """Forget session[key] and its stored payload; True if the key was present"""
+    handle = session.pop(key, None)
+    if isinstance(handle, str):
+        drop_result(handle)
+    return handle is not None
+
+def session_keys(prefix):
+    """Session keys starting with prefix"""
+    return [key for key in session.keys() if key.startswith(prefix)]
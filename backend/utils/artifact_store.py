@@ -0,0 +1,214 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+from flask import send_file
+
+from utils.excel_cache import file_hash
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed store for generated decks and exports. An artifact is keyed
+# by a hash of what produced it: the generator kind and version, the request
+# payload (tables, column mapping, filters) and the contents of any input files.
+# Identical requests are then served from disk instead of being rendered
+# again. Each artifact is ARTIFACT_DIR/<key>.bin with a <key>.json sidecar
+# (download name, mimetype, size, kind); the least recently served artifacts
+# are evicted once the store grows past ARTIFACT_STORE_MAX_BYTES.
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", 512 * 1024 * 1024))
+ARTIFACT_STORE_ENABLED = os.getenv("ARTIFACT_STORE_ENABLED", "1") != "0"
+
+PPTX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+STATIC_LOGO_PATH = os.path.join("static", "logo.jpeg")
+
+_DATA_SUFFIX = '.bin'
+_META_SUFFIX = '.json'
+_CHUNK_SIZE = 1024 * 1024
+
+_evict_lock = threading.Lock()
+
+
+### --------- Keys ----------
+
+def artifact_key(kind, payload, input_files=(), version=1):
+    """
+    Key of the artifact a generator of the given kind and version builds from
+    payload (any JSON-serialisable request data) and the listed input files.
+    Missing input files count as absent rather than failing.
+    """
+    files = []
+    for path in input_files:
+        files.append(file_hash(path) if path and os.path.exists(path) else None)
+    material = json.dumps([kind, version, payload, files], sort_keys=True, default=str, separators=(',', ':'))
+    return f"{kind}-{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+
+def deck_artifact_key(kind, payload, version=1):
+    """Key of a deck built from payload; decks carry the static logo, so it counts as an input"""
+    return artifact_key(kind, payload, input_files=[STATIC_LOGO_PATH], version=version)
+
+
+def is_valid_key(key):
+    kind, _, digest = key.rpartition('-')
+    return bool(kind) and len(digest) == 64 and all(c in '0123456789abcdef' for c in digest) \
+        and all(c.isalnum() or c in '_-' for c in kind)
+
+
+def _data_path(key):
+    return os.path.join(ARTIFACT_DIR, key + _DATA_SUFFIX)
+
+
+def _meta_path(key):
+    return os.path.join(ARTIFACT_DIR, key + _META_SUFFIX)
+
+
+### --------- Lookup ----------
+
+def read_artifact_meta(key):
+    if not is_valid_key(key):
+        return None
+    try:
+        with open(_meta_path(key), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_artifact(key):
+    """(path, meta) of a stored artifact, or None; marks it as recently used"""
+    if not ARTIFACT_STORE_ENABLED:
+        return None
+    meta = read_artifact_meta(key)
+    path = _data_path(key)
+    if meta is None or not os.path.exists(path):
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return path, meta
+
+
+def send_cached_artifact(key):
+    """send_file response for a stored artifact, or None on a miss"""
+    found = find_artifact(key)
+    if found is None:
+        return None
+    path, meta = found
+    logger.info(f"Serving stored artifact {key} ({meta.get('name')})")
+    return send_file(
+        os.path.abspath(path),
+        as_attachment=True,
+        download_name=meta.get('name'),
+        mimetype=meta.get('mimetype') or 'application/octet-stream'
+    )
+
+
+### --------- Storing ----------
+
+def store_artifact(key, source, name, mimetype=PPTX_MIMETYPE, move=False):
+    """
+    Store a generated file under key. source is bytes, a file object (read from
+    the start and rewound afterwards) or a path (moved into the store when
+    move is set). Returns the stored path, or None if storing failed or the
+    store is disabled; the caller keeps serving its own copy either way.
+    """
+    if not ARTIFACT_STORE_ENABLED or not is_valid_key(key):
+        return None
+    try:
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=ARTIFACT_DIR, suffix='.tmp')
+        if isinstance(source, (str, os.PathLike)):
+            os.close(fd)
+            if move:
+                shutil.move(source, tmp_path)
+            else:
+                shutil.copyfile(source, tmp_path)
+        else:
+            with os.fdopen(fd, 'wb') as out:
+                if hasattr(source, 'read'):
+                    source.seek(0)
+                    shutil.copyfileobj(source, out, _CHUNK_SIZE)
+                    source.seek(0)
+                else:
+                    out.write(source)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, _data_path(key))
+
+        meta = {
+            'key': key,
+            'kind': key.rpartition('-')[0],
+            'name': name,
+            'mimetype': mimetype,
+            'size': size,
+            'created_at': datetime.now().isoformat()
+        }
+        fd, tmp_meta = tempfile.mkstemp(dir=ARTIFACT_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, _meta_path(key))
+    except OSError as e:
+        logger.warning(f"Could not store artifact {key}: {e}")
+        return None
+
+    evict_artifacts()
+    return _data_path(key)
+
+
+### --------- Listing and eviction ----------
+
+def list_artifacts():
+    """Metadata of every stored artifact, most recently used first"""
+    if not os.path.isdir(ARTIFACT_DIR):
+        return []
+    found = []
+    for entry in os.scandir(ARTIFACT_DIR):
+        if not entry.name.endswith(_DATA_SUFFIX):
+            continue
+        key = entry.name[:-len(_DATA_SUFFIX)]
+        meta = read_artifact_meta(key)
+        if meta is None:
+            continue
+        try:
+            last_used = entry.stat().st_mtime
+        except OSError:
+            continue
+        meta['last_used'] = datetime.fromtimestamp(last_used).isoformat()
+        found.append((last_used, meta))
+    found.sort(key=lambda item: item[0], reverse=True)
+    return [meta for _, meta in found]
+
+
+def delete_artifact(key):
+    if not is_valid_key(key):
+        return False
+    removed = False
+    for path in (_data_path(key), _meta_path(key)):
+        try:
+            os.remove(path)
+            removed = True
+        except OSError:
+            pass
+    return removed
+
+
+def evict_artifacts(max_bytes=None):
+    """Drop least recently used artifacts until the store fits in max_bytes"""
+    max_bytes = ARTIFACT_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        artifacts = list_artifacts()
+        total = sum(meta.get('size') or 0 for meta in artifacts)
+        while artifacts and total > max_bytes:
+            meta = artifacts.pop()
+            delete_artifact(meta['key'])
+            total -= meta.get('size') or 0
+            logger.info(f"Evicted artifact {meta['key']} ({meta.get('size')} bytes)")
+        return total
@@ -5,6 +5,8 @@ import re
 from datetime import datetime
 import warnings
 
+from utils.auditor.table_locator import find_header_rows
+
 warnings.filterwarnings('ignore')
 
 class DataProcessor:
@@ -31,38 +33,38 @@ class DataProcessor:
         df.columns = cols
         return df
 
-    def extract_tables(self, df, possible_headers, is_product_analysis=False):
-        """Extract tables from Excel sheet based on header patterns"""
-        for i in range(len(df)):
-            row_text = ' '.join(df.iloc[i].astype(str).str.lower().tolist())
-            for header in possible_headers:
-                if header.lower() in row_text:
-                    # Check for budget/actual style headers
-                    potential_header = df.iloc[i]
-                    if any(str(col).strip().lower().startswith(('budget-', 'act-', 'ly-', 'gr.', 'ach.')) for col in potential_header[1:]):
-                        data_start = i + 2 if i + 2 < len(df) else i + 1
-                        if data_start < len(df):
-                            first_col = str(df.iloc[data_start, 0]).strip().upper()
-                            identifier_cols = ['REGIONS', 'REGION', 'BRANCH', 'ORGANIZATION', 'ORGANIZATION NAME'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
-                            if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
-                                return i, data_start
+    def extract_tables(self, df, possible_headers, is_product_analysis=False, header_rows=None):
+        """Extract tables from Excel sheet based on header patterns.
+        header_rows: candidate row positions already located with find_header_rows()"""
+        if header_rows is None:
+            header_rows = find_header_rows(df, {'table': possible_headers}, skip_blank=False)['table']
+        for i in header_rows:
+            # Check for budget/actual style headers
+            potential_header = df.iloc[i]
+            if any(str(col).strip().lower().startswith(('budget-', 'act-', 'ly-', 'gr.', 'ach.')) for col in potential_header[1:]):
+                data_start = i + 2 if i + 2 < len(df) else i + 1
+                if data_start < len(df):
+                    first_col = str(df.iloc[data_start, 0]).strip().upper()
+                    identifier_cols = ['REGIONS', 'REGION', 'BRANCH', 'ORGANIZATION', 'ORGANIZATION NAME'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
+                    if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
+                        return i, data_start
                         
-                        data_start = i + 1
-                        if data_start < len(df):
-                            first_col = str(df.iloc[data_start, 0]).strip().upper()
-                            if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
-                                return i, data_start
+                data_start = i + 1
+                if data_start < len(df):
+                    first_col = str(df.iloc[data_start, 0]).strip().upper()
+                    if any(r in first_col for r in identifier_cols) or first_col in ['ACCLLP', 'TOTAL SALES']:
+                        return i, data_start
                     
-                    # Try alternative approach
-                    for j in range(i + 1, min(i + 5, len(df))):
-                        if j >= len(df):
-                            break
-                        row = df.iloc[j]
-                        first_col = str(row.iloc[0]).strip().upper()
-                        identifier_cols = ['REGIONS', 'REGION', 'BRANCH'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
-                        if any(r in first_col for r in identifier_cols):
-                            header_row = j - 1 if j > 0 else j
-                            return header_row, j
+            # Try alternative approach
+            for j in range(i + 1, min(i + 5, len(df))):
+                if j >= len(df):
+                    break
+                row = df.iloc[j]
+                first_col = str(row.iloc[0]).strip().upper()
+                identifier_cols = ['REGIONS', 'REGION', 'BRANCH'] if not is_product_analysis else ['PRODUCT', 'PRODUCT GROUP', 'PRODUCT NAME', 'ACETIC ACID', 'AUXILARIES', 'CSF', 'TOTAL']
+                if any(r in first_col for r in identifier_cols):
+                    header_row = j - 1 if j > 0 else j
+                    return header_row, j
         
         return None, None
 
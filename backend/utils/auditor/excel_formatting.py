@@ -1,8 +1,11 @@
 # Create this file: utilities/excel_formatting.py
 
 import pandas as pd
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, GradientFill
+from openpyxl.styles import Border, Side
 import logging
+from utils.auditor.style_cache import (
+    interned_font, interned_pattern_fill, interned_gradient_fill, interned_alignment, interned_border
+)
 
 logger = logging.getLogger(__name__)
 
@@ -14,76 +17,81 @@ def copy_cell_comprehensive_formatting(source_cell, target_cell, excel_formattin
         # Copy basic value
         target_cell.value = source_cell.value
         
+        # Style objects are interned: one instance per distinct attribute set, shared by all cells
         # Font formatting with all properties
-        if source_cell.font:
-            target_cell.font = Font(
-                name=source_cell.font.name or 'Calibri',
-                size=source_cell.font.size or 11,
-                bold=source_cell.font.bold or False,
-                italic=source_cell.font.italic or False,
-                vertAlign=source_cell.font.vertAlign,
-                underline=source_cell.font.underline or 'none',
-                strike=source_cell.font.strike or False,
-                color=source_cell.font.color,
-                charset=source_cell.font.charset,
-                family=source_cell.font.family,
-                scheme=source_cell.font.scheme
+        font = source_cell.font
+        if font:
+            target_cell.font = interned_font(
+                name=font.name or 'Calibri',
+                size=font.size or 11,
+                bold=font.bold or False,
+                italic=font.italic or False,
+                vertAlign=font.vertAlign,
+                underline=font.underline or 'none',
+                strike=font.strike or False,
+                color=font.color,
+                charset=font.charset,
+                family=font.family,
+                scheme=font.scheme
             )
         
         # Fill/Background formatting with gradient support
-        if source_cell.fill and source_cell.fill.fill_type:
-            if source_cell.fill.fill_type == 'solid':
-                target_cell.fill = PatternFill(
-                    fill_type=source_cell.fill.fill_type,
-                    start_color=source_cell.fill.start_color,
-                    end_color=source_cell.fill.end_color
+        fill = source_cell.fill
+        if fill and fill.fill_type:
+            if fill.fill_type == 'solid':
+                target_cell.fill = interned_pattern_fill(
+                    fill_type=fill.fill_type,
+                    start_color=fill.start_color,
+                    end_color=fill.end_color
                 )
-            elif source_cell.fill.fill_type in ['linear', 'path']:
+            elif fill.fill_type in ['linear', 'path']:
                 # Handle gradient fills
                 try:
-                    target_cell.fill = GradientFill(
-                        type=source_cell.fill.type,
-                        degree=getattr(source_cell.fill, 'degree', 0),
-                        left=getattr(source_cell.fill, 'left', 0),
-                        right=getattr(source_cell.fill, 'right', 0),
-                        top=getattr(source_cell.fill, 'top', 0),
-                        bottom=getattr(source_cell.fill, 'bottom', 0),
-                        stop=getattr(source_cell.fill, 'stop', [])
+                    target_cell.fill = interned_gradient_fill(
+                        type=fill.type,
+                        degree=getattr(fill, 'degree', 0),
+                        left=getattr(fill, 'left', 0),
+                        right=getattr(fill, 'right', 0),
+                        top=getattr(fill, 'top', 0),
+                        bottom=getattr(fill, 'bottom', 0),
+                        stop=getattr(fill, 'stop', [])
                     )
                 except:
                     # Fallback to pattern fill if gradient fails
-                    target_cell.fill = PatternFill(
+                    target_cell.fill = interned_pattern_fill(
                         fill_type='solid',
-                        start_color=source_cell.fill.start_color,
-                        end_color=source_cell.fill.end_color
+                        start_color=fill.start_color,
+                        end_color=fill.end_color
                     )
         
         # Enhanced alignment formatting
-        if source_cell.alignment:
-            target_cell.alignment = Alignment(
-                horizontal=source_cell.alignment.horizontal,
-                vertical=source_cell.alignment.vertical,
-                text_rotation=source_cell.alignment.text_rotation or 0,
-                wrap_text=source_cell.alignment.wrap_text or False,
-                shrink_to_fit=source_cell.alignment.shrink_to_fit or False,
-                indent=source_cell.alignment.indent or 0,
-                relativeIndent=getattr(source_cell.alignment, 'relativeIndent', 0),
-                justifyLastLine=getattr(source_cell.alignment, 'justifyLastLine', False),
-                readingOrder=getattr(source_cell.alignment, 'readingOrder', 0)
+        alignment = source_cell.alignment
+        if alignment:
+            target_cell.alignment = interned_alignment(
+                horizontal=alignment.horizontal,
+                vertical=alignment.vertical,
+                text_rotation=alignment.text_rotation or 0,
+                wrap_text=alignment.wrap_text or False,
+                shrink_to_fit=alignment.shrink_to_fit or False,
+                indent=alignment.indent or 0,
+                relativeIndent=getattr(alignment, 'relativeIndent', 0),
+                justifyLastLine=getattr(alignment, 'justifyLastLine', False),
+                readingOrder=getattr(alignment, 'readingOrder', 0)
             )
         
         # Comprehensive border formatting
-        if source_cell.border:
-            target_cell.border = Border(
-                left=source_cell.border.left,
-                right=source_cell.border.right,
-                top=source_cell.border.top,
-                bottom=source_cell.border.bottom,
-                diagonal=source_cell.border.diagonal,
-                diagonal_direction=source_cell.border.diagonal_direction,
-                outline=getattr(source_cell.border, 'outline', True),
-                vertical=getattr(source_cell.border, 'vertical', None),
-                horizontal=getattr(source_cell.border, 'horizontal', None)
+        border = source_cell.border
+        if border:
+            target_cell.border = interned_border(
+                left=border.left,
+                right=border.right,
+                top=border.top,
+                bottom=border.bottom,
+                diagonal=border.diagonal,
+                diagonal_direction=border.diagonal_direction,
+                outline=getattr(border, 'outline', True),
+                vertical=getattr(border, 'vertical', None),
+                horizontal=getattr(border, 'horizontal', None)
             )
         
         # Enhanced number formatting with custom format preservation
@@ -1,16 +1,14 @@
 import re
-from fuzzywuzzy import process
+
+from utils.auditor.table_locator import find_header_rows
 
 def extract_tables(df, possible_headers, is_product_analysis=False):
-    for i in range(len(df)):
-        row_text = ' '.join(df.iloc[i].astype(str).str.lower().tolist())
-        for header in possible_headers:
-            if header.lower() in row_text:
-                for j in range(i + 1, min(i + 5, len(df))):
-                    row = df.iloc[j]
-                    first_col = str(row.iloc[0]).strip().upper()
-                    if any(x in first_col for x in ['REGIONS', 'BRANCH', 'PRODUCT']):
-                        return i, j
+    for i in find_header_rows(df, {'table': possible_headers}, skip_blank=False)['table']:
+        for j in range(i + 1, min(i + 5, len(df))):
+            row = df.iloc[j]
+            first_col = str(row.iloc[0]).strip().upper()
+            if any(x in first_col for x in ['REGIONS', 'BRANCH', 'PRODUCT']):
+                return i, j
     raise ValueError(f"Could not locate table header. Tried: {', '.join(possible_headers)}")
 
 def rename_columns(columns):
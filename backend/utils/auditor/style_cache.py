@@ -0,0 +1,47 @@
+from functools import lru_cache
+
+from openpyxl.styles import Font, Alignment, PatternFill, Border, GradientFill
+
+# Interned openpyxl style objects for sheet copies. Copying a workbook cell by
+# cell used to build a new Font/Fill/Border/Alignment for every cell, although
+# a sheet only has a handful of distinct styles. Here each style is built once
+# per distinct attribute tuple and the same (immutable) instance is assigned
+# to every cell that needs it, across cells, sheets and workbooks.
+
+STYLE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=STYLE_CACHE_SIZE)
+def _interned(style_class, attrs):
+    return style_class(**dict(attrs))
+
+
+def _intern(style_class, attrs):
+    # attribute values are plain values or hashable openpyxl objects (Color, Side, Stop)
+    return _interned(style_class, tuple(attrs.items()))
+
+
+def interned_font(**attrs):
+    return _intern(Font, attrs)
+
+
+def interned_pattern_fill(**attrs):
+    return _intern(PatternFill, attrs)
+
+
+def interned_gradient_fill(**attrs):
+    if 'stop' in attrs:
+        attrs['stop'] = tuple(attrs['stop'])
+    return _intern(GradientFill, attrs)
+
+
+def interned_alignment(**attrs):
+    return _intern(Alignment, attrs)
+
+
+def interned_border(**attrs):
+    return _intern(Border, attrs)
+
+
+def style_cache_info():
+    return _interned.cache_info()
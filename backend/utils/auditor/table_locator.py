@@ -0,0 +1,67 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Auditor-format sheets stack several tables (SALES in MT, SALES in Value, ...)
+# under title rows. The text of every row is built once per sheet from the raw
+# values, and all header sets are matched with one compiled regex, instead of an
+# iterrows()/iloc join and a substring scan per row for every header list.
+
+MT_TABLE_HEADERS = [
+    "SALES in MT", "SALES IN MT", "Sales in MT", "SALES IN TONNAGE", "SALES IN TON",
+    "Tonnage", "TONNAGE", "Tonnage Sales", "Sales Tonnage", "Metric Tons", "MT Sales"
+]
+
+VALUE_TABLE_HEADERS = [
+    "SALES in Value", "SALES IN VALUE", "Sales in Value", "SALES IN RS", "VALUE SALES",
+    "Value", "VALUE", "Sales Value"
+]
+
+
+def sheet_row_text(df, skip_blank=True, strip_cells=False):
+    """
+    ' '.join(str(cell) for cell in row) for every row, as a Series aligned with df.
+    skip_blank leaves out missing cells; otherwise they read as 'nan'/'None'.
+    """
+    values = df.to_numpy(dtype=object)
+    keep = df.notna().to_numpy() if skip_blank else np.ones(values.shape, dtype=bool)
+    fmt = (lambda v: str(v).strip()) if strip_cells else str
+    text = [' '.join(fmt(v) for v in row[mask]) for row, mask in zip(values, keep)]
+    return pd.Series(text, index=df.index, dtype=object)
+
+
+def literal_pattern(headers):
+    """Regex alternation matching any of the header strings literally"""
+    unique = sorted(set(headers), key=len, reverse=True)
+    return '|'.join(re.escape(h) for h in unique)
+
+
+def _compile_sets(patterns, flags):
+    # One optional lookahead per set, so every set is tested against the whole row
+    parts = [f"(?:(?=.*?(?P<{name}>{source})))?" for name, source in patterns.items()]
+    return re.compile('^' + ''.join(parts), flags | re.DOTALL)
+
+
+def find_pattern_rows(df, patterns, skip_blank=True, strip_cells=False, flags=re.IGNORECASE, row_text=None):
+    """
+    Row positions whose text matches each regex in `patterns` (dict name -> regex source),
+    found in a single pass over the sheet. Returns dict name -> ascending positions.
+    """
+    if row_text is None:
+        row_text = sheet_row_text(df, skip_blank=skip_blank, strip_cells=strip_cells)
+    if row_text.empty:
+        return {name: [] for name in patterns}
+    found = row_text.str.extract(_compile_sets(patterns, flags))
+    return {name: found[name].notna().to_numpy().nonzero()[0].tolist() for name in patterns}
+
+
+def find_header_rows(df, header_sets, skip_blank=True, strip_cells=False, row_text=None):
+    """Row positions containing any header of each set (dict name -> header strings), case-insensitive"""
+    patterns = {name: literal_pattern(headers) for name, headers in header_sets.items()}
+    return find_pattern_rows(df, patterns, skip_blank=skip_blank, strip_cells=strip_cells, row_text=row_text)
+
+
+def first_header_row(df, headers, skip_blank=True, strip_cells=False):
+    """Index label of the first row containing any of the headers, or None"""
+    rows = find_header_rows(df, {'table': headers}, skip_blank=skip_blank, strip_cells=strip_cells)['table']
+    return df.index[rows[0]] if rows else None
@@ -0,0 +1,92 @@
+import os
+import hashlib
+import logging
+import tempfile
+
+from utils.excel_cache import invalidate_file
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed blob store for uploaded workbooks. A blob is stored once
+# under the sha256 of its bytes, as BLOB_STORE_DIR/<namespace>/<ab>/<sha256>.bin,
+# so the same workbook saved twice takes the space of one and database rows
+# only carry the digest. Blobs are written through a temporary file while
+# being hashed, so neither the upload nor the stored file is held in memory
+# whole. Namespaces keep stores with separate owners (the mapping tables, the
+# monthly_files database) from releasing each other's blobs.
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "blobs")
+DEFAULT_NAMESPACE = "files"
+
+_DATA_SUFFIX = '.bin'
+_CHUNK_SIZE = 1024 * 1024
+
+
+def is_valid_digest(digest):
+    return isinstance(digest, str) and len(digest) == 64 and all(c in '0123456789abcdef' for c in digest)
+
+
+def blob_path(digest, namespace=DEFAULT_NAMESPACE):
+    return os.path.join(BLOB_STORE_DIR, namespace, digest[:2], digest + _DATA_SUFFIX)
+
+
+def has_blob(digest, namespace=DEFAULT_NAMESPACE):
+    return is_valid_digest(digest) and os.path.exists(blob_path(digest, namespace))
+
+
+def _chunks(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+        return
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from iter(lambda: f.read(_CHUNK_SIZE), b'')
+        return
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    yield from iter(lambda: source.read(_CHUNK_SIZE), b'')
+
+
+def put_blob(source, namespace=DEFAULT_NAMESPACE):
+    """
+    Store bytes, a file object (read from the start) or a file path; returns
+    (sha256, size). Storing content that is already there is a no-op.
+    """
+    root = os.path.join(BLOB_STORE_DIR, namespace)
+    os.makedirs(root, exist_ok=True)
+    sha, size = hashlib.sha256(), 0
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in _chunks(source):
+                sha.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        digest = sha.hexdigest()
+        target = blob_path(digest, namespace)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return digest, size
+
+
+def delete_blob(digest, namespace=DEFAULT_NAMESPACE):
+    """Remove a blob and its Excel cache sidecars"""
+    if not is_valid_digest(digest):
+        return False
+    path = blob_path(digest, namespace)
+    invalidate_file(path)
+    try:
+        os.remove(path)
+    except OSError:
+        return False
+    logger.info(f"Deleted blob {digest} from {namespace}")
+    return True
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+
+# Branch and area name canonicalization. OS and sales files spell a branch many
+# ways ('PONDY', 'AAAA - PUDUCHERRY', 'Puducherry - PDY'); the tables below map
+# them to one name. Whole columns are resolved per distinct value: the column
+# is factorized into category codes, each distinct raw value goes through the
+# memoized rule once, and the results are broadcast back by code. A 300k-row
+# OS file with 40 area spellings costs 40 resolutions, and fewer once they
+# are cached across requests.
+
+BRANCH_NAME_CACHE_SIZE = 65536
+
+# Substrings identifying a branch in an upper-cased area name, in match order
+AREA_VARIATIONS = {
+    'PUDUCHERRY': ('PUDUCHERRY', 'PONDY', 'PONDICHERRY', 'PUDUCHERI'),
+    'COIMBATORE': ('COIMBATORE', 'CBE', 'COIMBATURE'),
+    'KARUR': ('KARUR', 'KRR'),
+    'MADURAI': ('MADURAI', 'MDU', 'MADURA'),
+    'CHENNAI': ('CHENNAI', 'CHN'),
+}
+AREA_PREFIXES = ('AAAA - ', 'BBB - ', 'ASIA CRYSTAL COMMODITY LLP - ')
+AREA_SEPARATORS = (' - ', '-', ':')
+
+# Branch codes and spellings of the budget and sales files
+BRANCH_ALIASES = {
+    'PONDY': 'PUDUCHERRY', 'PDY': 'PUDUCHERRY', 'Puducherry - PDY': 'PUDUCHERRY',
+    'COVAI': 'COIMBATORE', 'CBE': 'COIMBATORE', 'Coimbatore - CBE': 'COIMBATORE',
+    'ERD': 'ERODE', 'Erode - ERD': 'ERODE', 'ERD002': 'ERODE', 'ERD001': 'ERODE',
+    'ERDTD1': 'ERODE', 'ERD003': 'ERODE', 'ERD004': 'ERODE', 'ERD005': 'ERODE',
+    'ERD007': 'ERODE',
+    'KRR': 'KARUR',
+    'Chennai - CHN': 'CHENNAI', 'CHN': 'CHENNAI',
+    'Tirupur - TPR': 'TIRUPUR', 'TPR': 'TIRUPUR',
+    'Madurai - MDU': 'MADURAI', 'MDU': 'MADURAI',
+    'POULTRY': 'POULTRY', 'Poultry - PLT': 'POULTRY',
+    'SALEM': 'SALEM', 'Salem - SLM': 'SALEM',
+    'HO': 'HO',
+    'SLM002': 'SALEM', 'SLMTD1': 'SALEM',
+    'BHV1': 'BHAVANI',
+    'CBU': 'COIMBATORE',
+    'VLR': 'VELLORE',
+    'TRZ': 'TRICHY',
+    'TVL': 'TIRUNELVELI',
+    'NGS': 'NAGERCOIL',
+    'PONDICHERRY': 'PUDUCHERRY',
+    'BLR': 'BANGALORE', 'BANGALORE': 'BANGALORE', 'BGLR': 'BANGALORE'
+}
+
+_AREA_MATCHES = tuple(
+    (variation, name) for name, variations in AREA_VARIATIONS.items() for variation in variations
+)
+
+
+### --------- Single values ----------
+
+@lru_cache(maxsize=BRANCH_NAME_CACHE_SIZE)
+def _area_name(area):
+    area_upper = area.upper()
+
+    # Skip HO entries
+    if area_upper == 'HO' or area_upper.endswith('-HO'):
+        return None
+
+    for variation, name in _AREA_MATCHES:
+        if variation in area_upper:
+            return name
+
+    for prefix in AREA_PREFIXES:
+        if area_upper.startswith(prefix):
+            return area[len(prefix):].strip().upper()
+
+    for sep in AREA_SEPARATORS:
+        if sep in area_upper:
+            return area_upper.split(sep)[-1].strip()
+
+    return area_upper
+
+
+def area_name(area):
+    """Standard branch name of an OS/sales area value; None for blanks and HO"""
+    if pd.isna(area):
+        return None
+    area = str(area).strip()
+    if not area:
+        return None
+    return _area_name(area)
+
+
+@lru_cache(maxsize=BRANCH_NAME_CACHE_SIZE)
+def _branch_alias_name(branch):
+    branch = branch.strip().upper()
+    if ' - ' in branch:
+        branch = branch.split(' - ')[-1].strip()
+    return BRANCH_ALIASES.get(branch, branch)
+
+
+def branch_alias_name(branch_name):
+    """Budget/sales branch value resolved through BRANCH_ALIASES; 'Unknown' for blanks"""
+    if pd.isna(branch_name):
+        return 'Unknown'
+    return _branch_alias_name(str(branch_name))
+
+
+def executive_name(executive):
+    """Upper-cased executive name; 'BLANK' for null/empty"""
+    if pd.isna(executive) or str(executive).strip() == '':
+        return 'BLANK'
+    return str(executive).strip().upper()
+
+
+### --------- Columns ----------
+
+def canonicalize_series(series, resolve):
+    """resolve(value) for every row of series, evaluated once per distinct value"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    resolved = np.empty(len(uniques) + 1, dtype=object)
+    resolved[:-1] = [resolve(value) for value in uniques]
+    resolved[-1] = resolve(None)  # code -1: missing values
+    return pd.Series(resolved[codes], index=series.index, name=series.name)
+
+
+def area_names(series):
+    return canonicalize_series(series, area_name)
+
+
+def branch_alias_names(series):
+    return canonicalize_series(series, branch_alias_name)
+
+
+def executive_names(series):
+    return canonicalize_series(series, executive_name)
@@ -3,71 +3,34 @@ import numpy as np
 import os
 from datetime import datetime
 import logging
+from utils.excel_cache import read_excel_cached
+from utils.month_keys import month_keys, month_mask
+from utils.column_resolver import map_fields
+from utils.branch_names import branch_alias_names
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Mappings from branch.py
-branch_mapping = {
-    'PONDY': 'PUDUCHERRY', 'PDY': 'PUDUCHERRY', 'Puducherry - PDY': 'PUDUCHERRY',
-    'COVAI': 'COIMBATORE', 'CBE': 'COIMBATORE', 'Coimbatore - CBE': 'COIMBATORE',
-    'ERD': 'ERODE', 'Erode - ERD': 'ERODE', 'ERD002': 'ERODE', 'ERD001': 'ERODE',
-    'ERDTD1': 'ERODE', 'ERD003': 'ERODE', 'ERD004': 'ERODE', 'ERD005': 'ERODE',
-    'ERD007': 'ERODE',
-    'KRR': 'KARUR',
-    'Chennai - CHN': 'CHENNAI', 'CHN': 'CHENNAI',
-    'Tirupur - TPR': 'TIRUPUR', 'TPR': 'TIRUPUR',
-    'Madurai - MDU': 'MADURAI', 'MDU': 'MADURAI',
-    'POULTRY': 'POULTRY', 'Poultry - PLT': 'POULTRY',
-    'SALEM': 'SALEM', 'Salem - SLM': 'SALEM',
-    'HO': 'HO',
-    'SLM002': 'SALEM', 'SLMTD1': 'SALEM',
-    'BHV1': 'BHAVANI',
-    'CBU': 'COIMBATORE',
-    'VLR': 'VELLORE',
-    'TRZ': 'TRICHY',
-    'TVL': 'TIRUNELVELI',
-    'NGS': 'NAGERCOIL',
-    'PONDICHERRY': 'PUDUCHERRY',
-    'BLR': 'BANGALORE', 'BANGALORE': 'BANGALORE', 'BGLR': 'BANGALORE'
-}
-
 # -------------------- UTILITY MAPPING FUNCTIONS --------------------
 
-def map_branch(branch_name):
-    if pd.isna(branch_name):
-        return 'Unknown'
-    branch_str = str(branch_name).strip().upper()
-    if ' - ' in branch_str:
-        branch_str = branch_str.split(' - ')[-1].strip()
-    return branch_mapping.get(branch_str, branch_str)
-
-def find_column_by_names(columns, target_names):
-    columns_upper = [col.upper() for col in columns]
-    target_names_upper = [name.upper() for name in target_names]
-    for target in target_names_upper:
-        if target in columns_upper:
-            return columns[columns_upper.index(target)]
-    return None
-
 def auto_map_budget_columns(sales_columns, budget_columns):
-    sales_mapping = {
-        'date': find_column_by_names(sales_columns, ['Date', 'Bill Date', 'Invoice Date']),
-        'value': find_column_by_names(sales_columns, ['Value', 'Invoice Value', 'Amount']),
-        'product_group': find_column_by_names(sales_columns, ['Type (Make)', 'Product Group', 'Type', 'Make']),
-        'area': find_column_by_names(sales_columns, ['Branch', 'Area', 'Location']),
-        'quantity': find_column_by_names(sales_columns, ['Actual Quantity', 'Quantity', 'Qty']),
-        'sl_code': find_column_by_names(sales_columns, ['Customer Code', 'SL Code', 'Customer ID']),
-        'executive': find_column_by_names(sales_columns, ['Executive', 'Sales Executive', 'Executive Name'])
-    }
-    budget_mapping = {
-        'area': find_column_by_names(budget_columns, ['Branch', 'Area', 'Location']),
-        'quantity': find_column_by_names(budget_columns, ["Qty – Apr'25", 'Quantity', 'Qty', 'Budget Qty']),
-        'sl_code': find_column_by_names(budget_columns, ['SL Code', 'Customer Code', 'Customer ID']),
-        'value': find_column_by_names(budget_columns, ["Value – Apr'25", 'Value', 'Budget Value', 'Amount']),
-        'product_group': find_column_by_names(budget_columns, ['Product Group', 'Type(Make)', 'Product', 'Type']),
-        'executive': find_column_by_names(budget_columns, ['Executive Name', 'Executive', 'Sales Executive'])
-    }
+    sales_mapping = map_fields(sales_columns, {
+        'date': 'sales_date',
+        'value': 'sales_value',
+        'product_group': 'sales_product_group',
+        'area': 'branch',
+        'quantity': 'sales_qty',
+        'sl_code': 'customer_code',
+        'executive': 'executive'
+    })
+    budget_mapping = map_fields(budget_columns, {
+        'area': 'branch',
+        'quantity': 'budget_qty',
+        'sl_code': 'sl_code',
+        'value': 'budget_value',
+        'product_group': 'budget_product_group',
+        'executive': 'executive'
+    })
     return sales_mapping, budget_mapping
 
 # -------------------- CORE BUDGET VS BILLED CALCULATION --------------------
@@ -102,8 +65,8 @@ def calculate_budget_vs_billed(data):
     sales_path = os.path.join('uploads', data['sales_filename'])
     budget_path = os.path.join('uploads', data['budget_filename'])
 
-    sales_df = pd.read_excel(sales_path, sheet_name=data['sales_sheet'], header=data['sales_header'] - 1, dtype=str)
-    budget_df = pd.read_excel(budget_path, sheet_name=data['budget_sheet'], header=data['budget_header'] - 1, dtype=str)
+    sales_df = read_excel_cached(sales_path, sheet_name=data['sales_sheet'], header=data['sales_header'] - 1, dtype=str)
+    budget_df = read_excel_cached(budget_path, sheet_name=data['budget_sheet'], header=data['budget_header'] - 1, dtype=str)
 
     # Convert and clean numeric and date columns
     sales_df[data['sales_date_col']] = pd.to_datetime(sales_df[data['sales_date_col']], dayfirst=True, errors='coerce')
@@ -122,18 +85,17 @@ def calculate_budget_vs_billed(data):
     sales_df = sales_df[sales_df[data['sales_exec_col']].isin(selected_sales_execs)]
     budget_df = budget_df[budget_df[data['budget_exec_col']].isin(selected_budget_execs)]
 
-    sales_df = sales_df[sales_df[data['sales_date_col']].dt.strftime('%b %y') == selected_month]
+    sales_df = sales_df[month_mask(month_keys(sales_df[data['sales_date_col']]), selected_month)]
 
     # Map branches
-    sales_df[data['sales_area_col']] = sales_df[data['sales_area_col']].map(map_branch)
-    budget_df[data['budget_area_col']] = budget_df[data['budget_area_col']].map(map_branch)
+    sales_df[data['sales_area_col']] = branch_alias_names(sales_df[data['sales_area_col']])
+    budget_df[data['budget_area_col']] = branch_alias_names(budget_df[data['budget_area_col']])
 
     # Filter branches
     sales_df = sales_df[sales_df[data['sales_area_col']].isin(selected_branches)]
     budget_df = budget_df[budget_df[data['budget_area_col']].isin(selected_branches)]
 
     # ---------------- Budget Matching Logic ----------------
-    results = []
     budget_grouped = budget_df.groupby([
         data['budget_area_col'],
         data['budget_sl_code_col'],
@@ -148,35 +110,27 @@ def calculate_budget_vs_billed(data):
         (budget_grouped[data['budget_value_col']] > 0)
     ]
 
-    for _, row in valid_budget.iterrows():
-        branch = row[data['budget_area_col']]
-        sl_code = row[data['budget_sl_code_col']]
-        product = row[data['budget_product_group_col']]
-        budget_qty = row[data['budget_qty_col']]
-        budget_val = row[data['budget_value_col']]
-
-        sales_match = sales_df[
-            (sales_df[data['sales_area_col']] == branch) &
-            (sales_df[data['sales_sl_code_col']] == sl_code) &
-            (sales_df[data['sales_product_group_col']] == product)
-        ]
-
-        sales_qty = sales_match[data['sales_qty_col']].sum()
-        sales_val = sales_match[data['sales_value_col']].sum()
-
-        results.append({
-            'Branch': branch,
-            'SL_Code': sl_code,
-            'Product': product,
-            'Budget_Qty': budget_qty,
-            'Sales_Qty': sales_qty,
-            'Final_Qty': budget_qty if sales_qty > budget_qty else sales_qty,
-            'Budget_Value': budget_val,
-            'Sales_Value': sales_val,
-            'Final_Value': budget_val if sales_val > budget_val else sales_val
-        })
-
-    df = pd.DataFrame(results)
+    # Hash join: aggregate sales once per (area, SL code, product group) instead of
+    # scanning the whole sales frame for every budget line
+    budget_keys = [data['budget_area_col'], data['budget_sl_code_col'], data['budget_product_group_col']]
+    sales_grouped = sales_df.groupby([
+        data['sales_area_col'],
+        data['sales_sl_code_col'],
+        data['sales_product_group_col']
+    ]).agg(
+        Sales_Qty=(data['sales_qty_col'], 'sum'),
+        Sales_Value=(data['sales_value_col'], 'sum')
+    )
+
+    df = valid_budget[budget_keys + [data['budget_qty_col'], data['budget_value_col']]].copy()
+    df.columns = ['Branch', 'SL_Code', 'Product', 'Budget_Qty', 'Budget_Value']
+    matched = sales_grouped.reindex(pd.MultiIndex.from_frame(valid_budget[budget_keys]))
+    df['Sales_Qty'] = matched['Sales_Qty'].fillna(0).to_numpy()
+    df['Sales_Value'] = matched['Sales_Value'].fillna(0).to_numpy()
+    df['Final_Qty'] = df['Sales_Qty'].where(df['Sales_Qty'] <= df['Budget_Qty'], df['Budget_Qty'])
+    df['Final_Value'] = df['Sales_Value'].where(df['Sales_Value'] <= df['Budget_Value'], df['Budget_Value'])
+    df = df[['Branch', 'SL_Code', 'Product', 'Budget_Qty', 'Sales_Qty', 'Final_Qty',
+             'Budget_Value', 'Sales_Value', 'Final_Value']].reset_index(drop=True)
 
     # ---- Quantity Summary
     qty_summary = df.groupby('Branch')[['Budget_Qty', 'Final_Qty']].sum().reset_index()
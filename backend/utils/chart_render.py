@@ -0,0 +1,180 @@
+import os
+import io
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from utils.process_pool import get_pool, reset_pool, in_pool_worker
+
+logger = logging.getLogger(__name__)
+
+# Chart images for the PPT exports. A chart is a job: a module-level draw
+# function, draw(fig, spec), plus a spec of plain data. Jobs are drawn on a
+# per-thread Agg figure that is created once and cleared between charts, under
+# an rc set resolved once per style, so nothing touches pyplot's global state.
+# Rendered PNGs are cached by a hash of the job, and the misses of a whole deck
+# are rendered in a process pool (serially when already inside a pool worker).
+
+CHART_DPI = int(os.getenv("CHART_DPI", 300))
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+CHART_FIGSIZE = (10, 6)
+CHART_POOL = 'chart_render'
+
+ChartJob = namedtuple('ChartJob', ['draw', 'spec', 'style', 'rc'], defaults=(None, None))
+
+_local = threading.local()
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()     # job hash -> PNG bytes
+_cache_bytes = 0
+
+
+### --------- Styles and canvas ----------
+
+@lru_cache(maxsize=16)
+def _style_items(style):
+    if style is None:
+        return ()
+    # Styles renamed in matplotlib 3.6 ('seaborn' -> 'seaborn-v0_8') resolve to their new name
+    name = style
+    if name not in matplotlib.style.available and name != 'default':
+        renamed = name.replace('seaborn', 'seaborn-v0_8', 1)
+        if renamed in matplotlib.style.available:
+            name = renamed
+    with matplotlib.style.context(name):
+        params = dict(matplotlib.rcParams)
+    blacklist = matplotlib.style.core.STYLE_BLACKLIST
+    return tuple((key, value) for key, value in params.items() if key not in blacklist)
+
+
+def style_rc(style, rc=None):
+    """rcParams of a named matplotlib style (None: current settings), updated with rc"""
+    params = dict(_style_items(style))
+    if rc:
+        params.update(rc)
+    return params
+
+
+def _figure(style):
+    """This thread's canvas for a style, created on first use"""
+    figures = getattr(_local, 'figures', None)
+    if figures is None:
+        figures = _local.figures = {}
+    fig = figures.get(style)
+    if fig is None:
+        fig = Figure(figsize=CHART_FIGSIZE)
+        FigureCanvasAgg(fig)
+        figures[style] = fig
+    return fig
+
+
+def draw_png(job, dpi=None):
+    """Draw one job and return the PNG bytes"""
+    with matplotlib.rc_context(style_rc(job.style, job.rc)):
+        fig = _figure(job.style)
+        try:
+            job.draw(fig, job.spec)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=dpi or CHART_DPI, bbox_inches='tight')
+        finally:
+            fig.clear()
+            fig.subplots_adjust(**{
+                key: matplotlib.rcParams[f'figure.subplot.{key}']
+                for key in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+            })
+    return buffer.getvalue()
+
+
+### --------- Cache ----------
+
+def job_key(job, dpi=None):
+    """Content hash of a job: draw function, spec, style and resolution"""
+    rc = tuple(sorted(job.rc.items())) if job.rc else None
+    payload = (job.draw.__module__, job.draw.__qualname__, job.spec, job.style, rc, dpi or CHART_DPI)
+    return hashlib.blake2b(pickle.dumps(payload, protocol=4), digest_size=20).hexdigest()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+        return png
+
+
+def _cache_put(key, png):
+    global _cache_bytes
+    if len(png) > CHART_CACHE_MAX_BYTES:
+        return
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = png
+        _cache_bytes += len(png)
+        while _cache_bytes > CHART_CACHE_MAX_BYTES:
+            _, old = _cache.popitem(last=False)
+            _cache_bytes -= len(old)
+
+
+def chart_cache_stats():
+    with _cache_lock:
+        return {'entries': len(_cache), 'total_bytes': _cache_bytes, 'max_bytes': CHART_CACHE_MAX_BYTES}
+
+
+### --------- Rendering ----------
+
+def _draw_or_none(job, dpi):
+    try:
+        return draw_png(job, dpi)
+    except Exception as e:
+        logger.error(f"Error rendering chart: {e}", exc_info=True)
+        return None
+
+
+def render_chart(job, dpi=None):
+    """PNG bytes of one chart, or None if drawing failed"""
+    return render_charts([job], dpi)[0]
+
+
+def render_charts(jobs, dpi=None):
+    """
+    PNG bytes for every job (None where drawing failed), in order. Cached charts
+    are reused; the rest are drawn in the process pool when there are several.
+    """
+    keys = [job_key(job, dpi) for job in jobs]
+    results = [_cache_get(key) for key in keys]
+    missing = {}
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            missing.setdefault(key, i)
+
+    pending = list(missing.items())
+    if CHART_RENDER_WORKERS > 1 and len(pending) > 1 and not in_pool_worker():
+        try:
+            pool = get_pool(CHART_POOL, CHART_RENDER_WORKERS)
+            futures = [pool.submit(_draw_or_none, jobs[i], dpi) for _, i in pending]
+            rendered = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            logger.warning(f"Chart render pool failed ({e}); rendering serially")
+            reset_pool(CHART_POOL)
+            rendered = [_draw_or_none(jobs[i], dpi) for _, i in pending]
+    else:
+        rendered = [_draw_or_none(jobs[i], dpi) for _, i in pending]
+
+    pngs = {}
+    for (key, _), png in zip(pending, rendered):
+        pngs[key] = png
+        if png is not None:
+            _cache_put(key, png)
+    return [png if png is not None else pngs.get(key) for key, png in zip(keys, results)]
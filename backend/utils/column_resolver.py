@@ -0,0 +1,147 @@
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+# Column resolution shared by the upload routes and the auto-mapping helpers.
+# Candidate names are looked up in an index of normalized headers, first exactly
+# and then as a decorated prefix ('Qty' -> "Qty - Apr'25"); only names that
+# are still unresolved are scored fuzzily. Results are memoized per header
+# signature, so repeat uploads of the same layout resolve from the cache.
+#
+# The accepted header names for each field live in COLUMN_SYNONYMS, in priority
+# order; callers resolve a field by name instead of carrying their own lists.
+# Fields whose meaning differs between sheets (a budget's region vs its branch,
+# an auditor sheet's amount vs a sales report's value) are kept apart.
+
+RESOLVE_CACHE_SIZE = 4096
+
+# field -> candidate header names, best first
+COLUMN_SYNONYMS = {
+    # sales reports and auditor sales sheets
+    'sales_date': ['Date', 'Bill Date', 'Invoice Date', 'Month Format', 'Month'],
+    'sales_month': ['Month Format', 'Date', 'Month', 'Bill Date', 'Invoice Date'],
+    'sales_value': ['Value', 'Invoice Value', 'Amount', 'Sales Value'],
+    'sales_amount': ['Amount', 'Value', 'Sales Value', 'Total Amount', 'Sales Amount'],
+    'invoice_value': ['Invoice Value', 'Value', 'Amount'],
+    'sales_qty': ['Actual Quantity', 'Acutal Quantity', 'Acutal Qty', 'Actual Qty', 'Quantity',
+                  'Sales Quantity', 'Qty', 'Sales Qty', 'Volume'],
+    'sales_product_group': ['Type (Make)', 'Type(Make)', 'Product Group', 'Product', 'Type', 'Make'],
+    'customer_code': ['Customer Code', 'SL Code', 'Customer ID'],
+    # budgets
+    'budget_qty': ["Qty – Apr'25", 'Budget Quantity', 'Quantity', 'Qty', 'Budget Qty'],
+    'budget_value': ["Value – Apr'25", 'Budget Value', 'Value', 'Amount'],
+    'budget_product_group': ['Product Group', 'Type(Make)', 'Type (Make)', 'Product', 'Type'],
+    'sl_code': ['SL Code', 'Customer Code', 'Customer ID'],
+    # row identifiers of the auditor budget and last-year sheets
+    'product_name': ['Product', 'Product Group', 'PRODUCT NAME'],
+    'branch_or_region': ['Branch', 'Region', 'REGIONS'],
+    'region_or_branch': ['Region', 'Branch', 'REGIONS'],
+    # OS (outstanding) reports
+    'due_date': ['Due Date', 'Due_Date', 'DueDate'],
+    'os_due_date': ['Due Date', 'Due_Date', 'DueDate', 'Date'],  # falls back to the bill date
+    'ref_date': ['Ref. Date', 'Ref Date', 'Reference Date'],
+    'net_value': ['Net Value', 'NetValue', 'Amount', 'Value'],
+    'party_code': ['Party Code', 'SL Code', 'Customer Code'],
+    # shared
+    'executive': ['Executive Name', 'Executive', 'Sales Executive'],
+    'branch': ['Branch', 'Area', 'Location', 'Unit'],
+    'auditor_branch': ['Branch.1', 'Branch'],
+    'region': ['Region', 'Area Region', 'Zone', 'Area'],
+    'company_group': ['Company Group', 'Company', 'Group'],
+}
+
+
+def normalize_header(name, case_sensitive=False):
+    """Header text with surrounding/repeated whitespace collapsed (lower-cased unless case_sensitive)"""
+    text = ' '.join(str(name).split())
+    return text if case_sensitive else text.lower()
+
+
+@lru_cache(maxsize=256)
+def _header_index(columns, case_sensitive):
+    """(normalized header -> first column, ((normalized, column), ...) in sheet order)"""
+    exact = {}
+    pairs = []
+    for col in columns:
+        key = normalize_header(col, case_sensitive)
+        exact.setdefault(key, col)
+        pairs.append((key, col))
+    return exact, tuple(pairs)
+
+
+def _is_decorated(prefix, text):
+    """text is prefix plus a decoration such as " - Apr'25", " (Rs)" or " 2024", not another word"""
+    if not text.startswith(prefix):
+        return False
+    rest = text[len(prefix):].lstrip()
+    return not rest or not rest[0].isalpha()
+
+
+def _best_fuzzy(key, pairs, threshold):
+    matcher = SequenceMatcher(None, b=key)
+    best_col, best_score = None, 0
+    for col_key, col in pairs:
+        matcher.set_seq1(col_key)
+        # cheap upper bounds first; ratio() is the expensive part
+        if matcher.real_quick_ratio() * 100 < threshold or matcher.quick_ratio() * 100 < threshold:
+            continue
+        score = matcher.ratio() * 100
+        if score >= threshold and score > best_score:
+            best_col, best_score = col, score
+    return best_col
+
+
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def _resolve(columns, candidates, threshold, case_sensitive, fuzzy):
+    exact, pairs = _header_index(columns, case_sensitive)
+    keys = [normalize_header(name, case_sensitive) for name in candidates]
+
+    for key in keys:
+        if key in exact:
+            return exact[key]
+    if not fuzzy:
+        return None
+
+    for key in keys:
+        if not key:
+            continue
+        for col_key, col in pairs:
+            if _is_decorated(key, col_key):
+                return col
+
+    for key in keys:
+        col = _best_fuzzy(key, pairs, threshold)
+        if col is not None:
+            return col
+    return None
+
+
+def resolve_column(columns, candidates, threshold=80, case_sensitive=False, fuzzy=True):
+    """
+    First column matching one of `candidates` (tried in priority order):
+    exact normalized name, then decorated prefix, then best fuzzy score >= threshold.
+    With fuzzy=False only exact normalized names match.
+    """
+    if isinstance(candidates, str):
+        candidates = [candidates]
+    return _resolve(tuple(columns), tuple(candidates), threshold, case_sensitive, fuzzy)
+
+
+def resolve_field(columns, field, threshold=80, case_sensitive=False, fuzzy=True):
+    """resolve_column with the COLUMN_SYNONYMS candidates of field"""
+    return resolve_column(columns, COLUMN_SYNONYMS[field], threshold=threshold,
+                          case_sensitive=case_sensitive, fuzzy=fuzzy)
+
+
+def find_field(df, field, threshold=80, case_sensitive=False):
+    """Find the column of a COLUMN_SYNONYMS field by exact, prefix or fuzzy match"""
+    return resolve_field(df.columns, field, threshold=threshold, case_sensitive=case_sensitive)
+
+
+def map_fields(columns, fields, fuzzy=False):
+    """{key: column} for a dict of key -> COLUMN_SYNONYMS field"""
+    columns = tuple(columns)
+    return {key: resolve_field(columns, field, fuzzy=fuzzy) for key, field in fields.items()}
+
+
+def resolver_cache_info():
+    return _resolve.cache_info()
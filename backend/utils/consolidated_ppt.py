@@ -4,6 +4,8 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import uuid, os
+from utils.ppt_table import fill_table, body_rows, plain_texts, total_row_flags
+from utils.ppt_generator import BRANCH_TABLE_STYLE
 
 def _add_title_slide(prs, main_title):
     slide = prs.slides.add_slide(prs.slide_layouts[6])
@@ -54,36 +56,15 @@ def _add_table_slide(prs, title_text, df, percent_cols=None):
     for i in range(cols):
         table.columns[i].width = Inches(3)
 
-    for col_idx, col_name in enumerate(df.columns):
-        cell = table.cell(0, col_idx)
-        cell.text = str(col_name)
-        cell.text_frame.paragraphs[0].font.size = Pt(12)
-        cell.text_frame.paragraphs[0].font.bold = True
-        cell.fill.solid()
-        cell.fill.fore_color.rgb = RGBColor(0, 112, 192)
-        cell.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-        cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-
-    for row_idx in range(rows):
-        is_total = str(df.iloc[row_idx, 0]).upper() in ['TOTAL', 'GRAND TOTAL']
-        for col_idx in range(cols):
-            val = df.iloc[row_idx, col_idx]
-            cell = table.cell(row_idx + 1, col_idx)
-
-            if percent_cols and col_idx in percent_cols:
-                cell.text = f"{val}%" if pd.notnull(val) else ""
-            else:
-                cell.text = str(val)
-
-            cell.text_frame.paragraphs[0].font.size = Pt(11)
-            cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-            if is_total:
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(211, 211, 211)
-                cell.text_frame.paragraphs[0].font.bold = True
-            elif row_idx % 2 == 0:
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(240, 240, 240)
+    columns_text = []
+    for col_idx in range(cols):
+        column = df.iloc[:, col_idx]
+        texts = plain_texts(column)
+        if percent_cols and col_idx in percent_cols:
+            texts = [f"{text}%" if present else "" for text, present in zip(texts, column.notnull())]
+        columns_text.append(texts)
+    total_rows = total_row_flags(df.iloc[:, 0], ['TOTAL', 'GRAND TOTAL']) if cols else None
+    fill_table(table, [str(col) for col in df.columns], body_rows(columns_text), BRANCH_TABLE_STYLE, total_rows)
 
 def generate_consolidated_ppt(payload):
     prs = Presentation()
@@ -5,6 +5,8 @@ import logging
 import gc
 from flask import current_app
 
+from utils.auditor.table_locator import sheet_row_text, find_pattern_rows
+
 # Helper Functions
 def allowed_file(filename):
     allowed = current_app.config.get("ALLOWED_EXTENSIONS", {"xlsx", "xls"})
@@ -25,25 +27,23 @@ def safe_convert_value(x):
         return None
     
 def extract_tables(df, table1_header, table2_header):
-    table1_idx = table2_idx = None
-    for i in range(len(df)):
-        row_text = ' '.join(str(cell) for cell in df.iloc[i].values if pd.notna(cell)).upper()
-        
+    row_text = sheet_row_text(df).str.upper()
+    rows = find_pattern_rows(df, {
         # Skip unwanted tables (TS-PW & ERO-PW Monthly Budget tables)
-        if "MONTHLY BUDGET AND ACTUAL VALUES" in row_text:
-            continue
-            
+        'skip': re.escape("MONTHLY BUDGET AND ACTUAL VALUES"),
         # Handle table1 header (SALES IN MT / TONNAGE)
-        if table1_idx is None:
-            if (re.search(r'\bSALES\s*IN\s*MT\b', row_text, re.IGNORECASE) or
-                re.search(r'\bSALES\s*IN\s*TON(?:NAGE|AGE)\b', row_text, re.IGNORECASE)):
-                table1_idx = i
-                logging.debug(f"Table 1 header found at index {i}: {row_text}")
-                
+        'table1': r'\bSALES\s*IN\s*MT\b|\bSALES\s*IN\s*TON(?:NAGE|AGE)\b',
         # Handle table2 header (SALES IN VALUE)
-        if table2_idx is None and re.search(r'\bSALES\s*IN\s*VALUE\b', row_text, re.IGNORECASE):
-            table2_idx = i
-            logging.debug(f"Table 2 header found at index {i}: {row_text}")
+        'table2': r'\bSALES\s*IN\s*VALUE\b',
+    }, row_text=row_text)
+    skipped = set(rows['skip'])
+    
+    table1_idx = next((i for i in rows['table1'] if i not in skipped), None)
+    if table1_idx is not None:
+        logging.debug(f"Table 1 header found at index {table1_idx}: {row_text.iat[table1_idx]}")
+    table2_idx = next((i for i in rows['table2'] if i not in skipped), None)
+    if table2_idx is not None:
+        logging.debug(f"Table 2 header found at index {table2_idx}: {row_text.iat[table2_idx]}")
             
     if table1_idx is None:
         logging.warning("Table 1 header ('SALES IN MT' or 'SALES IN TONNAGE') not found")
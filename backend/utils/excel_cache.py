@@ -0,0 +1,405 @@
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # sidecars are an optimisation only
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for parsed DataFrames kept in memory (per process)
+EXCEL_CACHE_MAX_BYTES = int(os.getenv("EXCEL_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# Columnar (Feather) copies of parsed sheets. They live in their own directory,
+# never next to the workbook: upload folders take client-chosen file names.
+# A relative EXCEL_SIDECAR_DIR is taken from the backend directory, not from
+# wherever the server was started.
+EXCEL_SIDECARS_ENABLED = os.getenv("EXCEL_SIDECARS_ENABLED", "1") != "0" and feather is not None
+EXCEL_SIDECAR_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    os.getenv("EXCEL_SIDECAR_DIR", "excel_sidecars")
+)
+SIDECAR_SUFFIX = ".feather"
+
+_lock = threading.RLock()
+_frames = OrderedDict()      # (file_hash, sheet, header, options) -> (DataFrame, nbytes)
+_path_hashes = {}            # abs path -> (mtime_ns, size, file_hash)
+_sheet_names = {}            # file_hash -> [sheet names]
+_total_bytes = 0
+
+
+def file_hash(source):
+    """Return the sha1 of a file path, bytes or file-like object"""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha1(source).hexdigest()
+
+    if hasattr(source, "read"):
+        pos = source.tell() if hasattr(source, "tell") else None
+        if pos is not None:
+            source.seek(0)
+        digest = hashlib.sha1(source.read()).hexdigest()
+        if pos is not None:
+            source.seek(pos)
+        return digest
+
+    path = os.path.abspath(str(source))
+    stat = os.stat(path)
+    with _lock:
+        known = _path_hashes.get(path)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2]
+
+    sha = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    with _lock:
+        previous = _path_hashes.get(path)
+        _path_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        if previous and previous[2] != digest:
+            _drop_hash(previous[2])
+    if previous and previous[2] != digest:
+        _remove_sidecars(path)
+    return digest
+
+
+def _frame_nbytes(result):
+    if isinstance(result, dict):
+        return sum(_frame_nbytes(df) for df in result.values())
+    try:
+        return int(result.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+
+def _copy_result(result):
+    if isinstance(result, dict):
+        return {name: df.copy() for name, df in result.items()}
+    return result.copy()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, type):
+        return value.__name__
+    return value
+
+
+def _drop_hash(digest):
+    global _total_bytes
+    _sheet_names.pop(digest, None)
+    for key in [k for k in _frames if k[0] == digest]:
+        _, nbytes = _frames.pop(key)
+        _total_bytes -= nbytes
+
+
+def _store(key, result):
+    global _total_bytes
+    nbytes = _frame_nbytes(result)
+    if nbytes > EXCEL_CACHE_MAX_BYTES:
+        logger.info(f"Parsed sheet {key[1]!r} ({nbytes} bytes) exceeds cache budget, not cached")
+        return
+    with _lock:
+        if key in _frames:
+            _total_bytes -= _frames.pop(key)[1]
+        _frames[key] = (result, nbytes)
+        _total_bytes += nbytes
+        while _total_bytes > EXCEL_CACHE_MAX_BYTES and _frames:
+            _, (_, evicted) = _frames.popitem(last=False)
+            _total_bytes -= evicted
+
+
+# -------------------- COLUMNAR SIDECARS --------------------
+
+def _encode_label(label):
+    if isinstance(label, bool):
+        return None
+    if isinstance(label, str):
+        return ["s", label]
+    if isinstance(label, int):
+        return ["i", label]
+    if isinstance(label, float):
+        return ["f", label]
+    if isinstance(label, datetime):
+        return ["t", label.isoformat()]
+    return None
+
+
+def _decode_label(tagged):
+    kind, value = tagged
+    if kind == "t":
+        return pd.Timestamp(value).to_pydatetime()
+    return value
+
+
+# Object columns that are not plain text (numbers, text and dates mixed in one
+# Excel column) are stored as JSON-tagged strings, one per cell, so reading a
+# sidecar never deserializes anything but plain values.
+_VALUE_TAGS = (
+    (bool, "b", lambda v: v, lambda v: v),
+    (int, "i", lambda v: v, lambda v: v),
+    (float, "f", lambda v: v, lambda v: v),
+    (str, "s", lambda v: v, lambda v: v),
+    (pd.Timestamp, "T", lambda v: v.isoformat(), pd.Timestamp),
+    (datetime, "t", lambda v: v.isoformat(), datetime.fromisoformat),
+    (date, "d", lambda v: v.isoformat(), date.fromisoformat),
+    (time, "h", lambda v: v.isoformat(), time.fromisoformat),
+    (timedelta, "td", lambda v: v.total_seconds(), lambda v: timedelta(seconds=v)),
+)
+_TAG_DECODERS = {tag: decode for _, tag, _, decode in _VALUE_TAGS}
+# dtypes Arrow hands back unchanged; other non-object columns get no sidecar
+_NATIVE_KINDS = "biufM"
+
+
+def _encode_value(value):
+    if value is None:
+        return None
+    for value_type, tag, encode, _ in _VALUE_TAGS:
+        if type(value) is value_type:
+            return json.dumps([tag, encode(value)])
+    raise TypeError(f"no sidecar encoding for {type(value).__name__}")
+
+
+def _decode_value(encoded):
+    if encoded is None:
+        return None
+    tag, value = json.loads(encoded)
+    return _TAG_DECODERS[tag](value)
+
+
+def _null_kind(values):
+    """'nan', 'none' or 'mixed': what the missing cells of an object column hold"""
+    nulls = {type(v) for v in values if v is None or (isinstance(v, float) and v != v)}
+    if nulls <= {float}:
+        return "nan"
+    if nulls == {type(None)}:
+        return "none"
+    return "mixed"
+
+
+def _sidecar_path(path, key):
+    path_hash = hashlib.sha1(os.path.abspath(str(path)).encode("utf-8")).hexdigest()[:16]
+    key_hash = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(EXCEL_SIDECAR_DIR, f"{path_hash}.{key_hash}{SIDECAR_SUFFIX}")
+
+
+def _column_array(series):
+    """(Arrow array, encoding) of a column; encoding is None, 'nan', 'none' or 'tagged'"""
+    if series.dtype != object:
+        if series.dtype.kind not in _NATIVE_KINDS:
+            raise TypeError(f"no sidecar encoding for {series.dtype}")
+        return pa.Array.from_pandas(series), None
+
+    values = series.tolist()
+    null_kind = _null_kind(values)
+    if null_kind != "mixed":
+        try:
+            array = pa.Array.from_pandas(series)
+        except (pa.ArrowException, TypeError, ValueError):
+            array = None
+        # Only plain text survives the round trip as an object column
+        if array is not None and pa.types.is_string(array.type):
+            return array, null_kind
+    return pa.array([_encode_value(v) for v in values], type=pa.string()), "tagged"
+
+
+def _write_sidecar(path, key, df):
+    """Persist a parsed sheet as Feather; silently skipped for frames Arrow cannot hold"""
+    if not EXCEL_SIDECARS_ENABLED or not isinstance(df, pd.DataFrame):
+        return False
+    labels = [_encode_label(col) for col in df.columns]
+    if any(label is None for label in labels) or not isinstance(df.index, pd.RangeIndex):
+        return False
+    target = _sidecar_path(path, key)
+    try:
+        arrays, encodings = [], []
+        for i in range(len(df.columns)):
+            array, encoding = _column_array(df.iloc[:, i])
+            arrays.append(array)
+            encodings.append(encoding)
+        table = pa.Table.from_arrays(arrays, names=[f"c{i}" for i in range(len(df.columns))])
+        table = table.replace_schema_metadata({
+            b"excel_cache_columns": json.dumps(labels).encode("utf-8"),
+            b"excel_cache_encodings": json.dumps(encodings).encode("utf-8"),
+        })
+        os.makedirs(EXCEL_SIDECAR_DIR, exist_ok=True)
+        tmp = f"{target}.tmp"
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, target)
+        return True
+    except (pa.ArrowException, TypeError, ValueError, OSError) as e:
+        logger.debug(f"Sidecar skipped for {path} {key[1]!r}: {e}")
+        return False
+
+
+def _read_sidecar(path, key):
+    if not EXCEL_SIDECARS_ENABLED:
+        return None
+    target = _sidecar_path(path, key)
+    if not os.path.exists(target):
+        return None
+    try:
+        # Uncompressed Feather can be memory-mapped instead of read into the heap
+        table = feather.read_table(target, memory_map=True)
+        labels = json.loads(table.schema.metadata[b"excel_cache_columns"])
+        encodings = json.loads(table.schema.metadata[b"excel_cache_encodings"])
+        df = table.to_pandas()
+        for i, encoding in enumerate(encodings):
+            column = f"c{i}"
+            if encoding == "tagged":
+                values = [_decode_value(v) for v in df[column].tolist()]
+            elif encoding == "nan":
+                # Arrow turns NaN into null; pd.read_excel gives NaN for empty cells
+                values = df[column].to_numpy(dtype=object)
+                values[pd.isna(values)] = np.nan
+            else:
+                continue
+            df[column] = pd.Series(values, index=df.index, dtype=object)
+        df.columns = [_decode_label(label) for label in labels]
+        return df
+    except Exception as e:
+        logger.warning(f"Discarding unreadable sidecar {target}: {e}")
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        return None
+
+
+def _remove_sidecars(path):
+    prefix = os.path.basename(_sidecar_path(path, None)).split(".")[0]
+    for sidecar in glob.glob(os.path.join(glob.escape(EXCEL_SIDECAR_DIR), f"{prefix}.*{SIDECAR_SUFFIX}")):
+        try:
+            os.remove(sidecar)
+        except OSError:
+            pass
+
+
+def write_sidecars(path, header=0):
+    """
+    Parse every sheet of an uploaded workbook once and store it as a columnar sidecar.
+
+    Later read_excel_cached(path, sheet_name=<sheet>, header=<header>) calls, in
+    this or any other worker, load the sidecar instead of re-parsing the XML.
+    Returns the names of the sheets that got a sidecar.
+    """
+    if not EXCEL_SIDECARS_ENABLED:
+        return []
+    path = os.path.abspath(str(path))
+    digest = file_hash(path)
+    sheets = pd.read_excel(path, sheet_name=None, header=header)
+
+    written = []
+    with _lock:
+        _sheet_names[digest] = list(sheets.keys())
+    for sheet_name, df in sheets.items():
+        key = (digest, _freeze(sheet_name), _freeze(header), ())
+        _store(key, df)
+        if _write_sidecar(path, key, df):
+            written.append(sheet_name)
+    logger.info(f"Wrote {len(written)}/{len(sheets)} sidecars for {os.path.basename(path)}")
+    return written
+
+
+# -------------------- CACHED READERS --------------------
+
+def read_excel_cached(source, sheet_name=0, header=0, **kwargs):
+    """
+    Drop-in replacement for pd.read_excel backed by a process-wide LRU cache.
+
+    Entries are keyed by file content hash, sheet, header row and the remaining
+    read options, so a re-uploaded file with new content never hits a stale
+    entry. For files on disk a Feather sidecar is consulted before falling back
+    to openpyxl. Callers always receive a copy and may mutate it freely.
+    """
+    if hasattr(source, "read"):
+        source.seek(0)
+        source = source.read()
+
+    digest = file_hash(source)
+    if isinstance(sheet_name, int) and not isinstance(sheet_name, bool):
+        # Share entries (and sidecars) between positional and named lookups
+        names = get_sheet_names_cached(source)
+        if 0 <= sheet_name < len(names):
+            sheet_name = names[sheet_name]
+    key = (digest, _freeze(sheet_name), _freeze(header), _freeze(kwargs))
+
+    with _lock:
+        hit = _frames.get(key)
+        if hit is not None:
+            _frames.move_to_end(key)
+            return _copy_result(hit[0])
+
+    on_disk = not isinstance(source, (bytes, bytearray))
+    result = _read_sidecar(source, key) if on_disk else None
+    if result is None:
+        reader = source if on_disk else io.BytesIO(source)
+        result = pd.read_excel(reader, sheet_name=sheet_name, header=header, **kwargs)
+        if on_disk:
+            _write_sidecar(source, key, result)
+    _store(key, result)
+    return _copy_result(result)
+
+
+def get_sheet_names_cached(source):
+    """Sheet names of a workbook, memoized by file content hash"""
+    if hasattr(source, "read"):
+        source.seek(0)
+        source = source.read()
+
+    digest = file_hash(source)
+    with _lock:
+        names = _sheet_names.get(digest)
+    if names is None:
+        reader = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        with pd.ExcelFile(reader) as xls:
+            names = list(xls.sheet_names)
+        with _lock:
+            _sheet_names[digest] = names
+    return list(names)
+
+
+def invalidate_file(path):
+    """Forget every cached sheet and sidecar of a file, e.g. before it is re-uploaded"""
+    path = os.path.abspath(str(path))
+    with _lock:
+        known = _path_hashes.pop(path, None)
+        if known:
+            _drop_hash(known[2])
+    _remove_sidecars(path)
+
+
+def clear_cache():
+    global _total_bytes
+    with _lock:
+        _frames.clear()
+        _path_hashes.clear()
+        _sheet_names.clear()
+        _total_bytes = 0
+
+
+def cache_stats():
+    with _lock:
+        return {
+            "entries": len(_frames),
+            "bytes": _total_bytes,
+            "max_bytes": EXCEL_CACHE_MAX_BYTES,
+            "files": len(_path_hashes),
+        }
@@ -0,0 +1,78 @@
+import os
+import hashlib
+import tempfile
+from copy import copy
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+# Streaming workbook exports. Sheets are written row by row through openpyxl's
+# write-only mode, so rows go straight to the sheet's temporary XML instead of
+# living as cell objects until save. Cell styles are registered once per
+# workbook by name; every cell then reuses the resolved style instead of
+# assigning fresh Font/Fill/Border objects. The finished workbook is spooled
+# to a temporary file and sent from there in chunks.
+
+EXPORT_SPOOL_MAX_MEMORY = int(os.getenv("EXPORT_SPOOL_MAX_MEMORY", 8 * 1024 * 1024))
+_CHUNK_SIZE = 64 * 1024
+
+
+def new_streaming_workbook():
+    return openpyxl.Workbook(write_only=True)
+
+
+class StyleRegistry:
+    """
+    Named cell styles of one write-only workbook. styles maps a name to the
+    attributes to set (font, fill, border, alignment, number_format); each name
+    is resolved to the workbook's style indices on first use.
+    """
+
+    def __init__(self, styles):
+        self._specs = styles
+        self._resolved = {}
+
+    def cell(self, ws, value=None, style=None):
+        """WriteOnlyCell holding value, styled as the named style"""
+        cell = WriteOnlyCell(ws, value)
+        if style is None:
+            return cell
+        resolved = self._resolved.get(style)
+        if resolved is None:
+            for attr, attr_value in self._specs[style].items():
+                setattr(cell, attr, attr_value)
+            self._resolved[style] = copy(cell._style)
+        else:
+            cell._style = copy(resolved)
+        return cell
+
+
+def set_column_widths(ws, widths):
+    """Column widths in sheet order; on write-only sheets, before the first row"""
+    for col_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+
+def merge_row(ws, row, end_column):
+    ws.merged_cells.add(f"A{row}:{get_column_letter(end_column)}{row}")
+
+
+def save_to_spool(wb):
+    """Save wb to a spooled temporary file (in memory up to EXPORT_SPOOL_MAX_MEMORY), rewound"""
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY)
+    wb.save(spool)
+    spool.seek(0)
+    return spool
+
+
+def file_digest(fileobj):
+    """(size, md5 hex) of a file object, read in chunks; leaves it rewound"""
+    md5 = hashlib.md5()
+    size = 0
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(_CHUNK_SIZE), b''):
+        md5.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return size, md5.hexdigest()
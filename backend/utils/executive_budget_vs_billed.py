@@ -3,6 +3,11 @@ import numpy as np
 import os
 from pathlib import Path
 import logging
+import threading
+from collections import OrderedDict
+from utils.excel_cache import read_excel_cached, file_hash
+from utils.month_keys import month_keys, keys_for_labels, unique_month_labels
+from utils.column_resolver import resolve_field
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,84 @@ def extract_executive_name(executive):
         return 'BLANK'
     return str(executive).strip().upper()
 
+# Prepared (loaded, typed and normalized) sales/budget frames, keyed by file contents
+# and column mapping, so repeated requests and multi-month batches skip the reload
+_PREPARED_MAX_ENTRIES = 4
+_prepared_frames = OrderedDict()
+_prepared_lock = threading.Lock()
+
+def _normalize_text(series):
+    """astype(str).strip().upper(), evaluated once per distinct value"""
+    uniques = pd.unique(series)
+    normalized = dict(zip(uniques, (str(v).strip().upper() for v in uniques)))
+    return series.map(normalized).astype(object)
+
+def prepare_executive_frames(
+    sales_file_path, budget_file_path,
+    sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
+    budget_value, budget_quantity, budget_product_group, budget_sl_code, budget_executive, budget_area
+):
+    """
+    Load both files and normalize them once: numeric conversion, upper-cased
+    keys and an integer month key. Returns a dict of read-only frames, or a
+    dict with an 'error' key when mapped columns are missing.
+    """
+    key = (
+        file_hash(os.path.abspath(sales_file_path)), file_hash(os.path.abspath(budget_file_path)),
+        sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
+        budget_value, budget_quantity, budget_product_group, budget_sl_code, budget_executive, budget_area,
+    )
+    with _prepared_lock:
+        if key in _prepared_frames:
+            _prepared_frames.move_to_end(key)
+            return _prepared_frames[key]
+
+    sales_df = load_data(sales_file_path)
+    budget_df = load_data(budget_file_path)
+
+    print(f"Sales data loaded: {len(sales_df)} rows")
+    print(f"Budget data loaded: {len(budget_df)} rows")
+
+    # Validate column existence
+    required_sales_cols = [sales_date, sales_value, sales_quantity, sales_executive,
+                          sales_product_group, sales_sl_code, sales_area]
+    required_budget_cols = [budget_value, budget_quantity, budget_executive,
+                           budget_product_group, budget_sl_code, budget_area]
+
+    missing_sales_cols = [col for col in required_sales_cols if col and col not in sales_df.columns]
+    missing_budget_cols = [col for col in required_budget_cols if col and col not in budget_df.columns]
+
+    if missing_sales_cols:
+        return {"error": f"Missing columns in sales data: {missing_sales_cols}"}
+    if missing_budget_cols:
+        return {"error": f"Missing columns in budget data: {missing_budget_cols}"}
+
+    dates = pd.to_datetime(sales_df[sales_date], dayfirst=True, errors='coerce')
+    sales = pd.DataFrame({
+        'month': month_keys(dates),
+        'area': _normalize_text(sales_df[sales_area]),
+        'executive': _normalize_text(sales_df[sales_executive]),
+        'sl_code': _normalize_text(sales_df[sales_sl_code]),
+        'product': _normalize_text(sales_df[sales_product_group]),
+        'qty': pd.to_numeric(sales_df[sales_quantity], errors='coerce').fillna(0),
+        'value': pd.to_numeric(sales_df[sales_value], errors='coerce').fillna(0),
+    })
+    budget = pd.DataFrame({
+        'area': _normalize_text(budget_df[budget_area]),
+        'executive': _normalize_text(budget_df[budget_executive]),
+        'sl_code': _normalize_text(budget_df[budget_sl_code]),
+        'product': _normalize_text(budget_df[budget_product_group]),
+        'qty': pd.to_numeric(budget_df[budget_quantity], errors='coerce').fillna(0),
+        'value': pd.to_numeric(budget_df[budget_value], errors='coerce').fillna(0),
+    })
+
+    prepared = {'sales': sales, 'budget': budget}
+    with _prepared_lock:
+        _prepared_frames[key] = prepared
+        while len(_prepared_frames) > _PREPARED_MAX_ENTRIES:
+            _prepared_frames.popitem(last=False)
+    return prepared
+
 def calculate_executive_budget_vs_billed(
     sales_file_path, budget_file_path, 
     sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
@@ -21,366 +104,344 @@ def calculate_executive_budget_vs_billed(
     """
     Calculate executive budget vs billed analysis following the exact Streamlit logic
     """
+    return calculate_executive_budget_vs_billed_batch(
+        sales_file_path, budget_file_path,
+        sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
+        budget_value, budget_quantity, budget_product_group, budget_sl_code, budget_executive, budget_area,
+        selected_executives, [selected_months], selected_branches
+    )[0]
+
+def calculate_executive_budget_vs_billed_batch(
+    sales_file_path, budget_file_path,
+    sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
+    budget_value, budget_quantity, budget_product_group, budget_sl_code, budget_executive, budget_area,
+    selected_executives, month_selections, selected_branches=None
+):
+    """
+    Budget vs billed for several month selections in one pass.
+
+    month_selections is a list of month lists (e.g. [['Apr 25'], ['May 25'], ['Apr 25', 'May 25']]);
+    an empty selection means all months. Sales are aggregated once per
+    (month, executive, SL code, product) and every selection is answered from
+    that cube. Returns one result dict per selection, in order.
+    """
     try:
-        print("Starting executive budget vs billed calculation...")
-        
-        # Load data files
-        sales_df = load_data(sales_file_path)
-        budget_df = load_data(budget_file_path)
-        
-        print(f"Sales data loaded: {len(sales_df)} rows")
-        print(f"Budget data loaded: {len(budget_df)} rows")
-        
-        # Create copies to avoid modifying original DataFrames
-        sales_df = sales_df.copy()
-        budget_df = budget_df.copy()
-
-        # Validate column existence
-        required_sales_cols = [sales_date, sales_value, sales_quantity, sales_executive,
-                              sales_product_group, sales_sl_code, sales_area]
-        required_budget_cols = [budget_value, budget_quantity, budget_executive,
-                               budget_product_group, budget_sl_code, budget_area]
-        
-        missing_sales_cols = [col for col in required_sales_cols if col and col not in sales_df.columns]
-        missing_budget_cols = [col for col in required_budget_cols if col and col not in budget_df.columns]
-        
-        if missing_sales_cols:
-            return {"error": f"Missing columns in sales data: {missing_sales_cols}"}
-        if missing_budget_cols:
-            return {"error": f"Missing columns in budget data: {missing_budget_cols}"}
-
-        # Convert date and numeric columns
-        sales_df[sales_date] = pd.to_datetime(sales_df[sales_date], dayfirst=True, errors='coerce')
-        sales_df[sales_value] = pd.to_numeric(sales_df[sales_value], errors='coerce').fillna(0)
-        sales_df[sales_quantity] = pd.to_numeric(sales_df[sales_quantity], errors='coerce').fillna(0)
-        budget_df[budget_value] = pd.to_numeric(budget_df[budget_value], errors='coerce').fillna(0)
-        budget_df[budget_quantity] = pd.to_numeric(budget_df[budget_quantity], errors='coerce').fillna(0)
-
-        # Filter sales data for the selected months
-        if selected_months:
-            filtered_sales_df = sales_df[sales_df[sales_date].dt.strftime('%b %y').isin(selected_months)].copy()
-            if filtered_sales_df.empty:
-                return {"error": f"No sales data found for selected months: {selected_months}"}
-        else:
-            filtered_sales_df = sales_df.copy()
+        print(f"Starting executive budget vs billed calculation for {len(month_selections)} month selection(s)...")
 
-        # Standardize branch and executive names
-        filtered_sales_df[sales_area] = filtered_sales_df[sales_area].astype(str).str.strip().str.upper()
-        filtered_sales_df[sales_executive] = filtered_sales_df[sales_executive].astype(str).str.strip().str.upper()
-        budget_df[budget_area] = budget_df[budget_area].astype(str).str.strip().str.upper()
-        budget_df[budget_executive] = budget_df[budget_executive].astype(str).str.strip().str.upper()
-        
-        # Apply branch filter if provided
-        if selected_branches:
-            filtered_sales_df = filtered_sales_df[filtered_sales_df[sales_area].isin([b.upper() for b in selected_branches])]
-            budget_df = budget_df[budget_df[budget_area].isin([b.upper() for b in selected_branches])]
-            if filtered_sales_df.empty or budget_df.empty:
-                return {"error": f"No data found for selected branches: {', '.join(selected_branches)}"}
-
-        # Determine executives to display
-        if selected_branches:
-            branch_sales_df = filtered_sales_df[filtered_sales_df[sales_area].isin([b.upper() for b in selected_branches])]
-            branch_budget_df = budget_df[budget_df[budget_area].isin([b.upper() for b in selected_branches])]
-            branch_executives = sorted(set(branch_sales_df[sales_executive].dropna().unique()) | 
-                                     set(branch_budget_df[budget_executive].dropna().unique()))
-            
-            if selected_executives:
-                selected_execs_upper = [str(exec).strip().upper() for exec in selected_executives]
-                executives_to_display = [exec for exec in branch_executives if exec in selected_execs_upper]
-            else:
-                executives_to_display = branch_executives
+        prepared = prepare_executive_frames(
+            sales_file_path, budget_file_path,
+            sales_date, sales_value, sales_quantity, sales_product_group, sales_sl_code, sales_executive, sales_area,
+            budget_value, budget_quantity, budget_product_group, budget_sl_code, budget_executive, budget_area
+        )
+        if 'error' in prepared:
+            return [prepared for _ in month_selections]
+
+        sales = prepared['sales']
+        budget = prepared['budget']
+        month_rows = sales['month'].value_counts()
+
+        # Branch filter does not depend on the month, so apply it once
+        branches_upper = [b.upper() for b in selected_branches] if selected_branches else None
+        if branches_upper:
+            sales = sales[sales['area'].isin(branches_upper)]
+            budget = budget[budget['area'].isin(branches_upper)]
+
+        sales_cube = sales.groupby(['month', 'executive', 'sl_code', 'product'], sort=False)[['qty', 'value']].sum()
+        exec_month = sales.groupby(['month', 'executive'], sort=False)[['qty', 'value']].sum()
+        budget_grouped = budget.groupby(['executive', 'sl_code', 'product'])[['qty', 'value']].sum().reset_index()
+        budget_executives = set(budget['executive'])
+
+        results = []
+        for selected_months in month_selections:
+            results.append(_executive_budget_vs_billed_for_months(
+                selected_months, selected_executives, selected_branches, branches_upper,
+                month_rows, sales_cube, exec_month, budget_grouped, budget_executives
+            ))
+
+        print("Executive budget vs billed calculation completed successfully")
+        return results
+
+    except Exception as e:
+        print(f"Error in calculate_executive_budget_vs_billed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return [{
+            'success': False,
+            'error': f"Error calculating executive budget vs billed: {str(e)}"
+        } for _ in month_selections]
+
+def _executive_budget_vs_billed_for_months(
+    selected_months, selected_executives, selected_branches, branches_upper,
+    month_rows, sales_cube, exec_month, budget_grouped, budget_executives
+):
+    # Filter sales data for the selected months
+    if selected_months:
+        months = keys_for_labels(month_rows.index, selected_months)
+        if not month_rows.reindex(months).sum():
+            return {"error": f"No sales data found for selected months: {selected_months}"}
+        month_sales = exec_month[exec_month.index.get_level_values('month').isin(months)]
+        month_cube = sales_cube[sales_cube.index.get_level_values('month').isin(months)]
+    else:
+        month_sales = exec_month
+        month_cube = sales_cube
+
+    # Apply branch filter if provided
+    if branches_upper and (month_sales.empty or budget_grouped.empty):
+        return {"error": f"No data found for selected branches: {', '.join(selected_branches)}"}
+
+    # Determine executives to display
+    sales_executives = set(month_sales.index.get_level_values('executive'))
+    if branches_upper:
+        branch_executives = sorted(sales_executives | budget_executives)
+        if selected_executives:
+            selected_execs_upper = [str(exec).strip().upper() for exec in selected_executives]
+            executives_to_display = [exec for exec in branch_executives if exec in selected_execs_upper]
         else:
-            executives_to_display = [str(exec).strip().upper() for exec in selected_executives] if selected_executives else \
-                                    sorted(set(filtered_sales_df[sales_executive].dropna().unique()) | 
-                                          set(budget_df[budget_executive].dropna().unique()))
+            executives_to_display = branch_executives
+    else:
+        executives_to_display = [str(exec).strip().upper() for exec in selected_executives] if selected_executives else \
+                                sorted(sales_executives | budget_executives)
 
-        # Filter by selected executives
-        filtered_sales_df = filtered_sales_df[filtered_sales_df[sales_executive].isin(executives_to_display)].copy()
-        budget_filtered = budget_df[budget_df[budget_executive].isin(executives_to_display)].copy()
-        
-        if filtered_sales_df.empty or budget_filtered.empty:
-            return {"error": "No data found for selected executives."}
-
-        # Standardize SL codes and product groups
-        filtered_sales_df[sales_sl_code] = filtered_sales_df[sales_sl_code].astype(str).str.strip().str.upper()
-        filtered_sales_df[sales_product_group] = filtered_sales_df[sales_product_group].astype(str).str.strip().str.upper()
-        budget_filtered[budget_sl_code] = budget_filtered[budget_sl_code].astype(str).str.strip().str.upper()
-        budget_filtered[budget_product_group] = budget_filtered[budget_product_group].astype(str).str.strip().str.upper()
-
-        # Process Budget Data
-        budget_grouped = budget_filtered.groupby([
-            budget_executive, 
-            budget_sl_code, 
-            budget_product_group
-        ]).agg({
-            budget_quantity: 'sum',
-            budget_value: 'sum'
-        }).reset_index()
-        
-        budget_valid = budget_grouped[
-            (budget_grouped[budget_quantity] > 0) & 
-            (budget_grouped[budget_value] > 0)
-        ].copy()
-        
-        if budget_valid.empty:
-            return {"error": "No valid budget data found (with qty > 0 and value > 0)."}
-        
-        # Process Sales Data
-        final_results = []
-        
-        for _, budget_row in budget_valid.iterrows():
-            executive = budget_row[budget_executive]
-            sl_code = budget_row[budget_sl_code]
-            product = budget_row[budget_product_group]
-            budget_qty = budget_row[budget_quantity]
-            budget_val = budget_row[budget_value]
-            
-            matching_sales = filtered_sales_df[
-                (filtered_sales_df[sales_executive] == executive) &
-                (filtered_sales_df[sales_sl_code] == sl_code) &
-                (filtered_sales_df[sales_product_group] == product)
-            ]
-            
-            if not matching_sales.empty:
-                sales_qty_total = matching_sales[sales_quantity].sum()
-                sales_value_total = matching_sales[sales_value].sum()
-            else:
-                sales_qty_total = 0
-                sales_value_total = 0
-            
-            final_qty = budget_qty if sales_qty_total > budget_qty else sales_qty_total
-            final_value = budget_val if sales_value_total > budget_val else sales_value_total
-            
-            final_results.append({
-                'Executive': executive,
-                'SL_Code': sl_code,
-                'Product': product,
-                'Budget_Qty': budget_qty,
-                'Sales_Qty': sales_qty_total,
-                'Final_Qty': final_qty,
-                'Budget_Value': budget_val,
-                'Sales_Value': sales_value_total,
-                'Final_Value': final_value
-            })
-        
-        results_df = pd.DataFrame(final_results)
-        
-        # Aggregate by Executive
-        exec_qty_summary = results_df.groupby('Executive').agg({
-            'Budget_Qty': 'sum',
-            'Final_Qty': 'sum'
-        }).reset_index()
-        exec_qty_summary.columns = ['Executive', 'Budget Qty', 'Billed Qty']
-        
-        exec_value_summary = results_df.groupby('Executive').agg({
-            'Budget_Value': 'sum',
-            'Final_Value': 'sum'
-        }).reset_index()
-        exec_value_summary.columns = ['Executive', 'Budget Value', 'Billed Value']
-        
-        # NUCLEAR FIX: Completely rebuild DataFrames from scratch
-        # Build QUANTITY DataFrame from scratch
-        qty_data = []
-        for exec_name in executives_to_display:
-            # Find matching data in summary
-            exec_qty_row = exec_qty_summary[exec_qty_summary['Executive'] == exec_name]
-            
-            if not exec_qty_row.empty:
-                budget_val = round(float(exec_qty_row['Budget Qty'].iloc[0]), 2)
-                billed_val = round(float(exec_qty_row['Billed Qty'].iloc[0]), 2)
-            else:
-                budget_val = 0.0
-                billed_val = 0.0
-            
-            # Calculate percentage from scratch
-            if budget_val > 0:
-                percentage = round((billed_val / budget_val) * 100, 2)
-            else:
-                percentage = 0.0
-            
-            qty_data.append({
-                'Executive': exec_name,
-                'Budget Qty': budget_val,
-                'Billed Qty': billed_val,
-                '%': percentage
-            })
-        
-        # Create fresh DataFrame
-        budget_vs_billed_qty_df = pd.DataFrame(qty_data)
-        
-        # Build VALUE DataFrame from scratch
-        value_data = []
-        for exec_name in executives_to_display:
-            # Find matching data in summary
-            exec_value_row = exec_value_summary[exec_value_summary['Executive'] == exec_name]
-            
-            if not exec_value_row.empty:
-                budget_val = round(float(exec_value_row['Budget Value'].iloc[0]), 2)
-                billed_val = round(float(exec_value_row['Billed Value'].iloc[0]), 2)
-            else:
-                budget_val = 0.0
-                billed_val = 0.0
-            
-            # Calculate percentage from scratch
-            if budget_val > 0:
-                percentage = round((billed_val / budget_val) * 100, 2)
-            else:
-                percentage = 0.0
-            
-            value_data.append({
-                'Executive': exec_name,
-                'Budget Value': budget_val,
-                'Billed Value': billed_val,
-                '%': percentage
-            })
-        
-        # Create fresh DataFrame
-        budget_vs_billed_value_df = pd.DataFrame(value_data)
-        
-        # ADDITIONAL SAFETY CHECK: Force fix any remaining anomalies
-        # Check for any impossible percentages (non-zero % with zero budget and billed)
-        anomaly_mask_qty = (
-            (budget_vs_billed_qty_df['Budget Qty'] == 0) & 
-            (budget_vs_billed_qty_df['Billed Qty'] == 0) & 
-            (budget_vs_billed_qty_df['%'] != 0.0)
-        )
-        if anomaly_mask_qty.any():
-            budget_vs_billed_qty_df.loc[anomaly_mask_qty, '%'] = 0.0
-            print(f"🔧 SAFETY FIX: Reset {anomaly_mask_qty.sum()} anomalous quantity percentages to 0.0%")
-        
-        anomaly_mask_value = (
-            (budget_vs_billed_value_df['Budget Value'] == 0) & 
-            (budget_vs_billed_value_df['Billed Value'] == 0) & 
-            (budget_vs_billed_value_df['%'] != 0.0)
-        )
-        if anomaly_mask_value.any():
-            budget_vs_billed_value_df.loc[anomaly_mask_value, '%'] = 0.0
-            print(f"🔧 SAFETY FIX: Reset {anomaly_mask_value.sum()} anomalous value percentages to 0.0%")
-        
-        # Create Overall Sales DataFrames
-        overall_sales_data = filtered_sales_df.groupby(sales_executive).agg({
-            sales_quantity: 'sum',
-            sales_value: 'sum'
-        }).reset_index()
-        overall_sales_data.columns = ['Executive', 'Overall_Sales_Qty', 'Overall_Sales_Value']
-        
-        budget_totals = results_df.groupby('Executive').agg({
-            'Budget_Qty': 'sum',
-            'Budget_Value': 'sum'
-        }).reset_index()
-        
-        overall_sales_qty_df = pd.DataFrame({'Executive': executives_to_display})
-        overall_sales_qty_df = pd.merge(
-            overall_sales_qty_df,
-            budget_totals[['Executive', 'Budget_Qty']].rename(columns={'Budget_Qty': 'Budget Qty'}),
-            on='Executive',
-            how='left'
-        ).fillna({'Budget Qty': 0})
-        
-        overall_sales_qty_df = pd.merge(
-            overall_sales_qty_df,
-            overall_sales_data[['Executive', 'Overall_Sales_Qty']].rename(columns={'Overall_Sales_Qty': 'Billed Qty'}),
-            on='Executive',
-            how='left'
-        ).fillna({'Billed Qty': 0})
-        
-        overall_sales_value_df = pd.DataFrame({'Executive': executives_to_display})
-        overall_sales_value_df = pd.merge(
-            overall_sales_value_df,
-            budget_totals[['Executive', 'Budget_Value']].rename(columns={'Budget_Value': 'Budget Value'}),
-            on='Executive',
-            how='left'
-        ).fillna({'Budget Value': 0})
-        
-        overall_sales_value_df = pd.merge(
-            overall_sales_value_df,
-            overall_sales_data[['Executive', 'Overall_Sales_Value']].rename(columns={'Overall_Sales_Value': 'Billed Value'}),
-            on='Executive',
-            how='left'
-        ).fillna({'Billed Value': 0})
-        
-        # Add Total Rows
-        total_budget_qty = round(budget_vs_billed_qty_df['Budget Qty'].sum(), 2)
-        total_billed_qty = round(budget_vs_billed_qty_df['Billed Qty'].sum(), 2)
-        total_percentage_qty = round((total_billed_qty / total_budget_qty * 100), 2) if total_budget_qty > 0 else 0.0
-        
-        total_row_qty = pd.DataFrame({
-            'Executive': ['TOTAL'],
-            'Budget Qty': [total_budget_qty],
-            'Billed Qty': [total_billed_qty],
-            '%': [total_percentage_qty]
-        })
-        budget_vs_billed_qty_df = pd.concat([budget_vs_billed_qty_df, total_row_qty], ignore_index=True)
+    # Filter by selected executives
+    display = set(executives_to_display)
+    if not (sales_executives & display) or not (budget_executives & display):
+        return {"error": "No data found for selected executives."}
+
+    budget_valid = budget_grouped[
+        budget_grouped['executive'].isin(display) &
+        (budget_grouped['qty'] > 0) &
+        (budget_grouped['value'] > 0)
+    ]
+    if budget_valid.empty:
+        return {"error": "No valid budget data found (with qty > 0 and value > 0)."}
+
+    # Hash join of the budget lines against the sales cube for these months
+    sales_totals = month_cube.groupby(level=['executive', 'sl_code', 'product']).sum()
+    matched = sales_totals.reindex(pd.MultiIndex.from_frame(budget_valid[['executive', 'sl_code', 'product']]))
+    sales_qty = matched['qty'].fillna(0).to_numpy()
+    sales_val = matched['value'].fillna(0).to_numpy()
+    budget_qty = budget_valid['qty'].to_numpy()
+    budget_val = budget_valid['value'].to_numpy()
+
+    results_df = pd.DataFrame({
+        'Executive': budget_valid['executive'].to_numpy(),
+        'SL_Code': budget_valid['sl_code'].to_numpy(),
+        'Product': budget_valid['product'].to_numpy(),
+        'Budget_Qty': budget_qty,
+        'Sales_Qty': sales_qty,
+        'Final_Qty': np.where(sales_qty > budget_qty, budget_qty, sales_qty),
+        'Budget_Value': budget_val,
+        'Sales_Value': sales_val,
+        'Final_Value': np.where(sales_val > budget_val, budget_val, sales_val),
+    })
+
+    overall_sales_data = month_sales[
+        month_sales.index.get_level_values('executive').isin(display)
+    ].groupby(level='executive').sum().reset_index()
+    overall_sales_data.columns = ['Executive', 'Overall_Sales_Qty', 'Overall_Sales_Value']
+
+    return _build_executive_tables(results_df, overall_sales_data, executives_to_display)
+
+def _build_executive_tables(results_df, overall_sales_data, executives_to_display):
+    # Aggregate by Executive
+    exec_qty_summary = results_df.groupby('Executive').agg({
+        'Budget_Qty': 'sum',
+        'Final_Qty': 'sum'
+    }).reset_index()
+    exec_qty_summary.columns = ['Executive', 'Budget Qty', 'Billed Qty']
+    
+    exec_value_summary = results_df.groupby('Executive').agg({
+        'Budget_Value': 'sum',
+        'Final_Value': 'sum'
+    }).reset_index()
+    exec_value_summary.columns = ['Executive', 'Budget Value', 'Billed Value']
+    
+    # NUCLEAR FIX: Completely rebuild DataFrames from scratch
+    # Build QUANTITY DataFrame from scratch
+    qty_data = []
+    for exec_name in executives_to_display:
+        # Find matching data in summary
+        exec_qty_row = exec_qty_summary[exec_qty_summary['Executive'] == exec_name]
+        
+        if not exec_qty_row.empty:
+            budget_val = round(float(exec_qty_row['Budget Qty'].iloc[0]), 2)
+            billed_val = round(float(exec_qty_row['Billed Qty'].iloc[0]), 2)
+        else:
+            budget_val = 0.0
+            billed_val = 0.0
         
-        total_budget_value = round(budget_vs_billed_value_df['Budget Value'].sum(), 2)
-        total_billed_value = round(budget_vs_billed_value_df['Billed Value'].sum(), 2)
-        total_percentage_value = round((total_billed_value / total_budget_value * 100), 2) if total_budget_value > 0 else 0.0
+        # Calculate percentage from scratch
+        if budget_val > 0:
+            percentage = round((billed_val / budget_val) * 100, 2)
+        else:
+            percentage = 0.0
         
-        total_row_value = pd.DataFrame({
-            'Executive': ['TOTAL'],
-            'Budget Value': [total_budget_value],
-            'Billed Value': [total_billed_value],
-            '%': [total_percentage_value]
+        qty_data.append({
+            'Executive': exec_name,
+            'Budget Qty': budget_val,
+            'Billed Qty': billed_val,
+            '%': percentage
         })
-        budget_vs_billed_value_df = pd.concat([budget_vs_billed_value_df, total_row_value], ignore_index=True)
+    
+    # Create fresh DataFrame
+    budget_vs_billed_qty_df = pd.DataFrame(qty_data)
+    
+    # Build VALUE DataFrame from scratch
+    value_data = []
+    for exec_name in executives_to_display:
+        # Find matching data in summary
+        exec_value_row = exec_value_summary[exec_value_summary['Executive'] == exec_name]
+        
+        if not exec_value_row.empty:
+            budget_val = round(float(exec_value_row['Budget Value'].iloc[0]), 2)
+            billed_val = round(float(exec_value_row['Billed Value'].iloc[0]), 2)
+        else:
+            budget_val = 0.0
+            billed_val = 0.0
         
-        total_row_overall_qty = pd.DataFrame({
-            'Executive': ['TOTAL'],
-            'Budget Qty': [round(overall_sales_qty_df['Budget Qty'].sum(), 2)],
-            'Billed Qty': [round(overall_sales_qty_df['Billed Qty'].sum(), 2)]
-        })
-        overall_sales_qty_df = pd.concat([overall_sales_qty_df, total_row_overall_qty], ignore_index=True)
+        # Calculate percentage from scratch
+        if budget_val > 0:
+            percentage = round((billed_val / budget_val) * 100, 2)
+        else:
+            percentage = 0.0
         
-        total_row_overall_value = pd.DataFrame({
-            'Executive': ['TOTAL'],
-            'Budget Value': [round(overall_sales_value_df['Budget Value'].sum(), 2)],
-            'Billed Value': [round(overall_sales_value_df['Billed Value'].sum(), 2)]
+        value_data.append({
+            'Executive': exec_name,
+            'Budget Value': budget_val,
+            'Billed Value': billed_val,
+            '%': percentage
         })
-        overall_sales_value_df = pd.concat([overall_sales_value_df, total_row_overall_value], ignore_index=True)
-        
-        # Round all numeric columns
-        for df in [budget_vs_billed_qty_df, budget_vs_billed_value_df, overall_sales_qty_df, overall_sales_value_df]:
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            df[numeric_cols] = df[numeric_cols].round(2)
-        
-        # FINAL NUCLEAR SAFETY CHECK - Force any remaining issues
-        for df_name, df in [("QTY", budget_vs_billed_qty_df), ("VALUE", budget_vs_billed_value_df)]:
-            if df_name == "QTY":
-                budget_col, billed_col = 'Budget Qty', 'Billed Qty'
-            else:
-                budget_col, billed_col = 'Budget Value', 'Billed Value'
-            
-            # Check for any remaining anomalies
-            final_anomaly_mask = (
-                (df[budget_col] == 0.0) & 
-                (df[billed_col] == 0.0) & 
-                (df['%'] != 0.0)
-            )
-            
-            if final_anomaly_mask.any():
-                print(f"🚨 FINAL CHECK: Found {final_anomaly_mask.sum()} anomalies in {df_name} DataFrame")
-                print(f"Anomalous executives: {df[final_anomaly_mask]['Executive'].tolist()}")
-                df.loc[final_anomaly_mask, '%'] = 0.0
-                print(f"✅ Fixed all anomalies in {df_name} DataFrame")
-        
-        print("Executive budget vs billed calculation completed successfully")
+    
+    # Create fresh DataFrame
+    budget_vs_billed_value_df = pd.DataFrame(value_data)
+    
+    # ADDITIONAL SAFETY CHECK: Force fix any remaining anomalies
+    # Check for any impossible percentages (non-zero % with zero budget and billed)
+    anomaly_mask_qty = (
+        (budget_vs_billed_qty_df['Budget Qty'] == 0) & 
+        (budget_vs_billed_qty_df['Billed Qty'] == 0) & 
+        (budget_vs_billed_qty_df['%'] != 0.0)
+    )
+    if anomaly_mask_qty.any():
+        budget_vs_billed_qty_df.loc[anomaly_mask_qty, '%'] = 0.0
+        print(f"🔧 SAFETY FIX: Reset {anomaly_mask_qty.sum()} anomalous quantity percentages to 0.0%")
+    
+    anomaly_mask_value = (
+        (budget_vs_billed_value_df['Budget Value'] == 0) & 
+        (budget_vs_billed_value_df['Billed Value'] == 0) & 
+        (budget_vs_billed_value_df['%'] != 0.0)
+    )
+    if anomaly_mask_value.any():
+        budget_vs_billed_value_df.loc[anomaly_mask_value, '%'] = 0.0
+        print(f"🔧 SAFETY FIX: Reset {anomaly_mask_value.sum()} anomalous value percentages to 0.0%")
+    
+    # Create Overall Sales DataFrames
+    budget_totals = results_df.groupby('Executive').agg({
+        'Budget_Qty': 'sum',
+        'Budget_Value': 'sum'
+    }).reset_index()
+    
+    overall_sales_qty_df = pd.DataFrame({'Executive': executives_to_display})
+    overall_sales_qty_df = pd.merge(
+        overall_sales_qty_df,
+        budget_totals[['Executive', 'Budget_Qty']].rename(columns={'Budget_Qty': 'Budget Qty'}),
+        on='Executive',
+        how='left'
+    ).fillna({'Budget Qty': 0})
+    
+    overall_sales_qty_df = pd.merge(
+        overall_sales_qty_df,
+        overall_sales_data[['Executive', 'Overall_Sales_Qty']].rename(columns={'Overall_Sales_Qty': 'Billed Qty'}),
+        on='Executive',
+        how='left'
+    ).fillna({'Billed Qty': 0})
+    
+    overall_sales_value_df = pd.DataFrame({'Executive': executives_to_display})
+    overall_sales_value_df = pd.merge(
+        overall_sales_value_df,
+        budget_totals[['Executive', 'Budget_Value']].rename(columns={'Budget_Value': 'Budget Value'}),
+        on='Executive',
+        how='left'
+    ).fillna({'Budget Value': 0})
+    
+    overall_sales_value_df = pd.merge(
+        overall_sales_value_df,
+        overall_sales_data[['Executive', 'Overall_Sales_Value']].rename(columns={'Overall_Sales_Value': 'Billed Value'}),
+        on='Executive',
+        how='left'
+    ).fillna({'Billed Value': 0})
+    
+    # Add Total Rows
+    total_budget_qty = round(budget_vs_billed_qty_df['Budget Qty'].sum(), 2)
+    total_billed_qty = round(budget_vs_billed_qty_df['Billed Qty'].sum(), 2)
+    total_percentage_qty = round((total_billed_qty / total_budget_qty * 100), 2) if total_budget_qty > 0 else 0.0
+    
+    total_row_qty = pd.DataFrame({
+        'Executive': ['TOTAL'],
+        'Budget Qty': [total_budget_qty],
+        'Billed Qty': [total_billed_qty],
+        '%': [total_percentage_qty]
+    })
+    budget_vs_billed_qty_df = pd.concat([budget_vs_billed_qty_df, total_row_qty], ignore_index=True)
+    
+    total_budget_value = round(budget_vs_billed_value_df['Budget Value'].sum(), 2)
+    total_billed_value = round(budget_vs_billed_value_df['Billed Value'].sum(), 2)
+    total_percentage_value = round((total_billed_value / total_budget_value * 100), 2) if total_budget_value > 0 else 0.0
+    
+    total_row_value = pd.DataFrame({
+        'Executive': ['TOTAL'],
+        'Budget Value': [total_budget_value],
+        'Billed Value': [total_billed_value],
+        '%': [total_percentage_value]
+    })
+    budget_vs_billed_value_df = pd.concat([budget_vs_billed_value_df, total_row_value], ignore_index=True)
+    
+    total_row_overall_qty = pd.DataFrame({
+        'Executive': ['TOTAL'],
+        'Budget Qty': [round(overall_sales_qty_df['Budget Qty'].sum(), 2)],
+        'Billed Qty': [round(overall_sales_qty_df['Billed Qty'].sum(), 2)]
+    })
+    overall_sales_qty_df = pd.concat([overall_sales_qty_df, total_row_overall_qty], ignore_index=True)
+    
+    total_row_overall_value = pd.DataFrame({
+        'Executive': ['TOTAL'],
+        'Budget Value': [round(overall_sales_value_df['Budget Value'].sum(), 2)],
+        'Billed Value': [round(overall_sales_value_df['Billed Value'].sum(), 2)]
+    })
+    overall_sales_value_df = pd.concat([overall_sales_value_df, total_row_overall_value], ignore_index=True)
+    
+    # Round all numeric columns
+    for df in [budget_vs_billed_qty_df, budget_vs_billed_value_df, overall_sales_qty_df, overall_sales_value_df]:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        df[numeric_cols] = df[numeric_cols].round(2)
+    
+    # FINAL NUCLEAR SAFETY CHECK - Force any remaining issues
+    for df_name, df in [("QTY", budget_vs_billed_qty_df), ("VALUE", budget_vs_billed_value_df)]:
+        if df_name == "QTY":
+            budget_col, billed_col = 'Budget Qty', 'Billed Qty'
+        else:
+            budget_col, billed_col = 'Budget Value', 'Billed Value'
         
-        return {
-            'success': True,
-            'budget_vs_billed_qty': budget_vs_billed_qty_df.to_dict('records'),
-            'budget_vs_billed_value': budget_vs_billed_value_df.to_dict('records'),
-            'overall_sales_qty': overall_sales_qty_df.to_dict('records'),
-            'overall_sales_value': overall_sales_value_df.to_dict('records')
-        }
+        # Check for any remaining anomalies
+        final_anomaly_mask = (
+            (df[budget_col] == 0.0) & 
+            (df[billed_col] == 0.0) & 
+            (df['%'] != 0.0)
+        )
         
-    except Exception as e:
-        print(f"Error in calculate_executive_budget_vs_billed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'success': False,
-            'error': f"Error calculating executive budget vs billed: {str(e)}"
-        }
+        if final_anomaly_mask.any():
+            print(f"🚨 FINAL CHECK: Found {final_anomaly_mask.sum()} anomalies in {df_name} DataFrame")
+            print(f"Anomalous executives: {df[final_anomaly_mask]['Executive'].tolist()}")
+            df.loc[final_anomaly_mask, '%'] = 0.0
+            print(f"✅ Fixed all anomalies in {df_name} DataFrame")
+    
+    return {
+        'success': True,
+        'budget_vs_billed_qty': budget_vs_billed_qty_df.to_dict('records'),
+        'budget_vs_billed_value': budget_vs_billed_value_df.to_dict('records'),
+        'overall_sales_qty': overall_sales_qty_df.to_dict('records'),
+        'overall_sales_value': overall_sales_value_df.to_dict('records')
+    }
 
 def load_data(file_path):
     """Load data from CSV or Excel file"""
@@ -392,7 +453,7 @@ def load_data(file_path):
         if file_path.endswith('.csv'):
             return pd.read_csv(file_path)
         elif file_path.endswith(('.xlsx', '.xls')):
-            return pd.read_excel(file_path)
+            return read_excel_cached(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_path}")
     except Exception as e:
@@ -404,44 +465,43 @@ def auto_map_executive_columns(sales_df, budget_df):
     Auto-map columns for executive analysis following the Streamlit logic
     """
     try:
-        def find_column(columns, target_names, default_index=0):
-            for target in target_names:
-                for col in columns:
-                    if col.lower() == target.lower():
-                        return col
+        def find_column(columns, field, default_index=0):
+            col = resolve_field(columns, field, fuzzy=False)
+            if col is not None:
+                return col
             return columns[default_index] if columns else None
 
         # Enhanced column mappings - Fixed quantity mapping
         column_mappings = {
-            'sales_date': ['Date'],
-            'sales_value': ['Value', 'Invoice Value'],
-            'sales_qty': ['Actual Quantity', 'Quantity', 'Qty', 'Sales Quantity', 'Sales Qty'],
-            'sales_product_group': ['Type (Make)', 'Product Group'],
-            'sales_sl_code': ['Customer Code', 'SL Code'],
-            'sales_area': ['Branch', 'Area'],
-            'sales_exec': ['Executive Name', 'Executive'],
-            'budget_value': ['Budget Value', 'Value'],
-            'budget_qty': ['Budget Quantity', 'Quantity', 'Qty', 'Budget Qty'],
-            'budget_product_group': ['Product Group', 'Type (Make)'],
-            'budget_sl_code': ['SL Code', 'Customer Code'],
-            'budget_area': ['Branch', 'Area'],
-            'budget_exec': ['Executive Name', 'Executive']
+            'sales_date': 'sales_date',
+            'sales_value': 'sales_value',
+            'sales_qty': 'sales_qty',
+            'sales_product_group': 'sales_product_group',
+            'sales_sl_code': 'customer_code',
+            'sales_area': 'branch',
+            'sales_exec': 'executive',
+            'budget_value': 'budget_value',
+            'budget_qty': 'budget_qty',
+            'budget_product_group': 'budget_product_group',
+            'budget_sl_code': 'sl_code',
+            'budget_area': 'branch',
+            'budget_exec': 'executive'
         }
 
         sales_mapping = {}
         budget_mapping = {}
 
         # Auto-map sales columns
-        for key, targets in column_mappings.items():
+        for key, field in column_mappings.items():
             if key.startswith('sales_'):
                 clean_key = key.replace('sales_', '')
-                sales_mapping[clean_key] = find_column(sales_df.columns.tolist(), targets)
+                sales_mapping[clean_key] = find_column(sales_df.columns.tolist(), field)
 
         # Auto-map budget columns
-        for key, targets in column_mappings.items():
+        for key, field in column_mappings.items():
             if key.startswith('budget_'):
                 clean_key = key.replace('budget_', '')
-                budget_mapping[clean_key] = find_column(budget_df.columns.tolist(), targets)
+                budget_mapping[clean_key] = find_column(budget_df.columns.tolist(), field)
 
         return {
             'sales_mapping': sales_mapping,
@@ -513,7 +573,7 @@ def get_available_months(sales_df, sales_date_col):
             return []
         
         sales_df[sales_date_col] = pd.to_datetime(sales_df[sales_date_col], dayfirst=True, errors='coerce')
-        available_months = sorted(sales_df[sales_date_col].dt.strftime('%b %y').dropna().unique().tolist())
+        available_months = sorted(unique_month_labels(month_keys(sales_df[sales_date_col])))
         
         return available_months
         
@@ -3,6 +3,10 @@ import numpy as np
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import logging
+from utils.excel_cache import read_excel_cached
+from utils.month_keys import month_keys, month_label, month_labels, month_mask, map_month_keys, unique_month_labels
+from utils.column_resolver import map_fields
+from utils.branch_names import area_names, executive_names
 import os
 from pathlib import Path
 
@@ -19,69 +23,17 @@ def determine_financial_year(date):
     else:
         return f"{year-1}-{year}"
 
-def extract_area_name(area):
-    """Extract and standardize area/branch names"""
-    if pd.isna(area) or not str(area).strip():
-        return None
-    
-    area = str(area).strip()
-    area_upper = area.upper()
-    
-    # Skip HO entries
-    if area_upper == 'HO' or area_upper.endswith('-HO'):
-        return None
-    
-    # Branch variations mapping
-    branch_variations = {
-        'PUDUCHERRY': ['PUDUCHERRY', 'PONDY', 'PUDUCHERRY - PONDY', 'PONDICHERRY', 'PUDUCHERI', 'aaaa - PUDUCHERRY', 'AAAA - PUDUCHERRY'],
-        'COIMBATORE': ['COIMBATORE', 'CBE', 'COIMBATORE - CBE', 'COIMBATURE', 'aaaa - COIMBATORE', 'AAAA - COIMBATORE'],
-        'KARUR': ['KARUR', 'KRR', 'KARUR - KRR', 'aaaa - KARUR', 'AAAA - KARUR'],
-        'MADURAI': ['MADURAI', 'MDU', 'MADURAI - MDU', 'MADURA', 'aaaa - MADURAI', 'AAAA - MADURAI'],
-        'CHENNAI': ['CHENNAI', 'CHN', 'aaaa - CHENNAI', 'AAAA - CHENNAI'],
-    }
-    
-    # Check for branch variations
-    for standard_name, variations in branch_variations.items():
-        for variation in variations:
-            if variation in area_upper:
-                return standard_name
-    
-    # Remove common prefixes
-    prefixes = ['AAAA - ', 'aaaa - ', 'BBB - ', 'bbb - ', 'ASIA CRYSTAL COMMODITY LLP - ']
-    for prefix in prefixes:
-        if area_upper.startswith(prefix.upper()):
-            return area[len(prefix):].strip().upper()
-    
-    # Handle separators
-    separators = [' - ', '-', ':']
-    for sep in separators:
-        if sep in area_upper:
-            return area_upper.split(sep)[-1].strip()
-    
-    return area_upper
-
 # ==================== BILLED CUSTOMERS FUNCTIONS ====================
 
 def auto_map_customer_columns(sales_df):
     """Auto-map columns for customer analysis"""
     try:
-        def find_column(columns, target_names):
-            for target in target_names:
-                for col in columns:
-                    if col.lower() == target.lower():
-                        return col
-            return None
-        
-        column_mappings = {
-            'date': ['Date', 'Bill Date', 'Invoice Date'],
-            'branch': ['Branch', 'Area', 'Location'],
-            'customer_id': ['Customer Code', 'SL Code', 'Customer ID'],
-            'executive': ['Executive Name', 'Executive', 'Sales Executive']
-        }
-        
-        mapping = {}
-        for key, targets in column_mappings.items():
-            mapping[key] = find_column(sales_df.columns.tolist(), targets)
+        mapping = map_fields(sales_df.columns, {
+            'date': 'sales_date',
+            'branch': 'branch',
+            'customer_id': 'customer_code',
+            'executive': 'executive'
+        })
         
         return {
             'success': True,
@@ -106,7 +58,7 @@ def get_customer_options(sales_df, date_col, branch_col, executive_col):
         sales_df[date_col] = pd.to_datetime(sales_df[date_col], errors='coerce', dayfirst=True)
         
         # Get available months
-        available_months = sorted(sales_df[date_col].dt.strftime('%b %Y').dropna().unique().tolist())
+        available_months = sorted(unique_month_labels(month_keys(sales_df[date_col]), '%b %Y'))
         
         # Get branches (extract raw branches directly from branch column)
         raw_branches = sales_df[branch_col].dropna().astype(str).str.strip().str.upper().unique().tolist()
@@ -167,11 +119,12 @@ def create_customer_table(sales_df, date_col, branch_col, customer_id_col, execu
             }
         
         # Extract month-year for filtering
-        sales_df['Month_Year'] = sales_df[date_col].dt.strftime('%b %Y')
+        sales_df['Month_Key'] = month_keys(sales_df[date_col])
+        sales_df['Month_Year'] = month_labels(sales_df['Month_Key'], '%b %Y')
         
         # Filter by selected months if provided
         if selected_months:
-            sales_df = sales_df[sales_df['Month_Year'].isin(selected_months)]
+            sales_df = sales_df[month_mask(sales_df['Month_Key'], selected_months, '%b %Y')]
             if sales_df.empty:
                 return {
                     'success': False,
@@ -179,7 +132,9 @@ def create_customer_table(sales_df, date_col, branch_col, customer_id_col, execu
                 }
         
         # Determine financial year
-        sales_df['Financial_Year'] = sales_df[date_col].apply(determine_financial_year)
+        sales_df['Financial_Year'] = map_month_keys(
+            sales_df['Month_Key'], lambda year, month: determine_financial_year(datetime(year, month, 1))
+        )
         available_financial_years = sales_df['Financial_Year'].dropna().unique()
         
         if len(available_financial_years) == 0:
@@ -196,9 +151,7 @@ def create_customer_table(sales_df, date_col, branch_col, customer_id_col, execu
                 continue
             
             # Extract unique months in chronological order
-            fy_df['Month_Year_Period'] = fy_df[date_col].dt.to_period('M')
-            available_months_periods = fy_df['Month_Year_Period'].unique()
-            month_names = [pd.to_datetime(str(m) + '-01').strftime('%b %Y') for m in sorted(available_months_periods)]
+            month_names = [month_label(int(k), '%b %Y') for k in sorted(fy_df['Month_Key'].unique())]
             
             if not month_names:
                 continue
@@ -314,23 +267,12 @@ def create_customer_table(sales_df, date_col, branch_col, customer_id_col, execu
 def auto_map_od_columns(os_df):
     """Auto-map columns for OD target analysis"""
     try:
-        def find_column(columns, target_names):
-            for target in target_names:
-                for col in columns:
-                    if col.lower() == target.lower():
-                        return col
-            return None
-        
-        column_mappings = {
-            'area': ['Branch', 'Area', 'Location'],
-            'net_value': ['Net Value', 'Value', 'Amount'],
-            'due_date': ['Due Date', 'Date'],
-            'executive': ['Executive Name', 'Executive', 'Sales Executive']
-        }
-        
-        mapping = {}
-        for key, targets in column_mappings.items():
-            mapping[key] = find_column(os_df.columns.tolist(), targets)
+        mapping = map_fields(os_df.columns, {
+            'area': 'branch',
+            'net_value': 'net_value',
+            'due_date': 'os_due_date',
+            'executive': 'executive'
+        })
         
         return {
             'success': True,
@@ -357,8 +299,8 @@ def get_od_options(os_df, due_date_col, area_col, executive_col):
         # Get available years
         years = sorted(os_df[due_date_col].dt.year.dropna().astype(int).unique().tolist())
         
-        # Get branches using extract_area_name
-        os_branches = sorted(set([b for b in os_df[area_col].apply(extract_area_name).dropna().unique() if b]))
+        # Get branches using the area name rules
+        os_branches = sorted(set([b for b in area_names(os_df[area_col]).dropna().unique() if b]))
         
         # Get executives
         os_executives = sorted(os_df[executive_col].dropna().astype(str).unique().tolist())
@@ -393,8 +335,8 @@ def filter_os_qty(os_df, os_area_col, os_qty_col, os_due_date_col, os_exec_col,
                 }
         
         os_df = os_df.copy()
-        os_df[os_area_col] = os_df[os_area_col].apply(extract_area_name).astype(str).str.strip().str.upper()
-        os_df[os_exec_col] = os_df[os_exec_col].apply(lambda x: 'BLANK' if pd.isna(x) or str(x).strip() == '' else str(x).strip().upper())
+        os_df[os_area_col] = area_names(os_df[os_area_col]).astype(str).str.strip().str.upper()
+        os_df[os_exec_col] = executive_names(os_df[os_exec_col])
         
         try:
             os_df[os_due_date_col] = pd.to_datetime(os_df[os_due_date_col], errors='coerce')
@@ -520,7 +462,7 @@ def load_data(file_path):
         if file_path.endswith('.csv'):
             return pd.read_csv(file_path)
         elif file_path.endswith(('.xlsx', '.xls')):
-            return pd.read_excel(file_path)
+            return read_excel_cached(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_path}")
     except Exception as e:
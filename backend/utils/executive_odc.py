@@ -3,48 +3,14 @@ import numpy as np
 import os
 from pathlib import Path
 import logging
+from utils.excel_cache import read_excel_cached
+from utils.column_resolver import resolve_field
+from utils.branch_names import area_names
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
 logger = logging.getLogger(__name__)
 
-def extract_area_name(area):
-    """Extract and standardize area/branch name"""
-    if pd.isna(area) or not str(area).strip():
-        return None
-    area = str(area).strip()
-    area_upper = area.upper()
-    if area_upper == 'HO' or area_upper.endswith('-HO'):
-        return None
-    
-    # Branch variations mapping
-    branch_variations = {
-        'PUDUCHERRY': ['PUDUCHERRY', 'PONDY', 'PUDUCHERRY - PONDY', 'PONDICHERRY', 'PUDUCHERI', 'aaaa - PUDUCHERRY', 'AAAA - PUDUCHERRY'],
-        'COIMBATORE': ['COIMBATORE', 'CBE', 'COIMBATORE - CBE', 'COIMBATURE', 'aaaa - COIMBATORE', 'AAAA - COIMBATORE'],
-        'KARUR': ['KARUR', 'KRR', 'KARUR - KRR', 'aaaa - KARUR', 'AAAA - KARUR'],
-        'MADURAI': ['MADURAI', 'MDU', 'MADURAI - MDU', 'MADURA', 'aaaa - MADURAI', 'AAAA - MADURAI'],
-        'CHENNAI': ['CHENNAI', 'CHN', 'aaaa - CHENNAI', 'AAAA - CHENNAI'],
-    }
-    
-    for standard_name, variations in branch_variations.items():
-        for variation in variations:
-            if variation in area_upper:
-                return standard_name
-    
-    # Remove common prefixes
-    prefixes = ['AAAA - ', 'aaaa - ', 'BBB - ', 'bbb - ', 'ASIA CRYSTAL COMMODITY LLP - ']
-    for prefix in prefixes:
-        if area_upper.startswith(prefix.upper()):
-            return area[len(prefix):].strip().upper()
-    
-    # Split by common separators
-    separators = [' - ', '-', ':']
-    for sep in separators:
-        if sep in area_upper:
-            return area_upper.split(sep)[-1].strip()
-    
-    return area_upper
-
 def get_available_months_od(os_jan, os_feb, total_sale,
                            os_jan_due_date_col, os_jan_ref_date_col,
                            os_feb_due_date_col, os_feb_ref_date_col,
@@ -91,7 +57,7 @@ def get_od_executives_and_branches(os_jan, os_feb, total_sale,
             (total_sale, sale_area_col)
         ]:
             if area_col in df.columns:
-                branches = df[area_col].apply(extract_area_name).dropna().astype(str).str.upper().unique().tolist()
+                branches = area_names(df[area_col]).dropna().astype(str).str.upper().unique().tolist()
                 all_branches.update([b for b in branches if b])
         
         return {
@@ -109,39 +75,29 @@ def get_od_executives_and_branches(os_jan, os_feb, total_sale,
 def auto_map_od_columns(os_jan_df, os_feb_df, sales_df):
     """Auto-map columns for OD analysis"""
     try:
-        def find_column(columns, target_names, default_index=0):
-            for target in target_names:
-                for col in columns:
-                    if col.lower() == target.lower():
-                        return col
+        def find_column(columns, field, default_index=0):
+            col = resolve_field(columns, field, fuzzy=False)
+            if col is not None:
+                return col
             return columns[default_index] if columns else None
 
-        # Column mappings for OD analysis
-        os_jan_mappings = {
-            'due_date': ['Due Date'],
-            'ref_date': ['Ref. Date', 'Reference Date'],
-            'net_value': ['Net Value'],
-            'executive': ['Executive Name', 'Executive'],
-            'sl_code': ['Party Code', 'SL Code', 'Customer Code'],
-            'area': ['Branch', 'Area']
-        }
-
-        os_feb_mappings = {
-            'due_date': ['Due Date'],
-            'ref_date': ['Ref. Date', 'Reference Date'],
-            'net_value': ['Net Value'],
-            'executive': ['Executive Name', 'Executive'],
-            'sl_code': ['Party Code', 'SL Code', 'Customer Code'],
-            'area': ['Branch', 'Area']
+        # Column fields for OD analysis
+        os_fields = {
+            'due_date': 'due_date',
+            'ref_date': 'ref_date',
+            'net_value': 'net_value',
+            'executive': 'executive',
+            'sl_code': 'party_code',
+            'area': 'branch'
         }
 
-        sales_mappings = {
-            'bill_date': ['Date', 'Bill Date'],
-            'due_date': ['Due Date'],
-            'value': ['Invoice Value', 'Value'],
-            'executive': ['Executive Name', 'Executive'],
-            'sl_code': ['Customer Code', 'SL Code'],
-            'area': ['Branch', 'Area']
+        sales_fields = {
+            'bill_date': 'sales_date',
+            'due_date': 'due_date',
+            'value': 'invoice_value',
+            'executive': 'executive',
+            'sl_code': 'customer_code',
+            'area': 'branch'
         }
 
         os_jan_mapping = {}
@@ -149,16 +105,16 @@ def auto_map_od_columns(os_jan_df, os_feb_df, sales_df):
         sales_mapping = {}
 
         # Auto-map OS Jan columns
-        for key, targets in os_jan_mappings.items():
-            os_jan_mapping[key] = find_column(os_jan_df.columns.tolist(), targets)
+        for key, field in os_fields.items():
+            os_jan_mapping[key] = find_column(os_jan_df.columns.tolist(), field)
 
         # Auto-map OS Feb columns
-        for key, targets in os_feb_mappings.items():
-            os_feb_mapping[key] = find_column(os_feb_df.columns.tolist(), targets)
+        for key, field in os_fields.items():
+            os_feb_mapping[key] = find_column(os_feb_df.columns.tolist(), field)
 
         # Auto-map Sales columns
-        for key, targets in sales_mappings.items():
-            sales_mapping[key] = find_column(sales_df.columns.tolist(), targets)
+        for key, field in sales_fields.items():
+            sales_mapping[key] = find_column(sales_df.columns.tolist(), field)
 
         return {
             'os_jan_mapping': os_jan_mapping,
@@ -207,9 +163,9 @@ def calculate_od_values(os_jan, os_feb, total_sale, selected_month_str,
         os_feb[os_feb_net_value_col] = os_feb[os_feb_net_value_col].clip(lower=0)
 
         # Standardize branch
-        os_jan[os_jan_area_col] = os_jan[os_jan_area_col].apply(extract_area_name).astype(str).str.strip().str.upper()
-        os_feb[os_feb_area_col] = os_feb[os_feb_area_col].apply(extract_area_name).astype(str).str.strip().str.upper()
-        total_sale[sale_area_col] = total_sale[sale_area_col].apply(extract_area_name).astype(str).str.strip().str.upper()
+        os_jan[os_jan_area_col] = area_names(os_jan[os_jan_area_col]).astype(str).str.strip().str.upper()
+        os_feb[os_feb_area_col] = area_names(os_feb[os_feb_area_col]).astype(str).str.strip().str.upper()
+        total_sale[sale_area_col] = area_names(total_sale[sale_area_col]).astype(str).str.strip().str.upper()
 
         # Branch filter
         if selected_branches:
@@ -361,7 +317,7 @@ def load_data(file_path):
         if file_path.endswith('.csv'):
             return pd.read_csv(file_path)
         elif file_path.endswith(('.xlsx', '.xls')):
-            return pd.read_excel(file_path)
+            return read_excel_cached(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_path}")
     except Exception as e:
@@ -8,6 +8,11 @@ from io import BytesIO
 import math
 import logging
 import base64
+from utils.ppt_table import (
+    TableStyle, HEADER_FILL, TOTAL_FILL, fill_table, body_rows, total_row_flags,
+    plain_texts, number_texts, percent_texts
+)
+from utils.ppt_pipeline import new_presentation, render_sections
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +83,36 @@ def create_title_slide(prs, title, logo_file=None):
         logger.error(f"Error creating title slide: {e}")
         raise
 
+EXECUTIVE_TABLE_STYLE = TableStyle(
+    header_size=14, header_fill=HEADER_FILL, body_size=12,
+    band_fills=((255, 255, 255), (221, 235, 247)), total_fill=TOTAL_FILL, anchor_middle=False
+)
+TOTAL_ROW_LABELS = ['TOTAL', 'GRAND TOTAL', 'PART 1 TOTAL', 'PART 2 TOTAL']
+PERCENT_COLUMNS = ['ACHIEVEMENT %', '%', 'Overall % Achieved', '% Achieved (Selected Month)']
+
+def _executive_cell_text(value, col_name, is_percent_col):
+    is_number = isinstance(value, (int, float)) and not pd.isna(value)
+    if col_name in PERCENT_COLUMNS:
+        if is_number:
+            return f"{value:.2f}%"
+        return str(value) if value is not None else ""
+    if is_number:
+        if is_percent_col:
+            return f"{value:.2f}%"
+        return str(int(round(value))) if abs(value - round(value)) < 0.001 else f"{value:.2f}"
+    return str(value) if value is not None and not pd.isna(value) else ""
+
+def _executive_cell_texts(column, col_name, is_percent_col):
+    """Texts of one table column"""
+    kind = column.dtype.kind
+    if kind == 'f':
+        if col_name in PERCENT_COLUMNS:
+            return percent_texts(column, nan_text='nan')
+        return percent_texts(column) if is_percent_col else number_texts(column)
+    if kind in 'iu':
+        return percent_texts(column) if (col_name in PERCENT_COLUMNS or is_percent_col) else plain_texts(column)
+    return [_executive_cell_text(v, col_name, is_percent_col) for v in column]
+
 def add_table_slide(prs, df, title, percent_cols=None, is_consolidated=False):
     """Add table slide with strict column order (supports dynamic override via df.attrs['columns'])"""
     try:
@@ -97,11 +132,7 @@ def add_table_slide(prs, df, title, percent_cols=None, is_consolidated=False):
         p.font.color.rgb = RGBColor(0, 112, 192)
         p.alignment = PP_ALIGN.CENTER
 
-        logger.info(f"🔍 PROCESSING SLIDE: '{title}'")
-        logger.info(f"🔍 DataFrame columns: {list(df.columns)}")
-        logger.info(f"🔍 DataFrame shape: {df.shape}")
-        logger.info(f"🔍 Is consolidated: {is_consolidated}")
-        print(f"🔍 PROCESSING: '{title}' | Columns: {list(df.columns)}")
+        logger.debug(f"🔍 PROCESSING SLIDE: '{title}' | Columns: {list(df.columns)} | Shape: {df.shape} | Consolidated: {is_consolidated}")
 
         actual_columns = list(df.columns)
         title_lower = title.lower()
@@ -160,14 +191,8 @@ def add_table_slide(prs, df, title, percent_cols=None, is_consolidated=False):
                 ordered_columns.append(col)
                 logger.warning(f"⚠️ Added missing column to end: {col}")
 
-        logger.info(f"✅ FINAL COLUMN ORDER for '{title}': {ordered_columns}")
-        print(f"✅ FINAL COLUMN ORDER for '{title}': {ordered_columns}")
-
-        # [The rest of your existing slide/table creation logic remains unchanged...]
-        # -- table.rows, table.columns, header styling, data rows, formatting --
-        # You don’t need to touch that code
+        logger.debug(f"✅ FINAL COLUMN ORDER for '{title}': {ordered_columns}")
 
-        # Continue with table generation...
         num_rows = len(df) + 1
         num_cols = len(ordered_columns)
 
@@ -185,45 +210,17 @@ def add_table_slide(prs, df, title, percent_cols=None, is_consolidated=False):
                 for i in range(1, num_cols):
                     table.columns[i].width = Inches(col_width)
 
-        # Header
-        for i, col_name in enumerate(ordered_columns):
-            cell = table.cell(0, i)
-            cell.text = str(col_name)
-            cell.fill.solid()
-            cell.fill.fore_color.rgb = RGBColor(0, 112, 192)
-            cell.text_frame.paragraphs[0].font.size = Pt(14)
-            cell.text_frame.paragraphs[0].font.bold = True
-            cell.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-            cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-
-        # Data rows
-        for row_idx, (_, row) in enumerate(df.iterrows(), start=1):
-            first_col_value = str(row.iloc[0]).upper()
-            is_total_row = first_col_value in ['TOTAL', 'GRAND TOTAL', 'PART 1 TOTAL', 'PART 2 TOTAL']
-            for col_idx, col_name in enumerate(ordered_columns):
-                cell = table.cell(row_idx, col_idx)
-                value = row.get(col_name, "")
-                if col_name in ['ACHIEVEMENT %', '%', 'Overall % Achieved', '% Achieved (Selected Month)']:
-                    if isinstance(value, (int, float)) and not pd.isna(value):
-                        cell.text = f"{value:.2f}%"
-                    else:
-                        cell.text = str(value) if value is not None else ""
-                elif col_idx in percent_cols and isinstance(value, (int, float)) and not pd.isna(value):
-                    cell.text = f"{value:.2f}%"
-                elif isinstance(value, (int, float)) and not pd.isna(value):
-                    cell.text = str(int(round(value))) if abs(value - round(value)) < 0.001 else f"{value:.2f}"
-                else:
-                    cell.text = str(value) if value is not None and not pd.isna(value) else ""
-
-                cell.text_frame.paragraphs[0].font.size = Pt(12)
-                cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-                cell.fill.solid()
+        # Cell texts are formatted a column at a time, then written in one pass
+        positions = {}
+        for j, col in enumerate(actual_columns):
+            positions.setdefault(col, j)
+        columns_text = [
+            _executive_cell_texts(df.iloc[:, positions[col_name]], col_name, col_idx in percent_cols)
+            for col_idx, col_name in enumerate(ordered_columns)
+        ]
+        total_rows = total_row_flags(df.iloc[:, 0], TOTAL_ROW_LABELS) if len(actual_columns) else None
 
-                if is_total_row:
-                    cell.fill.fore_color.rgb = RGBColor(211, 211, 211)
-                    cell.text_frame.paragraphs[0].font.bold = True
-                else:
-                    cell.fill.fore_color.rgb = RGBColor(221, 235, 247) if row_idx % 2 == 0 else RGBColor(255, 255, 255)
+        fill_table(table, [str(col) for col in ordered_columns], body_rows(columns_text), EXECUTIVE_TABLE_STYLE, total_rows)
 
         return slide
 
@@ -231,12 +228,20 @@ def add_table_slide(prs, df, title, percent_cols=None, is_consolidated=False):
         logger.error(f"Error adding table slide: {e}")
         raise
 
+def _add_consolidated_section(prs, df, slide_title, percent_cols):
+    """Slides of one consolidated report; runs in a render worker for larger decks"""
+    # Check if this report needs splitting (same logic as individual PPTs)
+    if 'Executive' in df.columns:
+        # Use the same splitting logic as process_df_for_slides
+        process_df_for_slides(prs, df, slide_title, percent_cols=percent_cols, is_consolidated=True)
+    else:
+        # Non-executive reports (like product growth, customer analysis)
+        add_table_slide(prs, df, slide_title, percent_cols=percent_cols, is_consolidated=True)
+
 def create_consolidated_ppt(dfs_info, logo_file=None, title="Consolidated Report"):
     """Create consolidated PowerPoint with STREAMLIT-COMPATIBLE column order consistency and proper splitting"""
     try:
-        prs = Presentation()
-        prs.slide_width = Inches(13.33)
-        prs.slide_height = Inches(7.5)
+        prs = new_presentation()
         
         # Create title slide
         create_title_slide(prs, title, logo_file)
@@ -245,6 +250,7 @@ def create_consolidated_ppt(dfs_info, logo_file=None, title="Consolidated Report
         print(f"📊 Creating consolidated PPT with {len(dfs_info)} reports")
         
         # Process each report with strict column order and splitting logic
+        sections = []
         for df_info in dfs_info:
             df_data = df_info.get('df', [])
             slide_title = df_info['title']
@@ -270,14 +276,10 @@ def create_consolidated_ppt(dfs_info, logo_file=None, title="Consolidated Report
             logger.info(f"🔄 Processing consolidated report: {slide_title}")
             print(f"🔄 Processing consolidated report: {slide_title}")
             print(f"🔍 Original DataFrame columns: {list(df.columns)}")
-            
-            # Check if this report needs splitting (same logic as individual PPTs)
-            if 'Executive' in df.columns:
-                # Use the same splitting logic as process_df_for_slides
-                process_df_for_slides(prs, df, slide_title, percent_cols=percent_cols, is_consolidated=True)
-            else:
-                # Non-executive reports (like product growth, customer analysis)
-                add_table_slide(prs, df, slide_title, percent_cols=percent_cols, is_consolidated=True)
+            sections.append((df, slide_title, percent_cols))
+        
+        # Reports are independent of each other: render them side by side, merged in order
+        render_sections(prs, _add_consolidated_section, sections)
         
         # Save to buffer
         ppt_buffer = BytesIO()
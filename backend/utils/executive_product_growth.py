@@ -5,24 +5,17 @@ import numpy as np
 import os
 from pathlib import Path
 import logging
+from utils.excel_cache import read_excel_cached
+from utils.month_keys import month_keys, unique_month_labels
+from utils.column_resolver import map_fields
+from utils.growth_cube import (
+    map_distinct, frame_fingerprint, cached_cube, build_cube,
+    cube_slice, month_slice, cube_rows, first_seen, product_sums, company_cells
+)
+from utils.group_names import standardize_name, standardize_names
 
 logger = logging.getLogger(__name__)
 
-def standardize_name(name):
-    """Standardize company/product group names - EXACT STREAMLIT LOGIC"""
-    if pd.isna(name) or not name:
-        return ""
-    name = str(name).strip().lower()
-    name = ''.join(c for c in name if c.isalnum() or c.isspace())
-    name = ' '.join(word.capitalize() for word in name.split())
-    
-    # Handle special cases for 'General'
-    general_variants = ['general', 'gen', 'generals', 'general ', 'genral', 'generl']
-    if any(variant in name.lower() for variant in general_variants):
-        return 'General'
-    
-    return name
-
 def create_sl_code_mapping(ly_df, cy_df, budget_df, ly_sl_code_col, cy_sl_code_col, budget_sl_code_col, 
                            ly_company_group_col, cy_company_group_col, budget_company_group_col):
     """Create SL Code to Company Group mapping - EXACT STREAMLIT LOGIC"""
@@ -43,9 +36,11 @@ def create_sl_code_mapping(ly_df, cy_df, budget_df, ly_sl_code_col, cy_sl_code_c
             return {}
         
         combined = pd.concat(mappings, ignore_index=True)
-        combined['COMPANY_GROUP'] = combined['COMPANY_GROUP'].apply(standardize_name)
+        combined['COMPANY_GROUP'] = standardize_names(combined['COMPANY_GROUP'])
         
-        mapping_df = combined.groupby('SL_CODE')['COMPANY_GROUP'].agg(lambda x: x.mode()[0] if not x.empty else "").reset_index()
+        # Most frequent company group per SL code; ties go to the smallest name, as with mode()[0]
+        counts = combined.groupby(['SL_CODE', 'COMPANY_GROUP'], sort=False).size().reset_index(name='COUNT')
+        mapping_df = counts.sort_values(['COUNT', 'COMPANY_GROUP'], ascending=[False, True], kind='stable').drop_duplicates('SL_CODE')
         sl_code_map = dict(zip(mapping_df['SL_CODE'], mapping_df['COMPANY_GROUP']))
         
         return sl_code_map
@@ -56,64 +51,46 @@ def create_sl_code_mapping(ly_df, cy_df, budget_df, ly_sl_code_col, cy_sl_code_c
 
 def apply_sl_code_mapping(df, sl_code_col, company_group_col, sl_code_map):
     """Apply SL Code mapping - EXACT STREAMLIT LOGIC"""
+    standardized = standardize_names(df[company_group_col])
     if not sl_code_col or sl_code_col not in df.columns or not sl_code_map:
-        return df[company_group_col].apply(standardize_name)
+        return standardized
     
     try:
-        def map_company(row):
-            if pd.isna(row[sl_code_col]) or row[sl_code_col] == "":
-                return standardize_name(row[company_group_col])
-            sl_code = str(row[sl_code_col]).strip()
-            return sl_code_map.get(sl_code, standardize_name(row[company_group_col]))
-        
-        return df.apply(map_company, axis=1)
+        # Rows with a known SL code take its company group, the rest keep their own
+        sl_codes = df[sl_code_col]
+        mapped = map_distinct(sl_codes, lambda code: sl_code_map.get(str(code).strip()))
+        has_code = sl_codes.notna() & (sl_codes != "")
+        return mapped.where(has_code & mapped.notna(), standardized)
         
     except Exception as e:
         logger.error(f"Error applying SL Code mapping: {e}")
-        return df[company_group_col].apply(standardize_name)
+        return standardized
 
 def auto_map_product_growth_columns(ly_df, cy_df, budget_df):
     """Auto-map columns - EXACT STREAMLIT LOGIC"""
     try:
-        def find_column(columns, target_names):
-            for target in target_names:
-                for col in columns:
-                    if col.lower() == target.lower():
-                        return col
-            return None
-
-        ly_mappings = {
-            'date': ['Date'],
-            'value': ['Value', 'Invoice Value'],
-            'quantity': ['Actual Quantity', 'Quantity', 'Qty'],
-            'product_group': ['Type (Make)', 'Product Group'],
-            'company_group': ['Company Group'],
-            'executive': ['Executive Name', 'Executive'],
-            'sl_code': ['Customer Code', 'SL Code']
-        }
-
-        cy_mappings = {
-            'date': ['Date'],
-            'value': ['Value', 'Invoice Value'],
-            'quantity': ['Actual Quantity', 'Quantity', 'Qty'],
-            'product_group': ['Type (Make)', 'Product Group'],
-            'company_group': ['Company Group'],
-            'executive': ['Executive Name', 'Executive'],
-            'sl_code': ['Customer Code', 'SL Code']
+        sales_fields = {
+            'date': 'sales_date',
+            'value': 'sales_value',
+            'quantity': 'sales_qty',
+            'product_group': 'sales_product_group',
+            'company_group': 'company_group',
+            'executive': 'executive',
+            'sl_code': 'customer_code'
         }
 
-        budget_mappings = {
-            'company_group': ['Company Group'],
-            'product_group': ['Product Group', 'Type (Make)'],
-            'quantity': ['Budget Quantity', 'Quantity', 'Qty'],
-            'value': ['Budget Value', 'Value'],
-            'executive': ['Executive Name', 'Executive'],
-            'sl_code': ['SL Code', 'Customer Code']
+        budget_fields = {
+            'company_group': 'company_group',
+            'product_group': 'budget_product_group',
+            'quantity': 'budget_qty',
+            'value': 'budget_value',
+            'executive': 'executive',
+            'sl_code': 'sl_code'
         }
 
-        ly_mapping = {key: find_column(ly_df.columns.tolist(), targets) for key, targets in ly_mappings.items()}
-        cy_mapping = {key: find_column(cy_df.columns.tolist(), targets) for key, targets in cy_mappings.items()}
-        budget_mapping = {key: find_column(budget_df.columns.tolist(), targets) for key, targets in budget_mappings.items()}
+        ly_mapping = map_fields(ly_df.columns, sales_fields)
+        cy_mapping = map_fields(cy_df.columns, sales_fields)
+        budget_mapping = map_fields(budget_df.columns, budget_fields)
 
         return {
             'ly_mapping': ly_mapping,
@@ -150,9 +127,9 @@ def get_product_growth_options(ly_df, cy_df, budget_df, ly_exec_col, cy_exec_col
         cy_df[cy_company_group_col] = apply_sl_code_mapping(cy_df, cy_sl_code_col, cy_company_group_col, sl_code_map)
         budget_df[budget_company_group_col] = apply_sl_code_mapping(budget_df, budget_sl_code_col, budget_company_group_col, sl_code_map)
         
-        ly_df[ly_product_group_col] = ly_df[ly_product_group_col].apply(standardize_name)
-        cy_df[cy_product_group_col] = cy_df[cy_product_group_col].apply(standardize_name)
-        budget_df[budget_product_group_col] = budget_df[budget_product_group_col].apply(standardize_name)
+        ly_df[ly_product_group_col] = standardize_names(ly_df[ly_product_group_col])
+        cy_df[cy_product_group_col] = standardize_names(cy_df[cy_product_group_col])
+        budget_df[budget_product_group_col] = standardize_names(budget_df[budget_product_group_col])
         
         all_executives = set()
         for df, exec_col in [(ly_df, ly_exec_col), (cy_df, cy_exec_col), (budget_df, budget_exec_col)]:
@@ -192,8 +169,10 @@ def get_product_growth_months(ly_df, cy_df, ly_date_col, cy_date_col):
         ly_df[ly_date_col] = pd.to_datetime(ly_df[ly_date_col], dayfirst=True, errors='coerce')
         cy_df[cy_date_col] = pd.to_datetime(cy_df[cy_date_col], dayfirst=True, errors='coerce')
         
-        available_ly_months = ly_df[ly_date_col].dt.strftime('%b %y').dropna().unique().tolist()
-        available_cy_months = cy_df[cy_date_col].dt.strftime('%b %y').dropna().unique().tolist()
+        ly_keys = month_keys(ly_df[ly_date_col])
+        cy_keys = month_keys(cy_df[cy_date_col])
+        available_ly_months = unique_month_labels(ly_keys)
+        available_cy_months = unique_month_labels(cy_keys)
         
         return {
             'ly_months': sorted(available_ly_months),
@@ -203,6 +182,88 @@ def get_product_growth_months(ly_df, cy_df, ly_date_col, cy_date_col):
     except Exception as e:
         return {'ly_months': [], 'cy_months': []}
 
+def build_product_growth_cube(ly_df, cy_df, budget_df, ly_date_col, cy_date_col,
+                              ly_qty_col, cy_qty_col, ly_value_col, cy_value_col,
+                              budget_qty_col, budget_value_col, ly_company_group_col,
+                              cy_company_group_col, budget_company_group_col,
+                              ly_product_group_col, cy_product_group_col, budget_product_group_col,
+                              ly_sl_code_col, cy_sl_code_col, budget_sl_code_col,
+                              ly_exec_col, cy_exec_col, budget_exec_col):
+    """
+    Pre-aggregate LY/CY qty and value by (executive, company group, product group, month)
+    and budget by (executive, company group, product group). Company groups go through
+    the SL code mapping (skipped when budget_sl_code_col is None), names are standardized
+    once per distinct value, and cubes are cached by frame contents and columns.
+    """
+    frames = [
+        (ly_df, [ly_date_col, ly_qty_col, ly_value_col, ly_company_group_col, ly_product_group_col, ly_exec_col, ly_sl_code_col]),
+        (cy_df, [cy_date_col, cy_qty_col, cy_value_col, cy_company_group_col, cy_product_group_col, cy_exec_col, cy_sl_code_col]),
+        (budget_df, [budget_qty_col, budget_value_col, budget_company_group_col, budget_product_group_col, budget_exec_col, budget_sl_code_col])
+    ]
+    key = ('executive_product_growth',) + tuple(
+        (frame_fingerprint(df, cols), tuple(cols)) for df, cols in frames
+    )
+
+    def build():
+        if budget_sl_code_col:
+            # Empty company groups count as "" (not missing) for the SL code mapping, as in Streamlit
+            company_frames = [
+                pd.DataFrame({
+                    sl_code_col: df[sl_code_col],
+                    company_group_col: df[company_group_col].replace("", np.nan).fillna(""),
+                })
+                for df, sl_code_col, company_group_col in [
+                    (ly_df, ly_sl_code_col, ly_company_group_col),
+                    (cy_df, cy_sl_code_col, cy_company_group_col),
+                    (budget_df, budget_sl_code_col, budget_company_group_col)
+                ]
+            ]
+            sl_code_map = create_sl_code_mapping(
+                *company_frames,
+                ly_sl_code_col, cy_sl_code_col, budget_sl_code_col,
+                ly_company_group_col, cy_company_group_col, budget_company_group_col
+            )
+            ly_company = apply_sl_code_mapping(company_frames[0], ly_sl_code_col, ly_company_group_col, sl_code_map)
+            cy_company = apply_sl_code_mapping(company_frames[1], cy_sl_code_col, cy_company_group_col, sl_code_map)
+            budget_company = apply_sl_code_mapping(company_frames[2], budget_sl_code_col, budget_company_group_col, sl_code_map)
+        else:
+            ly_company = standardize_names(ly_df[ly_company_group_col])
+            cy_company = standardize_names(cy_df[cy_company_group_col])
+            budget_company = standardize_names(budget_df[budget_company_group_col])
+
+        def sales_cube(df, company, date_col, qty_col, value_col, product_group_col, exec_col):
+            dates = pd.to_datetime(df[date_col], dayfirst=True, errors='coerce', format='mixed')
+            return build_cube(
+                {
+                    'executive': map_distinct(df[exec_col], lambda e: str(e).strip().upper()),
+                    'company': company,
+                    'product': standardize_names(df[product_group_col]),
+                    'month': month_keys(dates),
+                },
+                {
+                    'qty': pd.to_numeric(df[qty_col], errors='coerce').fillna(0),
+                    'value': pd.to_numeric(df[value_col], errors='coerce').fillna(0),
+                }
+            )
+
+        return {
+            'ly': sales_cube(ly_df, ly_company, ly_date_col, ly_qty_col, ly_value_col, ly_product_group_col, ly_exec_col),
+            'cy': sales_cube(cy_df, cy_company, cy_date_col, cy_qty_col, cy_value_col, cy_product_group_col, cy_exec_col),
+            'budget': build_cube(
+                {
+                    'executive': map_distinct(budget_df[budget_exec_col], lambda e: str(e).strip().upper()),
+                    'company': budget_company,
+                    'product': standardize_names(budget_df[budget_product_group_col]),
+                },
+                {
+                    'qty': pd.to_numeric(budget_df[budget_qty_col], errors='coerce').fillna(0),
+                    'value': pd.to_numeric(budget_df[budget_value_col], errors='coerce').fillna(0),
+                }
+            ),
+        }
+
+    return cached_cube(key, build)
+
 def calculate_product_growth(ly_df, cy_df, budget_df, ly_month, cy_month, ly_date_col, cy_date_col, 
                             ly_qty_col, cy_qty_col, ly_value_col, cy_value_col, 
                             budget_qty_col, budget_value_col, ly_company_group_col, 
@@ -217,18 +278,6 @@ def calculate_product_growth(ly_df, cy_df, budget_df, ly_month, cy_month, ly_dat
     try:
         logger.info("Starting product growth calculation...")
         
-        # Create copies to avoid modifying original DataFrames
-        ly_df = ly_df.copy()
-        cy_df = cy_df.copy()
-        budget_df = budget_df.copy()
-        
-        # Replace empty strings with NaN and standardize, as in Streamlit
-        for df, col in [
-            (ly_df, ly_company_group_col), (cy_df, cy_company_group_col), (budget_df, budget_company_group_col),
-            (ly_df, ly_product_group_col), (cy_df, cy_product_group_col), (budget_df, budget_product_group_col)
-        ]:
-            df[col] = df[col].replace("", np.nan).fillna("")
-        
         # Validate required columns (relaxed for budget_sl_code_col)
         required_cols = [
             (ly_df, [ly_date_col, ly_qty_col, ly_value_col, ly_company_group_col, ly_product_group_col, ly_exec_col, ly_sl_code_col]),
@@ -247,291 +296,231 @@ def calculate_product_growth(ly_df, cy_df, budget_df, ly_month, cy_month, ly_dat
             logger.warning(f"Budget SL code column '{budget_sl_code_col}' not found. Proceeding without SL code mapping for budget.")
             budget_sl_code_col = None
         
-        # Create SL code mapping (skip if budget_sl_code_col is None)
-        if budget_sl_code_col:
-            sl_code_map = create_sl_code_mapping(
-                ly_df, cy_df, budget_df, 
-                ly_sl_code_col, cy_sl_code_col, budget_sl_code_col,
-                ly_company_group_col, cy_company_group_col, budget_company_group_col
-            )
-            ly_df[ly_company_group_col] = apply_sl_code_mapping(ly_df, ly_sl_code_col, ly_company_group_col, sl_code_map)
-            cy_df[cy_company_group_col] = apply_sl_code_mapping(cy_df, cy_sl_code_col, cy_company_group_col, sl_code_map)
-            budget_df[budget_company_group_col] = apply_sl_code_mapping(budget_df, budget_sl_code_col, budget_company_group_col, sl_code_map)
-        else:
-            # Standardize company group names without SL code mapping
-            ly_df[ly_company_group_col] = ly_df[ly_company_group_col].apply(standardize_name)
-            cy_df[cy_company_group_col] = cy_df[cy_company_group_col].apply(standardize_name)
-            budget_df[budget_company_group_col] = budget_df[budget_company_group_col].apply(standardize_name)
-        
-        # Standardize product group names
-        ly_df[ly_product_group_col] = ly_df[ly_product_group_col].apply(standardize_name)
-        cy_df[cy_product_group_col] = cy_df[cy_product_group_col].apply(standardize_name)
-        budget_df[budget_product_group_col] = budget_df[budget_product_group_col].apply(standardize_name)
-        
-        # Filter by executives
-        if selected_executives:
-            selected_executives = [str(e).strip().upper() for e in selected_executives]
-            if ly_exec_col in ly_df.columns:
-                ly_df = ly_df[ly_df[ly_exec_col].astype(str).str.strip().str.upper().isin(selected_executives)]
-            if cy_exec_col in cy_df.columns:
-                cy_df = cy_df[cy_df[cy_exec_col].astype(str).str.strip().str.upper().isin(selected_executives)]
-            if budget_exec_col in budget_df.columns:
-                budget_df = budget_df[budget_df[budget_exec_col].astype(str).str.strip().str.upper().isin(selected_executives)]
-        
-        if ly_df.empty or cy_df.empty or budget_df.empty:
-            logger.warning("One or more DataFrames are empty after executive filtering.")
-            return {"success": False, "error": "No data remains after executive filtering. Please check executive selections."}
-        
-        # Convert dates
-        ly_df[ly_date_col] = pd.to_datetime(ly_df[ly_date_col], dayfirst=True, errors='coerce', format='mixed')
-        cy_df[cy_date_col] = pd.to_datetime(cy_df[cy_date_col], dayfirst=True, errors='coerce', format='mixed')
-        
-        # Get available months
-        available_ly_months = ly_df[ly_date_col].dt.strftime('%b %y').dropna().unique().tolist()
-        available_cy_months = cy_df[cy_date_col].dt.strftime('%b %y').dropna().unique().tolist()
-        
-        if not available_ly_months or not available_cy_months:
-            logger.error("No valid dates found in LY or CY data.")
-            return {"success": False, "error": "No valid dates found in LY or CY data. Please check date columns."}
-        
-        # Filter by months
-        if ly_month:
-            ly_filtered_df = ly_df[ly_df[ly_date_col].dt.strftime('%b %y') == ly_month]
-        else:
-            latest_ly_month = max(available_ly_months, key=lambda x: pd.to_datetime(f"01 {x}", format="%d %b %y"))
-            ly_filtered_df = ly_df[ly_df[ly_date_col].dt.strftime('%b %y') == latest_ly_month]
-            ly_month = latest_ly_month
-        
-        if cy_month:
-            cy_filtered_df = cy_df[cy_df[cy_date_col].dt.strftime('%b %y') == cy_month]
-        else:
-            latest_cy_month = max(available_cy_months, key=lambda x: pd.to_datetime(f"01 {x}", format="%d %b %y"))
-            cy_filtered_df = cy_df[cy_df[cy_date_col].dt.strftime('%b %y') == latest_cy_month]
-            cy_month = latest_cy_month
+        cube = build_product_growth_cube(
+            ly_df, cy_df, budget_df, ly_date_col, cy_date_col,
+            ly_qty_col, cy_qty_col, ly_value_col, cy_value_col,
+            budget_qty_col, budget_value_col, ly_company_group_col,
+            cy_company_group_col, budget_company_group_col,
+            ly_product_group_col, cy_product_group_col, budget_product_group_col,
+            ly_sl_code_col, cy_sl_code_col, budget_sl_code_col,
+            ly_exec_col, cy_exec_col, budget_exec_col
+        )
+        return product_growth_from_cube(
+            cube, ly_month, cy_month,
+            selected_executives, selected_company_groups, selected_product_groups
+        )
         
-        if ly_filtered_df.empty or cy_filtered_df.empty:
-            logger.error(f"No data for selected months (LY: {ly_month}, CY: {cy_month}).")
-            return {"success": False, "error": f"No data for selected months (LY: {ly_month}, CY: {cy_month}). Please check month selections."}
+    except Exception as e:
+        logger.error(f"Error in calculate_product_growth: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {'success': False, 'error': f"Error calculating product growth: {str(e)}"}
+
+def product_growth_from_cube(cube, ly_month=None, cy_month=None, selected_executives=None,
+                             selected_company_groups=None, selected_product_groups=None):
+    """Product growth tables for one selection, read from build_product_growth_cube()"""
+    ly_cube, cy_cube, budget_cube = cube['ly'], cube['cy'], cube['budget']
+    
+    # Filter by executives
+    if selected_executives:
+        selected_executives = [str(e).strip().upper() for e in selected_executives]
+        ly_cube = cube_slice(ly_cube, executive=selected_executives)
+        cy_cube = cube_slice(cy_cube, executive=selected_executives)
+        budget_cube = cube_slice(budget_cube, executive=selected_executives)
+    
+    if not cube_rows(ly_cube) or not cube_rows(cy_cube) or not cube_rows(budget_cube):
+        logger.warning("One or more DataFrames are empty after executive filtering.")
+        return {"success": False, "error": "No data remains after executive filtering. Please check executive selections."}
+    
+    # Get available months
+    available_ly_months = unique_month_labels(ly_cube.index.get_level_values('month'))
+    available_cy_months = unique_month_labels(cy_cube.index.get_level_values('month'))
+    
+    if not available_ly_months or not available_cy_months:
+        logger.error("No valid dates found in LY or CY data.")
+        return {"success": False, "error": "No valid dates found in LY or CY data. Please check date columns."}
+    
+    # Filter by months
+    if not ly_month:
+        ly_month = max(available_ly_months, key=lambda x: pd.to_datetime(f"01 {x}", format="%d %b %y"))
+    if not cy_month:
+        cy_month = max(available_cy_months, key=lambda x: pd.to_datetime(f"01 {x}", format="%d %b %y"))
+    ly_filtered = month_slice(ly_cube, ly_month)
+    cy_filtered = month_slice(cy_cube, cy_month)
+    
+    if not cube_rows(ly_filtered) or not cube_rows(cy_filtered):
+        logger.error(f"No data for selected months (LY: {ly_month}, CY: {cy_month}).")
+        return {"success": False, "error": f"No data for selected months (LY: {ly_month}, CY: {cy_month}). Please check month selections."}
+    
+    # Get company groups
+    company_groups = set(first_seen(ly_filtered, 'company') + first_seen(cy_filtered, 'company') + first_seen(budget_cube, 'company'))
+    
+    # Filter by company groups
+    if selected_company_groups:
+        selected_company_groups = [standardize_name(g) for g in selected_company_groups]
+        invalid_groups = [g for g in selected_company_groups if g not in company_groups]
+        if invalid_groups:
+            logger.warning(f"The following company groups are not found in the data: {invalid_groups}. Proceeding with valid groups.")
+            selected_company_groups = [g for g in selected_company_groups if g in company_groups]
+            if not selected_company_groups:
+                return {"success": False, "error": "No valid company groups selected after validation. Please select valid company groups."}
+        
+        ly_filtered = cube_slice(ly_filtered, company=selected_company_groups)
+        cy_filtered = cube_slice(cy_filtered, company=selected_company_groups)
+        budget_cube = cube_slice(budget_cube, company=selected_company_groups)
+        if not cube_rows(ly_filtered) or not cube_rows(cy_filtered) or not cube_rows(budget_cube):
+            logger.warning(f"No data remains after filtering for company groups: {selected_company_groups}.")
+            return {"success": False, "error": f"No data remains after filtering for company groups: {selected_company_groups}. Please check company group selections or data content."}
+    
+    # Get product groups
+    product_groups = set(first_seen(ly_filtered, 'product') + first_seen(cy_filtered, 'product') + first_seen(budget_cube, 'product'))
+    
+    # Filter by product groups
+    if selected_product_groups:
+        selected_product_groups = [standardize_name(g) for g in selected_product_groups]
+        invalid_product_groups = [g for g in selected_product_groups if g not in product_groups]
+        if invalid_product_groups:
+            logger.warning(f"The following product groups are not found in the data: {invalid_product_groups}. Proceeding with valid groups.")
+            selected_product_groups = [g for g in selected_product_groups if g in product_groups]
+            if not selected_product_groups:
+                return {"success": False, "error": "No valid product groups selected after validation. Please select valid product groups."}
+        
+        ly_filtered = cube_slice(ly_filtered, product=selected_product_groups)
+        cy_filtered = cube_slice(cy_filtered, product=selected_product_groups)
+        budget_cube = cube_slice(budget_cube, product=selected_product_groups)
+        if not cube_rows(ly_filtered) or not cube_rows(cy_filtered) or not cube_rows(budget_cube):
+            logger.warning(f"No data remains after filtering for product groups: {selected_product_groups}.")
+            return {"success": False, "error": f"No data remains after filtering for product groups: {selected_product_groups}. Please check product group selections or data content."}
+    
+    # Get final company groups
+    company_groups = selected_company_groups if selected_company_groups else sorted(company_groups)
+    
+    if not company_groups:
+        logger.error("No valid company groups found in the data.")
+        return {"success": False, "error": "No valid company groups found in the data. Please check company group columns."}
+    
+    # Helper functions for calculations
+    def calc_achievement(cy, ly):
+        """Calculate achievement percentage for individual products"""
+        if pd.isna(ly) or ly == 0:
+            return 0.00 if cy == 0 else 100.00
+        return round(((cy - ly) / ly) * 100, 2)
+
+    def calc_total_growth_percentage(total_cy, total_ly):
+        """Calculate total growth percentage based on total values"""
+        if pd.isna(total_ly) or total_ly == 0:
+            return 0.00 if total_cy == 0 else 100.00
+        return round(((total_cy - total_ly) / total_ly) * 100, 2)
+    
+    ly_sums = product_sums(ly_filtered)
+    cy_sums = product_sums(cy_filtered)
+    budget_sums = product_sums(budget_cube)
+    
+    # Result dictionary
+    result = {}
+    
+    for company in company_groups:
+        ly_company = cube_slice(ly_filtered, company=[company])
+        cy_company = cube_slice(cy_filtered, company=[company])
+        budget_company = cube_slice(budget_cube, company=[company])
         
-        # Get company groups
-        company_groups = pd.concat([
-            ly_filtered_df[ly_company_group_col], 
-            cy_filtered_df[cy_company_group_col], 
-            budget_df[budget_company_group_col]
-        ]).dropna().unique().tolist()
+        if ly_company.empty and cy_company.empty and budget_company.empty:
+            logger.warning(f"No data for company group: {company}. Skipping.")
+            continue
         
-        # Filter by company groups
-        if selected_company_groups:
-            selected_company_groups = [standardize_name(g) for g in selected_company_groups]
-            valid_groups = set(company_groups)
-            invalid_groups = [g for g in selected_company_groups if g not in valid_groups]
-            if invalid_groups:
-                logger.warning(f"The following company groups are not found in the data: {invalid_groups}. Proceeding with valid groups.")
-                selected_company_groups = [g for g in selected_company_groups if g in valid_groups]
-                if not selected_company_groups:
-                    return {"success": False, "error": "No valid company groups selected after validation. Please select valid company groups."}
-            
-            ly_filtered_df = ly_filtered_df[ly_filtered_df[ly_company_group_col].isin(selected_company_groups)]
-            cy_filtered_df = cy_filtered_df[cy_filtered_df[cy_company_group_col].isin(selected_company_groups)]
-            budget_df = budget_df[budget_df[budget_company_group_col].isin(selected_company_groups)]
-            if ly_filtered_df.empty or cy_filtered_df.empty or budget_df.empty:
-                logger.warning(f"No data remains after filtering for company groups: {selected_company_groups}.")
-                return {"success": False, "error": f"No data remains after filtering for company groups: {selected_company_groups}. Please check company group selections or data content."}
-        
-        # Get product groups
-        product_groups = pd.concat([
-            ly_filtered_df[ly_product_group_col], 
-            cy_filtered_df[cy_product_group_col], 
-            budget_df[budget_product_group_col]
-        ]).dropna().unique().tolist()
+        # Get product groups for this company, in order of first appearance
+        company_product_groups = list(dict.fromkeys(
+            first_seen(ly_company, 'product') + first_seen(cy_company, 'product') + first_seen(budget_company, 'product')
+        ))
         
-        # Filter by product groups
         if selected_product_groups:
-            selected_product_groups = [standardize_name(g) for g in selected_product_groups]
-            valid_product_groups = set(product_groups)
-            invalid_product_groups = [g for g in selected_product_groups if g not in valid_product_groups]
-            if invalid_product_groups:
-                logger.warning(f"The following product groups are not found in the data: {invalid_product_groups}. Proceeding with valid groups.")
-                selected_product_groups = [g for g in selected_product_groups if g in valid_product_groups]
-                if not selected_product_groups:
-                    return {"success": False, "error": "No valid product groups selected after validation. Please select valid product groups."}
-            
-            ly_filtered_df = ly_filtered_df[ly_filtered_df[ly_product_group_col].isin(selected_product_groups)]
-            cy_filtered_df = cy_filtered_df[cy_filtered_df[cy_product_group_col].isin(selected_product_groups)]
-            budget_df = budget_df[budget_df[budget_product_group_col].isin(selected_product_groups)]
-            if ly_filtered_df.empty or cy_filtered_df.empty or budget_df.empty:
-                logger.warning(f"No data remains after filtering for product groups: {selected_product_groups}.")
-                return {"success": False, "error": f"No data remains after filtering for product groups: {selected_product_groups}. Please check product group selections or data content."}
-        
-        # Convert numeric columns
-        for df, qty_col, value_col in [
-            (ly_filtered_df, ly_qty_col, ly_value_col), 
-            (cy_filtered_df, cy_qty_col, cy_value_col), 
-            (budget_df, budget_qty_col, budget_value_col)
-        ]:
-            df[qty_col] = pd.to_numeric(df[qty_col], errors='coerce').fillna(0)
-            df[value_col] = pd.to_numeric(df[value_col], errors='coerce').fillna(0)
-            if df[qty_col].isna().all() or df[value_col].isna().all():
-                logger.warning(f"Invalid numeric data in {qty_col} or {value_col}. All values converted to 0.")
-        
-        # Get final company groups
-        company_groups = selected_company_groups if selected_company_groups else sorted(set(company_groups))
-        
-        if not company_groups:
-            logger.error("No valid company groups found in the data.")
-            return {"success": False, "error": "No valid company groups found in the data. Please check company group columns."}
-        
-        # Helper functions for calculations
-        def calc_achievement(row, cy_col, ly_col):
-            """Calculate achievement percentage for individual products"""
-            if pd.isna(row[ly_col]) or row[ly_col] == 0:
-                return 0.00 if row[cy_col] == 0 else 100.00
-            return round(((row[cy_col] - row[ly_col]) / row[ly_col]) * 100, 2)
-
-        def calc_total_growth_percentage(total_cy, total_ly):
-            """Calculate total growth percentage based on total values"""
-            if pd.isna(total_ly) or total_ly == 0:
-                return 0.00 if total_cy == 0 else 100.00
-            return round(((total_cy - total_ly) / total_ly) * 100, 2)
-        
-        # Result dictionary
-        result = {}
-        
-        for company in company_groups:
-            # Initialize DataFrames
-            qty_df = pd.DataFrame(columns=['PRODUCT GROUP', 'LY_QTY', 'BUDGET_QTY', 'CY_QTY', 'ACHIEVEMENT %'])
-            value_df = pd.DataFrame(columns=['PRODUCT GROUP', 'LY_VALUE', 'BUDGET_VALUE', 'CY_VALUE', 'ACHIEVEMENT %'])
-            
-            # Filter data for this company
-            ly_company_df = ly_filtered_df[ly_filtered_df[ly_company_group_col] == company]
-            cy_company_df = cy_filtered_df[cy_filtered_df[cy_company_group_col] == company]
-            budget_company_df = budget_df[budget_df[budget_company_group_col] == company]
-            
-            if ly_company_df.empty and cy_company_df.empty and budget_company_df.empty:
-                logger.warning(f"No data for company group: {company}. Skipping.")
-                continue
-            
-            # Get product groups for this company
-            company_product_groups = pd.concat([
-                ly_company_df[ly_product_group_col],
-                cy_company_df[cy_product_group_col],
-                budget_company_df[budget_product_group_col]
-            ]).dropna().unique().tolist()
-            
+            company_product_groups = [pg for pg in company_product_groups if pg in selected_product_groups]
             if not company_product_groups:
-                logger.warning(f"No product groups for company: {company}. Skipping.")
+                logger.warning(f"No valid product groups for company: {company} after filtering. Skipping.")
                 continue
-            
-            if selected_product_groups:
-                company_product_groups = [pg for pg in company_product_groups if pg in selected_product_groups]
-                if not company_product_groups:
-                    logger.warning(f"No valid product groups for company: {company} after filtering. Skipping.")
-                    continue
-            
-            # Aggregate data
-            ly_qty = ly_company_df.groupby([ly_company_group_col, ly_product_group_col])[ly_qty_col].sum().reset_index()
-            ly_qty = ly_qty.rename(columns={ly_product_group_col: 'PRODUCT GROUP', ly_qty_col: 'LY_QTY'})
-            
-            cy_qty = cy_company_df.groupby([cy_company_group_col, cy_product_group_col])[cy_qty_col].sum().reset_index()
-            cy_qty = cy_qty.rename(columns={cy_product_group_col: 'PRODUCT GROUP', cy_qty_col: 'CY_QTY'})
-            
-            budget_qty = budget_company_df.groupby([budget_company_group_col, budget_product_group_col])[budget_qty_col].sum().reset_index()
-            budget_qty = budget_qty.rename(columns={budget_product_group_col: 'PRODUCT GROUP', budget_qty_col: 'BUDGET_QTY'})
-            
-            ly_value = ly_company_df.groupby([ly_company_group_col, ly_product_group_col])[ly_value_col].sum().reset_index()
-            ly_value = ly_value.rename(columns={ly_product_group_col: 'PRODUCT GROUP', ly_value_col: 'LY_VALUE'})
-            
-            cy_value = cy_company_df.groupby([cy_company_group_col, cy_product_group_col])[cy_value_col].sum().reset_index()
-            cy_value = cy_value.rename(columns={cy_product_group_col: 'PRODUCT GROUP', cy_value_col: 'CY_VALUE'})
-            
-            budget_value = budget_company_df.groupby([budget_company_group_col, budget_product_group_col])[budget_value_col].sum().reset_index()
-            budget_value = budget_value.rename(columns={budget_product_group_col: 'PRODUCT GROUP', budget_value_col: 'BUDGET_VALUE'})
-            
-            # Create base DataFrames
-            product_qty_df = pd.DataFrame({'PRODUCT GROUP': company_product_groups})
-            product_value_df = pd.DataFrame({'PRODUCT GROUP': company_product_groups})
-            
-            # Merge data
-            qty_df = product_qty_df.merge(ly_qty[['PRODUCT GROUP', 'LY_QTY']], on='PRODUCT GROUP', how='left')\
-                                   .merge(budget_qty[['PRODUCT GROUP', 'BUDGET_QTY']], on='PRODUCT GROUP', how='left')\
-                                   .merge(cy_qty[['PRODUCT GROUP', 'CY_QTY']], on='PRODUCT GROUP', how='left').fillna(0)
-            
-            value_df = product_value_df.merge(ly_value[['PRODUCT GROUP', 'LY_VALUE']], on='PRODUCT GROUP', how='left')\
-                                       .merge(budget_value[['PRODUCT GROUP', 'BUDGET_VALUE']], on='PRODUCT GROUP', how='left')\
-                                       .merge(cy_value[['PRODUCT GROUP', 'CY_VALUE']], on='PRODUCT GROUP', how='left').fillna(0)
-            
-            # Calculate achievement percentages for individual products
-            qty_df['ACHIEVEMENT %'] = qty_df.apply(lambda row: calc_achievement(row, 'CY_QTY', 'LY_QTY'), axis=1)
-            value_df['ACHIEVEMENT %'] = value_df.apply(lambda row: calc_achievement(row, 'CY_VALUE', 'LY_VALUE'), axis=1)
-            
-            # Round all numeric columns to 2 decimal places
-            numeric_cols_qty = ['LY_QTY', 'BUDGET_QTY', 'CY_QTY']
-            numeric_cols_value = ['LY_VALUE', 'BUDGET_VALUE', 'CY_VALUE']
-            
-            for col in numeric_cols_qty:
-                qty_df[col] = qty_df[col].round(2)
-            
-            for col in numeric_cols_value:
-                value_df[col] = value_df[col].round(2)
-            
-            # Reorder columns
-            qty_df = qty_df[['PRODUCT GROUP', 'LY_QTY', 'BUDGET_QTY', 'CY_QTY', 'ACHIEVEMENT %']]
-            value_df = value_df[['PRODUCT GROUP', 'LY_VALUE', 'BUDGET_VALUE', 'CY_VALUE', 'ACHIEVEMENT %']]
-            
-            # Calculate totals correctly
-            total_ly_qty = qty_df['LY_QTY'].sum()
-            total_cy_qty = qty_df['CY_QTY'].sum()
-            total_budget_qty = qty_df['BUDGET_QTY'].sum()
-            
-            total_ly_value = value_df['LY_VALUE'].sum()
-            total_cy_value = value_df['CY_VALUE'].sum()
-            total_budget_value = value_df['BUDGET_VALUE'].sum()
-            
-            # Add total rows with correct growth calculation
-            qty_totals = pd.DataFrame({
-                'PRODUCT GROUP': ['TOTAL'],
-                'LY_QTY': [round(total_ly_qty, 2)],
-                'BUDGET_QTY': [round(total_budget_qty, 2)],
-                'CY_QTY': [round(total_cy_qty, 2)],
-                'ACHIEVEMENT %': [calc_total_growth_percentage(total_cy_qty, total_ly_qty)]
-            })
-            qty_df = pd.concat([qty_df, qty_totals], ignore_index=True)
-            
-            value_totals = pd.DataFrame({
-                'PRODUCT GROUP': ['TOTAL'],
-                'LY_VALUE': [round(total_ly_value, 2)],
-                'BUDGET_VALUE': [round(total_budget_value, 2)],
-                'CY_VALUE': [round(total_cy_value, 2)],
-                'ACHIEVEMENT %': [calc_total_growth_percentage(total_cy_value, total_ly_value)]
-            })
-            value_df = pd.concat([value_df, value_totals], ignore_index=True)
-            
-            # Store result
-            result[company] = {'qty_df': qty_df, 'value_df': value_df}
-        
-        if not result:
-            logger.error("No data available after filtering.")
-            return {"success": False, "error": "No data available after filtering. Please review filters and data."}
-        
-        logger.info("Product growth calculation completed successfully")
-        
-        # Convert DataFrames to records for JSON serialization
-        for company in result:
-            result[company]['qty_df'] = result[company]['qty_df'].to_dict('records')
-            result[company]['value_df'] = result[company]['value_df'].to_dict('records')
-        
-        return {
-            'success': True,
-            'streamlit_result': result,
-            'ly_month': ly_month,
-            'cy_month': cy_month
-        }
         
-    except Exception as e:
-        logger.error(f"Error in calculate_product_growth: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {'success': False, 'error': f"Error calculating product growth: {str(e)}"}
+        def column(sums, measure):
+            return company_cells(sums, company)[measure].reindex(company_product_groups).fillna(0).values
+        
+        qty_df = pd.DataFrame({
+            'PRODUCT GROUP': company_product_groups,
+            'LY_QTY': column(ly_sums, 'qty'),
+            'BUDGET_QTY': column(budget_sums, 'qty'),
+            'CY_QTY': column(cy_sums, 'qty'),
+        })
+        value_df = pd.DataFrame({
+            'PRODUCT GROUP': company_product_groups,
+            'LY_VALUE': column(ly_sums, 'value'),
+            'BUDGET_VALUE': column(budget_sums, 'value'),
+            'CY_VALUE': column(cy_sums, 'value'),
+        })
+        
+        # Calculate achievement percentages for individual products
+        qty_df['ACHIEVEMENT %'] = [calc_achievement(cy, ly) for cy, ly in zip(qty_df['CY_QTY'], qty_df['LY_QTY'])]
+        value_df['ACHIEVEMENT %'] = [calc_achievement(cy, ly) for cy, ly in zip(value_df['CY_VALUE'], value_df['LY_VALUE'])]
+        
+        # Round all numeric columns to 2 decimal places
+        numeric_cols_qty = ['LY_QTY', 'BUDGET_QTY', 'CY_QTY']
+        numeric_cols_value = ['LY_VALUE', 'BUDGET_VALUE', 'CY_VALUE']
+
+        for col in numeric_cols_qty:
+            qty_df[col] = qty_df[col].round(2)
+
+        for col in numeric_cols_value:
+            value_df[col] = value_df[col].round(2)
+
+        # Reorder columns
+        qty_df = qty_df[['PRODUCT GROUP', 'LY_QTY', 'BUDGET_QTY', 'CY_QTY', 'ACHIEVEMENT %']]
+        value_df = value_df[['PRODUCT GROUP', 'LY_VALUE', 'BUDGET_VALUE', 'CY_VALUE', 'ACHIEVEMENT %']]
+
+        # Calculate totals correctly
+        total_ly_qty = qty_df['LY_QTY'].sum()
+        total_cy_qty = qty_df['CY_QTY'].sum()
+        total_budget_qty = qty_df['BUDGET_QTY'].sum()
+
+        total_ly_value = value_df['LY_VALUE'].sum()
+        total_cy_value = value_df['CY_VALUE'].sum()
+        total_budget_value = value_df['BUDGET_VALUE'].sum()
+
+        # Add total rows with correct growth calculation
+        qty_totals = pd.DataFrame({
+            'PRODUCT GROUP': ['TOTAL'],
+            'LY_QTY': [round(total_ly_qty, 2)],
+            'BUDGET_QTY': [round(total_budget_qty, 2)],
+            'CY_QTY': [round(total_cy_qty, 2)],
+            'ACHIEVEMENT %': [calc_total_growth_percentage(total_cy_qty, total_ly_qty)]
+        })
+        qty_df = pd.concat([qty_df, qty_totals], ignore_index=True)
+
+        value_totals = pd.DataFrame({
+            'PRODUCT GROUP': ['TOTAL'],
+            'LY_VALUE': [round(total_ly_value, 2)],
+            'BUDGET_VALUE': [round(total_budget_value, 2)],
+            'CY_VALUE': [round(total_cy_value, 2)],
+            'ACHIEVEMENT %': [calc_total_growth_percentage(total_cy_value, total_ly_value)]
+        })
+        value_df = pd.concat([value_df, value_totals], ignore_index=True)
+
+        # Store result
+        result[company] = {'qty_df': qty_df, 'value_df': value_df}
+
+    if not result:
+        logger.error("No data available after filtering.")
+        return {"success": False, "error": "No data available after filtering. Please review filters and data."}
+
+    logger.info("Product growth calculation completed successfully")
+
+    # Convert DataFrames to records for JSON serialization
+    for company in result:
+        result[company]['qty_df'] = result[company]['qty_df'].to_dict('records')
+        result[company]['value_df'] = result[company]['value_df'].to_dict('records')
+
+    return {
+        'success': True,
+        'streamlit_result': result,
+        'ly_month': ly_month,
+        'cy_month': cy_month
+    }
 
 def load_data(file_path):
     """Load data from file"""
@@ -542,7 +531,7 @@ def load_data(file_path):
         if file_path.endswith('.csv'):
             return pd.read_csv(file_path)
         elif file_path.endswith(('.xlsx', '.xls')):
-            return pd.read_excel(file_path)
+            return read_excel_cached(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_path}")
     except Exception as e:
@@ -0,0 +1,47 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+from utils.growth_cube import map_distinct
+
+# Company and product group names, standardized as the Streamlit reports do:
+# lower-cased, stripped of punctuation, words capitalized, and every spelling
+# of "general" folded into 'General'. Columns are standardized per distinct
+# value only (see map_distinct), and the results are memoized across
+# requests, so the cost follows the number of distinct groups, not rows.
+
+GROUP_NAME_CACHE_SIZE = 65536
+GENERAL_NAME = 'General'
+# Each accepted spelling (general, gen, generals, genral, generl) contains 'gen'
+_GENERAL_MARKER = 'gen'
+# Anything but letters, digits and whitespace, as str.isalnum()/isspace() see them
+_PUNCTUATION = re.compile(r'[^\w\s]|_')
+
+
+@lru_cache(maxsize=GROUP_NAME_CACHE_SIZE)
+def _standardize_text(text):
+    name = _PUNCTUATION.sub('', text.strip().lower())
+    name = ' '.join(word.capitalize() for word in name.split())
+    if _GENERAL_MARKER in name.lower():
+        return GENERAL_NAME
+    return name
+
+
+def standardize_name(name):
+    """Standardize company/product group names"""
+    if pd.isna(name) or not name:
+        return ""
+    return _standardize_text(str(name))
+
+
+def _standardize_text_cell(value):
+    return "" if pd.isna(value) else standardize_name(str(value))
+
+
+def standardize_names(series, as_text=False):
+    """
+    standardize_name over a column, once per distinct value. With as_text every
+    non-missing value is standardized as its str(), so 0 becomes '0', not ''.
+    """
+    return map_distinct(series, _standardize_text_cell if as_text else standardize_name)
@@ -0,0 +1,120 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.month_keys import month_mask
+
+# Product growth cubes: qty/value pre-aggregated over (executive, company group,
+# product, month) so every executive / company / month selection is answered
+# from a few thousand cube cells instead of re-standardizing the raw rows.
+# Each cell also carries its row count ('rows', for the "no data" checks) and
+# the position of its first source row ('pos', for first-appearance ordering).
+
+_CUBE_MAX_ENTRIES = 8
+_cubes = OrderedDict()
+_cubes_lock = threading.Lock()
+
+
+def map_distinct(series, func):
+    """series.apply(func), evaluated once per distinct value and broadcast back by category code"""
+    values = series.to_numpy()
+    codes, uniques = pd.factorize(values)
+    mapped = np.fromiter((func(v) for v in uniques), dtype=object, count=len(uniques))
+    result = mapped[codes] if len(uniques) else np.empty(len(series), dtype=object)
+    missing = codes == -1
+    if missing.any():
+        # factorize folds None and NaN into one code; func may tell them apart
+        missing_values = values[missing]
+        kinds = pd.unique(missing_values)
+        if len(kinds) == 1:
+            result[missing] = func(kinds[0])
+        else:
+            result[missing] = [func(v) for v in missing_values]
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def frame_fingerprint(df, columns):
+    """Content hash of the given columns; cheap compared to rebuilding a cube"""
+    sha = hashlib.sha1()
+    sha.update(repr((len(df), list(columns))).encode())
+    for col in columns:
+        if col is None or col not in df.columns:
+            continue
+        values = df[col]
+        sha.update(repr((col, str(values.dtype))).encode())
+        sha.update(pd.util.hash_pandas_object(values, index=False).values.tobytes())
+        if values.dtype == object:
+            # Nulls all hash alike; record which ones are None rather than NaN
+            missing = values.isna().to_numpy()
+            if missing.any():
+                sha.update(np.equal(values.to_numpy()[missing], None).tobytes())
+    return sha.hexdigest()
+
+
+def cached_cube(key, build):
+    """Return the cube stored under key, building it with build() on a miss"""
+    with _cubes_lock:
+        if key in _cubes:
+            _cubes.move_to_end(key)
+            return _cubes[key]
+
+    cube = build()
+    with _cubes_lock:
+        _cubes[key] = cube
+        while len(_cubes) > _CUBE_MAX_ENTRIES:
+            _cubes.popitem(last=False)
+    return cube
+
+
+def build_cube(keys, measures):
+    """
+    Group rows by the `keys` columns (dict name -> Series) and sum `measures`
+    (dict name -> numeric Series). Missing key values form their own cells.
+    """
+    frame = pd.DataFrame({**keys, **measures})
+    frame['rows'] = 1
+    frame['pos'] = np.arange(len(frame))
+    agg = {name: 'sum' for name in measures}
+    agg.update(rows='sum', pos='min')
+    return frame.groupby(list(keys), dropna=False, sort=False).agg(agg)
+
+
+def cube_slice(cube, **levels):
+    """Cells whose index level values are in the given lists; None leaves a level unfiltered"""
+    mask = np.ones(len(cube), dtype=bool)
+    for level, values in levels.items():
+        if values is not None:
+            mask &= cube.index.get_level_values(level).isin(values)
+    return cube[mask]
+
+
+def month_slice(cube, labels, level='month'):
+    """Cells whose month key is labelled as one of `labels` (e.g. 'Apr 25')"""
+    keys = pd.Series(cube.index.get_level_values(level))
+    return cube[month_mask(keys, labels).values]
+
+
+def cube_rows(cube):
+    """Number of source rows behind a cube slice"""
+    return int(cube['rows'].sum())
+
+
+def first_seen(cube, level):
+    """Distinct values of a level, in order of their first source row"""
+    first = pd.Series(cube['pos'].values, index=cube.index.get_level_values(level))
+    return first.groupby(level=0, sort=False, dropna=False).min().sort_values(kind='stable').index.tolist()
+
+
+def product_sums(cube):
+    """qty/value per (company, product), like df.groupby([company, product]).sum()"""
+    return cube[['qty', 'value']].groupby(level=['company', 'product']).sum()
+
+
+def company_cells(sums, company):
+    """Rows of product_sums() for one company group, indexed by product"""
+    if company not in sums.index.get_level_values('company'):
+        return sums.iloc[0:0].droplevel('company')
+    return sums.xs(company, level='company')
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from werkzeug.http import parse_options_header
+
+from utils.process_pool import get_pool, reset_pool
+
+logger = logging.getLogger(__name__)
+
+# Background jobs for the long-running report builds. A job is a captured HTTP
+# request to one of the heavy endpoints; a worker process replays it against
+# its own app instance and writes the response body to the job directory. All
+# job state lives on local disk (JOBS_DIR/<job_id>/status.json and result), so
+# any server process can answer status and result requests. Completion hooks
+# run in the submitting process once the worker is done. Jobs run in a
+# utils.process_pool pool.
+
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", min(2, os.cpu_count() or 1)))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", 24))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+_STATUS_FILE = 'status.json'
+_RESULT_FILE = 'result'
+_DROPPED_HEADERS = {'host', 'content-length'}
+JOB_POOL = 'jobs'
+
+_futures = {}              # job_id -> Future, for jobs submitted by this process
+_futures_lock = threading.Lock()
+_completion_hooks = []
+
+# Worker process state
+_worker_app = None
+_current_job = None
+
+
+### --------- Job state on disk ----------
+
+def is_valid_job_id(job_id):
+    return isinstance(job_id, str) and len(job_id) == 32 and all(c in '0123456789abcdef' for c in job_id)
+
+
+def job_dir(job_id):
+    return os.path.join(JOBS_DIR, job_id)
+
+
+def result_path(job_id):
+    return os.path.join(job_dir(job_id), _RESULT_FILE)
+
+
+def read_status(job_id):
+    """Status dict of a job, or None if there is no such job"""
+    if not is_valid_job_id(job_id):
+        return None
+    try:
+        with open(os.path.join(job_dir(job_id), _STATUS_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_status(job_id, status):
+    directory = job_dir(job_id)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, os.path.join(directory, _STATUS_FILE))
+
+
+def _update_status(job_id, **changes):
+    status = read_status(job_id) or {'job_id': job_id}
+    status.update(changes)
+    _write_status(job_id, status)
+    return status
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def purge_expired_jobs():
+    """Remove finished jobs older than JOB_RETENTION_HOURS"""
+    if not os.path.isdir(JOBS_DIR):
+        return
+    cutoff = time.time() - JOB_RETENTION_HOURS * 3600
+    for job_id in os.listdir(JOBS_DIR):
+        status_file = os.path.join(JOBS_DIR, job_id, _STATUS_FILE)
+        try:
+            if os.path.getmtime(status_file) >= cutoff:
+                continue
+        except OSError:
+            continue
+        status = read_status(job_id)
+        if status and status.get('state') in FINISHED_STATES:
+            shutil.rmtree(job_dir(job_id), ignore_errors=True)
+
+
+### --------- Worker side ----------
+
+def report_progress(percent, message=None):
+    """Record progress of the job running in this process; no-op outside a job"""
+    if _current_job is None:
+        return
+    try:
+        _update_status(_current_job, progress=max(0, min(100, int(percent))), message=message)
+    except OSError as e:
+        logger.warning(f"Could not record progress of job {_current_job}: {e}")
+
+
+def _get_worker_app():
+    global _worker_app
+    if _worker_app is None:
+        from app import create_app
+        _worker_app = create_app()
+    return _worker_app
+
+
+def run_job(job_id, captured):
+    """Worker side: replay a captured request and store its response as the job result"""
+    global _current_job
+    _current_job = job_id
+    try:
+        _update_status(job_id, state=RUNNING, started_at=_now(), progress=1, message='Running')
+        client = _get_worker_app().test_client()
+        response = client.open(
+            captured['path'],
+            method=captured['method'],
+            query_string=captured['query_string'],
+            headers=captured['headers'],
+            data=captured['body'],
+            buffered=False
+        )
+        size = 0
+        try:
+            with open(result_path(job_id) + '.tmp', 'wb') as f:
+                for chunk in response.iter_encoded():
+                    f.write(chunk)
+                    size += len(chunk)
+        finally:
+            response.close()
+        os.replace(result_path(job_id) + '.tmp', result_path(job_id))
+
+        _, options = parse_options_header(response.headers.get('Content-Disposition', ''))
+        succeeded = response.status_code < 400
+        return _update_status(
+            job_id,
+            state=DONE if succeeded else FAILED,
+            progress=100,
+            message='Completed' if succeeded else f'Request failed with status {response.status_code}',
+            finished_at=_now(),
+            http_status=response.status_code,
+            mimetype=response.mimetype,
+            download_name=options.get('filename'),
+            size=size
+        )
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+        return _update_status(job_id, state=FAILED, finished_at=_now(), message='Job failed', error=str(e))
+    finally:
+        _current_job = None
+
+
+### --------- Submitting side ----------
+
+def register_completion_hook(hook):
+    """hook(status) is called in the submitting process when a job finishes"""
+    _completion_hooks.append(hook)
+
+
+def _on_job_finished(job_id, future):
+    with _futures_lock:
+        _futures.pop(job_id, None)
+    if future.cancelled():
+        status = _update_status(job_id, state=CANCELLED, finished_at=_now(), message='Cancelled')
+    else:
+        error = future.exception()
+        if error is None:
+            status = future.result()
+        else:
+            logger.error(f"Job {job_id} could not run: {error}")
+            if isinstance(error, BrokenProcessPool):
+                reset_pool(JOB_POOL)
+            status = _update_status(job_id, state=FAILED, finished_at=_now(), message='Job failed', error=str(error))
+
+    for hook in _completion_hooks:
+        try:
+            hook(status)
+        except Exception as e:
+            logger.warning(f"Completion hook {getattr(hook, '__name__', hook)} failed for job {job_id}: {e}")
+
+
+def capture_request(req, drop_args=()):
+    """Picklable copy of a Flask request, for replay in a worker"""
+    return {
+        'method': req.method,
+        'path': req.path,
+        'query_string': [(k, v) for k, v in req.args.items(multi=True) if k not in drop_args],
+        'headers': [(k, v) for k, v in req.headers.items() if k.lower() not in _DROPPED_HEADERS],
+        'body': req.get_data()
+    }
+
+
+def submit_job(captured, callback_id=None):
+    """Queue a captured request; returns the new job's status"""
+    purge_expired_jobs()
+    job_id = uuid.uuid4().hex
+    os.makedirs(job_dir(job_id), exist_ok=True)
+    status = {
+        'job_id': job_id,
+        'endpoint': captured['path'],
+        'state': QUEUED,
+        'progress': 0,
+        'message': 'Queued',
+        'created_at': _now(),
+        'callback_id': callback_id
+    }
+    _write_status(job_id, status)
+
+    try:
+        future = get_pool(JOB_POOL, JOB_WORKERS).submit(run_job, job_id, captured)
+    except BrokenProcessPool:
+        reset_pool(JOB_POOL)
+        future = get_pool(JOB_POOL, JOB_WORKERS).submit(run_job, job_id, captured)
+    with _futures_lock:
+        _futures[job_id] = future
+    future.add_done_callback(lambda f: _on_job_finished(job_id, f))
+    logger.info(f"Queued job {job_id} for {captured['path']}")
+    return status
+
+
+def cancel_job(job_id):
+    """Cancel a job that has not started yet; True if it was cancelled"""
+    with _futures_lock:
+        future = _futures.get(job_id)
+    return future is not None and future.cancel()
+
+
+def delete_job(job_id):
+    """Remove a finished job and its artifacts"""
+    status = read_status(job_id)
+    if status is None or status.get('state') not in FINISHED_STATES:
+        return False
+    shutil.rmtree(job_dir(job_id), ignore_errors=True)
+    return True
@@ -0,0 +1,67 @@
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+
+# Month filters compare integer period keys (year * 12 + month - 1) instead of
+# formatting every row with strftime. Labels are only built for distinct keys.
+
+MONTH_LABEL_FORMAT = '%b %y'
+NO_MONTH = -1
+
+
+def parse_dates(values, **kwargs):
+    """Parse a date column once; already-parsed datetime columns are returned as is"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    kwargs.setdefault('dayfirst', True)
+    kwargs.setdefault('errors', 'coerce')
+    return pd.to_datetime(values, **kwargs)
+
+
+def month_keys(dates):
+    """Integer month key per date (NO_MONTH for missing dates)"""
+    keys = dates.dt.year * 12 + dates.dt.month - 1
+    return keys.fillna(NO_MONTH).astype('int64')
+
+
+@lru_cache(maxsize=None)
+def month_label(key, fmt=MONTH_LABEL_FORMAT):
+    """Label of one month key, e.g. 24303 -> 'Apr 25'"""
+    if key == NO_MONTH:
+        return None
+    return datetime(key // 12, key % 12 + 1, 1).strftime(fmt)
+
+
+def key_year_month(key):
+    """(year, month) of a month key"""
+    return key // 12, key % 12 + 1
+
+
+def map_month_keys(keys, func):
+    """Apply func(year, month) once per distinct key; NO_MONTH rows map to None"""
+    mapping = {int(k): func(*key_year_month(int(k))) for k in pd.unique(keys) if k != NO_MONTH}
+    return keys.map(mapping).astype(object).where(keys != NO_MONTH, None)
+
+
+def month_labels(keys, fmt=MONTH_LABEL_FORMAT):
+    """Month label per row, formatted once per distinct key (None for NO_MONTH)"""
+    return map_month_keys(keys, lambda year, month: datetime(year, month, 1).strftime(fmt))
+
+
+def unique_month_labels(keys, fmt=MONTH_LABEL_FORMAT):
+    """Distinct labels in order of first appearance, like strftime(...).dropna().unique()"""
+    labels = (month_label(int(k), fmt) for k in pd.unique(keys) if k != NO_MONTH)
+    return list(dict.fromkeys(labels))
+
+
+def keys_for_labels(keys, labels, fmt=MONTH_LABEL_FORMAT):
+    """Month keys present in `keys` whose label is one of `labels`"""
+    if isinstance(labels, str):
+        labels = [labels]
+    wanted = set(labels)
+    return [int(k) for k in pd.unique(keys) if k != NO_MONTH and month_label(int(k), fmt) in wanted]
+
+
+def month_mask(keys, labels, fmt=MONTH_LABEL_FORMAT):
+    """Boolean mask equivalent to dates.dt.strftime(fmt).isin(labels)"""
+    return keys.isin(keys_for_labels(keys, labels, fmt))
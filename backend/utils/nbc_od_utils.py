@@ -6,6 +6,9 @@ from pptx.util import Inches
 import logging
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from utils.month_keys import month_keys, map_month_keys
+from utils.column_resolver import map_fields
+from utils.branch_names import area_names, executive_names
 
 logger = logging.getLogger(__name__)
 
@@ -31,24 +34,14 @@ def determine_financial_year(date):
     else:
         return f"{year % 100 - 1}-{year % 100}"  # e.g., February 2025 -> 24-25
     
-def find_column_by_names(columns, target_names):
-    """Find a column by checking multiple possible names (case-insensitive)."""
-    columns_upper = [col.upper() for col in columns]
-    target_names_upper = [name.upper() for name in target_names]
-    
-    for target in target_names_upper:
-        if target in columns_upper:
-            return columns[columns_upper.index(target)]
-    return None
-
 def auto_map_nbc_columns(sales_columns):
     """Auto-map Number of Billed Customers columns."""
-    return {
-        'date': find_column_by_names(sales_columns, ['Date', 'Bill Date', 'Invoice Date']),
-        'customer_id': find_column_by_names(sales_columns, ['Customer Code', 'SL Code', 'Customer ID']),
-        'branch': find_column_by_names(sales_columns, ['Branch', 'Area', 'Location']),
-        'executive': find_column_by_names(sales_columns, ['Executive', 'Sales Executive', 'Executive Name'])
-    }
+    return map_fields(sales_columns, {
+        'date': 'sales_date',
+        'customer_id': 'customer_code',
+        'branch': 'branch',
+        'executive': 'executive'
+    })
 
 def create_customer_table(sales_df, date_col, branch_col, customer_id_col, executive_col, selected_branches=None, selected_executives=None):
     sales_df = sales_df.copy()
@@ -67,8 +60,10 @@ def create_customer_table(sales_df, date_col, branch_col, customer_id_col, execu
         logger.warning("No valid date rows in sales_df")
         return None
 
-    sales_df['Financial_Year'] = sales_df[date_col].apply(determine_financial_year)
-    sales_df['Month_Name'] = sales_df[date_col].dt.strftime('%b-%Y').str.upper()
+    # Derived once per distinct month instead of per row
+    keys = month_keys(sales_df[date_col])
+    sales_df['Financial_Year'] = map_month_keys(keys, lambda year, month: determine_financial_year(datetime(year, month, 1)))
+    sales_df['Month_Name'] = map_month_keys(keys, lambda year, month: datetime(year, month, 1).strftime('%b-%Y').upper())
 
     # Branch mapping
     sales_df['Raw_Branch'] = sales_df[branch_col].astype(str).str.upper()
@@ -113,47 +108,12 @@ def create_customer_table(sales_df, date_col, branch_col, customer_id_col, execu
 
 def auto_map_od_target_columns(os_columns):
     """Auto-map OD Target columns."""
-    return {
-        'area': find_column_by_names(os_columns, ['Branch', 'Area', 'Location', 'Unit']),
-        'due_date': find_column_by_names(os_columns, ['Due Date', 'Due_Date', 'DueDate']),
-        'net_value': find_column_by_names(os_columns, ['Net Value', 'NetValue', 'Amount', 'Value']),
-        'executive': find_column_by_names(os_columns, ['Executive Name', 'Executive', 'Sales Executive'])
-    }
-
-def extract_area_name(area):
-    """Extract and standardize branch names."""
-    if pd.isna(area) or str(area).strip() == '':
-        return None  # Return None for empty/null values  
-    area = str(area).strip().upper()
-    if area == 'HO' or area.endswith('-HO'):
-        return None
-    branch_variations = {
-        'PUDUCHERRY': ['PUDUCHERRY', 'PONDY', 'PUDUCHERRY - PONDY', 'PONDICHERRY', 'PUDUCHERI', 'aaaa - PUDUCHERRY', 'AAAA - PUDUCHERRY'],
-        'COIMBATORE': ['COIMBATORE', 'CBE', 'COIMBATORE - CBE', 'COIMBATURE', 'aaaa - COIMBATORE', 'AAAA - COIMBATORE'],
-        'KARUR': ['KARUR', 'KRR', 'KARUR - KRR', 'aaaa - KARUR', 'AAAA - KARUR'],
-        'MADURAI': ['MADURAI', 'MDU', 'MADURAI - MDU', 'MADURA', 'aaaa - MADURAI', 'AAAA - MADURAI'],
-        'CHENNAI': ['CHENNAI', 'CHN', 'aaaa - CHENNAI', 'AAAA - CHENNAI'],
-    }
-    
-    for standard_name, variations in branch_variations.items():
-        for variation in variations:
-            if variation in area:
-                return standard_name
-    prefixes = ['AAAA - ', 'aaaa - ', 'BBB - ', 'bbb - ', 'ASIA CRYSTAL COMMODITY LLP - ']
-    for prefix in prefixes:
-        if area.startswith(prefix.upper()):
-            return area[len(prefix):].strip()
-    separators = [' - ', '-', ':']
-    for sep in separators:
-        if sep in area:
-            return area.split(sep)[-1].strip()    
-    return area
-
-def extract_executive_name(executive):
-    """Normalize executive names, treating null/empty as 'BLANK'."""
-    if pd.isna(executive) or str(executive).strip() == '':
-        return 'BLANK'  # Treat null/empty as 'BLANK'
-    return str(executive).strip().upper()  # Standardize to uppercase
+    return map_fields(os_columns, {
+        'area': 'branch',
+        'due_date': 'due_date',
+        'net_value': 'net_value',
+        'executive': 'executive'
+    })
 
 def filter_os_qty(
     os_df,
@@ -167,8 +127,6 @@ def filter_os_qty(
     selected_executives=None
 ):
     """Backend-compatible version of OD Target filter and aggregation."""
-    from utils.nbc_od_utils import extract_area_name, extract_executive_name  # If not in same file
-
     required_columns = [os_area_col, os_qty_col, os_due_date_col, os_exec_col]
     for col in required_columns:
         if col not in os_df.columns:
@@ -176,8 +134,8 @@ def filter_os_qty(
             return None, None, None
 
     os_df = os_df.copy()
-    os_df[os_area_col] = os_df[os_area_col].apply(extract_area_name)
-    os_df[os_exec_col] = os_df[os_exec_col].apply(extract_executive_name)
+    os_df[os_area_col] = area_names(os_df[os_area_col])
+    os_df[os_exec_col] = executive_names(os_df[os_exec_col])
 
     try:
         os_df[os_due_date_col] = pd.to_datetime(os_df[os_due_date_col], errors='coerce')
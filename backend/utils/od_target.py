@@ -5,44 +5,39 @@ from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 import logging
+from utils.column_resolver import map_fields
+from utils.branch_names import canonicalize_series
 
 logger = logging.getLogger(__name__)
 
 # =========================
 # Auto-mapping (KEEP ORIGINAL)
 # =========================
-def find_column_by_names(columns, possible_names):
-    for name in possible_names:
-        for col in columns:
-            if str(col).strip().lower() == str(name).strip().lower():
-                return col
-    return None
-
 def auto_map_od_columns(os_first_columns, os_second_columns, sales_columns):
-    os_first_mapping = {
-        'due_date': find_column_by_names(os_first_columns, ['Due Date', 'Due_Date', 'DueDate']),
-        'branch': find_column_by_names(os_first_columns, ['Branch', 'Unit', 'Area', 'Location']),
-        'ref_date': find_column_by_names(os_first_columns, ['Ref. Date', 'Ref Date', 'Reference Date']),
-        'net_value': find_column_by_names(os_first_columns, ['Net Value', 'NetValue', 'Amount', 'Value']),
-        'executive': find_column_by_names(os_first_columns, ['Executive Name', 'Executive', 'Sales Executive']),
-        'region': find_column_by_names(os_first_columns, ['Region', 'Area Region', 'Zone'])
-    }
-    os_second_mapping = {
-        'due_date': find_column_by_names(os_second_columns, ['Due Date', 'Due_Date', 'DueDate']),
-        'branch': find_column_by_names(os_second_columns, ['Branch', 'Unit', 'Area', 'Location']),
-        'ref_date': find_column_by_names(os_second_columns, ['Ref. Date', 'Ref Date', 'Reference Date']),
-        'net_value': find_column_by_names(os_second_columns, ['Net Value', 'NetValue', 'Amount', 'Value']),
-        'executive': find_column_by_names(os_second_columns, ['Executive Name', 'Executive', 'Sales Executive']),
-        'region': find_column_by_names(os_second_columns, ['Region', 'Area Region', 'Zone'])
-    }
-    sales_mapping = {
-        'bill_date': find_column_by_names(sales_columns, ['Date', 'Bill Date', 'Invoice Date']),
-        'branch': find_column_by_names(sales_columns, ['Branch', 'Unit', 'Area', 'Location']),
-        'due_date': find_column_by_names(sales_columns, ['Due Date', 'Due_Date', 'DueDate']),
-        'value': find_column_by_names(sales_columns, ['Invoice Value', 'Value', 'Amount']),
-        'executive': find_column_by_names(sales_columns, ['Executive', 'Sales Executive', 'Executive Name']),
-        'region': find_column_by_names(sales_columns, ['Region', 'Area Region', 'Zone'])
-    }
+    os_first_mapping = map_fields(os_first_columns, {
+        'due_date': 'due_date',
+        'branch': 'branch',
+        'ref_date': 'ref_date',
+        'net_value': 'net_value',
+        'executive': 'executive',
+        'region': 'region'
+    })
+    os_second_mapping = map_fields(os_second_columns, {
+        'due_date': 'due_date',
+        'branch': 'branch',
+        'ref_date': 'ref_date',
+        'net_value': 'net_value',
+        'executive': 'executive',
+        'region': 'region'
+    })
+    sales_mapping = map_fields(sales_columns, {
+        'bill_date': 'sales_date',
+        'branch': 'branch',
+        'due_date': 'due_date',
+        'value': 'invoice_value',
+        'executive': 'executive',
+        'region': 'region'
+    })
     return os_first_mapping, os_second_mapping, sales_mapping
 
 # =========================
@@ -56,17 +51,21 @@ def map_branch(val, case='title'):
         return val.title()
     return val.upper()
 
+def map_branch_series(series, case='title'):
+    """map_branch over a column, evaluated once per distinct value"""
+    return canonicalize_series(series, lambda val: map_branch(val, case))
+
 # =========================
 # Cumulative Helpers (KEEP ORIGINAL)
 # =========================
 def get_cumulative_branches(os_first, os_second, total_sale, os_first_unit_col, os_second_unit_col, sale_branch_col):
     branches = set()
     if os_first_unit_col in os_first.columns:
-        branches.update(os_first[os_first_unit_col].dropna().apply(lambda x: map_branch(x, 'title')).unique())
+        branches.update(os_first[os_first_unit_col].dropna().pipe(map_branch_series).unique())
     if os_second_unit_col in os_second.columns:
-        branches.update(os_second[os_second_unit_col].dropna().apply(lambda x: map_branch(x, 'title')).unique())
+        branches.update(os_second[os_second_unit_col].dropna().pipe(map_branch_series).unique())
     if sale_branch_col in total_sale.columns:
-        branches.update(total_sale[sale_branch_col].dropna().apply(lambda x: map_branch(x, 'title')).unique())
+        branches.update(total_sale[sale_branch_col].dropna().pipe(map_branch_series).unique())
     return sorted(b for b in branches if b and b != 'Unknown')
 
 def get_cumulative_regions(os_first, os_second, total_sale, os_first_region_col, os_second_region_col, sale_region_col):
@@ -96,7 +95,7 @@ def create_region_branch_mapping(os_first, os_second, total_sale,
     ]:
         if unit_col and region_col and unit_col in df.columns and region_col in df.columns:
             temp = df[[unit_col, region_col]].dropna()
-            temp['Branch'] = temp[unit_col].apply(lambda x: map_branch(x, 'title'))
+            temp['Branch'] = map_branch_series(temp[unit_col])
             temp['Region'] = temp[region_col].astype(str).str.strip()
             combined.append(temp[['Branch', 'Region']])
 
@@ -183,6 +182,191 @@ def create_dynamic_regional_summary(df, region_map):
 # =========================
 # Main Calculation - KEEP YOUR ORIGINAL WORKING LOGIC
 # =========================
+def prepare_od_frames(
+    os_first, os_second, total_sale,
+    os_first_due_date_col, os_first_ref_date_col, os_first_unit_col, os_first_net_value_col, os_first_region_col,
+    os_second_due_date_col, os_second_ref_date_col, os_second_unit_col, os_second_net_value_col, os_second_region_col,
+    sale_bill_date_col, sale_due_date_col, sale_branch_col, sale_value_col, sale_region_col
+):
+    """Numeric/date conversion, branch mapping and region map shared by every selection"""
+    os_first = os_first.copy()
+    os_second = os_second.copy()
+    total_sale = total_sale.copy()
+
+    # ✅ Validate numeric columns - KEEP ORIGINAL
+    for df, col, name in [
+        (os_first, os_first_net_value_col, "OS First"),
+        (os_second, os_second_net_value_col, "OS Second"),
+        (total_sale, sale_value_col, "Sales")
+    ]:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        if df[col].isna().all():
+            raise ValueError(f"Column '{col}' in {name} contains no valid numeric data.")
+
+    # ✅ Remove negative values - KEEP ORIGINAL
+    os_first = os_first[os_first[os_first_net_value_col] >= 0]
+    os_second = os_second[os_second[os_second_net_value_col] >= 0]
+
+    # ✅ Date conversion & branch mapping
+    os_first[os_first_due_date_col] = pd.to_datetime(os_first[os_first_due_date_col], errors='coerce')
+    os_first[os_first_ref_date_col] = pd.to_datetime(os_first[os_first_ref_date_col], errors='coerce') if os_first_ref_date_col else None
+    os_first["Branch"] = map_branch_series(os_first[os_first_unit_col])
+
+    os_second[os_second_due_date_col] = pd.to_datetime(os_second[os_second_due_date_col], errors='coerce')
+    os_second[os_second_ref_date_col] = pd.to_datetime(os_second[os_second_ref_date_col], errors='coerce') if os_second_ref_date_col else None
+    os_second["Branch"] = map_branch_series(os_second[os_second_unit_col])
+
+    total_sale[sale_bill_date_col] = pd.to_datetime(total_sale[sale_bill_date_col], errors='coerce')
+    total_sale[sale_due_date_col] = pd.to_datetime(total_sale[sale_due_date_col], errors='coerce')
+    total_sale["Branch"] = map_branch_series(total_sale[sale_branch_col])
+
+    # ✅ Region-branch mapping - KEEP ORIGINAL
+    region_map = create_region_branch_mapping(
+        os_first, os_second, total_sale,
+        os_first_unit_col, os_first_region_col,
+        os_second_unit_col, os_second_region_col,
+        sale_branch_col, sale_region_col
+    )
+
+    # Remove rows where Branch is null or "Unknown" - KEEP ORIGINAL
+    os_first = os_first[os_first["Branch"].notna() & (os_first["Branch"] != "Unknown")]
+    os_second = os_second[os_second["Branch"].notna() & (os_second["Branch"] != "Unknown")]
+    total_sale = total_sale[total_sale["Branch"].notna() & (total_sale["Branch"] != "Unknown")]
+
+    return {
+        "os_first": os_first,
+        "os_second": os_second,
+        "total_sale": total_sale,
+        "region_map": region_map,
+    }
+
+def _month_range(selected_month_str):
+    month_str = selected_month_str.replace(" ", "-")
+    specified_date = pd.to_datetime("01-" + month_str, format="%d-%b-%y")
+    return specified_date, specified_date + pd.offsets.MonthEnd(0)
+
+def _exec_key(df, exec_col):
+    if exec_col and exec_col in df.columns:
+        return df[exec_col]
+    return pd.Series(np.nan, index=df.index, dtype=object)
+
+def _od_month_cube(prepared, selected_month_str, cols):
+    """
+    Per (Branch, executive) sums of every OD/collection figure for one month.
+    Filter combinations only slice this cube instead of re-filtering the frames.
+    """
+    os_first, os_second, total_sale = prepared["os_first"], prepared["os_second"], prepared["total_sale"]
+    specified_date, month_end = _month_range(selected_month_str)
+
+    def grouped(df, mask, exec_col, value_col):
+        df = df[mask]
+        return df[value_col].groupby([df["Branch"], _exec_key(df, exec_col)], dropna=False).sum()
+
+    return {
+        "due": grouped(os_first, os_first[cols["os_first_due_date_col"]] <= month_end,
+                       cols["os_first_exec_col"], cols["os_first_net_value_col"]),
+        "feb_coll": grouped(os_second, (os_second[cols["os_second_due_date_col"]] <= month_end) &
+                                       (os_second[cols["os_second_ref_date_col"]] < specified_date),
+                            cols["os_second_exec_col"], cols["os_second_net_value_col"]),
+        "overdue": grouped(total_sale, total_sale[cols["sale_bill_date_col"]].between(specified_date, month_end) &
+                                       total_sale[cols["sale_due_date_col"]].between(specified_date, month_end),
+                           cols["sale_exec_col"], cols["sale_value_col"]),
+        "os_month": grouped(os_second, os_second[cols["os_second_ref_date_col"]].between(specified_date, month_end) &
+                                       os_second[cols["os_second_due_date_col"]].between(specified_date, month_end),
+                            cols["os_second_exec_col"], cols["os_second_net_value_col"]),
+    }
+
+def _selection_mask(index, selected_executives, selected_branches, allowed_branches):
+    mask = np.ones(len(index), dtype=bool)
+    if selected_executives:
+        mask &= index.get_level_values(1).isin(selected_executives)
+    if selected_branches:
+        mask &= index.get_level_values(0).isin(selected_branches)
+    if allowed_branches is not None:
+        mask &= index.get_level_values(0).isin(allowed_branches)
+    return mask
+
+def _branch_totals(cube, selection, column):
+    totals = cube[_selection_mask(cube.index, *selection)].groupby(level=0).sum().reset_index()
+    totals.columns = ["Branch", column]
+    return totals
+
+def _od_tables(prepared, row_counts, month_cube, selected_executives, selected_branches, selected_regions):
+    region_map = prepared["region_map"]
+
+    # ✅ Filters - KEEP ORIGINAL
+    allowed = None
+    if selected_regions and region_map:
+        allowed = [b for r in selected_regions for b in region_map.get(r, [])]
+    selection = (selected_executives, selected_branches, allowed)
+
+    if any(not _selection_mask(counts.index, *selection).any() for counts in row_counts):
+        logger.error("Error in calculate_od_values_updated: One or more datasets are empty after filtering. Cannot compute results.")
+        raise ValueError("One or more datasets are empty after filtering. Cannot compute results.")
+
+    cube = month_cube()
+
+    # === Branch-wise Calculations - KEEP ORIGINAL ===
+    due_target_sum = _branch_totals(cube["due"], selection, "Due Target")
+    jan_coll = _branch_totals(cube["due"], selection, "OS Jan Coll")
+    feb_coll = _branch_totals(cube["feb_coll"], selection, "OS Feb Coll")
+
+    collection = jan_coll.merge(feb_coll, on="Branch", how="outer").fillna(0)
+    collection["Collection Achieved"] = collection["OS Jan Coll"] - collection["OS Feb Coll"]
+    collection["Overall % Achieved"] = np.where(collection["OS Jan Coll"] > 0, 
+                                                (collection["Collection Achieved"] / collection["OS Jan Coll"]) * 100, 
+                                                0)
+    collection = collection.merge(due_target_sum, on="Branch", how="left").fillna(0)
+
+    # === Overdue + Month Collection - KEEP ORIGINAL ===
+    overdue_sum = _branch_totals(cube["overdue"], selection, "For the month Overdue")
+    sales_sum = _branch_totals(cube["overdue"], selection, "Sale Value")
+    os_month_sum = _branch_totals(cube["os_month"], selection, "OS Month Collection")
+
+    month_result = sales_sum.merge(os_month_sum, on="Branch", how="outer").fillna(0)
+    month_result["For the month Collection"] = month_result["Sale Value"] - month_result["OS Month Collection"]
+
+    # === Final Merge - KEEP ORIGINAL ===
+    final = collection.drop(columns=["OS Jan Coll", "OS Feb Coll"]).merge(overdue_sum, on="Branch", how="outer") \
+                      .merge(month_result[["Branch", "For the month Collection"]], on="Branch", how="outer").fillna(0)
+
+    final["% Achieved (Selected Month)"] = np.where(final["For the month Overdue"] > 0,
+                                                    (final["For the month Collection"] / final["For the month Overdue"]) * 100, 0)
+
+    # 💰 Convert to lakhs and round - KEEP ORIGINAL
+    value_cols = ["Due Target", "Collection Achieved", "For the month Overdue", "For the month Collection"]
+    final[value_cols] = final[value_cols].div(100000)
+    round_cols = value_cols + ["Overall % Achieved", "% Achieved (Selected Month)"]
+    final[round_cols] = final[round_cols].round(2)
+
+    # Reorder - KEEP ORIGINAL
+    final = final[["Branch", "Due Target", "Collection Achieved", "Overall % Achieved", 
+                   "For the month Overdue", "For the month Collection", "% Achieved (Selected Month)"]]
+    final.sort_values("Branch", inplace=True)
+
+    # 🌍 Regional Summary - SIMPLIFIED TO JUST SUM VALUES
+    regional_summary = create_dynamic_regional_summary(final, region_map)
+
+    # ➕ Total Row - FIXED: Use exact formula like regional summary
+    total_row = {'Branch': 'TOTAL'}
+    for col in final.columns[1:]:
+        if col == "Overall % Achieved":
+            # Use exact formula: (Total Collection Achieved / Total Due Target) * 100
+            total_due = final["Due Target"].sum()
+            total_achieved = final["Collection Achieved"].sum()
+            total_row[col] = round((total_achieved / total_due * 100) if total_due > 0 else 0, 2)
+        elif col == "% Achieved (Selected Month)":
+            # Use exact formula: (Total Month Collection / Total Month Overdue) * 100
+            total_overdue = final["For the month Overdue"].sum()
+            total_month_collection = final["For the month Collection"].sum()
+            total_row[col] = round((total_month_collection / total_overdue * 100) if total_overdue > 0 else 0, 2)
+        else:
+            total_row[col] = round(final[col].sum(), 2)
+
+    final = pd.concat([final, pd.DataFrame([total_row])], ignore_index=True)
+
+    return final, regional_summary, region_map
+
 def calculate_od_values_updated(
     os_first, os_second, total_sale, selected_month_str,
     os_first_due_date_col, os_first_ref_date_col, os_first_unit_col, os_first_net_value_col, os_first_exec_col, os_first_region_col,
@@ -190,154 +374,83 @@ def calculate_od_values_updated(
     sale_bill_date_col, sale_due_date_col, sale_branch_col, sale_value_col, sale_exec_col, sale_region_col,
     selected_executives, selected_branches, selected_regions
 ):
+    results = calculate_od_values_batch(
+        os_first, os_second, total_sale,
+        os_first_due_date_col, os_first_ref_date_col, os_first_unit_col, os_first_net_value_col, os_first_exec_col, os_first_region_col,
+        os_second_due_date_col, os_second_ref_date_col, os_second_unit_col, os_second_net_value_col, os_second_exec_col, os_second_region_col,
+        sale_bill_date_col, sale_due_date_col, sale_branch_col, sale_value_col, sale_exec_col, sale_region_col,
+        [{
+            "selected_month": selected_month_str,
+            "selected_executives": selected_executives,
+            "selected_branches": selected_branches,
+            "selected_regions": selected_regions,
+        }],
+        raise_errors=True
+    )
+    final, regional_summary, region_map, _ = results[0]
+    return final, regional_summary, region_map
+
+def calculate_od_values_batch(
+    os_first, os_second, total_sale,
+    os_first_due_date_col, os_first_ref_date_col, os_first_unit_col, os_first_net_value_col, os_first_exec_col, os_first_region_col,
+    os_second_due_date_col, os_second_ref_date_col, os_second_unit_col, os_second_net_value_col, os_second_exec_col, os_second_region_col,
+    sale_bill_date_col, sale_due_date_col, sale_branch_col, sale_value_col, sale_exec_col, sale_region_col,
+    selections, raise_errors=False
+):
+    """
+    OD target vs collection for many filter combinations from one preprocessing pass.
+
+    Each selection is a dict with selected_month, selected_executives,
+    selected_branches and selected_regions. Returns one
+    (branch_summary, regional_summary, region_map, error) tuple per selection, with
+    error None; a selection that fails yields (None, None, region_map, message)
+    unless raise_errors is set.
+    """
+    cols = {
+        "os_first_due_date_col": os_first_due_date_col, "os_first_net_value_col": os_first_net_value_col,
+        "os_first_exec_col": os_first_exec_col,
+        "os_second_due_date_col": os_second_due_date_col, "os_second_ref_date_col": os_second_ref_date_col,
+        "os_second_net_value_col": os_second_net_value_col, "os_second_exec_col": os_second_exec_col,
+        "sale_bill_date_col": sale_bill_date_col, "sale_due_date_col": sale_due_date_col,
+        "sale_value_col": sale_value_col, "sale_exec_col": sale_exec_col,
+    }
     try:
-        os_first = os_first.copy()
-        os_second = os_second.copy()
-        total_sale = total_sale.copy()
-
-        # ✅ Validate numeric columns - KEEP ORIGINAL
-        for df, col, name in [
-            (os_first, os_first_net_value_col, "OS First"),
-            (os_second, os_second_net_value_col, "OS Second"),
-            (total_sale, sale_value_col, "Sales")
-        ]:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            if df[col].isna().all():
-                raise ValueError(f"Column '{col}' in {name} contains no valid numeric data.")
-
-        # ✅ Remove negative values - KEEP ORIGINAL
-        os_first = os_first[os_first[os_first_net_value_col] >= 0]
-        os_second = os_second[os_second[os_second_net_value_col] >= 0]
-
-        # ✅ Date conversion & branch mapping - KEEP ORIGINAL
-        os_first[os_first_due_date_col] = pd.to_datetime(os_first[os_first_due_date_col], errors='coerce')
-        os_first[os_first_ref_date_col] = pd.to_datetime(os_first[os_first_ref_date_col], errors='coerce') if os_first_ref_date_col else None
-        os_first["Branch"] = os_first[os_first_unit_col].apply(lambda x: map_branch(x, case='title'))
-
-        os_second[os_second_due_date_col] = pd.to_datetime(os_second[os_second_due_date_col], errors='coerce')
-        os_second[os_second_ref_date_col] = pd.to_datetime(os_second[os_second_ref_date_col], errors='coerce') if os_second_ref_date_col else None
-        os_second["Branch"] = os_second[os_second_unit_col].apply(lambda x: map_branch(x, case='title'))
-
-        total_sale[sale_bill_date_col] = pd.to_datetime(total_sale[sale_bill_date_col], errors='coerce')
-        total_sale[sale_due_date_col] = pd.to_datetime(total_sale[sale_due_date_col], errors='coerce')
-        total_sale["Branch"] = total_sale[sale_branch_col].apply(lambda x: map_branch(x, case='title'))
-
-        # ✅ Region-branch mapping - KEEP ORIGINAL
-        region_map = create_region_branch_mapping(
+        prepared = prepare_od_frames(
             os_first, os_second, total_sale,
-            os_first_unit_col, os_first_region_col,
-            os_second_unit_col, os_second_region_col,
-            sale_branch_col, sale_region_col
+            os_first_due_date_col, os_first_ref_date_col, os_first_unit_col, os_first_net_value_col, os_first_region_col,
+            os_second_due_date_col, os_second_ref_date_col, os_second_unit_col, os_second_net_value_col, os_second_region_col,
+            sale_bill_date_col, sale_due_date_col, sale_branch_col, sale_value_col, sale_region_col
         )
-
-        # Remove rows where Branch is null or "Unknown" - KEEP ORIGINAL
-        os_first = os_first[os_first["Branch"].notna() & (os_first["Branch"] != "Unknown")]
-        os_second = os_second[os_second["Branch"].notna() & (os_second["Branch"] != "Unknown")]
-        total_sale = total_sale[total_sale["Branch"].notna() & (total_sale["Branch"] != "Unknown")]
-
-        # ✅ Filters - KEEP ORIGINAL
-        if selected_executives:
-            os_first = os_first[os_first[os_first_exec_col].isin(selected_executives)]
-            os_second = os_second[os_second[os_second_exec_col].isin(selected_executives)]
-            total_sale = total_sale[total_sale[sale_exec_col].isin(selected_executives)]
-
-        if selected_branches:
-            os_first = os_first[os_first["Branch"].isin(selected_branches)]
-            os_second = os_second[os_second["Branch"].isin(selected_branches)]
-            total_sale = total_sale[total_sale["Branch"].isin(selected_branches)]
-
-        if selected_regions and region_map:
-            allowed = [b for r in selected_regions for b in region_map.get(r, [])]
-            os_first = os_first[os_first["Branch"].isin(allowed)]
-            os_second = os_second[os_second["Branch"].isin(allowed)]
-            total_sale = total_sale[total_sale["Branch"].isin(allowed)]
-
-        if os_first.empty or os_second.empty or total_sale.empty:
-            logger.error("Error in calculate_od_values_updated: One or more datasets are empty after filtering. Cannot compute results.")
-            raise ValueError("One or more datasets are empty after filtering. Cannot compute results.")
-
-        # ✅ Date range - KEEP ORIGINAL
-        month_str = selected_month_str.replace(" ", "-")
-        specified_date = pd.to_datetime("01-" + month_str, format="%d-%b-%y")
-        month_end = specified_date + pd.offsets.MonthEnd(0)
-
-        # === Branch-wise Calculations - KEEP ORIGINAL ===
-        due_target = os_first[os_first[os_first_due_date_col] <= month_end]
-        due_target_sum = due_target.groupby("Branch")[os_first_net_value_col].sum().reset_index()
-        due_target_sum.columns = ["Branch", "Due Target"]
-
-        jan_coll = os_first[os_first[os_first_due_date_col] <= month_end].groupby("Branch")[os_first_net_value_col].sum().reset_index()
-        jan_coll.columns = ["Branch", "OS Jan Coll"]
-
-        feb_coll = os_second[(os_second[os_second_due_date_col] <= month_end) & 
-                             (os_second[os_second_ref_date_col] < specified_date)].groupby("Branch")[os_second_net_value_col].sum().reset_index()
-        feb_coll.columns = ["Branch", "OS Feb Coll"]
-
-        collection = jan_coll.merge(feb_coll, on="Branch", how="outer").fillna(0)
-        collection["Collection Achieved"] = collection["OS Jan Coll"] - collection["OS Feb Coll"]
-        collection["Overall % Achieved"] = np.where(collection["OS Jan Coll"] > 0, 
-                                                    (collection["Collection Achieved"] / collection["OS Jan Coll"]) * 100, 
-                                                    0)
-        collection = collection.merge(due_target_sum, on="Branch", how="left").fillna(0)
-
-        # === Overdue + Month Collection - KEEP ORIGINAL ===
-        overdue = total_sale[(total_sale[sale_bill_date_col].between(specified_date, month_end)) &
-                             (total_sale[sale_due_date_col].between(specified_date, month_end))]
-        overdue_sum = overdue.groupby("Branch")[sale_value_col].sum().reset_index()
-        overdue_sum.columns = ["Branch", "For the month Overdue"]
-
-        sales_sum = overdue.groupby("Branch")[sale_value_col].sum().reset_index()
-        sales_sum.columns = ["Branch", "Sale Value"]
-
-        os_month = os_second[(os_second[os_second_ref_date_col].between(specified_date, month_end)) &
-                             (os_second[os_second_due_date_col].between(specified_date, month_end))]
-        os_month_sum = os_month.groupby("Branch")[os_second_net_value_col].sum().reset_index()
-        os_month_sum.columns = ["Branch", "OS Month Collection"]
-
-        month_result = sales_sum.merge(os_month_sum, on="Branch", how="outer").fillna(0)
-        month_result["For the month Collection"] = month_result["Sale Value"] - month_result["OS Month Collection"]
-
-        # === Final Merge - KEEP ORIGINAL ===
-        final = collection.drop(columns=["OS Jan Coll", "OS Feb Coll"]).merge(overdue_sum, on="Branch", how="outer") \
-                          .merge(month_result[["Branch", "For the month Collection"]], on="Branch", how="outer").fillna(0)
-
-        final["% Achieved (Selected Month)"] = np.where(final["For the month Overdue"] > 0,
-                                                        (final["For the month Collection"] / final["For the month Overdue"]) * 100, 0)
-
-        # 💰 Convert to lakhs and round - KEEP ORIGINAL
-        value_cols = ["Due Target", "Collection Achieved", "For the month Overdue", "For the month Collection"]
-        final[value_cols] = final[value_cols].div(100000)
-        round_cols = value_cols + ["Overall % Achieved", "% Achieved (Selected Month)"]
-        final[round_cols] = final[round_cols].round(2)
-
-        # Reorder - KEEP ORIGINAL
-        final = final[["Branch", "Due Target", "Collection Achieved", "Overall % Achieved", 
-                       "For the month Overdue", "For the month Collection", "% Achieved (Selected Month)"]]
-        final.sort_values("Branch", inplace=True)
-
-        # 🌍 Regional Summary - SIMPLIFIED TO JUST SUM VALUES
-        regional_summary = create_dynamic_regional_summary(final, region_map)
-
-        # ➕ Total Row - FIXED: Use exact formula like regional summary
-        total_row = {'Branch': 'TOTAL'}
-        for col in final.columns[1:]:
-            if col == "Overall % Achieved":
-                # Use exact formula: (Total Collection Achieved / Total Due Target) * 100
-                total_due = final["Due Target"].sum()
-                total_achieved = final["Collection Achieved"].sum()
-                total_row[col] = round((total_achieved / total_due * 100) if total_due > 0 else 0, 2)
-            elif col == "% Achieved (Selected Month)":
-                # Use exact formula: (Total Month Collection / Total Month Overdue) * 100
-                total_overdue = final["For the month Overdue"].sum()
-                total_month_collection = final["For the month Collection"].sum()
-                total_row[col] = round((total_month_collection / total_overdue * 100) if total_overdue > 0 else 0, 2)
-            else:
-                total_row[col] = round(final[col].sum(), 2)
-
-        final = pd.concat([final, pd.DataFrame([total_row])], ignore_index=True)
-
-        return final, regional_summary, region_map
-
     except Exception as e:
         logger.error(f"Error in calculate_od_values_updated: {e}")
-        raise RuntimeError(f"OD Target Calculation failed: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"OD Target Calculation failed: {str(e)}")
+
+    # Row counts per (Branch, executive) answer the "empty after filtering" check
+    row_counts = [
+        prepared[name].groupby([prepared[name]["Branch"], _exec_key(prepared[name], exec_col)], dropna=False).size()
+        for name, exec_col in [("os_first", os_first_exec_col), ("os_second", os_second_exec_col), ("total_sale", sale_exec_col)]
+    ]
+    month_cubes = {}
+
+    results = []
+    for selection in selections:
+        month = selection["selected_month"]
+
+        def month_cube():
+            if month not in month_cubes:
+                month_cubes[month] = _od_month_cube(prepared, month, cols)
+            return month_cubes[month]
+
+        try:
+            final, regional_summary, region_map = _od_tables(
+                prepared, row_counts, month_cube,
+                selection.get("selected_executives"), selection.get("selected_branches"), selection.get("selected_regions")
+            )
+        except Exception as e:
+            logger.error(f"Error in calculate_od_values_updated: {e}")
+            if raise_errors:
+                raise RuntimeError(f"OD Target Calculation failed: {str(e)}")
+            results.append((None, None, prepared["region_map"], f"OD Target Calculation failed: {str(e)}"))
+            continue
+        results.append((final, regional_summary, region_map, None))
+    return results
@@ -1,13 +1,21 @@
 import pandas as pd
 from pptx import Presentation
 from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR
+from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import os
 from io import BytesIO
 import uuid
 import json
 import logging
+from utils.ppt_table import TableStyle, HEADER_FILL, TOTAL_FILL, fill_table, body_rows, plain_texts
+from utils.ppt_pipeline import new_presentation, render_sections
+
+BRANCH_TABLE_STYLE = TableStyle(
+    header_size=12, header_fill=HEADER_FILL, body_size=11,
+    band_fills=((240, 240, 240), None), total_fill=TOTAL_FILL, anchor_middle=False
+)
+MIDDLE_TABLE_STYLE = BRANCH_TABLE_STYLE._replace(anchor_middle=True)
 
 def _add_title_slide(prs, month_title, logo_file=None):
     slide = prs.slides.add_slide(prs.slide_layouts[6])
@@ -68,49 +76,30 @@ def _add_table_slide(prs, title_text, df, percent_col_index=None):
     table = slide.shapes.add_table(rows + 1, cols, Inches(0.5), Inches(1.5), Inches(12), Inches(5.5)).table
     for i in range(cols):
         table.columns[i].width = Inches(3)
-        
-    for col_idx, col_name in enumerate(df.columns):
-        cell = table.cell(0, col_idx)
-        cell.text = str(col_name)
-        cell.text_frame.paragraphs[0].font.size = Pt(12)
-        cell.text_frame.paragraphs[0].font.bold = True
-        cell.fill.solid()
-        cell.fill.fore_color.rgb = RGBColor(0, 112, 192)
-        cell.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-        cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-
-    for row_idx in range(rows):
-        is_total = df.iloc[row_idx, 0].upper() in ['TOTAL', 'GRAND TOTAL'] if isinstance(df.iloc[row_idx, 0], str) else False
-        for col_idx in range(cols):
-            val = df.iloc[row_idx, col_idx]
-            text = f"{val}%" if percent_col_index is not None and col_idx == percent_col_index else str(val)
-            cell = table.cell(row_idx + 1, col_idx)
-            cell.text = text
-            cell.text_frame.paragraphs[0].font.size = Pt(11)
-            cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-            if is_total:
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(211, 211, 211)
-                cell.text_frame.paragraphs[0].font.bold = True
-            elif row_idx % 2 == 0:
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(240, 240, 240)
 
-def create_consolidated_ppt(all_dfs_with_titles, title="ACCLLP Consolidated Report"):
-    """Create a consolidated PPT with all report data. Automatically loads static logo."""
+    columns_text = []
+    for col_idx in range(cols):
+        texts = plain_texts(df.iloc[:, col_idx])
+        if percent_col_index is not None and col_idx == percent_col_index:
+            texts = [f"{text}%" for text in texts]
+        columns_text.append(texts)
+    first = df.iloc[:, 0] if cols else pd.Series([], dtype=object)
+    total_rows = [isinstance(v, str) and v.upper() in ['TOTAL', 'GRAND TOTAL'] for v in first]
+    fill_table(table, [str(col) for col in df.columns], body_rows(columns_text), BRANCH_TABLE_STYLE, total_rows)
+
+def create_consolidated_ppt(all_dfs_with_titles, logo_file=None, title="ACCLLP Consolidated Report"):
+    """Create a consolidated PPT with all report data. Loads the static logo unless logo_file is given."""
     try:
         from io import BytesIO
         import os
 
-        prs = Presentation()
-        prs.slide_width = Inches(13.33)
-        prs.slide_height = Inches(7.5)
+        prs = new_presentation()
 
         # 🔥 Load logo from static folder (internal handling)
-        logo_stream = None
+        logo_stream = logo_file
         static_logo_path = os.path.join("static", "logo.jpeg")  # adjust if .jpg/.png
 
-        if os.path.exists(static_logo_path):
+        if logo_stream is None and os.path.exists(static_logo_path):
             try:
                 with open(static_logo_path, "rb") as f:
                     logo_stream = BytesIO(f.read())
@@ -118,21 +107,19 @@ def create_consolidated_ppt(all_dfs_with_titles, title="ACCLLP Consolidated Repo
                 logger.info(f"✅ Logo loaded from {static_logo_path}")
             except Exception as e:
                 logger.warning(f"⚠️ Could not read logo from static: {e}")
-        else:
+        elif logo_stream is None:
             logger.warning("⚠️ No static logo found — proceeding without logo.")
 
         # 🧠 Title slide
         create_title_slide(prs, title, logo_stream)
 
-        # 📊 Table slides
-        for df_info in all_dfs_with_titles:
-            if df_info and 'df' in df_info and 'title' in df_info:
-                add_table_slide(
-                    prs,
-                    df_info['df'],
-                    df_info['title'],
-                    df_info.get('percent_cols')
-                )
+        # 📊 Table slides, rendered side by side and merged in order
+        sections = [
+            (df_info['df'], df_info['title'], df_info.get('percent_cols'))
+            for df_info in all_dfs_with_titles
+            if df_info and 'df' in df_info and 'title' in df_info
+        ]
+        render_sections(prs, add_table_slide, sections)
 
         # 📤 Output PPT
         ppt_buffer = BytesIO()
@@ -288,35 +275,17 @@ def add_table_slide(prs, df, title, percent_cols=None):
     p.font.color.rgb = RGBColor(0, 112, 192)
     rows, cols = df.shape
     table = slide.shapes.add_table(rows + 1, cols, Inches(0.5), Inches(1.5), Inches(12.33), Inches(5.5)).table
-    for col_idx, col_name in enumerate(df.columns):
-        cell = table.cell(0, col_idx)
-        cell.text = str(col_name)
-        cell.text_frame.paragraphs[0].font.size = Pt(12)
-        cell.text_frame.paragraphs[0].font.bold = True
-        cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-        cell.vertical_anchor = MSO_VERTICAL_ANCHOR.MIDDLE
-        cell.fill.solid()
-        cell.fill.fore_color.rgb = RGBColor(0, 112, 192)
-        cell.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-    for row_idx in range(df.shape[0]):
-        is_total_row = row_idx == rows - 1 and str(df.iloc[row_idx, 0]).upper() in ['TOTAL', 'GRAND TOTAL']
-        for col_idx in range(cols):
-            cell = table.cell(row_idx + 1, col_idx)
-            value = df.iloc[row_idx, col_idx]
-            if percent_cols and col_idx in percent_cols:
-                cell.text = f"{value}%"
-            else:
-                cell.text = str(value)
-            cell.text_frame.paragraphs[0].font.size = Pt(11)
-            cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-            cell.vertical_anchor = MSO_VERTICAL_ANCHOR.MIDDLE
-            if row_idx % 2 == 0 and not is_total_row:
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(240, 240, 240)
-            if is_total_row:
-                cell.text_frame.paragraphs[0].font.bold = True
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(211, 211, 211)    
+    columns_text = []
+    for col_idx in range(cols):
+        texts = plain_texts(df.iloc[:, col_idx])
+        if percent_cols and col_idx in percent_cols:
+            texts = [f"{text}%" for text in texts]
+        columns_text.append(texts)
+    # only a trailing TOTAL / GRAND TOTAL row is drawn as a total
+    total_rows = [False] * rows
+    if rows and str(df.iloc[rows - 1, 0]).upper() in ['TOTAL', 'GRAND TOTAL']:
+        total_rows[-1] = True
+    fill_table(table, [str(col) for col in df.columns], body_rows(columns_text), MIDDLE_TABLE_STYLE, total_rows)
     return slide
 
 
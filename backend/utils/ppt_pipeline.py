@@ -0,0 +1,86 @@
+import os
+import logging
+from concurrent.futures.process import BrokenProcessPool
+
+from lxml import etree
+from pptx import Presentation
+from pptx.oxml import parse_xml
+from pptx.util import Inches
+
+from utils.jobs import report_progress
+from utils.process_pool import get_pool, reset_pool, in_pool_worker
+
+logger = logging.getLogger(__name__)
+
+# Consolidated decks are rendered section by section in a process pool. Each
+# worker draws its section into a scratch presentation and hands back the shape
+# trees of the slides it produced; the request thread grafts them onto fresh
+# blank slides in section order. Table slides carry no relationships (images,
+# charts), so the shape tree is the whole slide. Small decks, decks built inside
+# a job worker, and any pool failure fall back to rendering in the calling thread.
+
+PPT_RENDER_WORKERS = int(os.getenv("PPT_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+PPT_PARALLEL_MIN_SECTIONS = int(os.getenv("PPT_PARALLEL_MIN_SECTIONS", 4))
+
+PPT_POOL = 'ppt_render'
+BLANK_LAYOUT = 6
+
+
+def new_presentation():
+    """Empty 16:9 deck, as every report starts from"""
+    prs = Presentation()
+    prs.slide_width = Inches(13.33)
+    prs.slide_height = Inches(7.5)
+    return prs
+
+
+def render_part(render, args):
+    """Worker side: render one section into a scratch deck and return its slides' shape trees"""
+    prs = new_presentation()
+    render(prs, *args)
+    return [etree.tostring(slide.shapes._spTree) for slide in prs.slides]
+
+
+def append_slide_parts(prs, parts):
+    """Add one blank slide per shape tree returned by render_part"""
+    layout = prs.slide_layouts[BLANK_LAYOUT]
+    for xml in parts:
+        slide = prs.slides.add_slide(layout)
+        sp_tree = slide.shapes._spTree
+        sp_tree.getparent().replace(sp_tree, parse_xml(xml))
+
+
+def _report_sections_done(done, total):
+    report_progress(5 + 85 * done // total, f"Rendered {done} of {total} sections")
+
+
+def _render_serially(prs, render, sections):
+    for done, args in enumerate(sections, 1):
+        render(prs, *args)
+        _report_sections_done(done, len(sections))
+
+
+def render_sections(prs, render, sections):
+    """
+    Append the slides of every section to prs, in order. render(prs, *args) is a
+    module-level function drawing one section; sections is a list of args tuples.
+    """
+    if PPT_RENDER_WORKERS <= 1 or len(sections) < PPT_PARALLEL_MIN_SECTIONS or in_pool_worker():
+        _render_serially(prs, render, sections)
+        return
+
+    try:
+        pool = get_pool(PPT_POOL, PPT_RENDER_WORKERS)
+        futures = [pool.submit(render_part, render, args) for args in sections]
+        parts = []
+        for future in futures:
+            parts.append(future.result())
+            _report_sections_done(len(parts), len(sections))
+    except BrokenProcessPool as e:
+        logger.warning(f"PPT render pool failed ({e}); rendering serially")
+        reset_pool(PPT_POOL)
+        _render_serially(prs, render, sections)
+        return
+
+    for section_parts in parts:
+        append_slide_parts(prs, section_parts)
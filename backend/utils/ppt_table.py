@@ -0,0 +1,158 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.util import Inches, Pt
+
+# Bulk table rendering for the PPT decks. Setting text, font and fill through
+# python-pptx costs a handful of XML lookups per property per cell; here every
+# styled cell kind (header, banded body, total) is rendered once through those
+# same setters into an XML template, and whole tables are then written as one
+# string of cells that is parsed in a single pass. Cell texts are formatted
+# column-wise beforehand.
+
+TableStyle = namedtuple('TableStyle', [
+    'header_size',     # header font size (pt)
+    'header_fill',     # header background, RGB tuple
+    'body_size',       # body font size (pt)
+    'band_fills',      # (fill of even body rows, fill of odd body rows); None leaves the cell unfilled
+    'total_fill',      # background of total rows
+    'anchor_middle',   # vertically centre every cell
+])
+
+HEADER_FILL = (0, 112, 192)
+TOTAL_FILL = (211, 211, 211)
+
+# Kinds of cell a template is built for
+HEADER, EVEN, ODD, TOTAL = 'header', 'even', 'odd', 'total'
+
+_SENTINEL = 'QQ_CELL_TEXT_QQ'
+_NEEDS_SETTER = re.compile(r'[\x00-\x1f\x7f]')  # line breaks / control chars: let python-pptx handle them
+_NS_DECL = re.compile(r'\sxmlns(?::\w+)?="[^"]*"')
+
+
+def style_cell(cell, text, style, kind):
+    """Write text into a table cell and style it the python-pptx way"""
+    cell.text = text
+    paragraph = cell.text_frame.paragraphs[0]
+    if kind == HEADER:
+        fill = style.header_fill
+        paragraph.font.size = Pt(style.header_size)
+        paragraph.font.bold = True
+        paragraph.font.color.rgb = RGBColor(255, 255, 255)
+    else:
+        paragraph.font.size = Pt(style.body_size)
+        if kind == TOTAL:
+            fill = style.total_fill
+            paragraph.font.bold = True
+        else:
+            fill = style.band_fills[0 if kind == EVEN else 1]
+    paragraph.alignment = PP_ALIGN.CENTER
+    if style.anchor_middle:
+        cell.vertical_anchor = MSO_VERTICAL_ANCHOR.MIDDLE
+    if fill is not None:
+        cell.fill.solid()
+        cell.fill.fore_color.rgb = RGBColor(*fill)
+
+
+@lru_cache(maxsize=64)
+def _cell_templates(style, kind):
+    """(before, after, empty) XML of a styled <a:tc>; text goes between before and after"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    table = slide.shapes.add_table(1, 2, Inches(0), Inches(0), Inches(2), Inches(1)).table
+
+    def render(cell, text):
+        style_cell(cell, text, style, kind)
+        return _NS_DECL.sub('', etree.tostring(cell._tc, encoding='unicode'))
+
+    before, after = render(table.cell(0, 0), _SENTINEL).split(_SENTINEL)
+    return before, after, render(table.cell(0, 1), '')
+
+
+def fill_table(table, header, rows, style, total_rows=None):
+    """
+    Write header (list of str) and body rows (lists of str) into a python-pptx
+    table created with len(rows) + 1 rows, styling cells like style_cell().
+    total_rows flags body rows drawn as totals.
+    """
+    tbl = table._tbl
+    tr_elements = tbl.tr_lst
+    fallback = []
+
+    def row_xml(r, texts, kind):
+        before, after, empty = _cell_templates(style, kind)
+        cells = []
+        for c, text in enumerate(texts):
+            if not text:
+                cells.append(empty)
+            elif _NEEDS_SETTER.search(text):
+                fallback.append((r, c, text, kind))
+                cells.append(empty)
+            else:
+                cells.append(before + escape(text) + after)
+        return f'<a:tr h="{tr_elements[r].h}">' + ''.join(cells) + '</a:tr>'
+
+    parts = [row_xml(0, header, HEADER)]
+    for i, texts in enumerate(rows):
+        if total_rows is not None and total_rows[i]:
+            kind = TOTAL
+        else:
+            kind = EVEN if i % 2 == 0 else ODD
+        parts.append(row_xml(i + 1, texts, kind))
+
+    new_rows = parse_xml(f'<a:tbl {nsdecls("a")}>' + ''.join(parts) + '</a:tbl>')
+    for old_tr, new_tr in zip(tr_elements, list(new_rows)):
+        tbl.replace(old_tr, new_tr)
+
+    for r, c, text, kind in fallback:
+        style_cell(table.cell(r, c), text, style, kind)
+    return table
+
+
+### --------- Cell text formatting ----------
+
+def plain_texts(column):
+    """str(value) for every cell of a column (Series)"""
+    if column.dtype.kind in 'biuf':
+        return column.to_numpy().astype(str).tolist()
+    return column.map(str).tolist()
+
+
+def number_texts(column):
+    """Whole numbers as integers, everything else with two decimals; NaN as ''"""
+    values = np.asarray(column, dtype=float)
+    if not values.size:
+        return []
+    rounded = np.round(values)
+    whole = np.abs(values - rounded) < 0.001
+    texts = np.where(whole, np.char.mod('%d', np.nan_to_num(rounded)), np.char.mod('%.2f', values))
+    return np.where(np.isnan(values), '', texts).tolist()
+
+
+def percent_texts(column, nan_text=''):
+    """Numbers as '12.34%'; NaN as nan_text"""
+    values = np.asarray(column, dtype=float)
+    if not values.size:
+        return []
+    return np.where(np.isnan(values), nan_text, np.char.add(np.char.mod('%.2f', values), '%')).tolist()
+
+
+def body_rows(columns):
+    """Transpose per-column text lists into per-row lists"""
+    return [list(row) for row in zip(*columns)] if columns else []
+
+
+def total_row_flags(first_column, labels):
+    """Rows whose first cell, upper-cased, is one of labels"""
+    upper = pd.Series(first_column, dtype=object).map(lambda v: str(v).upper())
+    return upper.isin(labels).tolist()
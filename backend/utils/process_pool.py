@@ -0,0 +1,52 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Named process pools for the background jobs and the PPT and chart renderers.
+# A pool is started on first use and kept for the life of the process; after a
+# BrokenProcessPool the caller resets it and the next get_pool starts a fresh
+# one. Workers are spawned, not forked: a fork of the threaded server would
+# inherit locks held by other request threads and the database connection
+# pools. Anything submitted must therefore be picklable by reference
+# (module-level functions and plain data).
+#
+# Pool workers never start pools of their own: a job worker rendering a deck
+# would otherwise add a PPT and a chart pool per job, each paying the spawn
+# start-up again. Code that can run in a worker checks in_pool_worker() and
+# does the work serially there.
+
+_pools = {}                # name -> ProcessPoolExecutor
+_lock = threading.Lock()
+_in_worker = False
+
+
+def _mark_worker():
+    global _in_worker
+    _in_worker = True
+
+
+def in_pool_worker():
+    """True in a process started by get_pool"""
+    return _in_worker
+
+
+def get_pool(name, workers):
+    """The process pool registered under name, started with workers processes on first use"""
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_mark_worker
+            )
+            _pools[name] = pool
+        return pool
+
+
+def reset_pool(name):
+    """Shut down the pool registered under name without waiting; the next get_pool starts a new one"""
+    with _lock:
+        pool = _pools.pop(name, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)